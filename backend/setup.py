@@ -76,6 +76,8 @@ setup(
             # Used for multipart stream parsing in file manager
             "streaming_form_data",
             "psutil",
+            # Used to expose metrics in the Prometheus format
+            "prometheus-client",
             "uvicorn",
             "sqlalchemy>=1.4.0",
             # Postgres Driver
@@ -1,5 +1,4 @@
 import asyncio
-import functools
 import sys
 from typing import Any, Dict
 
@@ -19,14 +18,14 @@ from contaxy.api.endpoints import (
     extension,
     file,
     json_db,
+    operation,
     project,
     seed,
     system,
     user,
 )
-from contaxy.managers.components import ComponentManager
-from contaxy.managers.deployment.utils import stop_idle_services
-from contaxy.utils import fastapi_utils, state_utils
+from contaxy.managers.scheduler import JobScheduler
+from contaxy.utils import fastapi_utils, prometheus_utils, state_utils
 
 # Initialize API
 app = FastAPI(
@@ -38,6 +37,9 @@ app = FastAPI(
 if config.settings.DEBUG:
     fastapi_utils.add_timing_info(app)
 
+# Collect request metrics exposed via /system/metrics
+app.add_middleware(prometheus_utils.MetricsMiddleware)
+
 # Setup logging
 logger.remove()
 if config.settings.DEBUG:
@@ -71,12 +73,10 @@ def on_startup() -> None:
     state_utils.GlobalState(
         app.state
     ).shared_namespace.async_loop = asyncio.get_running_loop()
-    component_manager = ComponentManager.from_app(app)
-    # Schedule regular cleanup of idle services
-    fastapi_utils.schedule_call(
-        func=functools.partial(stop_idle_services, component_manager),
-        interval=config.settings.SERVICE_IDLE_CHECK_INTERVAL,
-    )
+    # Start the regular background jobs registered by the managers (e.g. cleanup of idle services)
+    job_scheduler = JobScheduler(state_utils.GlobalState(app.state))
+    job_scheduler.start()
+    state_utils.GlobalState(app.state).register_close_callback(job_scheduler.stop)
 
 
 @app.on_event("shutdown")
@@ -114,6 +114,7 @@ app.include_router(deployment.service_router)
 app.include_router(extension.router)
 app.include_router(file.router)
 app.include_router(json_db.router)
+app.include_router(operation.router)
 
 if config.settings.DEBUG:
     app.include_router(seed.router)
@@ -1,10 +1,14 @@
 from datetime import datetime
 from typing import Any, List, Optional
 
-from fastapi import APIRouter, Depends, Path, Query, Response, status
+from fastapi import APIRouter, Body, Depends, Path, Query, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 
 from contaxy.api.dependencies import ComponentManager, get_component_manager
 from contaxy.managers.extension import parse_composite_id
+from contaxy.managers.operation import OperationFunction
+from contaxy.operations.components import ComponentOperations
 from contaxy.schema import (
     ExtensibleOperations,
     Job,
@@ -14,7 +18,19 @@ from contaxy.schema import (
     ServiceInput,
 )
 from contaxy.schema.auth import AccessLevel, TokenPurpose, TokenType
-from contaxy.schema.deployment import JOB_ID_PARAM, SERVICE_ID_PARAM, ServiceUpdate
+from contaxy.schema.deployment import (
+    JOB_ID_PARAM,
+    LOGS_FOLLOW_PARAM,
+    LOGS_STREAM_PARAM,
+    LOGS_WAIT_PARAM,
+    METRICS_MAX_SAMPLES_PARAM,
+    METRICS_SINCE_PARAM,
+    SERVICE_ID_PARAM,
+    DeletionBatchResult,
+    DeploymentMetrics,
+    JobBatchResult,
+    ServiceUpdate,
+)
 from contaxy.schema.exceptions import (
     AUTH_ERROR_RESPONSES,
     CREATE_RESOURCE_RESPONSES,
@@ -23,6 +39,10 @@ from contaxy.schema.exceptions import (
     VALIDATION_ERROR_RESPONSE,
 )
 from contaxy.schema.extension import EXTENSION_ID_PARAM
+from contaxy.schema.operation import (
+    ACCEPTED_OPERATION_RESPONSES,
+    BACKGROUND_OPERATION_PARAM,
+)
 from contaxy.schema.project import PROJECT_ID_PARAM
 from contaxy.schema.shared import (
     OPEN_URL_REDIRECT,
@@ -32,6 +52,7 @@ from contaxy.schema.shared import (
 )
 from contaxy.utils import auth_utils
 from contaxy.utils.auth_utils import get_api_token
+from contaxy.utils.fastapi_utils import ClosableStreamingResponse
 
 service_router = APIRouter(
     tags=["services"],
@@ -43,6 +64,22 @@ job_router = APIRouter(
 )
 
 
+def _start_background_operation(
+    component_manager: ComponentManager,
+    project_id: str,
+    operation_type: ExtensibleOperations,
+    resource_name: str,
+    func: OperationFunction,
+) -> Response:
+    """Executes the function as long-running operation and returns the operation with status code 202."""
+    operation = component_manager.get_operation_manager().start_operation(
+        project_id, operation_type.value, resource_name, func
+    )
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED, content=jsonable_encoder(operation)
+    )
+
+
 @service_router.get(
     "/projects/{project_id}/services",
     operation_id=ExtensibleOperations.LIST_SERVICES.value,
@@ -168,7 +205,7 @@ def list_deploy_service_actions(
     response_model=Service,
     summary="Deploy a service.",
     status_code=status.HTTP_200_OK,
-    responses={**CREATE_RESOURCE_RESPONSES},
+    responses={**CREATE_RESOURCE_RESPONSES, **ACCEPTED_OPERATION_RESPONSES},
 )
 def deploy_service(
     service: ServiceInput,
@@ -182,6 +219,7 @@ def deploy_service(
         False,
         description="If true, the server waits for the service to be ready before sending a response.",
     ),
+    background: bool = BACKGROUND_OPERATION_PARAM,
     component_manager: ComponentManager = Depends(get_component_manager),
     token: str = Depends(get_api_token),
 ) -> Any:
@@ -193,6 +231,9 @@ def deploy_service(
     If the action is from an extension, the `action_id` must be a composite ID with the following format: `{extension_id}~{action_id}`.
 
     The action mechanism is further explained in the description of the [list_deploy_service_actions](#services/list_deploy_service_actions).
+
+    If `background` is true, the service is deployed as long-running operation that is done once the service is ready.
+    The operation can be requested via the [get_operation](#operations/get_operation) operation.
     """
     component_manager.verify_access(
         token, f"projects/{project_id}/services", AccessLevel.WRITE
@@ -201,6 +242,20 @@ def deploy_service(
     extension_id = None
     if action_id:
         action_id, extension_id = parse_composite_id(action_id)
+    if background:
+
+        def deploy(background_component_manager: ComponentOperations) -> Service:
+            return background_component_manager.get_service_manager(
+                extension_id
+            ).deploy_service(project_id, service, action_id, wait=True)
+
+        return _start_background_operation(
+            component_manager,
+            project_id,
+            ExtensibleOperations.DEPLOY_SERVICE,
+            f"projects/{project_id}/services",
+            deploy,
+        )
     return component_manager.get_service_manager(extension_id).deploy_service(
         project_id, service, action_id, wait=wait
     )
@@ -211,6 +266,7 @@ def deploy_service(
     operation_id=ExtensibleOperations.DELETE_SERVICE.value,
     summary="Delete a service.",
     status_code=status.HTTP_204_NO_CONTENT,
+    responses={**ACCEPTED_OPERATION_RESPONSES},
 )
 def delete_service(
     project_id: str = PROJECT_ID_PARAM,
@@ -218,6 +274,7 @@ def delete_service(
     delete_volumes: Optional[bool] = Query(
         False, description="Delete all volumes associated with the deployment."
     ),
+    background: bool = BACKGROUND_OPERATION_PARAM,
     component_manager: ComponentManager = Depends(get_component_manager),
     token: str = Depends(get_api_token),
 ) -> Any:
@@ -233,6 +290,20 @@ def delete_service(
         delete_volumes = False
 
     service_id, extension_id = parse_composite_id(service_id)
+    if background:
+
+        def delete(background_component_manager: ComponentOperations) -> None:
+            background_component_manager.get_service_manager(
+                extension_id
+            ).delete_service(project_id, service_id, delete_volumes)
+
+        return _start_background_operation(
+            component_manager,
+            project_id,
+            ExtensibleOperations.DELETE_SERVICE,
+            f"projects/{project_id}/services/{service_id}",
+            delete,
+        )
     component_manager.get_service_manager(extension_id).delete_service(
         project_id, service_id, delete_volumes
     )
@@ -295,22 +366,72 @@ def update_service_access(
     operation_id=ExtensibleOperations.DELETE_SERVICES.value,
     summary="Delete all services.",
     status_code=status.HTTP_204_NO_CONTENT,
+    responses={**ACCEPTED_OPERATION_RESPONSES},
 )
 def delete_services(
     project_id: str = PROJECT_ID_PARAM,
     extension_id: Optional[str] = EXTENSION_ID_PARAM,
+    background: bool = BACKGROUND_OPERATION_PARAM,
     component_manager: ComponentManager = Depends(get_component_manager),
     token: str = Depends(get_api_token),
 ) -> Any:
-    """Deletes all services associated with a project."""
+    """Deletes all services associated with a project.
+
+    If `background` is true, the services are deleted as long-running operation and the request returns immediately.
+    """
     component_manager.verify_access(
         token, f"projects/{project_id}/services", AccessLevel.WRITE
     )
 
+    if background:
+
+        def delete(background_component_manager: ComponentOperations) -> None:
+            background_component_manager.get_service_manager(
+                extension_id
+            ).delete_services(project_id)
+
+        return _start_background_operation(
+            component_manager,
+            project_id,
+            ExtensibleOperations.DELETE_SERVICES,
+            f"projects/{project_id}/services",
+            delete,
+        )
     component_manager.get_service_manager(extension_id).delete_services(project_id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
+@service_router.post(
+    "/projects/{project_id}/services:batch-delete",
+    operation_id=ExtensibleOperations.BATCH_DELETE_SERVICES.value,
+    response_model=List[DeletionBatchResult],
+    summary="Delete multiple services.",
+    status_code=status.HTTP_200_OK,
+)
+def batch_delete_services(
+    service_ids: List[str] = Body(..., description="IDs of the services to delete."),
+    project_id: str = PROJECT_ID_PARAM,
+    delete_volumes: bool = Query(
+        False, description="Delete all volumes associated with the deployments."
+    ),
+    extension_id: Optional[str] = EXTENSION_ID_PARAM,
+    component_manager: ComponentManager = Depends(get_component_manager),
+    token: str = Depends(get_api_token),
+) -> Any:
+    """Deletes multiple services of a project in parallel.
+
+    Returns the result for every service in the given order. The deletion of a service
+    that failed is described by the `error` of its result and does not stop the deletion of the other services.
+    """
+    component_manager.verify_access(
+        token, f"projects/{project_id}/services", AccessLevel.WRITE
+    )
+
+    return component_manager.get_service_manager(extension_id).batch_delete_services(
+        project_id, service_ids, delete_volumes
+    )
+
+
 @service_router.get(
     "/projects/{project_id}/services/{service_id}/logs",
     operation_id=ExtensibleOperations.GET_SERVICE_LOGS.value,
@@ -326,17 +447,61 @@ def get_service_logs(
     since: Optional[datetime] = Query(
         None, description="Only show the logs generated after a given date."
     ),
+    follow: bool = LOGS_FOLLOW_PARAM,
+    stream: bool = LOGS_STREAM_PARAM,
+    wait: bool = LOGS_WAIT_PARAM,
     component_manager: ComponentManager = Depends(get_component_manager),
     token: str = Depends(get_api_token),
 ) -> Any:
-    """Returns the stdout/stderr logs of the service."""
+    """Returns the stdout/stderr logs of the service.
+
+    If `stream` or `follow` is set, the logs are sent as plain text in chunks while they are read.
+    If `wait` is not set and the service is still starting, a 503 error is returned immediately.
+    """
     component_manager.verify_access(
         token, f"projects/{project_id}/services/{service_id}/logs", AccessLevel.WRITE
     )
 
     service_id, extension_id = parse_composite_id(service_id)
-    return component_manager.get_service_manager(extension_id).get_service_logs(
-        project_id, service_id, lines, since
+    service_manager = component_manager.get_service_manager(extension_id)
+    if stream or follow:
+        return ClosableStreamingResponse(
+            service_manager.stream_service_logs(
+                project_id, service_id, lines, since, follow, wait
+            ),
+            media_type="text/plain",
+        )
+    return service_manager.get_service_logs(project_id, service_id, lines, since, wait)
+
+
+@service_router.get(
+    "/projects/{project_id}/services/{service_id}/metrics",
+    operation_id=ExtensibleOperations.GET_SERVICE_METRICS.value,
+    response_model=DeploymentMetrics,
+    summary="Get service resource usage.",
+    status_code=status.HTTP_200_OK,
+    responses={**GET_RESOURCE_RESPONSES},
+)
+def get_service_metrics(
+    project_id: str = PROJECT_ID_PARAM,
+    service_id: str = SERVICE_ID_PARAM,
+    since: Optional[datetime] = METRICS_SINCE_PARAM,
+    max_samples: int = METRICS_MAX_SAMPLES_PARAM,
+    component_manager: ComponentManager = Depends(get_component_manager),
+    token: str = Depends(get_api_token),
+) -> Any:
+    """Returns the CPU, memory and network usage of the running service sampled in the background.
+
+    The samples are kept in memory for a limited time and are dropped once the service is stopped.
+    If there are more samples than `max_samples`, they are averaged into equally sized buckets.
+    """
+    component_manager.verify_access(
+        token, f"projects/{project_id}/services/{service_id}", AccessLevel.READ
+    )
+
+    service_id, extension_id = parse_composite_id(service_id)
+    return component_manager.get_service_manager(extension_id).get_service_metrics(
+        project_id, service_id, since, max_samples
     )
 
 
@@ -387,7 +552,11 @@ def list_service_actions(
     # TODO: what is the response model? add additional status codes?
     summary="Execute a service action.",
     status_code=status.HTTP_200_OK,
-    responses={**OPEN_URL_REDIRECT, **GET_RESOURCE_RESPONSES},
+    responses={
+        **OPEN_URL_REDIRECT,
+        **GET_RESOURCE_RESPONSES,
+        **ACCEPTED_OPERATION_RESPONSES,
+    },
 )
 def execute_service_action(
     action_execution: Optional[ResourceActionExecution] = None,
@@ -398,6 +567,7 @@ def execute_service_action(
         description="The action ID from the list_service_actions operation.",
         regex=RESOURCE_ID_REGEX,
     ),
+    background: bool = BACKGROUND_OPERATION_PARAM,
     component_manager: ComponentManager = Depends(get_component_manager),
     token: str = Depends(get_api_token),
 ) -> Any:
@@ -407,6 +577,8 @@ def execute_service_action(
     If the action is from an extension, the `action_id` must be a composite ID with the following format: `{extension_id}~{action_id}`.
 
     The action mechanism is further explained in the description of the [list_service_actions](#services/list_service_actions).
+
+    If `background` is true, the action (e.g. a restart) is executed as long-running operation.
     """
     component_manager.verify_access(
         token,
@@ -415,6 +587,27 @@ def execute_service_action(
     )
 
     action_id, extension_id = parse_composite_id(action_id)
+    if background:
+
+        def execute_action(
+            background_component_manager: ComponentOperations,
+        ) -> Response:
+            return background_component_manager.get_service_manager(
+                extension_id
+            ).execute_service_action(
+                project_id,
+                service_id,
+                action_id,
+                action_execution or ResourceActionExecution(),
+            )
+
+        return _start_background_operation(
+            component_manager,
+            project_id,
+            ExtensibleOperations.EXECUTE_SERVICE_ACTION,
+            f"projects/{project_id}/services/{service_id}",
+            execute_action,
+        )
     return component_manager.get_service_manager(extension_id).execute_service_action(
         project_id, service_id, action_id, action_execution or ResourceActionExecution()
     )
@@ -452,6 +645,7 @@ def list_jobs(
     operation_id=ExtensibleOperations.DELETE_JOBS.value,
     summary="Delete all jobs.",
     status_code=status.HTTP_204_NO_CONTENT,
+    responses={**ACCEPTED_OPERATION_RESPONSES},
 )
 def delete_jobs(
     project_id: str = PROJECT_ID_PARAM,
@@ -464,13 +658,31 @@ def delete_jobs(
         description="The end date to delete the jobs. If not specified, all jobs will be deleted.",
     ),
     extension_id: Optional[str] = EXTENSION_ID_PARAM,
+    background: bool = BACKGROUND_OPERATION_PARAM,
     component_manager: ComponentManager = Depends(get_component_manager),
     token: str = Depends(get_api_token),
 ) -> Any:
-    """Deletes all jobs associated with a project."""
+    """Deletes all jobs associated with a project.
+
+    If `background` is true, the jobs are deleted as long-running operation and the request returns immediately.
+    """
     component_manager.verify_access(
         token, f"projects/{project_id}/jobs", AccessLevel.WRITE
     )
+    if background:
+
+        def delete(background_component_manager: ComponentOperations) -> None:
+            background_component_manager.get_job_manager(extension_id).delete_jobs(
+                project_id, date_from, date_to
+            )
+
+        return _start_background_operation(
+            component_manager,
+            project_id,
+            ExtensibleOperations.DELETE_JOBS,
+            f"projects/{project_id}/jobs",
+            delete,
+        )
     component_manager.get_job_manager(extension_id).delete_jobs(
         project_id, date_from, date_to
     )
@@ -585,7 +797,11 @@ def list_deploy_job_actions(
     response_model=Job,
     summary="Deploy a job.",
     status_code=status.HTTP_200_OK,
-    responses={**OPEN_URL_REDIRECT, **CREATE_RESOURCE_RESPONSES},
+    responses={
+        **OPEN_URL_REDIRECT,
+        **CREATE_RESOURCE_RESPONSES,
+        **ACCEPTED_OPERATION_RESPONSES,
+    },
 )
 def deploy_job(
     job: JobInput,
@@ -599,6 +815,7 @@ def deploy_job(
         False,
         description="If true, the server waits for the job to be ready before sending a response.",
     ),
+    background: bool = BACKGROUND_OPERATION_PARAM,
     component_manager: ComponentManager = Depends(get_component_manager),
     token: str = Depends(get_api_token),
 ) -> Any:
@@ -610,6 +827,8 @@ def deploy_job(
     If the action is from an extension, the `action_id` must be a composite ID with the following format: `{extension_id}~{action_id}`.
 
     The action mechanism is further explained in the description of the [list_deploy_job_actions](#jobs/list_deploy_job_actions).
+
+    If `background` is true, the job is deployed as long-running operation that is done once the job is ready.
     """
     component_manager.verify_access(
         token,
@@ -620,12 +839,69 @@ def deploy_job(
     extension_id = None
     if action_id:
         action_id, extension_id = parse_composite_id(action_id)
+    if background:
+
+        def deploy(background_component_manager: ComponentOperations) -> Job:
+            return background_component_manager.get_job_manager(
+                extension_id
+            ).deploy_job(project_id, job, action_id, wait=True)
+
+        return _start_background_operation(
+            component_manager,
+            project_id,
+            ExtensibleOperations.DEPLOY_JOB,
+            f"projects/{project_id}/jobs",
+            deploy,
+        )
 
     return component_manager.get_job_manager(extension_id).deploy_job(
         project_id, job, action_id, wait=wait
     )
 
 
+@job_router.post(
+    "/projects/{project_id}/jobs:batch",
+    operation_id=ExtensibleOperations.DEPLOY_JOBS.value,
+    response_model=List[JobBatchResult],
+    summary="Deploy multiple jobs.",
+    status_code=status.HTTP_200_OK,
+    responses={**CREATE_RESOURCE_RESPONSES},
+)
+def deploy_jobs(
+    jobs: List[JobInput],
+    project_id: str = PROJECT_ID_PARAM,
+    action_id: Optional[str] = Query(
+        None,
+        description="The action ID from the job deploy options. Used for all jobs.",
+        regex=RESOURCE_ID_REGEX,
+    ),
+    wait: bool = Query(
+        False,
+        description="If true, the server waits for all jobs to be ready before sending a response.",
+    ),
+    component_manager: ComponentManager = Depends(get_component_manager),
+    token: str = Depends(get_api_token),
+) -> Any:
+    """Deploys multiple jobs for the specified project in parallel.
+
+    All job configurations are validated and stored at once before the jobs are started.
+    Returns the result for every job in the given order. A job that could not be deployed
+    is described by the `error` of its result and does not stop the deployment of the other jobs.
+    """
+    component_manager.verify_access(
+        token,
+        f"projects/{project_id}/jobs",
+        AccessLevel.WRITE,
+    )
+
+    extension_id = None
+    if action_id:
+        action_id, extension_id = parse_composite_id(action_id)
+    return component_manager.get_job_manager(extension_id).deploy_jobs(
+        project_id, jobs, action_id, wait=wait
+    )
+
+
 @job_router.delete(
     "/projects/{project_id}/jobs/{job_id}",
     operation_id=ExtensibleOperations.DELETE_JOB.value,
@@ -668,10 +944,17 @@ def get_job_logs(
     since: Optional[datetime] = Query(
         None, description="Only show the logs generated after a given date."
     ),
+    follow: bool = LOGS_FOLLOW_PARAM,
+    stream: bool = LOGS_STREAM_PARAM,
+    wait: bool = LOGS_WAIT_PARAM,
     component_manager: ComponentManager = Depends(get_component_manager),
     token: str = Depends(get_api_token),
 ) -> Any:
-    """Returns the stdout/stderr logs of the job."""
+    """Returns the stdout/stderr logs of the job.
+
+    If `stream` or `follow` is set, the logs are sent as plain text in chunks while they are read.
+    If `wait` is not set and the job is still starting, a 503 error is returned immediately.
+    """
     component_manager.verify_access(
         token,
         f"projects/{project_id}/jobs/{job_id}/logs",
@@ -679,8 +962,42 @@ def get_job_logs(
     )
 
     job_id, extension_id = parse_composite_id(job_id)
-    return component_manager.get_job_manager(extension_id).get_job_logs(
-        project_id, job_id, lines, since
+    job_manager = component_manager.get_job_manager(extension_id)
+    if stream or follow:
+        return ClosableStreamingResponse(
+            job_manager.stream_job_logs(project_id, job_id, lines, since, follow, wait),
+            media_type="text/plain",
+        )
+    return job_manager.get_job_logs(project_id, job_id, lines, since, wait)
+
+
+@job_router.get(
+    "/projects/{project_id}/jobs/{job_id}/metrics",
+    operation_id=ExtensibleOperations.GET_JOB_METRICS.value,
+    response_model=DeploymentMetrics,
+    summary="Get job resource usage.",
+    status_code=status.HTTP_200_OK,
+    responses={**GET_RESOURCE_RESPONSES},
+)
+def get_job_metrics(
+    project_id: str = PROJECT_ID_PARAM,
+    job_id: str = JOB_ID_PARAM,
+    since: Optional[datetime] = METRICS_SINCE_PARAM,
+    max_samples: int = METRICS_MAX_SAMPLES_PARAM,
+    component_manager: ComponentManager = Depends(get_component_manager),
+    token: str = Depends(get_api_token),
+) -> Any:
+    """Returns the CPU, memory and network usage of the running job sampled in the background.
+
+    The samples are kept in memory for a limited time and are dropped once the job is stopped.
+    """
+    component_manager.verify_access(
+        token, f"projects/{project_id}/jobs/{job_id}", AccessLevel.READ
+    )
+
+    job_id, extension_id = parse_composite_id(job_id)
+    return component_manager.get_job_manager(extension_id).get_job_metrics(
+        project_id, job_id, since, max_samples
     )
 
 
@@ -1,17 +1,19 @@
 import json
 from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, Path, Query, Response, status
+from fastapi import APIRouter, Depends, Header, Path, Query, Response, status
 
 from contaxy.api.dependencies import ComponentManager, get_component_manager
 from contaxy.schema import CoreOperations, JsonDocument
 from contaxy.schema.auth import AccessLevel
 from contaxy.schema.exceptions import (
     AUTH_ERROR_RESPONSES,
+    CONDITIONAL_WRITE_RESPONSES,
     CREATE_RESOURCE_RESPONSES,
     GET_RESOURCE_RESPONSES,
     UPDATE_RESOURCE_RESPONSES,
     VALIDATION_ERROR_RESPONSE,
+    ClientValueError,
 )
 from contaxy.schema.project import PROJECT_ID_PARAM
 from contaxy.utils.auth_utils import get_api_token
@@ -20,6 +22,30 @@ router = APIRouter(
     tags=["json"], responses={**AUTH_ERROR_RESPONSES, **VALIDATION_ERROR_RESPONSE}
 )
 
+IF_MATCH_HEADER = Header(
+    None,
+    description="Only apply the write if the document still has the version of this entity tag (returned in the `ETag` header).",
+)
+
+
+def _parse_if_match(if_match: Optional[str]) -> Optional[int]:
+    """Extracts the expected document version from an `If-Match` header value."""
+    if not if_match or if_match.strip() == "*":
+        return None
+    entity_tag = if_match.strip()
+    if entity_tag.startswith("W/"):
+        entity_tag = entity_tag[2:]
+    try:
+        return int(entity_tag.strip('"'))
+    except ValueError:
+        raise ClientValueError(f"Invalid If-Match header: {if_match}")
+
+
+def _add_etag(response: Response, json_document: JsonDocument) -> JsonDocument:
+    if json_document.version is not None:
+        response.headers["ETag"] = f'"{json_document.version}"'
+    return json_document
+
 
 @router.put(
     "/projects/{project_id}/json/{collection_id}/{key}",
@@ -28,10 +54,11 @@ router = APIRouter(
     response_model=JsonDocument,
     response_model_exclude_unset=True,
     status_code=status.HTTP_200_OK,
-    responses={**CREATE_RESOURCE_RESPONSES},
+    responses={**CREATE_RESOURCE_RESPONSES, **CONDITIONAL_WRITE_RESPONSES},
 )
 def create_json_document(
     json_document: Dict,
+    response: Response,
     project_id: str = PROJECT_ID_PARAM,
     collection_id: str = Path(..., description="ID of the collection."),
     key: str = Path(..., description="Key of the JSON document."),
@@ -39,12 +66,16 @@ def create_json_document(
         True,
         description="If `True`, the document will be updated/overwritten if it already exists.",
     ),
+    if_match: Optional[str] = IF_MATCH_HEADER,
     component_manager: ComponentManager = Depends(get_component_manager),
     token: str = Depends(get_api_token),
 ) -> Any:
     """Creates a JSON document. If a document already exists for the given key, the document will be overwritten.
 
-    If no collection exists in the project with the provided `collection_id`, a new collection will be created.
+        If no collection exists in the project with the provided `collection_id`, a new collection will be created.
+
+        If the `If-Match` header is set, the existing document is only overwritten if its version matches the provided entity tag.
+    Otherwise, 412 (Precondition Failed) is returned.
     """
     component_manager.verify_access(
         token, f"projects/{project_id}/json/{collection_id}/{key}", AccessLevel.WRITE
@@ -54,8 +85,59 @@ def create_json_document(
         # True is the default
         upsert = True
 
-    return component_manager.get_json_db_manager().create_json_document(
-        project_id, collection_id, key, json.dumps(json_document), upsert=upsert
+    created_document = component_manager.get_json_db_manager().create_json_document(
+        project_id,
+        collection_id,
+        key,
+        json.dumps(json_document),
+        upsert=upsert,
+        expected_version=_parse_if_match(if_match),
+    )
+    return _add_etag(response, created_document)
+
+
+@router.put(
+    "/projects/{project_id}/json/{collection_id}",
+    operation_id=CoreOperations.CREATE_JSON_DOCUMENTS.value,
+    summary="Create multiple JSON documents.",
+    response_model=List[JsonDocument],
+    response_model_exclude_unset=True,
+    status_code=status.HTTP_200_OK,
+    responses={**CREATE_RESOURCE_RESPONSES},
+)
+def create_json_documents(
+    json_documents: Dict[str, Dict],
+    project_id: str = PROJECT_ID_PARAM,
+    collection_id: str = Path(..., description="ID of the collection."),
+    upsert: Optional[bool] = Query(
+        True,
+        description="If `True`, existing documents will be updated/overwritten.",
+    ),
+    component_manager: ComponentManager = Depends(get_component_manager),
+    token: str = Depends(get_api_token),
+) -> Any:
+    """Creates multiple JSON documents in a single transaction. The request body maps the document keys to the documents.
+
+    Either all documents are created or none of them.
+
+    If no collection exists in the project with the provided `collection_id`, a new collection will be created.
+    """
+    component_manager.verify_access(
+        token, f"projects/{project_id}/json/{collection_id}", AccessLevel.WRITE
+    )
+
+    if upsert is None:
+        # True is the default
+        upsert = True
+
+    return component_manager.get_json_db_manager().create_json_documents(
+        project_id,
+        collection_id,
+        {
+            key: json.dumps(json_document)
+            for key, json_document in json_documents.items()
+        },
+        upsert=upsert,
     )
 
 
@@ -66,27 +148,37 @@ def create_json_document(
     response_model=JsonDocument,
     response_model_exclude_unset=True,
     status_code=status.HTTP_200_OK,
-    responses={**UPDATE_RESOURCE_RESPONSES},
+    responses={**UPDATE_RESOURCE_RESPONSES, **CONDITIONAL_WRITE_RESPONSES},
 )
 def update_json_document(
     json_document: Dict,
+    response: Response,
     project_id: str = PROJECT_ID_PARAM,
     collection_id: str = Path(..., description="ID of the collection."),
     key: str = Path(..., description="Key of the JSON document."),
+    if_match: Optional[str] = IF_MATCH_HEADER,
     component_manager: ComponentManager = Depends(get_component_manager),
     token: str = Depends(get_api_token),
 ) -> Any:
     """Updates a JSON document.
 
-    The update is applied on the existing document based on the JSON Merge Patch Standard [RFC7396](https://tools.ietf.org/html/rfc7396).
+        The update is applied on the existing document based on the JSON Merge Patch Standard [RFC7396](https://tools.ietf.org/html/rfc7396).
+
+        If the `If-Match` header is set, the update is only applied if the document version matches the provided entity tag.
+    Otherwise, 412 (Precondition Failed) is returned.
     """
     component_manager.verify_access(
         token, f"projects/{project_id}/json/{collection_id}/{key}", AccessLevel.WRITE
     )
 
-    return component_manager.get_json_db_manager().update_json_document(
-        project_id, collection_id, key, json.dumps(json_document)
+    updated_document = component_manager.get_json_db_manager().update_json_document(
+        project_id,
+        collection_id,
+        key,
+        json.dumps(json_document),
+        expected_version=_parse_if_match(if_match),
     )
+    return _add_etag(response, updated_document)
 
 
 @router.get(
@@ -133,6 +225,7 @@ def list_json_documents(
     responses={**GET_RESOURCE_RESPONSES},
 )
 def get_json_document(
+    response: Response,
     project_id: str = PROJECT_ID_PARAM,
     collection_id: str = Path(..., description="ID of the collection."),
     key: str = Path(..., description="Key of the JSON document."),
@@ -145,8 +238,11 @@ def get_json_document(
         token, f"projects/{project_id}/json/{collection_id}/{key}", AccessLevel.READ
     )
 
-    return component_manager.get_json_db_manager().get_json_document(
-        project_id, collection_id, key
+    return _add_etag(
+        response,
+        component_manager.get_json_db_manager().get_json_document(
+            project_id, collection_id, key
+        ),
     )
 
 
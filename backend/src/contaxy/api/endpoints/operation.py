@@ -0,0 +1,99 @@
+from typing import Any, List
+
+from fastapi import APIRouter, Depends, Query, status
+from fastapi.concurrency import run_in_threadpool
+
+from contaxy.api.dependencies import ComponentManager, get_component_manager
+from contaxy.schema import CoreOperations
+from contaxy.schema.auth import AccessLevel
+from contaxy.schema.exceptions import (
+    AUTH_ERROR_RESPONSES,
+    GET_RESOURCE_RESPONSES,
+    VALIDATION_ERROR_RESPONSE,
+)
+from contaxy.schema.operation import OPERATION_ID_PARAM, Operation
+from contaxy.schema.project import PROJECT_ID_PARAM
+from contaxy.utils.auth_utils import get_api_token
+
+router = APIRouter(
+    tags=["operations"],
+    responses={**AUTH_ERROR_RESPONSES, **VALIDATION_ERROR_RESPONSE},
+)
+
+
+@router.get(
+    "/projects/{project_id}/operations",
+    operation_id=CoreOperations.LIST_OPERATIONS.value,
+    response_model=List[Operation],
+    summary="List project operations.",
+    status_code=status.HTTP_200_OK,
+)
+def list_operations(
+    project_id: str = PROJECT_ID_PARAM,
+    component_manager: ComponentManager = Depends(get_component_manager),
+    token: str = Depends(get_api_token),
+) -> Any:
+    """Lists all long-running operations (e.g. deployments) of the given project."""
+    component_manager.verify_access(
+        token, f"projects/{project_id}/operations", AccessLevel.READ
+    )
+    return component_manager.get_operation_manager().list_operations(project_id)
+
+
+@router.get(
+    "/projects/{project_id}/operations/{operation_id}",
+    operation_id=CoreOperations.GET_OPERATION.value,
+    response_model=Operation,
+    summary="Get operation.",
+    status_code=status.HTTP_200_OK,
+    responses={**GET_RESOURCE_RESPONSES},
+)
+def get_operation(
+    project_id: str = PROJECT_ID_PARAM,
+    operation_id: str = OPERATION_ID_PARAM,
+    component_manager: ComponentManager = Depends(get_component_manager),
+    token: str = Depends(get_api_token),
+) -> Any:
+    """Returns the current state of a long-running operation."""
+    component_manager.verify_access(
+        token, f"projects/{project_id}/operations/{operation_id}", AccessLevel.READ
+    )
+    return component_manager.get_operation_manager().get_operation(
+        project_id, operation_id
+    )
+
+
+@router.post(
+    "/projects/{project_id}/operations/{operation_id}:wait",
+    operation_id=CoreOperations.WAIT_FOR_OPERATION.value,
+    response_model=Operation,
+    summary="Wait for operation.",
+    status_code=status.HTTP_200_OK,
+    responses={**GET_RESOURCE_RESPONSES},
+)
+async def wait_for_operation(
+    project_id: str = PROJECT_ID_PARAM,
+    operation_id: str = OPERATION_ID_PARAM,
+    timeout: int = Query(
+        60,
+        ge=0,
+        le=600,
+        description="Maximum number of seconds to wait for the operation to be done.",
+    ),
+    component_manager: ComponentManager = Depends(get_component_manager),
+    token: str = Depends(get_api_token),
+) -> Any:
+    """Waits until the long-running operation succeeded or failed.
+
+    If the operation is not done before the timeout expires, the current state of the operation is returned.
+    The request is held open without blocking a worker thread of the server.
+    """
+    await run_in_threadpool(
+        component_manager.verify_access,
+        token,
+        f"projects/{project_id}/operations/{operation_id}",
+        AccessLevel.READ,
+    )
+    return await component_manager.get_operation_manager().wait_for_operation(
+        project_id, operation_id, timeout=timeout
+    )
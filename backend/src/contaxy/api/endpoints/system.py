@@ -5,7 +5,7 @@ from fastapi import APIRouter, Body, Depends, Form, Response, status
 from fastapi.templating import Jinja2Templates
 from loguru import logger
 from starlette.requests import Request
-from starlette.responses import HTMLResponse
+from starlette.responses import HTMLResponse, PlainTextResponse
 
 from contaxy import config
 from contaxy.api.dependencies import ComponentManager, get_component_manager
@@ -17,6 +17,7 @@ from contaxy.schema.exceptions import (
     ClientValueError,
 )
 from contaxy.schema.system import IMAGE_NAME_PARAM, AllowedImageInfo
+from contaxy.utils import prometheus_utils
 from contaxy.utils.auth_utils import get_api_token
 
 HERE = os.path.abspath(os.path.dirname(__file__))
@@ -75,6 +76,26 @@ def get_system_statistics(
     return component_manager.get_system_manager().get_system_statistics()
 
 
+@router.get(
+    "/system/metrics",
+    summary="Get metrics in the Prometheus text format.",
+    response_class=PlainTextResponse,
+    status_code=status.HTTP_200_OK,
+    responses={**AUTH_ERROR_RESPONSES},
+)
+def get_system_metrics(
+    component_manager: ComponentManager = Depends(get_component_manager),
+    token: str = Depends(get_api_token),
+) -> Any:
+    """Returns request, thread pool, and database metrics of this instance.
+
+    If the instance runs with multiple worker processes, the metrics of all workers are aggregated.
+    """
+    component_manager.verify_access(token, "system", AccessLevel.READ)
+    metrics, content_type = prometheus_utils.generate_metrics()
+    return Response(content=metrics, media_type=content_type)
+
+
 @router.post(
     "/system/initialize",
     operation_id=CoreOperations.INITIALIZE_SYSTEM.value,
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Dict, List, Literal, Optional
+from typing import Dict, Iterator, List, Literal, Optional
 
 import requests
 from pydantic.tools import parse_raw_as
@@ -7,8 +7,15 @@ from pydantic.tools import parse_raw_as
 from contaxy.clients.shared import handle_errors
 from contaxy.operations.deployment import DeploymentOperations
 from contaxy.schema import Job, JobInput, ResourceAction, Service, ServiceInput
-from contaxy.schema.deployment import DeploymentType, ServiceUpdate
+from contaxy.schema.deployment import (
+    DeletionBatchResult,
+    DeploymentMetrics,
+    DeploymentType,
+    JobBatchResult,
+    ServiceUpdate,
+)
 from contaxy.schema.shared import ResourceActionExecution
+from contaxy.utils.utils import ClosableStream
 
 
 class DeploymentClient(DeploymentOperations):
@@ -139,15 +146,35 @@ class DeploymentClient(DeploymentOperations):
         )
         handle_errors(response)
 
+    def batch_delete_services(
+        self,
+        project_id: str,
+        service_ids: List[str],
+        delete_volumes: bool = False,
+        request_kwargs: Dict = {},
+    ) -> List[DeletionBatchResult]:
+        params = {}
+        if delete_volumes:
+            params["delete_volumes"] = "true"
+        response = self.client.post(
+            f"/projects/{project_id}/services:batch-delete",
+            params=params,
+            json=service_ids,
+            **request_kwargs,
+        )
+        handle_errors(response)
+        return parse_raw_as(List[DeletionBatchResult], response.text)
+
     def get_service_logs(
         self,
         project_id: str,
         service_id: str,
         lines: Optional[int],
         since: Optional[datetime],
+        wait: bool = True,
         request_kwargs: Dict = {},
     ) -> str:
-        params = {}
+        params = {"wait": str(wait).lower()}
         if lines:
             params["lines"] = str(lines)
         if since:
@@ -160,6 +187,53 @@ class DeploymentClient(DeploymentOperations):
         handle_errors(response)
         return response.json()
 
+    def stream_service_logs(
+        self,
+        project_id: str,
+        service_id: str,
+        lines: Optional[int] = None,
+        since: Optional[datetime] = None,
+        follow: bool = False,
+        wait: bool = True,
+        request_kwargs: Dict = {},
+    ) -> Iterator[bytes]:
+        params = {
+            "stream": "true",
+            "follow": str(follow).lower(),
+            "wait": str(wait).lower(),
+        }
+        if lines:
+            params["lines"] = str(lines)
+        if since:
+            params["since"] = since.__str__()
+        response = self.client.get(
+            f"/projects/{project_id}/services/{service_id}/logs",
+            params=params,
+            stream=True,
+            **request_kwargs,
+        )
+        handle_errors(response)
+        return ClosableStream(response.iter_content(chunk_size=None), response.close)
+
+    def get_service_metrics(
+        self,
+        project_id: str,
+        service_id: str,
+        since: Optional[datetime] = None,
+        max_samples: int = 100,
+        request_kwargs: Dict = {},
+    ) -> DeploymentMetrics:
+        params = {"max_samples": str(max_samples)}
+        if since:
+            params["since"] = since.__str__()
+        response = self.client.get(
+            f"/projects/{project_id}/services/{service_id}/metrics",
+            params=params,
+            **request_kwargs,
+        )
+        handle_errors(response)
+        return parse_raw_as(DeploymentMetrics, response.text)
+
     def suggest_service_config(
         self,
         project_id: str,
@@ -247,6 +321,30 @@ class DeploymentClient(DeploymentOperations):
         handle_errors(resource)
         return parse_raw_as(Job, resource.text)
 
+    def deploy_jobs(
+        self,
+        project_id: str,
+        job_inputs: List[JobInput],
+        action_id: Optional[str] = None,
+        wait: bool = False,
+        request_kwargs: Dict = {},
+    ) -> List[JobBatchResult]:
+        params = {}
+        if wait:
+            params["wait"] = "true"
+        if action_id:
+            params["action_id"] = action_id
+        response = self.client.post(
+            f"/projects/{project_id}/jobs:batch",
+            params=params,
+            data="["
+            + ",".join(job_input.json(exclude_unset=True) for job_input in job_inputs)
+            + "]",
+            **request_kwargs,
+        )
+        handle_errors(response)
+        return parse_raw_as(List[JobBatchResult], response.text)
+
     def list_deploy_job_actions(
         self,
         project_id: str,
@@ -320,9 +418,10 @@ class DeploymentClient(DeploymentOperations):
         job_id: str,
         lines: Optional[int] = None,
         since: Optional[datetime] = None,
+        wait: bool = True,
         request_kwargs: Dict = {},
     ) -> str:
-        params = {}
+        params = {"wait": str(wait).lower()}
         if lines:
             params["lines"] = str(lines)
         if since:
@@ -335,6 +434,53 @@ class DeploymentClient(DeploymentOperations):
         handle_errors(response)
         return response.json()
 
+    def stream_job_logs(
+        self,
+        project_id: str,
+        job_id: str,
+        lines: Optional[int] = None,
+        since: Optional[datetime] = None,
+        follow: bool = False,
+        wait: bool = True,
+        request_kwargs: Dict = {},
+    ) -> Iterator[bytes]:
+        params = {
+            "stream": "true",
+            "follow": str(follow).lower(),
+            "wait": str(wait).lower(),
+        }
+        if lines:
+            params["lines"] = str(lines)
+        if since:
+            params["since"] = since.__str__()
+        response = self.client.get(
+            f"/projects/{project_id}/jobs/{job_id}/logs",
+            params=params,
+            stream=True,
+            **request_kwargs,
+        )
+        handle_errors(response)
+        return ClosableStream(response.iter_content(chunk_size=None), response.close)
+
+    def get_job_metrics(
+        self,
+        project_id: str,
+        job_id: str,
+        since: Optional[datetime] = None,
+        max_samples: int = 100,
+        request_kwargs: Dict = {},
+    ) -> DeploymentMetrics:
+        params = {"max_samples": str(max_samples)}
+        if since:
+            params["since"] = since.__str__()
+        response = self.client.get(
+            f"/projects/{project_id}/jobs/{job_id}/metrics",
+            params=params,
+            **request_kwargs,
+        )
+        handle_errors(response)
+        return parse_raw_as(DeploymentMetrics, response.text)
+
     def list_job_actions(
         self,
         project_id: str,
@@ -1,3 +1,4 @@
+import json
 from json.decoder import JSONDecodeError
 from typing import Dict, List, Optional
 
@@ -7,7 +8,13 @@ from pydantic import parse_raw_as
 from contaxy.clients.shared import handle_errors
 from contaxy.operations import JsonDocumentOperations
 from contaxy.schema import JsonDocument
-from contaxy.schema.exceptions import ClientValueError
+from contaxy.schema.exceptions import ClientValueError, ResourceNotFoundError
+
+
+def _get_if_match_headers(expected_version: Optional[int]) -> Dict[str, str]:
+    if expected_version is None:
+        return {}
+    return {"If-Match": f'"{expected_version}"'}
 
 
 class JsonDocumentClient(JsonDocumentOperations):
@@ -21,6 +28,7 @@ class JsonDocumentClient(JsonDocumentOperations):
         key: str,
         json_document: str,
         upsert: bool = True,
+        expected_version: Optional[int] = None,
         request_kwargs: Dict = {},
     ) -> JsonDocument:
         try:
@@ -28,6 +36,7 @@ class JsonDocumentClient(JsonDocumentOperations):
                 f"/projects/{project_id}/json/{collection_id}/{key}",
                 data=json_document,
                 params={"upsert": upsert},
+                headers=_get_if_match_headers(expected_version),
                 **request_kwargs,
             )
             handle_errors(response)
@@ -35,18 +44,45 @@ class JsonDocumentClient(JsonDocumentOperations):
         except JSONDecodeError as ex:
             raise ClientValueError("The loaded JSON is invalid.") from ex
 
+    def create_json_documents(
+        self,
+        project_id: str,
+        collection_id: str,
+        json_documents: Dict[str, str],
+        upsert: bool = True,
+        request_kwargs: Dict = {},
+    ) -> List[JsonDocument]:
+        try:
+            response = self._client.put(
+                f"/projects/{project_id}/json/{collection_id}",
+                data=json.dumps(
+                    {
+                        key: json.loads(json_document)
+                        for key, json_document in json_documents.items()
+                    }
+                ),
+                params={"upsert": upsert},
+                **request_kwargs,
+            )
+            handle_errors(response)
+            return parse_raw_as(List[JsonDocument], response.text)
+        except JSONDecodeError as ex:
+            raise ClientValueError("The loaded JSON is invalid.") from ex
+
     def update_json_document(
         self,
         project_id: str,
         collection_id: str,
         key: str,
         json_document: str,
+        expected_version: Optional[int] = None,
         request_kwargs: Dict = {},
     ) -> JsonDocument:
         try:
             response = self._client.patch(
                 f"/projects/{project_id}/json/{collection_id}/{key}",
                 data=json_document,
+                headers=_get_if_match_headers(expected_version),
                 **request_kwargs,
             )
             handle_errors(response)
@@ -69,7 +105,24 @@ class JsonDocumentClient(JsonDocumentOperations):
             **request_kwargs,
         )
         handle_errors(response)
-        return parse_raw_as(List[JsonDocument], response.text)
+        documents = parse_raw_as(List[JsonDocument], response.text)
+        if keys is not None:
+            # The API does not support selecting documents by key
+            documents = [document for document in documents if document.key in keys]
+        return documents
+
+    def list_json_documents_by_keys(
+        self,
+        project_id: str,
+        keys_by_collection: Dict[str, List[str]],
+        request_kwargs: Dict = {},
+    ) -> Dict[str, List[JsonDocument]]:
+        return {
+            collection_id: self.list_json_documents(
+                project_id, collection_id, keys=keys, request_kwargs=request_kwargs
+            )
+            for collection_id, keys in keys_by_collection.items()
+        }
 
     def get_json_document(
         self,
@@ -96,6 +149,26 @@ class JsonDocumentClient(JsonDocumentOperations):
         )
         handle_errors(response)
 
+    def delete_documents(
+        self,
+        project_id: str,
+        collection_id: str,
+        keys: List[str],
+        request_kwargs: Dict = {},
+    ) -> int:
+        # The API does not provide a batch delete endpoint, therefore the documents are deleted one by one.
+        # If a request fails, the documents that were deleted before are not restored.
+        deleted_documents = 0
+        for key in keys:
+            try:
+                self.delete_json_document(
+                    project_id, collection_id, key, request_kwargs=request_kwargs
+                )
+                deleted_documents += 1
+            except ResourceNotFoundError:
+                pass
+        return deleted_documents
+
     def delete_json_collection(
         self,
         project_id: str,
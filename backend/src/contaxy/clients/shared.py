@@ -6,9 +6,11 @@ from contaxy.schema import UnauthenticatedError
 from contaxy.schema.exceptions import (
     ClientValueError,
     PermissionDeniedError,
+    PreconditionFailedError,
     ProblemDetails,
     ResourceAlreadyExistsError,
     ResourceNotFoundError,
+    ResourceNotReadyError,
 )
 
 
@@ -49,6 +51,12 @@ def handle_errors(response: Response) -> None:
     if response.status_code == status.HTTP_409_CONFLICT:
         raise ResourceAlreadyExistsError(message)
 
+    if response.status_code == status.HTTP_412_PRECONDITION_FAILED:
+        raise PreconditionFailedError(message)
+
+    if response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE:
+        raise ResourceNotReadyError(message)
+
     # TODO: already used
     # if response.status_code == status.HTTP_409_CONFLICT:
     #    raise ResourceUpdateFailedError(message)
@@ -1,7 +1,7 @@
 import os
 from datetime import timedelta
 from enum import Enum
-from typing import List, Optional, Union
+from typing import Dict, List, Optional, Union
 
 from loguru import logger
 from pydantic import AnyHttpUrl, BaseSettings, PostgresDsn, validator
@@ -18,6 +18,13 @@ class DeploymentManager(str, Enum):
     DOCKER = "docker"
 
 
+class AuthStorage(str, Enum):
+    # Store permissions and tokens as documents in the JSON DB
+    JSON_DB = "json_db"
+    # Store permissions and tokens in dedicated (indexed) postgres tables
+    POSTGRES = "postgres"
+
+
 # MAX_SYSTEM_NAMESPACE_LENGTH = 5
 # def get_system_namespace(system_name: str) -> str:
 #    return id_utils.generate_readable_id(
@@ -51,8 +58,87 @@ class Settings(BaseSettings):
     # Selected deployment manager
     DEPLOYMENT_MANAGER: DeploymentManager = DeploymentManager.DOCKER
     KUBERNETES_NAMESPACE: Optional[str] = None
+    # Maximum number of connections kept open to the Docker daemon or Kubernetes API server per process
+    DEPLOYMENT_PLATFORM_MAX_CONNECTIONS: int = 10
+    # Interval in which the connection to the Docker daemon or Kubernetes API server is checked
+    DEPLOYMENT_PLATFORM_HEALTH_CHECK_INTERVAL: timedelta = timedelta(minutes=1)
+    # Keep deployments, pods, jobs and services in memory via the Kubernetes watch API
+    # instead of listing them from the Kubernetes API on every read
+    KUBERNETES_REFLECTOR_ENABLED: bool = True
+    # Keep the state of all containers and networks in memory via the Docker events stream
+    # instead of inspecting all containers and networks on every read or deployment
+    DOCKER_CONTAINER_CACHE_ENABLED: bool = True
+    # Interval in which all containers are listed again to recover from missed events
+    DOCKER_CONTAINER_CACHE_RESYNC_INTERVAL: timedelta = timedelta(minutes=5)
+    # Comma-separated list of container images that are kept pulled on the Docker host
+    # to reduce the startup time of services (e.g. workspace images)
+    DOCKER_WARM_POOL_IMAGES: Union[str, List[str]] = []
+    # Interval in which the warm pool images are pulled again to pick up updated tags
+    DOCKER_WARM_POOL_REFRESH_INTERVAL: timedelta = timedelta(hours=1)
+    # Sample the CPU, memory and network usage of all running deployments in the background
+    # (via the Docker stats API or the Kubernetes metrics API, which requires the metrics-server)
+    DEPLOYMENT_METRICS_ENABLED: bool = True
+    # Interval in which the resource usage of the deployments is sampled
+    DEPLOYMENT_METRICS_INTERVAL: timedelta = timedelta(seconds=15)
+    # Number of samples kept in memory per deployment (1 hour with the default interval)
+    DEPLOYMENT_METRICS_MAX_SAMPLES: int = 240
+    # Maximum number of long-running operations (e.g. deployments) executed in parallel per process
+    OPERATION_EXECUTOR_MAX_WORKERS: int = 10
+    # Maximum number of deployments that are created or deleted in parallel per batch request
+    DEPLOYMENT_BATCH_MAX_WORKERS: int = 10
+    # Maximum number of jobs running at the same time (0 = unlimited). Further jobs are queued.
+    JOB_QUEUE_MAX_RUNNING_JOBS: int = 0
+    # Maximum number of jobs running at the same time per project (0 = unlimited)
+    JOB_QUEUE_MAX_RUNNING_JOBS_PER_PROJECT: int = 0
+    # If enabled, jobs are queued if the minimal resources of all running deployments and
+    # the job exceed the capacity of the deployment platform (only supported for Docker)
+    JOB_QUEUE_CHECK_RESOURCES: bool = False
+    # Interval in which queued jobs are started if the quotas allow it
+    JOB_QUEUE_DISPATCH_INTERVAL: timedelta = timedelta(seconds=15)
+    # Maximum age of the shared resource usage that new jobs are admitted against. Older usage is
+    # loaded again from the deployment platform, otherwise it is only refreshed by the dispatcher.
+    JOB_QUEUE_USAGE_MAX_AGE: timedelta = timedelta(minutes=1)
+    # Number of attempts to start a queued job before it is marked as failed
+    JOB_QUEUE_MAX_START_ATTEMPTS: int = 3
+    # Seconds between the checks whether an operation executed by another app instance is done while waiting for it
+    OPERATION_POLL_INTERVAL: float = 1.0
+    # Interval in which every app instance renews the heartbeat of the operations it executes
+    OPERATION_HEARTBEAT_INTERVAL: timedelta = timedelta(seconds=30)
+    # Pending or running operations without a heartbeat for this time are marked as failed,
+    # e.g. because the executing app instance was stopped
+    OPERATION_HEARTBEAT_TIMEOUT: timedelta = timedelta(minutes=3)
+    # Finished operations are deleted after this time
+    OPERATION_RETENTION: timedelta = timedelta(days=1)
+    # Interval in which expired and stale operations are cleaned up
+    OPERATION_CLEANUP_INTERVAL: timedelta = timedelta(minutes=5)
     HOST_DATA_ROOT_PATH: Optional[str] = None
     SERVICE_IDLE_CHECK_INTERVAL: timedelta = timedelta(minutes=20)
+    # Interval in which deployed services that are missing in the DB are added to the DB
+    SERVICE_RECONCILE_INTERVAL: timedelta = timedelta(minutes=1)
+    # Services with a higher average CPU usage (in cores) during their idle timeout are not stopped
+    # even if they were not accessed (0 = only the last access time is checked)
+    SERVICE_IDLE_CPU_THRESHOLD: float = 0
+    # Maximum number of idle services that are stopped in parallel
+    SERVICE_IDLE_STOP_MAX_WORKERS: int = 5
+    # Access log of the proxy with the service requests in the format `$msec $project_id $service_id`.
+    # If set, the service accesses are read from the log (None = only session tokens count as access)
+    SERVICE_ACCESS_LOG_PATH: Optional[str] = None
+    # Interval in which the recorded service accesses are written to the DB
+    SERVICE_ACCESS_FLUSH_INTERVAL: timedelta = timedelta(minutes=1)
+    # Random deviation of the scheduled job intervals as fraction of the interval,
+    # to spread the job executions of multiple app instances
+    SCHEDULED_JOB_JITTER: float = 0.1
+    # Time after which a scheduled job that is still marked as running is considered as failed
+    # (e.g. because the app instance was terminated), so that another app instance can execute it
+    SCHEDULED_JOB_TIMEOUT: timedelta = timedelta(hours=1)
+
+    @validator("DOCKER_WARM_POOL_IMAGES", pre=True, allow_reuse=True)
+    def _assemble_warm_pool_images(
+        cls, images: Union[str, List[str]]
+    ) -> Union[str, List[str]]:
+        if isinstance(images, str):
+            return [item.strip() for item in images.split(",") if item.strip()]
+        return images
 
     # Ensure host data root path ends with a slash
     @validator("HOST_DATA_ROOT_PATH")
@@ -65,6 +151,9 @@ class Settings(BaseSettings):
     # If `None`, a dedicated postgres instance will be started as a service (container).
     POSTGRES_CONNECTION_URI: Optional[PostgresDsn] = None
 
+    # Storage backend used by the Auth Manager for permissions and API tokens
+    AUTH_STORAGE: AuthStorage = AuthStorage.JSON_DB
+
     # S3 Storage Connection Configuration for File Manager
     # If `S3_ENDPOINT` is `None`, a dedicated minio instance will be started as a service (container).
     S3_ENDPOINT: Optional[str] = None
@@ -93,6 +182,17 @@ class Settings(BaseSettings):
     )
     RESOURCE_PERMISSIONS_CACHE_SIZE: int = 10000  # number of items in the cache
     RESOURCE_PERMISSIONS_CACHE_EXPIRY: int = 10  # Time to live of cache items in seconds - This cache should have a very short lifetime
+    # DEPLOYMENT_METADATA_CACHE caches the metadata and status of services and jobs per process.
+    # Entries are invalidated by changes via the API and, if available, by Docker events or Kubernetes watches.
+    DEPLOYMENT_METADATA_CACHE_ENABLED: bool = True  # Enable or disable the cache
+    DEPLOYMENT_METADATA_CACHE_SIZE: int = 10000  # number of items in the cache
+    DEPLOYMENT_METADATA_CACHE_EXPIRY: int = 5  # Time to live of cache items in seconds - Short, since the status changes without events
+    # ALLOWED_IMAGES_CACHE keeps an index of the allowed images per process for the image checks on deployment.
+    # Changes via the same process are applied immediately, changes via other processes after the expiry.
+    ALLOWED_IMAGES_CACHE_ENABLED: bool = True  # Enable or disable the cache
+    ALLOWED_IMAGES_CACHE_EXPIRY: int = (
+        10  # Seconds after which the index is checked for changes of other processes
+    )
 
     # Usabel to deactivate setting or changing user passwords
     # The `system-admin` account can still set and change passwords for users,
@@ -116,6 +216,13 @@ class Settings(BaseSettings):
 
     # API Token Length
     API_TOKEN_LENGTH: int = 40
+    # Time to live of API tokens per token purpose, tokens with other purposes do not expire
+    API_TOKEN_EXPIRY: Dict[str, timedelta] = {"login-token": timedelta(days=30)}
+    # Interval in which expired API tokens are deleted from the DB
+    API_TOKEN_CLEANUP_INTERVAL: timedelta = timedelta(hours=1)
+    API_TOKEN_CLEANUP_BATCH_SIZE: int = (
+        1000  # max. number of tokens deleted per DB call
+    )
 
     # BACKEND_CORS_ORIGINS is a JSON-formatted list of origins
     # e.g: '["http://localhost", "http://localhost:4200", "http://localhost:3000", \
@@ -2,10 +2,10 @@ import json
 import threading
 import time
 from collections import deque
+from contextlib import contextmanager
 from datetime import datetime, timedelta, timezone
-from typing import Deque, List, Optional, Set, Union
+from typing import Callable, Deque, Iterator, List, Optional, Set, Tuple, Union
 
-from cachetools import TTLCache
 from jose import JWTError, jwt
 from loguru import logger
 from passlib.context import CryptContext
@@ -15,12 +15,9 @@ from starlette.responses import RedirectResponse
 
 from contaxy import config
 from contaxy.config import settings
-from contaxy.operations import (
-    AuthOperations,
-    JsonDocumentOperations,
-    ProjectOperations,
-    ServiceOperations,
-)
+from contaxy.managers.deployment.service_access import get_service_access_recorder
+from contaxy.managers.scheduler import register_scheduled_job
+from contaxy.operations import AuthOperations, JsonDocumentOperations, ProjectOperations
 from contaxy.operations.components import ComponentOperations
 from contaxy.schema import AuthorizedAccess, TokenType, User, UserInput, UserRead
 from contaxy.schema.auth import (
@@ -44,8 +41,16 @@ from contaxy.schema.exceptions import (
     ResourceUpdateFailedError,
     UnauthenticatedError,
 )
-from contaxy.utils import auth_utils, id_utils
+from contaxy.schema.system import AuthStatistics
+from contaxy.utils import auth_utils, id_utils, prometheus_utils
 from contaxy.utils.id_utils import extract_ids_from_service_resource_name
+from contaxy.utils.metrics_utils import MetricsTTLCache
+from contaxy.utils.prometheus_utils import (
+    AUTH_CACHE_LOCK_WAIT,
+    AUTH_DB_RESOLVE_LATENCY,
+    AUTH_ROLE_RESOLUTION_DEPTH,
+    AUTH_VERIFY_ACCESS_LATENCY,
+)
 
 PWD_CONTEXT = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -68,6 +73,7 @@ class AuthManager(AuthOperations):
     _API_TOKEN_COLLECTION = "tokens"
     _USER_COLLECTION = "users"
     _LOGIN_ID_MAPPING_COLLECTION = "login-id-mapping"
+    _PERMISSION_UPDATE_MAX_RETRIES = 10
     _PROJECT_COLLECTION = "projects"
 
     def __init__(
@@ -89,11 +95,42 @@ class AuthManager(AuthOperations):
     def _json_db_manager(self) -> JsonDocumentOperations:
         return self._component_manager.get_json_db_manager()
 
-    @property
-    def _service_manager(self) -> ServiceOperations:
-        return self._component_manager.get_service_manager()
+    def get_auth_statistics(self) -> AuthStatistics:
+        """Returns statistics about the auth caches and the access verification aggregated across all worker processes."""
+        samples = prometheus_utils.collect_samples()
+        return AuthStatistics(
+            caches={
+                name: prometheus_utils.get_cache_statistics(samples, name)
+                for name in ["verify_access", "api_token", "resource_permissions"]
+            },
+            verify_access_seconds=prometheus_utils.get_histogram_statistics(
+                samples, "contaxy_auth_verify_access_duration_seconds"
+            ),
+            lock_wait_seconds=prometheus_utils.get_histogram_statistics(
+                samples, "contaxy_auth_cache_lock_wait_seconds"
+            ),
+            db_resolve_seconds={
+                operation: prometheus_utils.get_histogram_statistics(
+                    samples,
+                    "contaxy_auth_db_resolve_duration_seconds",
+                    {"operation": operation},
+                )
+                for operation in ["token", "verify_access", "permissions"]
+            },
+            role_resolution_depth=prometheus_utils.get_histogram_statistics(
+                samples, "contaxy_auth_role_resolution_depth"
+            ),
+        )
+
+    @contextmanager
+    def _acquire_lock(self) -> Iterator[None]:
+        """Acquires the cache lock and records the time spent waiting for it."""
+        wait_start = time.perf_counter()
+        with self._lock:
+            AUTH_CACHE_LOCK_WAIT.observe(time.perf_counter() - wait_start)
+            yield
 
-    def _get_verify_access_cache(self) -> TTLCache:
+    def _get_verify_access_cache(self) -> MetricsTTLCache:
         """Returns a TTL (time to live) cache used by the access verification."""
         state_namespace = self._global_state[AuthManager]
         cache = state_namespace.verify_access_cache
@@ -101,13 +138,14 @@ class AuthManager(AuthOperations):
             return cache
         else:
             with self._lock:
-                state_namespace.verify_access_cache = TTLCache(
+                state_namespace.verify_access_cache = MetricsTTLCache(
+                    name="verify_access",
                     maxsize=self._global_state.settings.VERIFY_ACCESS_CACHE_SIZE,
                     ttl=self._global_state.settings.VERIFY_ACCESS_CACHE_EXPIRY,
                 )
                 return state_namespace.verify_access_cache
 
-    def _get_api_token_cache(self) -> TTLCache:
+    def _get_api_token_cache(self) -> MetricsTTLCache:
         """Returns a TTL (time to live) cache used for caching API token metadata."""
         state_namespace = self._global_state[AuthManager]
         cache = state_namespace.api_token_cache
@@ -115,13 +153,14 @@ class AuthManager(AuthOperations):
             return cache
         else:
             with self._lock:
-                state_namespace.api_token_cache = TTLCache(
+                state_namespace.api_token_cache = MetricsTTLCache(
+                    name="api_token",
                     maxsize=self._global_state.settings.API_TOKEN_CACHE_SIZE,
                     ttl=self._global_state.settings.API_TOKEN_CACHE_EXPIRY,
                 )
                 return state_namespace.api_token_cache
 
-    def _get_resource_permissions_cache(self) -> TTLCache:
+    def _get_resource_permissions_cache(self) -> MetricsTTLCache:
         """Returns a TTL (time to live) cache used for caching permissions associated with resources."""
         state_namespace = self._global_state[AuthManager]
         cache = state_namespace.resource_permissions_cache
@@ -129,7 +168,8 @@ class AuthManager(AuthOperations):
             return cache
         else:
             with self._lock:
-                state_namespace.resource_permissions_cache = TTLCache(
+                state_namespace.resource_permissions_cache = MetricsTTLCache(
+                    name="resource_permissions",
                     maxsize=self._global_state.settings.RESOURCE_PERMISSIONS_CACHE_SIZE,
                     ttl=self._global_state.settings.RESOURCE_PERMISSIONS_CACHE_EXPIRY,
                 )
@@ -144,11 +184,13 @@ class AuthManager(AuthOperations):
             self._request_state.authorized_access
             and self._request_state.authorized_access.access_token
         ):
-            self._json_db_manager.delete_json_document(
-                config.SYSTEM_INTERNAL_PROJECT,
-                self._API_TOKEN_COLLECTION,
-                self._request_state.authorized_access.access_token.token,
-            )
+            try:
+                self._delete_api_token(
+                    self._request_state.authorized_access.access_token.token
+                )
+            except ResourceNotFoundError:
+                # The token was already revoked or is a JWT token that is not stored in the DB
+                pass
         # TODO: where to redirect to
         rr = RedirectResponse("/welcome", status_code=307)
         rr.delete_cookie(config.API_TOKEN_NAME)
@@ -200,14 +242,16 @@ class AuthManager(AuthOperations):
                 raise UnauthenticatedError("No token subject found for token creation.")
 
         if token_type is token_type.SESSION_TOKEN:
-            # Check if token for service is requested and update service last access time
+            # Check if token for service is requested and record the service access.
+            # The access time is written to the DB in batches by a background job.
+            access_recorder = get_service_access_recorder(self._global_state)
             for scope in scopes:
                 try:
                     resource, _ = auth_utils.parse_permission(scope)
                     project_id, service_id = extract_ids_from_service_resource_name(
                         resource
                     )
-                    self._service_manager.update_service_access(project_id, service_id)
+                    access_recorder.record(project_id, service_id, user=token_subject)
                 except ValueError:
                     pass
 
@@ -223,17 +267,90 @@ class AuthManager(AuthOperations):
             created_at=datetime.now(timezone.utc),
             description=description,
             token_purpose=token_purpose,
+            expires_at=self._get_api_token_expiry(token_purpose),
             # TODO: created_by
-            # TODO: expires_at
         )
 
+        self._save_api_token(api_token)
+        return token
+
+    def _get_api_token_expiry(self, token_purpose: Optional[str]) -> Optional[datetime]:
+        """Returns the expiry date for a new API token based on the configured time to live of its purpose."""
+        if not token_purpose:
+            return None
+        token_ttl = self._global_state.settings.API_TOKEN_EXPIRY.get(token_purpose)
+        if not token_ttl:
+            return None
+        return datetime.now(timezone.utc) + token_ttl
+
+    def delete_expired_api_tokens(self) -> int:
+        """Deletes all API tokens from the DB that are expired.
+
+        Returns:
+            int: The number of deleted tokens.
+        """
+        deleted_tokens = self._delete_expired_api_tokens(datetime.now(timezone.utc))
+        if deleted_tokens:
+            logger.info(f"Deleted {deleted_tokens} expired API tokens.")
+        return deleted_tokens
+
+    def _delete_expired_api_tokens(self, expired_before: datetime) -> int:
+        """Deletes all API tokens from the DB that expired before the given date in batches of `API_TOKEN_CLEANUP_BATCH_SIZE`."""
+        expired_token_docs = self._json_db_manager.list_json_documents(
+            config.SYSTEM_INTERNAL_PROJECT,
+            self._API_TOKEN_COLLECTION,
+            filter=f'$ ? (@.expires_at < "{expired_before.isoformat()}")',
+        )
+        expired_tokens = []
+        for token_doc in expired_token_docs:
+            # Check here again for the expiry date
+            expires_at = ApiToken.parse_raw(token_doc.json_value).expires_at
+            if expires_at and expires_at < expired_before:
+                expired_tokens.append(token_doc.key)
+
+        batch_size = self._global_state.settings.API_TOKEN_CLEANUP_BATCH_SIZE
+        deleted_tokens = 0
+        for batch_start in range(0, len(expired_tokens), batch_size):
+            # Tokens that were deleted in the meantime are not counted
+            deleted_tokens += self._json_db_manager.delete_documents(
+                config.SYSTEM_INTERNAL_PROJECT,
+                self._API_TOKEN_COLLECTION,
+                expired_tokens[batch_start : batch_start + batch_size],
+            )
+        return deleted_tokens
+
+    def _save_api_token(self, api_token: ApiToken) -> None:
+        """Stores the API token metadata in the database."""
         self._json_db_manager.create_json_document(
             project_id=config.SYSTEM_INTERNAL_PROJECT,
             collection_id=self._API_TOKEN_COLLECTION,
-            key=token,
+            key=api_token.token,
             json_document=api_token.json(),
         )
-        return token
+
+    def _delete_api_token(self, token: str) -> None:
+        """Deletes the API token metadata from the database.
+
+        Raises:
+            ResourceNotFoundError: If the token does not exist in the DB.
+        """
+        self._json_db_manager.delete_json_document(
+            project_id=config.SYSTEM_INTERNAL_PROJECT,
+            collection_id=self._API_TOKEN_COLLECTION,
+            key=token,
+        )
+
+    def _delete_api_tokens_of_subject(self, token_subject: str) -> None:
+        """Deletes all API tokens issued to the given subject from the database."""
+        for token_doc in self._json_db_manager.list_json_documents(
+            config.SYSTEM_INTERNAL_PROJECT, self._API_TOKEN_COLLECTION
+        ):
+            if ApiToken.parse_raw(token_doc.json_value).subject == token_subject:
+                self._json_db_manager.delete_json_document(
+                    config.SYSTEM_INTERNAL_PROJECT,
+                    self._API_TOKEN_COLLECTION,
+                    token_doc.key,
+                )
 
     def list_api_tokens(self, token_subject: Optional[str] = None) -> List[ApiToken]:
         # Filter all resources for the provided permission
@@ -305,7 +422,9 @@ class AuthManager(AuthOperations):
         if not use_cache or not self._global_state.settings.API_TOKEN_CACHE_ENABLED:
             # Do not use cache
             try:
-                return self._get_api_token_from_db(token)
+                with AUTH_DB_RESOLVE_LATENCY.labels(operation="token").time():
+                    api_token = self._get_api_token_from_db(token)
+                return self._check_api_token_expiry(api_token)
             except ResourceNotFoundError as ex:
                 raise UnauthenticatedError(
                     message="The provided API token does not exist in the database."
@@ -315,13 +434,16 @@ class AuthManager(AuthOperations):
         cache_key = token
         token_metadata: Optional[AccessToken] = None
         if cache_key in cache:
+            cache.record_hit()
             token_metadata = cache[cache_key]
         else:
+            cache.record_miss()
             # lock thread if item is updated
-            with self._lock:
+            with self._acquire_lock():
                 try:
                     # Add the verification result to the cache
-                    token_metadata = self._get_api_token_from_db(token)
+                    with AUTH_DB_RESOLVE_LATENCY.labels(operation="token").time():
+                        token_metadata = self._get_api_token_from_db(token)
                 except ResourceNotFoundError:
                     token_metadata = None
                 # Store token in cache, even if None
@@ -332,6 +454,20 @@ class AuthManager(AuthOperations):
                 message="The provided API token does not exist in the database."
             )
 
+        return self._check_api_token_expiry(token_metadata)
+
+    def _check_api_token_expiry(self, token_metadata: AccessToken) -> AccessToken:
+        """Returns the token metadata if the token is not expired.
+
+        Expired tokens are rejected based on their metadata, even if they were not yet deleted from the DB.
+
+        Raises:
+            UnauthenticatedError: If the token is expired.
+        """
+        if token_metadata.expires_at and token_metadata.expires_at <= datetime.now(
+            timezone.utc
+        ):
+            raise UnauthenticatedError(message="The provided API token is expired.")
         return token_metadata
 
     def _verify_access_via_db(
@@ -375,6 +511,12 @@ class AuthManager(AuthOperations):
 
     def verify_access(
         self, token: str, permission: Optional[str] = None, use_cache: bool = True
+    ) -> AuthorizedAccess:
+        with AUTH_VERIFY_ACCESS_LATENCY.time():
+            return self._verify_access(token, permission, use_cache)
+
+    def _verify_access(
+        self, token: str, permission: Optional[str], use_cache: bool
     ) -> AuthorizedAccess:
         # This will throw an UnauthenticatedError if the token is not valid or does not exist
         resolved_token = self._resolve_token(token, use_cache=use_cache)
@@ -386,21 +528,25 @@ class AuthManager(AuthOperations):
             )
         if not use_cache or not self._global_state.settings.VERIFY_ACCESS_CACHE_ENABLED:
             # Do not use cache
-            return self._verify_access_via_db(
-                resolved_token, permission, use_cache=use_cache
-            )
+            with AUTH_DB_RESOLVE_LATENCY.labels(operation="verify_access").time():
+                return self._verify_access_via_db(
+                    resolved_token, permission, use_cache=use_cache
+                )
 
         cache = self._get_verify_access_cache()
         cache_key = token + "-perm-" + str(permission)
         if cache_key in cache:
+            cache.record_hit()
             return cache[cache_key]
         else:
+            cache.record_miss()
             # lock thread if item is updated
-            with self._lock:
+            with self._acquire_lock():
                 # Add the verification result to the cache
-                verification_result = self._verify_access_via_db(
-                    resolved_token, permission, use_cache=use_cache
-                )
+                with AUTH_DB_RESOLVE_LATENCY.labels(operation="verify_access").time():
+                    verification_result = self._verify_access_via_db(
+                        resolved_token, permission, use_cache=use_cache
+                    )
                 cache[cache_key] = verification_result
                 return verification_result
 
@@ -456,49 +602,87 @@ class AuthManager(AuthOperations):
         )
         return ResourcePermissions.parse_raw(permission_doc.json_value)
 
-    def add_permission(
-        self,
-        resource_name: str,
-        permission: str,
-    ) -> None:
-        resource_permission = ResourcePermissions()
-        try:
-            # Try to get the permission document
-            resource_permission = self._get_resource_permissions_from_db(resource_name)
-        except ResourceNotFoundError:
-            # Ignore error, create a new resource
-            pass
+    def _delete_resource_permissions(self, resource_name: str) -> None:
+        """Deletes all permissions granted to the resource.
 
-        # Add permissions to the document
-        resource_permission.permissions.append(permission)
-        # TODO: at this point there - theoretically - could be a data inconsitency if the same item is updated at the exact same time
-        # Create/or update document
-        self._json_db_manager.create_json_document(
+        Raises:
+            ResourceNotFoundError: If the resource does not have any permissions.
+        """
+        self._json_db_manager.delete_json_document(
             config.SYSTEM_INTERNAL_PROJECT,
             self._PERMISSION_COLLECTION,
             resource_name,
-            resource_permission.json(),
-            upsert=True,
         )
 
-        # Test if permission was applied with short timeout (to wait for conflicting updates)
-        # It is very unlikely that the resource update fails
-        time.sleep(0.005)
-        try:
-            resource_permissions = self._get_resource_permissions_from_db(resource_name)
+    def _update_resource_permissions(
+        self,
+        resource_name: str,
+        update_permissions: Callable[[List[str]], List[str]],
+        create_if_missing: bool,
+    ) -> None:
+        """Applies a read-modify-write on the permissions document of a resource.
+
+        The write is conditional on the version of the document that was read (compare-and-swap).
+        If the document was modified concurrently, the update is retried on the new version.
 
-            if permission not in resource_permissions.permissions:
-                raise ResourceUpdateFailedError(
-                    message=f"Unable to add permission ({permission}) for {resource_name}. Try again.",
-                    explanation="The permission was not added to the resource.",
-                    resource=resource_name,
+        Raises:
+            ResourceNotFoundError: If the resource has no permission document and `create_if_missing` is `False`.
+            ResourceUpdateFailedError: If the update could not be applied after all retries.
+        """
+        for _ in range(self._PERMISSION_UPDATE_MAX_RETRIES):
+            document_exists = False
+            expected_version: Optional[int] = None
+            try:
+                permission_doc = self._json_db_manager.get_json_document(
+                    config.SYSTEM_INTERNAL_PROJECT,
+                    self._PERMISSION_COLLECTION,
+                    resource_name,
                 )
-        except ResourceNotFoundError as ex:
-            raise ResourceUpdateFailedError(
-                message=f"Unable to add permission ({permission}) for {resource_name}. Try again. 2",
-                explanation="The resource did not exist anymore after the update.",
-                resource=resource_name,
-            ) from ex
+                resource_permission = ResourcePermissions.parse_raw(
+                    permission_doc.json_value
+                )
+                document_exists = True
+                expected_version = permission_doc.version
+            except ResourceNotFoundError:
+                if not create_if_missing:
+                    raise
+                resource_permission = ResourcePermissions()
+
+            resource_permission.permissions = update_permissions(
+                resource_permission.permissions
+            )
+            try:
+                # Only create the document if it does not exist or replace the exact version that was read
+                self._json_db_manager.create_json_document(
+                    config.SYSTEM_INTERNAL_PROJECT,
+                    self._PERMISSION_COLLECTION,
+                    resource_name,
+                    resource_permission.json(),
+                    upsert=document_exists,
+                    expected_version=expected_version,
+                )
+                return
+            except (ResourceAlreadyExistsError, ResourceUpdateFailedError):
+                # Concurrent modification -> retry with the latest version
+                logger.debug(
+                    f"Conflicting permission update on resource {resource_name}. Retrying."
+                )
+        raise ResourceUpdateFailedError(
+            message=f"Unable to update permissions for {resource_name}. Try again.",
+            explanation="The permissions of the resource were modified concurrently too often.",
+            resource=resource_name,
+        )
+
+    def add_permission(
+        self,
+        resource_name: str,
+        permission: str,
+    ) -> None:
+        self._update_resource_permissions(
+            resource_name,
+            lambda permissions: permissions + [permission],
+            create_if_missing=True,
+        )
         logger.debug(
             f"Successfully added new permission {permission} to resource {resource_name}."
         )
@@ -506,16 +690,12 @@ class AuthManager(AuthOperations):
     def remove_permission(
         self, resource_name: str, permission: str, remove_sub_permissions: bool = False
     ) -> None:
-        try:
-            # Try to get the permission document
-            resource_permission = self._get_resource_permissions_from_db(resource_name)
+        def _remove_permissions(granted_permissions: List[str]) -> List[str]:
             updated_permissions = []
-            removed_permissions = []
             # Iterate all permissions granted to the resource
-            for granted_permission in resource_permission.permissions:
+            for granted_permission in granted_permissions:
                 if permission == granted_permission:
                     # Permission matched granted permission -> Ignore/remove this permission
-                    removed_permissions.append(permission)
                     continue
 
                 if (
@@ -526,39 +706,15 @@ class AuthManager(AuthOperations):
                     and auth_utils.is_permission_granted(permission, granted_permission)
                 ):
                     # Ignore/remove this permission since it is a subpermission
-                    removed_permissions.append(permission)
                     continue
                 updated_permissions.append(granted_permission)
+            return updated_permissions
 
-            # Create/or update document
-            self._json_db_manager.create_json_document(
-                config.SYSTEM_INTERNAL_PROJECT,
-                self._PERMISSION_COLLECTION,
-                resource_name,
-                ResourcePermissions(permissions=updated_permissions).json(),
-                upsert=True,
+        try:
+            self._update_resource_permissions(
+                resource_name, _remove_permissions, create_if_missing=False
             )
-
-            # Test if permission was applied with short timeout (to wait for conflicting updates)
-            # It is very unlikely that the resource update fails
-            time.sleep(0.001)
-            try:
-                resource_permissions = self._get_resource_permissions_from_db(
-                    resource_name
-                )
-                for removed_permission in removed_permissions:
-                    if removed_permission in resource_permissions.permissions:
-                        raise ResourceUpdateFailedError(
-                            message=f"Unable to remove permission ({permission}) for {resource_name}. Try again.",
-                            explanation=f"The permission {removed_permission} was not removed during the update.",
-                            resource=resource_name,
-                        )
-            except ResourceNotFoundError:
-                # Ignore this
-                pass
-
         except ResourceNotFoundError as ex:
-            # Ignore error, create a new resource
             raise ResourceUpdateFailedError(
                 message=f"Unable to remove permission ({permission}) for {resource_name}. Try again.",
                 explanation="The resource does not have any permissions.",
@@ -580,12 +736,14 @@ class AuthManager(AuthOperations):
 
             # resolve roles: Permissions can have a hierachy based on roles which needs to be resolved
             checked_permissions: Set[str] = set()  # used to prevent recursive loops
-            permissions_to_resolve: Deque[str] = deque()  # queu of permissions to check
+            # queue of permissions to check with their depth in the role hierarchy
+            permissions_to_resolve: Deque[Tuple[str, int]] = deque()
             resolved_permissions: Set[str] = set()  # all resolved base permissions
+            resolution_depth = 0
 
-            permissions_to_resolve.extend(permissions)
+            permissions_to_resolve.extend((permission, 0) for permission in permissions)
             while permissions_to_resolve:
-                permission = permissions_to_resolve.popleft()
+                permission, depth = permissions_to_resolve.popleft()
                 if permission in checked_permissions:
                     continue
 
@@ -596,14 +754,17 @@ class AuthManager(AuthOperations):
                     try:
                         # Probably a role / permission collection -> resolve permissions and add to list
                         permissions_to_resolve.extend(
-                            self._get_resource_permissions_from_db(
+                            (role_permission, depth + 1)
+                            for role_permission in self._get_resource_permissions_from_db(
                                 permission
                             ).permissions
                         )
+                        resolution_depth = max(resolution_depth, depth + 1)
                     except ResourceNotFoundError:
                         logger.warning(
                             f"Failed to resolve permission {permission}",
                         )
+            AUTH_ROLE_RESOLUTION_DEPTH.observe(resolution_depth)
             return list(resolved_permissions)
 
         except ResourceNotFoundError:
@@ -614,20 +775,24 @@ class AuthManager(AuthOperations):
         self, resource_name: str, resolve_roles: bool = True, use_cache: bool = False
     ) -> List[str]:
         if not use_cache or not config.settings.RESOURCE_PERMISSIONS_CACHE_ENABLED:
-            return self._list_permissions_from_db(resource_name, resolve_roles)
+            with AUTH_DB_RESOLVE_LATENCY.labels(operation="permissions").time():
+                return self._list_permissions_from_db(resource_name, resolve_roles)
 
         # Load via cache
         cache = self._get_resource_permissions_cache()
         cache_key = resource_name
         if cache_key in cache:
+            cache.record_hit()
             return cache[cache_key]
         else:
+            cache.record_miss()
             # lock thread if item is updated
-            with self._lock:
+            with self._acquire_lock():
                 # Add the verification result to the cache
-                resource_permissions = self._list_permissions_from_db(
-                    resource_name, resolve_roles
-                )
+                with AUTH_DB_RESOLVE_LATENCY.labels(operation="permissions").time():
+                    resource_permissions = self._list_permissions_from_db(
+                        resource_name, resolve_roles
+                    )
                 cache[cache_key] = resource_permissions
                 return resource_permissions
 
@@ -710,11 +875,7 @@ class AuthManager(AuthOperations):
             raise OAuth2Error(error="unsupported_token_type")
 
         try:
-            self._json_db_manager.delete_json_document(
-                project_id=config.SYSTEM_INTERNAL_PROJECT,
-                collection_id=self._API_TOKEN_COLLECTION,
-                key=token,
-            )
+            self._delete_api_token(token)
             return
         except ResourceNotFoundError:
             # Based on the Oauth standard, nothing needs to be done here.
@@ -1043,27 +1204,14 @@ class AuthManager(AuthOperations):
 
         user_resource_name = "users/" + user_id
         try:
-            self._json_db_manager.delete_json_document(
-                config.SYSTEM_INTERNAL_PROJECT,
-                self._PERMISSION_COLLECTION,
-                user_resource_name,
-            )
+            self._delete_resource_permissions(user_resource_name)
         except ResourceNotFoundError:
             logger.warning(
                 f"ResourceNotFoundError: No JSON document was found in the permissions table with the given key: {user_id}."
             )
 
         try:
-            for token_doc in self._json_db_manager.list_json_documents(
-                config.SYSTEM_INTERNAL_PROJECT, self._API_TOKEN_COLLECTION
-            ):
-                token_subject = ApiToken.parse_raw(token_doc.json_value).subject
-                if token_subject == user_resource_name:
-                    self._json_db_manager.delete_json_document(
-                        config.SYSTEM_INTERNAL_PROJECT,
-                        self._API_TOKEN_COLLECTION,
-                        token_doc.key,
-                    )
+            self._delete_api_tokens_of_subject(user_resource_name)
         except ResourceNotFoundError:
             logger.warning(
                 f"ResourceNotFoundError: No JSON document was found in the token table with the given key: {user_id}."
@@ -1119,6 +1267,8 @@ class AuthManager(AuthOperations):
                     for token in tokens
                     if token.token_purpose == TokenPurpose.USER_API_TOKEN
                     if token.scopes == [user_token_scope]
+                    if not token.expires_at
+                    or token.expires_at > datetime.now(timezone.utc)
                 )
             ).token
         except StopIteration:
@@ -1129,3 +1279,17 @@ class AuthManager(AuthOperations):
                 token_purpose=TokenPurpose.USER_API_TOKEN,
                 description=f"{access_level} token for user {user_id}.",
             )
+
+
+def delete_expired_api_tokens(component_manager: ComponentOperations) -> None:
+    """Deletes all expired API tokens. Meant to be called regularly in the background."""
+    auth_manager = component_manager.get_auth_manager()
+    if isinstance(auth_manager, AuthManager):
+        auth_manager.delete_expired_api_tokens()
+
+
+register_scheduled_job(
+    "delete_expired_api_tokens",
+    delete_expired_api_tokens,
+    interval=settings.API_TOKEN_CLEANUP_INTERVAL,
+)
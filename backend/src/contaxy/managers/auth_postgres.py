@@ -0,0 +1,265 @@
+from datetime import datetime
+from typing import Callable, List, Optional
+
+from sqlalchemy import Column, DateTime, Index, MetaData, Table, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import NoResultFound
+
+from contaxy import config
+from contaxy.managers.auth import AuthManager, ResourcePermissions
+from contaxy.operations.components import ComponentOperations
+from contaxy.schema.auth import ApiToken
+from contaxy.schema.exceptions import ResourceNotFoundError
+from contaxy.utils.postgres_utils import create_schema, get_db_engine
+
+
+class PostgresAuthManager(AuthManager):
+    """Auth Manager that stores permissions and API tokens in dedicated Postgres tables.
+
+    In contrast to the JSON DB based storage, every permission and token is stored
+    in typed and indexed columns. Thereby, permission checks and token lookups
+    are index scans instead of filtered scans over JSON documents.
+
+    Users, passwords and login ID mappings are still stored in the JSON DB.
+    """
+
+    _PERMISSION_TABLE = "auth_permissions"
+    _API_TOKEN_TABLE = "auth_tokens"
+
+    def __init__(
+        self,
+        component_manager: ComponentOperations,
+    ):
+        """Initializes the Postgres Auth Manager.
+
+        Args:
+            component_manager: Instance of the component manager that grants access to the other managers.
+        """
+        super().__init__(component_manager)
+        self._engine = get_db_engine(self._global_state)
+        self._permission_table, self._api_token_table = self._get_tables()
+
+    def _get_tables(self) -> List[Table]:
+        """Returns the auth tables. The tables are lazily created once per process."""
+        state_namespace = self._global_state[PostgresAuthManager]
+        if state_namespace.tables:
+            return state_namespace.tables
+
+        schema_name = self._get_schema_name()
+        metadata = MetaData()
+        permission_table = Table(
+            self._PERMISSION_TABLE,
+            metadata,
+            Column("resource_name", postgresql.VARCHAR, primary_key=True),
+            Column("permission", postgresql.VARCHAR, primary_key=True),
+            Index(f"ix_{self._PERMISSION_TABLE}_permission", "permission"),
+            schema=schema_name,
+        )
+        api_token_table = Table(
+            self._API_TOKEN_TABLE,
+            metadata,
+            Column("token", postgresql.VARCHAR, primary_key=True),
+            Column("token_type", postgresql.VARCHAR, nullable=False),
+            Column("subject", postgresql.VARCHAR, nullable=False),
+            Column("scopes", postgresql.ARRAY(postgresql.VARCHAR), nullable=False),
+            Column("token_purpose", postgresql.VARCHAR),
+            Column("description", postgresql.VARCHAR),
+            Column("created_at", DateTime(timezone=True)),
+            Column("created_by", postgresql.VARCHAR),
+            Column("expires_at", DateTime(timezone=True)),
+            Index(f"ix_{self._API_TOKEN_TABLE}_subject", "subject"),
+            Index(f"ix_{self._API_TOKEN_TABLE}_expires_at", "expires_at"),
+            schema=schema_name,
+        )
+
+        create_schema(self._engine, schema_name)
+        metadata.create_all(self._engine, checkfirst=True)
+        state_namespace.tables = [permission_table, api_token_table]
+        return state_namespace.tables
+
+    def _get_schema_name(self) -> str:
+        prefix = self._global_state.settings.SYSTEM_NAMESPACE
+        project_id = config.SYSTEM_INTERNAL_PROJECT
+        return project_id if not prefix else f"{prefix}_{project_id}"
+
+    # Permission Storage
+
+    def _get_resource_permissions_from_db(
+        self, resource_name: str
+    ) -> ResourcePermissions:
+        table = self._permission_table
+        with self._engine.begin() as conn:
+            permissions = (
+                conn.execute(
+                    select(table.c.permission).where(
+                        table.c.resource_name == resource_name
+                    )
+                )
+                .scalars()
+                .all()
+            )
+        if not permissions:
+            raise ResourceNotFoundError(
+                f"No permissions found for resource {resource_name}."
+            )
+        return ResourcePermissions(permissions=permissions)
+
+    def _update_resource_permissions(
+        self,
+        resource_name: str,
+        update_permissions: Callable[[List[str]], List[str]],
+        create_if_missing: bool,
+    ) -> None:
+        """Applies the update on the permission rows of a resource within a single transaction.
+
+        The existing rows are locked, so concurrent updates of the same resource are serialized.
+
+        Raises:
+            ResourceNotFoundError: If the resource has no permissions and `create_if_missing` is `False`.
+        """
+        table = self._permission_table
+        with self._engine.begin() as conn:
+            granted_permissions = (
+                conn.execute(
+                    select(table.c.permission)
+                    .where(table.c.resource_name == resource_name)
+                    .with_for_update()
+                )
+                .scalars()
+                .all()
+            )
+            if not granted_permissions and not create_if_missing:
+                raise ResourceNotFoundError(
+                    f"No permissions found for resource {resource_name}."
+                )
+
+            updated_permissions = set(update_permissions(list(granted_permissions)))
+            removed_permissions = set(granted_permissions) - updated_permissions
+            added_permissions = updated_permissions - set(granted_permissions)
+
+            if removed_permissions:
+                conn.execute(
+                    table.delete().where(
+                        table.c.resource_name == resource_name,
+                        table.c.permission.in_(removed_permissions),
+                    )
+                )
+            if added_permissions:
+                conn.execute(
+                    postgresql.insert(table)
+                    .values(
+                        [
+                            {"resource_name": resource_name, "permission": permission}
+                            for permission in added_permissions
+                        ]
+                    )
+                    .on_conflict_do_nothing()
+                )
+            conn.commit()
+
+    def _delete_resource_permissions(self, resource_name: str) -> None:
+        table = self._permission_table
+        with self._engine.begin() as conn:
+            result = conn.execute(
+                table.delete().where(table.c.resource_name == resource_name)
+            )
+            conn.commit()
+        if result.rowcount == 0:
+            raise ResourceNotFoundError(
+                f"No permissions found for resource {resource_name}."
+            )
+
+    def list_resources_with_permission(
+        self, permission: str, resource_name_prefix: Optional[str] = None
+    ) -> List[str]:
+        table = self._permission_table
+        select_statement = (
+            select(table.c.resource_name)
+            .where(table.c.permission == permission)
+            .distinct()
+        )
+        if resource_name_prefix:
+            select_statement = select_statement.where(
+                table.c.resource_name.startswith(resource_name_prefix, autoescape=True)
+            )
+        with self._engine.begin() as conn:
+            return list(conn.execute(select_statement).scalars().all())
+
+    # API Token Storage
+
+    def _save_api_token(self, api_token: ApiToken) -> None:
+        with self._engine.begin() as conn:
+            conn.execute(
+                self._api_token_table.insert().values(
+                    **api_token.dict(
+                        include={
+                            "token",
+                            "subject",
+                            "scopes",
+                            "token_purpose",
+                            "description",
+                            "created_at",
+                            "created_by",
+                            "expires_at",
+                        }
+                    ),
+                    token_type=api_token.token_type.value,
+                )
+            )
+            conn.commit()
+
+    def _get_api_token_from_db(self, token: str) -> ApiToken:
+        table = self._api_token_table
+        with self._engine.begin() as conn:
+            try:
+                row = conn.execute(table.select().where(table.c.token == token)).one()
+            except NoResultFound:
+                raise ResourceNotFoundError("The API token does not exist.")
+        return self._map_db_row_to_api_token(row)
+
+    def list_api_tokens(self, token_subject: Optional[str] = None) -> List[ApiToken]:
+        table = self._api_token_table
+        with self._engine.begin() as conn:
+            rows = conn.execute(
+                table.select().where(table.c.subject == token_subject)
+            ).fetchall()
+        return [self._map_db_row_to_api_token(row) for row in rows]
+
+    def _delete_api_token(self, token: str) -> None:
+        table = self._api_token_table
+        with self._engine.begin() as conn:
+            result = conn.execute(table.delete().where(table.c.token == token))
+            conn.commit()
+        if result.rowcount == 0:
+            raise ResourceNotFoundError("The API token does not exist.")
+
+    def _delete_api_tokens_of_subject(self, token_subject: str) -> None:
+        table = self._api_token_table
+        with self._engine.begin() as conn:
+            conn.execute(table.delete().where(table.c.subject == token_subject))
+            conn.commit()
+
+    def _delete_expired_api_tokens(self, expired_before: datetime) -> int:
+        """Deletes expired tokens in batches using the index on the expiry date."""
+        table = self._api_token_table
+        batch_size = self._global_state.settings.API_TOKEN_CLEANUP_BATCH_SIZE
+        expired_tokens = (
+            select(table.c.token)
+            .where(table.c.expires_at < expired_before)
+            .limit(batch_size)
+            .scalar_subquery()
+        )
+        deleted_tokens = 0
+        while True:
+            with self._engine.begin() as conn:
+                result = conn.execute(
+                    table.delete().where(table.c.token.in_(expired_tokens))
+                )
+                conn.commit()
+            deleted_tokens += result.rowcount
+            if result.rowcount < batch_size:
+                return deleted_tokens
+
+    def _map_db_row_to_api_token(self, row: Row) -> ApiToken:
+        return ApiToken(**row._mapping)
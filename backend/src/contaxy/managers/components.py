@@ -1,4 +1,5 @@
-from typing import Optional
+import threading
+from typing import Optional, Union
 
 from fastapi import FastAPI, Request
 from loguru import logger
@@ -7,8 +8,11 @@ from starlette.datastructures import State
 
 from contaxy import config
 from contaxy.managers.auth import AuthManager
+from contaxy.managers.deployment.docker import DockerDeploymentPlatform
+from contaxy.managers.deployment.kubernetes import KubernetesDeploymentPlatform
 from contaxy.managers.deployment.manager import DeploymentManager
 from contaxy.managers.extension import ExtensionManager
+from contaxy.managers.operation import OperationManager
 from contaxy.managers.project import ProjectManager
 from contaxy.managers.seed import SeedManager
 from contaxy.managers.system import SystemManager
@@ -43,6 +47,9 @@ class ComponentManager(ComponentOperations):
     for a single request.
     """
 
+    # Prevents that concurrent requests create multiple deployment platforms
+    _deployment_platform_lock = threading.Lock()
+
     @classmethod
     def from_request(cls, request: Request) -> "ComponentManager":
         return cls(
@@ -74,6 +81,7 @@ class ComponentManager(ComponentOperations):
         self._extension_manager: Optional[ExtensionManager] = None
         self._project_manager: Optional[ProjectManager] = None
         self._system_manager: Optional[SystemManager] = None
+        self._operation_manager: Optional[OperationManager] = None
         # Extensible managers: typed by its interface
         self._json_db_manager: Optional[JsonDocumentOperations] = None
         self._deployment_manager: Optional[DeploymentOperations] = None
@@ -162,7 +170,12 @@ class ComponentManager(ComponentOperations):
     def get_auth_manager(self) -> AuthManager:
         """Returns an Auth Manager instance."""
         if not self._auth_manager:
-            self._auth_manager = AuthManager(self)
+            if self.global_state.settings.AUTH_STORAGE == config.AuthStorage.POSTGRES:
+                from contaxy.managers.auth_postgres import PostgresAuthManager
+
+                self._auth_manager = PostgresAuthManager(self)
+            else:
+                self._auth_manager = AuthManager(self)
         assert self._auth_manager is not None
         return self._auth_manager
 
@@ -180,6 +193,13 @@ class ComponentManager(ComponentOperations):
             self._extension_manager = ExtensionManager(self)
         return self._extension_manager
 
+    def get_operation_manager(self) -> OperationManager:
+        """Returns an Operation Manager instance."""
+        if not self._operation_manager:
+            self._operation_manager = OperationManager(self)
+        assert self._operation_manager is not None
+        return self._operation_manager
+
     def get_json_db_manager(self) -> JsonDocumentOperations:
         """Returns a JSON DB Manager instance."""
         if not self._json_db_manager:
@@ -231,31 +251,42 @@ class ComponentManager(ComponentOperations):
                 "Internal Minio object storage is not implemented! Please configure S3_ENDPOINT or AZURE_BLOB_CONNECTION_STRING."
             )
 
+    def _get_deployment_platform(
+        self,
+    ) -> Union[DockerDeploymentPlatform, KubernetesDeploymentPlatform]:
+        """Returns the deployment platform of this app instance (process).
+
+        The platform and its API clients (connection pools, loaded configuration)
+        are only created once and shared by all requests.
+        """
+        state_namespace = self.global_state[DeploymentManager]
+        with self._deployment_platform_lock:
+            if not state_namespace.deployment_platform:
+                if (
+                    self.global_state.settings.DEPLOYMENT_MANAGER
+                    == config.DeploymentManager.DOCKER
+                ):
+                    state_namespace.deployment_platform = DockerDeploymentPlatform()
+                elif (
+                    self.global_state.settings.DEPLOYMENT_MANAGER
+                    == config.DeploymentManager.KUBERNETES
+                ):
+                    kubernetes_platform = KubernetesDeploymentPlatform()
+                    # Stops the reflectors and the resource metrics collector of the platform
+                    self.global_state.register_close_callback(kubernetes_platform.close)
+                    state_namespace.deployment_platform = kubernetes_platform
+                logger.info(
+                    f"Deployment platform created ({self.global_state.settings.DEPLOYMENT_MANAGER.value})"
+                )
+        return state_namespace.deployment_platform
+
     def _get_deployment_manager(self) -> DeploymentOperations:
         # Lazyload deployment manager
         if not self._deployment_manager:
-            if (
-                self.global_state.settings.DEPLOYMENT_MANAGER
-                == config.DeploymentManager.DOCKER
-            ):
-                from contaxy.managers.deployment.docker import DockerDeploymentPlatform
-
-                # Add DB persistence to docker deployment manager
-                self._deployment_manager = DeploymentManager(
-                    DockerDeploymentPlatform(), self
-                )
-            elif (
-                self.global_state.settings.DEPLOYMENT_MANAGER
-                == config.DeploymentManager.KUBERNETES
-            ):
-                from contaxy.managers.deployment.kubernetes import (
-                    KubernetesDeploymentPlatform,
-                )
-
-                # Add DB persistence to kubernetes deployment manager
-                self._deployment_manager = DeploymentManager(
-                    KubernetesDeploymentPlatform(), self
-                )
+            # Add DB persistence to the deployment platform
+            self._deployment_manager = DeploymentManager(
+                self._get_deployment_platform(), self
+            )
 
         assert self._deployment_manager is not None
         return self._deployment_manager
@@ -1,12 +1,20 @@
+import threading
+import time
 from datetime import datetime
-from typing import Any, List, Literal, Optional
+from typing import Any, Callable, Dict, Iterator, List, Literal, Optional, Tuple
 
 import docker
 import docker.errors
+import docker.models.containers
+from loguru import logger
 
+from contaxy.config import settings
+from contaxy.managers.deployment.docker_cache import ContainerCache
+from contaxy.managers.deployment.docker_network_registry import NetworkRegistry
 from contaxy.managers.deployment.docker_utils import (
     create_container_config,
     delete_container,
+    get_all_project_containers,
     get_project_container,
     get_project_containers,
     handle_network,
@@ -15,24 +23,209 @@ from contaxy.managers.deployment.docker_utils import (
     map_service,
     read_container_logs,
     reconnect_to_all_networks,
+    stream_container_logs,
+    system_cpu_count,
+    system_memory_in_mb,
     wait_for_container,
 )
+from contaxy.managers.deployment.docker_warm_pool import ImageWarmPool
+from contaxy.managers.deployment.resource_metrics import DockerResourceMetricsCollector
+from contaxy.managers.deployment.utils import Labels
 from contaxy.schema import Job, JobInput, ResourceAction, Service, ServiceInput
-from contaxy.schema.deployment import DeploymentType, ServiceUpdate
+from contaxy.schema.deployment import DeploymentType, ResourceUsageSample, ServiceUpdate
 from contaxy.schema.exceptions import ClientValueError, ServerBaseError
+from contaxy.utils.prometheus_utils import DEPLOYMENT_TIME_TO_READY, WARM_POOL_REQUESTS
 
 
 class DockerDeploymentPlatform:
     _is_initialized = False
+    # The container cache is shared by all platform instances of the process
+    _container_cache: Optional[ContainerCache] = None
+    _container_cache_lock = threading.Lock()
+    # The network registry is shared by all platform instances of the process
+    _network_registry: Optional[NetworkRegistry] = None
+    _network_registry_lock = threading.Lock()
+    # The image warm pool is shared by all platform instances of the process
+    _warm_pool: Optional[ImageWarmPool] = None
+    _warm_pool_lock = threading.Lock()
+    # The resource metrics collector is shared by all platform instances of the process
+    _metrics_collector: Optional[DockerResourceMetricsCollector] = None
+    _metrics_collector_lock = threading.Lock()
 
     def __init__(self) -> None:
-        """Initializes the docker deployment manager."""
+        """Initializes the docker deployment manager.
 
-        self.client = docker.from_env()
+        The platform is meant to be created once per process and shared by all requests.
+        """
+
+        self.client = self._create_client()
         # Reconnect the backend to all existing docker networks on startup
         if not DockerDeploymentPlatform._is_initialized:
             reconnect_to_all_networks(self.client)
             DockerDeploymentPlatform._is_initialized = True
+        self._cache = self._get_container_cache()
+        self._networks = self._get_network_registry()
+        self._warm_pool = self._get_warm_pool()
+        self._metrics_collector = self._get_metrics_collector()
+
+    def _create_client(self) -> docker.DockerClient:
+        return docker.from_env(
+            max_pool_size=settings.DEPLOYMENT_PLATFORM_MAX_CONNECTIONS
+        )
+
+    def check_health(self) -> bool:
+        """Checks the connection to the Docker daemon and reconnects if the connection failed.
+
+        Returns:
+            bool: `True` if the Docker daemon is reachable.
+        """
+        try:
+            self.client.ping()
+            return True
+        except Exception as e:
+            logger.warning(f"Docker daemon is not reachable. Reconnecting: {e}")
+
+        try:
+            client = self._create_client()
+            client.ping()
+        except Exception as e:
+            logger.error(f"Could not reconnect to the Docker daemon: {e}")
+            return False
+        self.client = client
+        return True
+
+    def add_deployment_listener(self, listener: Callable[[str, str], None]) -> None:
+        """Registers a function that is called with the project ID and deployment ID of every changed deployment.
+
+        Changes are only reported if the container cache is enabled.
+        """
+        if self._cache is not None:
+            self._cache.add_listener(listener)
+
+    def get_resource_capacity(self) -> Optional[Tuple[float, float]]:
+        """Returns the number of CPUs and the memory in Megabyte of the Docker host."""
+        return system_cpu_count, system_memory_in_mb
+
+    def _get_container_cache(self) -> Optional[ContainerCache]:
+        """Returns the container cache of the process. The cache is started on first use."""
+        if not settings.DOCKER_CONTAINER_CACHE_ENABLED:
+            return None
+
+        with DockerDeploymentPlatform._container_cache_lock:
+            if DockerDeploymentPlatform._container_cache is None:
+                # The events stream blocks a connection, therefore a separate client is used
+                container_cache = ContainerCache(
+                    docker.from_env(),
+                    resync_interval=settings.DOCKER_CONTAINER_CACHE_RESYNC_INTERVAL,
+                )
+                container_cache.start()
+                DockerDeploymentPlatform._container_cache = container_cache
+            return DockerDeploymentPlatform._container_cache
+
+    def _get_network_registry(self) -> Optional[NetworkRegistry]:
+        """Returns the network registry of the process. The networks are listed on first use."""
+        if not settings.DOCKER_CONTAINER_CACHE_ENABLED:
+            return None
+
+        with DockerDeploymentPlatform._network_registry_lock:
+            if DockerDeploymentPlatform._network_registry is None:
+                # The events stream blocks a connection, therefore a separate client is used
+                network_registry = NetworkRegistry(
+                    docker.from_env(),
+                    resync_interval=settings.DOCKER_CONTAINER_CACHE_RESYNC_INTERVAL,
+                )
+                network_registry.start()
+                DockerDeploymentPlatform._network_registry = network_registry
+            return DockerDeploymentPlatform._network_registry
+
+    def _handle_network(self, project_id: str) -> None:
+        """Creates the project network if needed and connects the backend to it. Uses the network registry if it is ready."""
+        if self._networks is not None and self._networks.is_ready:
+            self._networks.handle_network(self.client, project_id)
+        else:
+            handle_network(client=self.client, project_id=project_id)
+
+    def _get_warm_pool(self) -> Optional[ImageWarmPool]:
+        """Returns the image warm pool of the process. The images are pulled on first use."""
+        if not settings.DOCKER_WARM_POOL_IMAGES:
+            return None
+
+        with DockerDeploymentPlatform._warm_pool_lock:
+            if DockerDeploymentPlatform._warm_pool is None:
+                # Image pulls can take minutes, therefore a separate client is used
+                warm_pool = ImageWarmPool(
+                    docker.from_env(),
+                    images=settings.DOCKER_WARM_POOL_IMAGES,  # type: ignore
+                    refresh_interval=settings.DOCKER_WARM_POOL_REFRESH_INTERVAL,
+                )
+                warm_pool.start()
+                DockerDeploymentPlatform._warm_pool = warm_pool
+            return DockerDeploymentPlatform._warm_pool
+
+    def _get_metrics_collector(self) -> Optional[DockerResourceMetricsCollector]:
+        """Returns the resource metrics collector of the process. The collection is started on first use."""
+        if not settings.DEPLOYMENT_METRICS_ENABLED:
+            return None
+
+        with DockerDeploymentPlatform._metrics_collector_lock:
+            if DockerDeploymentPlatform._metrics_collector is None:
+                # The stats of the containers are read in parallel, therefore a separate client is used
+                metrics_collector = DockerResourceMetricsCollector(
+                    docker.from_env(
+                        max_pool_size=settings.DEPLOYMENT_PLATFORM_MAX_CONNECTIONS
+                    ),
+                    interval=settings.DEPLOYMENT_METRICS_INTERVAL,
+                    max_samples=settings.DEPLOYMENT_METRICS_MAX_SAMPLES,
+                    max_workers=settings.DEPLOYMENT_PLATFORM_MAX_CONNECTIONS,
+                )
+                metrics_collector.start()
+                DockerDeploymentPlatform._metrics_collector = metrics_collector
+            return DockerDeploymentPlatform._metrics_collector
+
+    def get_deployment_metrics(
+        self, project_id: str, deployment_id: str, since: Optional[datetime] = None
+    ) -> List[ResourceUsageSample]:
+        """Returns the sampled resource usage of the running service or job in chronological order.
+
+        Returns an empty list if the resource metrics are not collected.
+        """
+        if self._metrics_collector is None:
+            return []
+        return self._metrics_collector.get_samples(project_id, deployment_id, since)
+
+    def _check_warm_pool(self, image: str) -> str:
+        """Records whether the image was pre-pulled by the warm pool and returns `hit`, `miss`, or `disabled`."""
+        if self._warm_pool is None:
+            return "disabled"
+        result = "hit" if self._warm_pool.contains(image) else "miss"
+        WARM_POOL_REQUESTS.labels(result=result).inc()
+        return result
+
+    def _list_cached_deployments(
+        self, project_id: str, deployment_type: DeploymentType
+    ) -> Optional[List[Any]]:
+        """Returns the deployments from the container cache or `None` if the cache is not ready."""
+        if self._cache is not None and self._cache.is_ready:
+            return self._cache.list_deployments(project_id, deployment_type)
+        return None
+
+    def _get_cached_deployment(
+        self, project_id: str, deployment_id: str, deployment_type: DeploymentType
+    ) -> Optional[Any]:
+        """Returns the deployment from the container cache or `None` if it is not (yet) in the cache."""
+        if self._cache is not None and self._cache.is_ready:
+            return self._cache.get_deployment(
+                project_id, deployment_id, deployment_type
+            )
+        return None
+
+    def _update_cache(self, container: docker.models.containers.Container) -> None:
+        if self._cache is not None:
+            self._cache.update(container)
+
+    def _remove_from_cache(self, container: docker.models.containers.Container) -> None:
+        if self._cache is not None:
+            self._cache.remove(container.id)
 
     def list_services(
         self,
@@ -41,6 +234,9 @@ class DockerDeploymentPlatform:
             DeploymentType.SERVICE, DeploymentType.EXTENSION
         ] = DeploymentType.SERVICE,
     ) -> List[Service]:
+        cached_services = self._list_cached_deployments(project_id, deployment_type)
+        if cached_services is not None:
+            return cached_services
         try:
             containers = get_project_containers(
                 client=self.client,
@@ -52,6 +248,32 @@ class DockerDeploymentPlatform:
         except docker.errors.APIError:
             return []
 
+    def list_all_services(
+        self,
+        deployment_type: Literal[
+            DeploymentType.SERVICE, DeploymentType.EXTENSION
+        ] = DeploymentType.SERVICE,
+    ) -> Dict[str, List[Service]]:
+        """Returns the services of all projects grouped by project ID.
+
+        Uses the container cache if it is ready, otherwise a single Docker API call.
+        """
+        if self._cache is not None and self._cache.is_ready:
+            return self._cache.list_all_deployments(deployment_type)  # type: ignore
+        try:
+            containers = get_all_project_containers(
+                client=self.client, deployment_type=deployment_type
+            )
+        except ServerBaseError:
+            return {}
+
+        services: Dict[str, List[Service]] = {}
+        for container in containers:
+            project_id = container.labels.get(Labels.PROJECT_NAME.value)
+            if project_id:
+                services.setdefault(project_id, []).append(map_service(container))
+        return services
+
     def deploy_service(
         self,
         project_id: str,
@@ -59,11 +281,13 @@ class DockerDeploymentPlatform:
         action_id: Optional[str] = None,
         wait: bool = False,
     ) -> Service:
+        start_time = time.perf_counter()
+        warm_pool_result = self._check_warm_pool(service.container_image)
         container_config = create_container_config(
             deployment=service,
             project_id=project_id,
         )
-        handle_network(client=self.client, project_id=project_id)
+        self._handle_network(project_id)
 
         try:
             container = self.client.containers.run(**container_config)
@@ -77,6 +301,10 @@ class DockerDeploymentPlatform:
                 ) from e
             raise ServerBaseError(message) from e
 
+        DEPLOYMENT_TIME_TO_READY.labels(
+            deployment_type=DeploymentType.SERVICE.value, warm_pool=warm_pool_result
+        ).observe(time.perf_counter() - start_time)
+        self._update_cache(container)
         return map_service(container)
 
     def list_deploy_service_actions(
@@ -85,11 +313,61 @@ class DockerDeploymentPlatform:
         return list_deploy_service_actions(project_id=project_id, deploy_input=service)
 
     def get_service_metadata(self, project_id: str, service_id: str) -> Service:
+        cached_service = self._get_cached_deployment(
+            project_id, service_id, DeploymentType.SERVICE
+        )
+        if cached_service is not None:
+            return cached_service
         container = get_project_container(
             client=self.client, project_id=project_id, deployment_id=service_id
         )
         return map_service(container)
 
+    def restart_service(
+        self, project_id: str, service_id: str, wait: bool = False
+    ) -> Service:
+        """Restarts the container of the service in place, keeping its configuration and volumes."""
+        container = get_project_container(
+            client=self.client, project_id=project_id, deployment_id=service_id
+        )
+        try:
+            # Returns after the container was stopped and started again
+            container.restart()
+            container.reload()
+            if wait:
+                container = wait_for_container(container, self.client)
+        except docker.errors.APIError as e:
+            raise ServerBaseError(f"Could not restart service '{service_id}'.") from e
+        self._update_cache(container)
+        return map_service(container)
+
+    def redeploy_service(
+        self, project_id: str, service: Service, wait: bool = False
+    ) -> Service:
+        """Replaces the container of the service with a container that uses the configuration of the service.
+
+        The configuration of a Docker container cannot be changed, therefore the container is
+        removed and created again. The volumes of the service are kept.
+        """
+        container = get_project_container(
+            client=self.client,
+            project_id=project_id,
+            deployment_id=service.id,  # type: ignore
+        )
+        delete_container(client=self.client, container=container)
+        try:
+            # Blocks until the removal event instead of polling, since the name is reused
+            container.wait(condition="removed", timeout=60)
+        except docker.errors.NotFound:
+            # The container was already removed
+            pass
+        except Exception as e:
+            raise ServerBaseError(
+                f"Service '{service.display_name}' was not removed in time."
+            ) from e
+        self._remove_from_cache(container)
+        return self.deploy_service(project_id, service, wait=wait)
+
     def update_service(
         self, project_id: str, service_id: str, service: ServiceUpdate
     ) -> Service:
@@ -109,6 +387,7 @@ class DockerDeploymentPlatform:
         delete_container(
             client=self.client, container=container, delete_volumes=delete_volumes
         )
+        self._remove_from_cache(container)
 
     def delete_services(
         self,
@@ -117,6 +396,7 @@ class DockerDeploymentPlatform:
         containers = get_project_containers(client=self.client, project_id=project_id)
         for container in containers:
             container.remove(v=True, force=True)
+            self._remove_from_cache(container)
 
     def get_service_logs(
         self,
@@ -124,19 +404,61 @@ class DockerDeploymentPlatform:
         service_id: str,
         lines: Optional[int] = None,
         since: Optional[datetime] = None,
+        wait: bool = True,
     ) -> str:
+        # The logs of a container can be read as soon as it is created, so there is nothing to wait for
         container = get_project_container(
             self.client, project_id=project_id, deployment_id=service_id
         )
 
         return read_container_logs(container=container, lines=lines, since=since)
 
+    def stream_service_logs(
+        self,
+        project_id: str,
+        service_id: str,
+        lines: Optional[int] = None,
+        since: Optional[datetime] = None,
+        follow: bool = False,
+        wait: bool = True,
+    ) -> Iterator[bytes]:
+        container = get_project_container(
+            self.client, project_id=project_id, deployment_id=service_id
+        )
+        return stream_container_logs(
+            container=container, lines=lines, since=since, follow=follow
+        )
+
     def list_jobs(self, project_id: str) -> List[Job]:
+        cached_jobs = self._list_cached_deployments(project_id, DeploymentType.JOB)
+        if cached_jobs is not None:
+            return cached_jobs
         containers = get_project_containers(
             self.client, project_id=project_id, deployment_type=DeploymentType.JOB
         )
         return [map_job(container) for container in containers]
 
+    def list_all_jobs(self) -> Dict[str, List[Job]]:
+        """Returns the jobs of all projects grouped by project ID.
+
+        Uses the container cache if it is ready, otherwise a single Docker API call.
+        """
+        if self._cache is not None and self._cache.is_ready:
+            return self._cache.list_all_deployments(DeploymentType.JOB)  # type: ignore
+        try:
+            containers = get_all_project_containers(
+                client=self.client, deployment_type=DeploymentType.JOB
+            )
+        except ServerBaseError:
+            return {}
+
+        jobs: Dict[str, List[Job]] = {}
+        for container in containers:
+            project_id = container.labels.get(Labels.PROJECT_NAME.value)
+            if project_id:
+                jobs.setdefault(project_id, []).append(map_job(container))
+        return jobs
+
     def deploy_job(
         self,
         project_id: str,
@@ -148,7 +470,7 @@ class DockerDeploymentPlatform:
             deployment=job,
             project_id=project_id,
         )
-        handle_network(client=self.client, project_id=project_id)
+        self._handle_network(project_id)
 
         try:
             container = self.client.containers.run(**container_config)
@@ -162,6 +484,7 @@ class DockerDeploymentPlatform:
                 ) from e
             raise ServerBaseError(message) from e
 
+        self._update_cache(container)
         response_service = map_job(container)
         return response_service
 
@@ -173,6 +496,9 @@ class DockerDeploymentPlatform:
         return list_deploy_service_actions(project_id=project_id, deploy_input=job)
 
     def get_job_metadata(self, project_id: str, job_id: str) -> Job:
+        cached_job = self._get_cached_deployment(project_id, job_id, DeploymentType.JOB)
+        if cached_job is not None:
+            return cached_job
         container = get_project_container(
             client=self.client,
             project_id=project_id,
@@ -190,6 +516,7 @@ class DockerDeploymentPlatform:
             deployment_type=DeploymentType.JOB,
         )
         delete_container(client=self.client, container=container)
+        self._remove_from_cache(container)
 
     def delete_jobs(
         self,
@@ -200,6 +527,7 @@ class DockerDeploymentPlatform:
         )
         for container in containers:
             container.remove(v=True, force=True)
+            self._remove_from_cache(container)
 
     def get_job_logs(
         self,
@@ -207,6 +535,7 @@ class DockerDeploymentPlatform:
         job_id: str,
         lines: Optional[int] = None,
         since: Optional[datetime] = None,
+        wait: bool = True,
     ) -> str:
         container = get_project_container(
             self.client,
@@ -217,6 +546,25 @@ class DockerDeploymentPlatform:
 
         return read_container_logs(container=container, lines=lines, since=since)
 
+    def stream_job_logs(
+        self,
+        project_id: str,
+        job_id: str,
+        lines: Optional[int] = None,
+        since: Optional[datetime] = None,
+        follow: bool = False,
+        wait: bool = True,
+    ) -> Iterator[bytes]:
+        container = get_project_container(
+            self.client,
+            project_id=project_id,
+            deployment_id=job_id,
+            deployment_type=DeploymentType.JOB,
+        )
+        return stream_container_logs(
+            container=container, lines=lines, since=since, follow=follow
+        )
+
     def suggest_service_config(
         self, project_id: str, container_image: str
     ) -> ServiceInput:
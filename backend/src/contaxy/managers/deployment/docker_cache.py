@@ -0,0 +1,376 @@
+"""In-memory snapshot of the contaxy containers that is kept in sync via the Docker events stream."""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import docker.errors
+import docker.models.containers
+from docker import DockerClient
+from loguru import logger
+
+from contaxy.config import settings
+from contaxy.managers.deployment.docker_utils import map_job, map_service
+from contaxy.managers.deployment.utils import Labels, get_label_string
+from contaxy.schema.deployment import DeploymentType, Job, Service
+
+# Container events that do not change the state of the container
+IGNORED_EVENT_ACTIONS = (
+    "archive-path",
+    "attach",
+    "commit",
+    "copy",
+    "detach",
+    "exec_create",
+    "exec_detach",
+    "exec_die",
+    "exec_start",
+    "export",
+    "extract-to-dir",
+    "resize",
+    "top",
+)
+
+
+@dataclass
+class CachedDeployment:
+    container_id: str
+    project_id: str
+    deployment_type: str
+    deployment_id: str
+    deployment: Union[Service, Job]
+
+
+def _add_to_index(
+    deployments: Dict[str, CachedDeployment],
+    project_index: Dict[Tuple[str, str], Dict[str, str]],
+    cached_deployment: CachedDeployment,
+) -> None:
+    deployments[cached_deployment.container_id] = cached_deployment
+    project_index.setdefault(
+        (cached_deployment.project_id, cached_deployment.deployment_type), {}
+    )[cached_deployment.deployment_id] = cached_deployment.container_id
+
+
+class DockerEventsConsumer(ABC):
+    """Base class for in-memory state that is kept in sync via the Docker events stream.
+
+    The state is loaded via `_resync()` and afterwards updated with the events matching
+    `_get_event_filters()` via `_handle_event()`. The state is loaded again in the given
+    resync interval and after the events stream failed to recover from missed events.
+    """
+
+    _thread_name = "docker-events-consumer"
+
+    def __init__(
+        self,
+        client: DockerClient,
+        resync_interval: timedelta = timedelta(minutes=5),
+        error_backoff: float = 1.0,
+    ):
+        """Initializes the consumer. The events consumer is started via `start()`.
+
+        Args:
+            client: Docker client that is exclusively used by the consumer, since the events stream blocks a connection.
+            resync_interval: Interval in which the state is loaded again.
+            error_backoff: Seconds to wait before loading the state again after the events stream failed.
+        """
+        self._client = client
+        self._resync_interval = resync_interval
+        self._error_backoff = error_backoff
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._stopped = threading.Event()
+        self._events_stream: Optional[docker.types.CancellableStream] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_ready(self) -> bool:
+        """Returns `True` if the state is in sync with the Docker daemon."""
+        return self._ready.is_set()
+
+    def start(self) -> None:
+        """Starts the events consumer in a background thread."""
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name=self._thread_name, daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops the events consumer. The state is not updated anymore afterwards."""
+        self._stopped.set()
+        self._ready.clear()
+        if self._thread is None:
+            return
+        deadline = time.time() + 10
+        while self._thread.is_alive() and time.time() < deadline:
+            # Repeat since the stream might have been (re-)opened in the meantime
+            self._close_events_stream()
+            self._thread.join(timeout=0.1)
+        self._thread = None
+
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until the initial state is loaded.
+
+        Returns:
+            bool: `True` if the state is ready, `False` if the timeout expired.
+        """
+        return self._ready.wait(timeout)
+
+    @abstractmethod
+    def _resync(self) -> None:
+        """Replaces the state with the current state of the Docker daemon."""
+        pass
+
+    @abstractmethod
+    def _get_event_filters(self) -> dict:
+        """Returns the filters of the events that are passed to `_handle_event()`."""
+        pass
+
+    @abstractmethod
+    def _handle_event(self, event: dict) -> None:
+        """Applies an event of the Docker events stream to the state."""
+        pass
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                # Events that happen while listing are replayed afterwards
+                since = int(time.time())
+                self._resync()
+                self._ready.set()
+                self._consume_events(
+                    since=since,
+                    until=since + int(self._resync_interval.total_seconds()),
+                )
+            except Exception as e:
+                if self._stopped.is_set():
+                    return
+                logger.warning(
+                    f"Error while consuming Docker events. Listing again in {self._error_backoff} seconds: {e}"
+                )
+                # The state might miss changes until it is loaded again
+                self._ready.clear()
+                self._stopped.wait(self._error_backoff)
+
+    def _consume_events(self, since: int, until: int) -> None:
+        """Applies the events until the given time or until the consumer is stopped."""
+        self._events_stream = self._client.events(
+            decode=True,
+            since=since,
+            until=until,
+            filters=self._get_event_filters(),
+        )
+        try:
+            for event in self._events_stream:
+                if self._stopped.is_set():
+                    return
+                self._handle_event(event)
+        finally:
+            self._close_events_stream()
+
+    def _close_events_stream(self) -> None:
+        events_stream = self._events_stream
+        if events_stream is not None:
+            try:
+                events_stream.close()
+            except Exception:
+                pass
+
+
+class ContainerCache(DockerEventsConsumer):
+    """Keeps the mapped services and jobs of all contaxy containers in memory.
+
+    The cache lists all containers of the contaxy namespace and afterwards applies
+    the events of the Docker events stream by inspecting the changed containers.
+    All containers are listed again in the given resync interval to recover from missed events.
+
+    The deployments are indexed by project and deployment type, so that listing the services
+    of a project does not require any Docker API call. While the cache is not ready
+    (initial list pending or the events stream failed), readers should fall back to the Docker API.
+    """
+
+    _thread_name = "docker-container-cache"
+
+    def __init__(
+        self,
+        client: DockerClient,
+        resync_interval: timedelta = timedelta(minutes=5),
+        error_backoff: float = 1.0,
+    ):
+        """Initializes the container cache. The events consumer is started via `start()`.
+
+        Args:
+            client: Docker client that is exclusively used by the cache, since the events stream blocks a connection.
+            resync_interval: Interval in which all containers are listed again.
+            error_backoff: Seconds to wait before listing again after the events stream failed.
+        """
+        super().__init__(client, resync_interval, error_backoff)
+        self._namespace_label = get_label_string(
+            Labels.NAMESPACE.value, settings.SYSTEM_NAMESPACE
+        )
+
+        self._deployments: Dict[str, CachedDeployment] = {}
+        # (project_id, deployment_type) -> deployment_id -> container_id
+        self._project_index: Dict[Tuple[str, str], Dict[str, str]] = {}
+        self._listeners: List[Callable[[str, str], None]] = []
+
+    def add_listener(self, listener: Callable[[str, str], None]) -> None:
+        """Registers a function that is called with the project ID and deployment ID of every deployment changed by an event."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def list_deployments(
+        self, project_id: str, deployment_type: DeploymentType
+    ) -> List[Union[Service, Job]]:
+        """Returns copies of all cached deployments of the project with the given type."""
+        with self._lock:
+            container_ids = self._project_index.get(
+                (project_id, deployment_type.value), {}
+            ).values()
+            return [
+                self._deployments[container_id].deployment.copy()
+                for container_id in container_ids
+            ]
+
+    def list_all_deployments(
+        self, deployment_type: DeploymentType
+    ) -> Dict[str, List[Union[Service, Job]]]:
+        """Returns copies of all cached deployments with the given type grouped by project ID."""
+        deployments: Dict[str, List[Union[Service, Job]]] = {}
+        with self._lock:
+            for (project_id, index_type), container_ids in self._project_index.items():
+                if index_type != deployment_type.value or not project_id:
+                    continue
+                deployments[project_id] = [
+                    self._deployments[container_id].deployment.copy()
+                    for container_id in container_ids.values()
+                ]
+        return deployments
+
+    def get_deployment(
+        self, project_id: str, deployment_id: str, deployment_type: DeploymentType
+    ) -> Optional[Union[Service, Job]]:
+        """Returns a copy of the cached deployment or `None` if it is not in the cache."""
+        with self._lock:
+            container_id = self._project_index.get(
+                (project_id, deployment_type.value), {}
+            ).get(deployment_id)
+            if container_id is None:
+                return None
+            return self._deployments[container_id].deployment.copy()
+
+    def update(
+        self, container: docker.models.containers.Container
+    ) -> Optional[CachedDeployment]:
+        """Maps the container and stores the deployment in the cache.
+
+        Is also called with containers returned by write requests to make them visible
+        for following reads of the same process before the event is received.
+
+        Returns:
+            Optional[CachedDeployment]: The cached deployment or `None` if the container is not a contaxy deployment.
+        """
+        cached_deployment = self._map_container(container)
+        if cached_deployment is None:
+            return None
+        with self._lock:
+            self._remove_from_index(container.id)
+            _add_to_index(self._deployments, self._project_index, cached_deployment)
+        return cached_deployment
+
+    def remove(self, container_id: str) -> Optional[CachedDeployment]:
+        """Removes the deployment of a deleted container from the cache.
+
+        Returns:
+            Optional[CachedDeployment]: The removed deployment or `None` if the container was not cached.
+        """
+        with self._lock:
+            return self._remove_from_index(container_id)
+
+    def _map_container(
+        self, container: docker.models.containers.Container
+    ) -> Optional[CachedDeployment]:
+        labels = container.labels
+        if labels.get(Labels.NAMESPACE.value) != settings.SYSTEM_NAMESPACE:
+            return None
+        deployment_type = labels.get(Labels.DEPLOYMENT_TYPE.value)
+        try:
+            deployment: Union[Service, Job] = (
+                map_job(container)
+                if deployment_type == DeploymentType.JOB.value
+                else map_service(container)
+            )
+        except Exception as e:
+            logger.warning(f"Could not map container {container.name}: {e}")
+            return None
+        return CachedDeployment(
+            container_id=container.id,
+            project_id=labels.get(Labels.PROJECT_NAME.value, ""),
+            deployment_type=deployment_type or "",
+            deployment_id=labels.get(Labels.DEPLOYMENT_ID.value, ""),
+            deployment=deployment,
+        )
+
+    def _remove_from_index(self, container_id: str) -> Optional[CachedDeployment]:
+        cached_deployment = self._deployments.pop(container_id, None)
+        if cached_deployment is None:
+            return None
+        index_key = (cached_deployment.project_id, cached_deployment.deployment_type)
+        project_deployments = self._project_index.get(index_key, {})
+        if project_deployments.get(cached_deployment.deployment_id) == container_id:
+            del project_deployments[cached_deployment.deployment_id]
+            if not project_deployments:
+                del self._project_index[index_key]
+        return cached_deployment
+
+    def _resync(self) -> None:
+        """Replaces the cached deployments with the current state of all containers."""
+        containers = self._client.containers.list(
+            all=True, filters={"label": [self._namespace_label]}
+        )
+        # Build the new state first so that readers never see a partially loaded cache
+        deployments: Dict[str, CachedDeployment] = {}
+        project_index: Dict[Tuple[str, str], Dict[str, str]] = {}
+        for container in containers:
+            cached_deployment = self._map_container(container)
+            if cached_deployment is not None:
+                _add_to_index(deployments, project_index, cached_deployment)
+        with self._lock:
+            self._deployments = deployments
+            self._project_index = project_index
+
+    def _get_event_filters(self) -> dict:
+        return {"type": "container", "label": [self._namespace_label]}
+
+    def _handle_event(self, event: dict) -> None:
+        action = event.get("Action") or event.get("status") or ""
+        container_id = (event.get("Actor") or {}).get("ID") or event.get("id")
+        if not container_id or action.startswith(IGNORED_EVENT_ACTIONS):
+            return
+        if action == "destroy":
+            self._notify_listeners(self.remove(container_id))
+            return
+        try:
+            container = self._client.containers.get(container_id)
+        except docker.errors.NotFound:
+            self._notify_listeners(self.remove(container_id))
+            return
+        self._notify_listeners(self.update(container))
+
+    def _notify_listeners(self, cached_deployment: Optional[CachedDeployment]) -> None:
+        if cached_deployment is None:
+            return
+        with self._lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(cached_deployment.project_id, cached_deployment.deployment_id)
+            except Exception as e:
+                logger.warning(f"Error in listener of the container cache: {e}")
@@ -0,0 +1,189 @@
+"""Registry of the Docker networks that is kept in sync via the Docker events stream."""
+
+import ipaddress
+import threading
+from datetime import timedelta
+from typing import Dict, Optional, Set
+
+import docker.errors
+import docker.models.networks
+from docker import DockerClient
+from loguru import logger
+
+from contaxy.managers.deployment.docker_cache import DockerEventsConsumer
+from contaxy.managers.deployment.docker_utils import (
+    connect_to_network,
+    create_network,
+    get_network_labels,
+    get_network_subnet,
+    get_next_subnet,
+    get_this_container,
+)
+from contaxy.managers.deployment.utils import get_network_name
+
+
+class NetworkRegistry(DockerEventsConsumer):
+    """Keeps the subnets of all Docker networks and the networks of the backend container in memory.
+
+    Creating a project network requires the subnets of all networks to find the next free subnet
+    and deploying a service requires that the backend container is connected to the project network.
+    With the registry, both are looked up in memory instead of listing and inspecting all networks.
+    Networks created or connected by this process are registered immediately, changes of other
+    processes are applied via the network events.
+    """
+
+    _thread_name = "docker-network-registry"
+
+    def __init__(
+        self,
+        client: DockerClient,
+        resync_interval: timedelta = timedelta(minutes=5),
+        error_backoff: float = 1.0,
+    ):
+        """Initializes the network registry. The events consumer is started via `start()`.
+
+        Args:
+            client: Docker client that is exclusively used by the registry, since the events stream blocks a connection.
+            resync_interval: Interval in which all networks are listed again.
+            error_backoff: Seconds to wait before listing again after the events stream failed.
+        """
+        super().__init__(client, resync_interval, error_backoff)
+        # network_id -> subnet
+        self._subnets: Dict[str, Optional[ipaddress.IPv4Network]] = {}
+        # lower-case network name -> network_id
+        self._network_ids: Dict[str, str] = {}
+        self._connected_network_ids: Set[str] = set()
+        # `None` if the backend does not run in a container
+        self._backend_container_id: Optional[str] = None
+        # Prevents that the process allocates the same subnet twice
+        self._allocation_lock = threading.Lock()
+
+    def handle_network(self, client: DockerClient, project_id: str) -> None:
+        """Creates the project network if it does not exist and connects the backend container to it.
+
+        Args:
+            client: Docker client used to create and connect the network.
+            project_id: ID of the project.
+        """
+        network_name = get_network_name(project_id)
+        network_id = self.get_network_id(network_name)
+        if network_id is None:
+            network_id = self._create_network(client, project_id, network_name)
+        self._connect_backend(client, network_id)
+
+    def get_network_id(self, network_name: str) -> Optional[str]:
+        with self._lock:
+            return self._network_ids.get(network_name.lower())
+
+    def add_network(self, network: docker.models.networks.Network) -> None:
+        with self._lock:
+            self._add_network(network.id, network.name, network.attrs)
+
+    def _create_network(
+        self, client: DockerClient, project_id: str, network_name: str
+    ) -> str:
+        with self._allocation_lock:
+            network_id = self.get_network_id(network_name)
+            if network_id is not None:
+                return network_id
+            with self._lock:
+                subnets = [
+                    subnet for subnet in self._subnets.values() if subnet is not None
+                ]
+            try:
+                network = create_network(
+                    client=client,
+                    name=network_name,
+                    labels=get_network_labels(project_id),
+                    subnet=get_next_subnet(subnets),
+                )
+            except docker.errors.APIError as e:
+                # Another process might have created the network or used the subnet in the meantime
+                logger.info(
+                    f"Could not create network {network_name} with the registered subnets. Listing all networks: {e}"
+                )
+                network = create_network(
+                    client=client,
+                    name=network_name,
+                    labels=get_network_labels(project_id),
+                )
+            self.add_network(network)
+            return network.id
+
+    def _connect_backend(self, client: DockerClient, network_id: str) -> None:
+        with self._lock:
+            backend_container_id = self._backend_container_id
+            if (
+                backend_container_id is None
+                or network_id in self._connected_network_ids
+            ):
+                return
+        # Checks the current networks of the backend container and removes the network on failure
+        connect_to_network(
+            client.containers.get(backend_container_id),
+            client.networks.get(network_id),
+        )
+        with self._lock:
+            self._connected_network_ids.add(network_id)
+
+    def _add_network(
+        self, network_id: str, network_name: str, network_attrs: dict
+    ) -> None:
+        self._subnets[network_id] = get_network_subnet(network_attrs)
+        self._network_ids[network_name.lower()] = network_id
+
+    def _remove_network(self, network_id: str) -> None:
+        self._subnets.pop(network_id, None)
+        self._connected_network_ids.discard(network_id)
+        for network_name, registered_id in list(self._network_ids.items()):
+            if registered_id == network_id:
+                del self._network_ids[network_name]
+
+    def _resync(self) -> None:
+        """Replaces the registered networks with all current networks."""
+        networks = self._client.networks.list()
+        backend_container = get_this_container(self._client)
+        with self._lock:
+            self._subnets = {}
+            self._network_ids = {}
+            for network in networks:
+                self._add_network(network.id, network.name, network.attrs)
+            if backend_container is None:
+                self._backend_container_id = None
+                self._connected_network_ids = set()
+                return
+            self._backend_container_id = backend_container.id
+            self._connected_network_ids = {
+                network_settings.get("NetworkID")
+                for network_settings in backend_container.attrs["NetworkSettings"][
+                    "Networks"
+                ].values()
+            }
+
+    def _get_event_filters(self) -> dict:
+        return {"type": "network"}
+
+    def _handle_event(self, event: dict) -> None:
+        action = event.get("Action") or event.get("status") or ""
+        actor = event.get("Actor") or {}
+        network_id = actor.get("ID")
+        if not network_id:
+            return
+        if action == "create":
+            try:
+                network = self._client.networks.get(network_id)
+            except docker.errors.NotFound:
+                return
+            self.add_network(network)
+        elif action == "destroy":
+            with self._lock:
+                self._remove_network(network_id)
+        elif action in ("connect", "disconnect"):
+            container_id = (actor.get("Attributes") or {}).get("container")
+            with self._lock:
+                if container_id is None or container_id != self._backend_container_id:
+                    return
+                if action == "connect":
+                    self._connected_network_ids.add(network_id)
+                else:
+                    self._connected_network_ids.discard(network_id)
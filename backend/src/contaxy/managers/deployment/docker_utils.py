@@ -2,7 +2,7 @@ import ipaddress
 import os
 import time
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 import docker
 import docker.errors
@@ -138,9 +138,55 @@ def map_job(container: docker.models.containers.Container) -> Job:
     return Job(**transformed_container)
 
 
+def get_network_subnet(network_attrs: dict) -> Optional[ipaddress.IPv4Network]:
+    """Returns the first IPv4 subnet of the network or `None` if the network has no IPv4 subnet."""
+    ipam_configs = (network_attrs.get("IPAM") or {}).get("Config") or []
+    if len(ipam_configs) == 0 or not ipam_configs[0].get("Subnet"):
+        return None
+    try:
+        return ipaddress.IPv4Network(ipam_configs[0]["Subnet"])
+    except ValueError:
+        # e.g. IPv6 subnet
+        return None
+
+
+def get_next_subnet(
+    subnets: Iterable[ipaddress.IPv4Network],
+) -> ipaddress.IPv4Network:
+    """Returns the /24 subnet following the highest of the given subnets in the range used for project networks.
+
+    Raises:
+        RuntimeError: If the range used for project networks is exhausted.
+    """
+    highest_cidr = ipaddress.IPv4Network(INITIAL_CIDR)
+
+    # determine subnet for the network to be created by finding the highest subnet so far.
+    # E.g. when you have three subnets 172.33.1.0, 172.33.2.0, and 172.33.3.0, highest_cidr will be 172.33.3.0
+    for cidr in subnets:
+        if (
+            cidr.network_address.packed[0] == INITIAL_CIDR_FIRST_OCTET
+            and cidr.network_address.packed[1] >= INITIAL_CIDR_SECOND_OCTET
+            and cidr > highest_cidr
+        ):
+            highest_cidr = cidr
+
+    # take the highest cidr and add bits used by it, so that if the highest subnet was 172.33.2.0, the new subnet is 172.33.3.0
+    # or if the highest subnet was 10.88.0.0/16, the new subnet is 10.89.0.0/24
+    next_cidr = ipaddress.IPv4Network(
+        (highest_cidr.network_address + 2 ** (32 - highest_cidr.prefixlen)).exploded
+        + "/24"
+    )
+    if next_cidr.network_address.packed[0] > INITIAL_CIDR_FIRST_OCTET:
+        raise RuntimeError("No more possible subnet addresses exist")
+    return next_cidr
+
+
 # TODO: copied from ML Hub
 def create_network(
-    client: DockerClient, name: str, labels: Dict[str, str]
+    client: DockerClient,
+    name: str,
+    labels: Dict[str, str],
+    subnet: Optional[ipaddress.IPv4Network] = None,
 ) -> docker.models.networks.Network:
     """Create a new network to put the new container into it.
 
@@ -154,6 +200,8 @@ def create_network(
         client (DockerClient): docker client that provides access to the docker API
         name (str): name of the network to be created
         labels (Dict[str, str]): labels that will be attached to the network
+        subnet (ipaddress.IPv4Network, optional): subnet of the network. If not provided, all networks are listed
+            to determine the next free subnet and an existing network with the given name is returned.
     Raises:
         docker.errors.APIError: Thrown by `docker.client.networks.create` upon error.
 
@@ -162,44 +210,20 @@ def create_network(
 
     """
 
-    networks = client.networks.list()
-    highest_cidr = ipaddress.IPv4Network(INITIAL_CIDR)
-
-    # determine subnet for the network to be created by finding the highest subnet so far.
-    # E.g. when you have three subnets 172.33.1.0, 172.33.2.0, and 172.33.3.0, highest_cidr will be 172.33.3.0
-    for network in networks:
-        if network.name.lower() == name.lower():
-            logger.info(f"Network {name} already exists")
-            return network
-
-        has_all_properties = (
-            network.attrs["IPAM"]
-            and network.attrs["IPAM"]["Config"]
-            and len(network.attrs["IPAM"]["Config"]) > 0
-            and network.attrs["IPAM"]["Config"][0]["Subnet"]
-        )
-        if has_all_properties:
-            cidr = ipaddress.IPv4Network(network.attrs["IPAM"]["Config"][0]["Subnet"])
-
-            if (
-                cidr.network_address.packed[0] == INITIAL_CIDR_FIRST_OCTET
-                and cidr.network_address.packed[1] >= INITIAL_CIDR_SECOND_OCTET
-                and cidr > highest_cidr
-            ):
-                highest_cidr = cidr
-
-    # take the highest cidr and add bits used by it, so that if the highest subnet was 172.33.2.0, the new subnet is 172.33.3.0
-    # or if the highest subnet was 10.88.0.0/16, the new subnet is 10.89.0.0/24
-    next_cidr = ipaddress.IPv4Network(
-        (highest_cidr.network_address + 2 ** (32 - highest_cidr.prefixlen)).exploded
-        + "/24"
-    )
-    if next_cidr.network_address.packed[0] > INITIAL_CIDR_FIRST_OCTET:
-        raise RuntimeError("No more possible subnet addresses exist")
-
-    logger.info(f"Create network {name} with subnet {next_cidr.exploded}")
+    if subnet is None:
+        subnets = []
+        for network in client.networks.list():
+            if network.name.lower() == name.lower():
+                logger.info(f"Network {name} already exists")
+                return network
+            network_subnet = get_network_subnet(network.attrs)
+            if network_subnet is not None:
+                subnets.append(network_subnet)
+        subnet = get_next_subnet(subnets)
+
+    logger.info(f"Create network {name} with subnet {subnet.exploded}")
     ipam_pool = docker.types.IPAMPool(
-        subnet=next_cidr.exploded, gateway=(next_cidr.network_address + 1).exploded
+        subnet=subnet.exploded, gateway=(subnet.network_address + 1).exploded
     )
     ipam_config = docker.types.IPAMConfig(pool_configs=[ipam_pool])
 
@@ -208,6 +232,13 @@ def create_network(
     )
 
 
+def get_network_labels(project_id: str) -> Dict[str, str]:
+    return {
+        Labels.NAMESPACE.value: settings.SYSTEM_NAMESPACE,
+        Labels.PROJECT_NAME.value: project_id,
+    }
+
+
 def handle_network(
     client: DockerClient, project_id: str
 ) -> docker.models.networks.Network:
@@ -218,10 +249,7 @@ def handle_network(
         network = create_network(
             client=client,
             name=network_name,
-            labels={
-                Labels.NAMESPACE.value: settings.SYSTEM_NAMESPACE,
-                Labels.PROJECT_NAME.value: project_id,
-            },
+            labels=get_network_labels(project_id),
         )
     connect_to_network(get_this_container(client), network)
     return network
@@ -312,6 +340,24 @@ def get_project_containers(
     return containers
 
 
+def get_all_project_containers(
+    client: DockerClient,
+    deployment_type: DeploymentType = DeploymentType.SERVICE,
+) -> List[docker.models.containers.Container]:
+    """Lists the containers of all projects with a single Docker API call."""
+    labels = [
+        get_label_string(Labels.NAMESPACE.value, settings.SYSTEM_NAMESPACE),
+        get_label_string(Labels.DEPLOYMENT_TYPE.value, deployment_type.value),
+    ]
+
+    try:
+        containers = client.containers.list(all=True, filters={"label": labels})
+    except docker.errors.APIError as e:
+        raise ServerBaseError("Could not list Docker containers.") from e
+
+    return containers
+
+
 def get_project_container(
     client: DockerClient,
     project_id: str,
@@ -553,19 +599,65 @@ def read_container_logs(
     return logs
 
 
+def stream_container_logs(
+    container: docker.models.containers.Container,
+    lines: Optional[int] = None,
+    since: Optional[datetime] = None,
+    follow: bool = False,
+) -> Iterator[bytes]:
+    """Returns the logs of the container as stream that can be closed from another thread."""
+    try:
+        return container.logs(
+            stream=True, follow=follow, tail=lines or "all", since=since
+        )
+    except docker.errors.APIError as e:
+        raise ServerBaseError(
+            f"Could not read logs of container {container.name}."
+        ) from e
+
+
 def wait_for_container(
     container: docker.models.containers.Container,
     client: DockerClient,
     timeout: int = 60,
 ) -> docker.models.containers.Container:
-    start = time.time()
-    while time.time() - start < timeout:
-        container_info = client.containers.get(container.id)
-        if container_info.status.lower() != "created":
-            return container_info
-        else:
-            time.sleep(2)
+    """Waits until the container is not in the `created` state anymore, e.g. after it was started.
+
+    Instead of polling, the events of the container are consumed, so that the function
+    returns as soon as the Docker daemon reports that the container was started or stopped.
 
+    Raises:
+        RuntimeError: If the container is still in the `created` state after the timeout.
+
+    Returns:
+        Container: The container with its current state.
+    """
+    # Events that happen after this point are received, even if they happen before the stream is opened
+    since = int(time.time())
+    container_info = client.containers.get(container.id)
+    if container_info.status.lower() != "created":
+        return container_info
+
+    events = client.events(
+        decode=True,
+        since=since,
+        until=since + timeout,
+        filters={
+            "type": "container",
+            "container": container.id,
+            "event": ["start", "die", "destroy"],
+        },
+    )
+    try:
+        for event in events:
+            if (event.get("Actor") or {}).get("ID") == container.id:
+                break
+    finally:
+        events.close()
+
+    container_info = client.containers.get(container.id)
+    if container_info.status.lower() != "created":
+        return container_info
     raise RuntimeError(f"Timeout while waiting for container {container.id}.")
 
 
@@ -0,0 +1,83 @@
+"""Pool of pre-pulled container images to reduce the startup time of services."""
+
+import threading
+from datetime import timedelta
+from typing import List, Set
+
+import docker
+import docker.errors
+from loguru import logger
+
+from contaxy.managers.deployment.utils import split_image_name_and_tag
+
+
+def _normalize_image_name(image: str) -> str:
+    image_name, image_tag = split_image_name_and_tag(image)
+    return f"{image_name}:{image_tag}"
+
+
+class ImageWarmPool:
+    """Keeps the configured container images pulled on the Docker host.
+
+    Pulling the image is usually the slowest part of starting a service. The pool pulls
+    the configured images in a background thread and pulls them again in every refresh
+    interval, so that updated tags (e.g. `latest`) and pruned images are restored.
+    """
+
+    def __init__(
+        self,
+        client: docker.DockerClient,
+        images: List[str],
+        refresh_interval: timedelta,
+    ) -> None:
+        """Initializes the pool. The images are pulled once the pool is started via `start()`.
+
+        Args:
+            client: Docker client used to pull the images.
+            images: Container images (with optional tag) that should be kept pulled.
+            refresh_interval: Time between two pulls of all images.
+        """
+        self._client = client
+        self._images = [_normalize_image_name(image) for image in images]
+        self._refresh_interval = refresh_interval
+        self._warm_images: Set[str] = set()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="docker-image-warm-pool", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def contains(self, image: str) -> bool:
+        """Returns `True` if the image is configured for the pool and was pulled successfully."""
+        with self._lock:
+            return _normalize_image_name(image) in self._warm_images
+
+    def refill(self) -> None:
+        """Pulls all configured images. Images that could not be pulled are removed from the pool."""
+        for image in self._images:
+            if self._stopped.is_set():
+                return
+            image_name, image_tag = split_image_name_and_tag(image)
+            try:
+                self._client.images.pull(image_name, tag=image_tag)
+            except docker.errors.APIError as e:
+                logger.warning(f"Could not pull image {image} for the warm pool: {e}")
+                with self._lock:
+                    self._warm_images.discard(image)
+                continue
+            with self._lock:
+                self._warm_images.add(image)
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                self.refill()
+            except Exception as e:
+                logger.warning(f"Error while refilling the image warm pool: {e}")
+            self._stopped.wait(self._refresh_interval.total_seconds())
@@ -0,0 +1,489 @@
+"""In-process deployment platform that keeps the deployments in memory.
+
+The platform implements the same interface as `DockerDeploymentPlatform` and
+`KubernetesDeploymentPlatform` without starting containers. It is used to test and
+benchmark the `DeploymentManager` with simulated API latencies and injected failures.
+"""
+
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime, timezone
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from contaxy.managers.deployment.utils import DEFAULT_DEPLOYMENT_ACTION_ID
+from contaxy.schema import Job, JobInput, ResourceAction, Service, ServiceInput
+from contaxy.schema.deployment import (
+    Deployment,
+    DeploymentStatus,
+    DeploymentType,
+    ResourceUsageSample,
+    ServiceUpdate,
+)
+from contaxy.schema.exceptions import (
+    ResourceNotFoundError,
+    ResourceNotReadyError,
+    ServerBaseError,
+)
+from contaxy.utils import id_utils
+
+DeploymentT = TypeVar("DeploymentT", bound=Deployment)
+
+
+class FakeDeploymentPlatform:
+    """Deployment platform that keeps the services and jobs in memory instead of running containers.
+
+    Every platform method first sleeps for its configured latency and then raises the
+    injected failures, so that the manager can be measured and tested as if it talked to
+    a Docker daemon or Kubernetes API server. Jobs keep running until `finish_job()` is called.
+    """
+
+    def __init__(
+        self,
+        latencies: Optional[Dict[str, float]] = None,
+        default_latency: float = 0,
+        failure_rates: Optional[Dict[str, float]] = None,
+        resource_capacity: Optional[Tuple[float, float]] = None,
+        seed: Optional[int] = None,
+    ):
+        """Initializes the platform without deployments.
+
+        Args:
+            latencies: Seconds that the methods with the given names take, e.g. `{"deploy_service": 0.5}`.
+            default_latency: Seconds that all other methods take.
+            failure_rates: Probabilities (0 to 1) that the methods with the given names fail with a `ServerBaseError`.
+            resource_capacity: Number of CPUs and memory in Megabyte reported as capacity (None = unknown).
+            seed: Seed of the random failures to make them reproducible.
+        """
+        self._latencies = latencies or {}
+        self._default_latency = default_latency
+        self._failure_rates = failure_rates or {}
+        self._resource_capacity = resource_capacity
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        # deployment_type -> project_id -> deployment_id -> deployment
+        self._deployments: Dict[str, Dict[str, Dict[str, Deployment]]] = defaultdict(
+            lambda: defaultdict(dict)
+        )
+        self._logs: Dict[Tuple[str, str], str] = {}
+        self._metrics: Dict[Tuple[str, str], List[ResourceUsageSample]] = {}
+        self._injected_failures: Dict[str, Deque[Exception]] = defaultdict(deque)
+        self._listeners: List[Callable[[str, str], None]] = []
+        # method name -> number of calls
+        self.calls: Dict[str, int] = defaultdict(int)
+
+    def inject_failure(
+        self, method_name: str, error: Optional[Exception] = None, count: int = 1
+    ) -> None:
+        """Lets the next `count` calls of the method fail with the error (default: `ServerBaseError`)."""
+        for _ in range(count):
+            self._injected_failures[method_name].append(
+                error or ServerBaseError(f"Injected failure of {method_name}.")
+            )
+
+    def _simulate_call(self, method_name: str) -> None:
+        """Records the call, waits for the latency of the method, and raises injected failures."""
+        with self._lock:
+            self.calls[method_name] += 1
+            injected_failures = self._injected_failures.get(method_name)
+            error = injected_failures.popleft() if injected_failures else None
+        latency = self._latencies.get(method_name, self._default_latency)
+        if latency > 0:
+            time.sleep(latency)
+        if error is not None:
+            raise error
+        failure_rate = self._failure_rates.get(method_name, 0)
+        if failure_rate > 0 and self._random.random() < failure_rate:
+            raise ServerBaseError(f"Random failure of {method_name}.")
+
+    def add_deployments(
+        self, project_id: str, deployments: List[DeploymentT]
+    ) -> List[DeploymentT]:
+        """Adds running deployments without simulating a call, e.g. to prepare benchmarks.
+
+        Returns:
+            List[DeploymentT]: The deployments with runtime information as returned by the platform.
+        """
+        return [
+            self._store_deployment(project_id, deployment) for deployment in deployments
+        ]
+
+    def set_status(
+        self, project_id: str, deployment_id: str, status: DeploymentStatus
+    ) -> None:
+        """Changes the status of the deployment as if the container changed its state."""
+        with self._lock:
+            deployment = self._find_deployment(project_id, deployment_id)
+            if deployment is None:
+                raise ResourceNotFoundError(f"Deployment {deployment_id} not found.")
+            deployment.status = status
+            if status not in (DeploymentStatus.PENDING, DeploymentStatus.RUNNING):
+                deployment.stopped_at = datetime.now(timezone.utc)
+        self._notify_listeners(project_id, deployment_id)
+
+    def finish_job(self, project_id: str, job_id: str, succeeded: bool = True) -> None:
+        """Stops the running job, like a container that exited."""
+        self.set_status(
+            project_id,
+            job_id,
+            DeploymentStatus.SUCCEEDED if succeeded else DeploymentStatus.FAILED,
+        )
+
+    def set_logs(self, project_id: str, deployment_id: str, logs: str) -> None:
+        """Sets the logs that are returned for the deployment."""
+        self._logs[(project_id, deployment_id)] = logs
+
+    def set_metrics(
+        self, project_id: str, deployment_id: str, samples: List[ResourceUsageSample]
+    ) -> None:
+        """Sets the resource usage samples that are returned for the deployment."""
+        self._metrics[(project_id, deployment_id)] = samples
+
+    def _store_deployment(
+        self, project_id: str, deployment: DeploymentT
+    ) -> DeploymentT:
+        stored_deployment = deployment.copy(deep=True)
+        stored_deployment.internal_id = id_utils.generate_short_uuid()
+        stored_deployment.status = DeploymentStatus.RUNNING
+        stored_deployment.started_at = datetime.now(timezone.utc)
+        stored_deployment.stopped_at = None
+        deployment_type = deployment.deployment_type or DeploymentType.SERVICE
+        with self._lock:
+            self._deployments[deployment_type.value][project_id][
+                stored_deployment.id  # type: ignore
+            ] = stored_deployment
+        self._notify_listeners(project_id, stored_deployment.id)  # type: ignore
+        return stored_deployment.copy()
+
+    def _find_deployment(
+        self, project_id: str, deployment_id: str
+    ) -> Optional[Deployment]:
+        for project_deployments in self._deployments.values():
+            deployment = project_deployments[project_id].get(deployment_id)
+            if deployment is not None:
+                return deployment
+        return None
+
+    def _get_deployment(
+        self, project_id: str, deployment_id: str, deployment_types: Tuple[str, ...]
+    ) -> Deployment:
+        with self._lock:
+            for deployment_type in deployment_types:
+                deployment = self._deployments[deployment_type][project_id].get(
+                    deployment_id
+                )
+                if deployment is not None:
+                    return deployment.copy()
+        raise ResourceNotFoundError(f"Deployment {deployment_id} not found.")
+
+    def _list_deployments(
+        self, project_id: str, deployment_type: DeploymentType
+    ) -> List[Any]:
+        with self._lock:
+            return [
+                deployment.copy()
+                for deployment in self._deployments[deployment_type.value][
+                    project_id
+                ].values()
+            ]
+
+    def _list_all_deployments(
+        self, deployment_type: DeploymentType
+    ) -> Dict[str, List[Any]]:
+        with self._lock:
+            return {
+                project_id: [deployment.copy() for deployment in deployments.values()]
+                for project_id, deployments in self._deployments[
+                    deployment_type.value
+                ].items()
+                if deployments
+            }
+
+    def _remove_deployments(
+        self,
+        project_id: str,
+        deployment_types: Tuple[str, ...],
+        deployment_id: Optional[str] = None,
+    ) -> List[str]:
+        removed_ids = []
+        with self._lock:
+            for deployment_type in deployment_types:
+                project_deployments = self._deployments[deployment_type][project_id]
+                for existing_id in list(project_deployments):
+                    if deployment_id is None or existing_id == deployment_id:
+                        del project_deployments[existing_id]
+                        self._logs.pop((project_id, existing_id), None)
+                        self._metrics.pop((project_id, existing_id), None)
+                        removed_ids.append(existing_id)
+        if deployment_id is not None and not removed_ids:
+            raise ResourceNotFoundError(f"Deployment {deployment_id} not found.")
+        for removed_id in removed_ids:
+            self._notify_listeners(project_id, removed_id)
+        return removed_ids
+
+    def _notify_listeners(self, project_id: str, deployment_id: str) -> None:
+        for listener in self._listeners:
+            listener(project_id, deployment_id)
+
+    def check_health(self) -> bool:
+        try:
+            self._simulate_call("check_health")
+            return True
+        except Exception:
+            return False
+
+    def add_deployment_listener(self, listener: Callable[[str, str], None]) -> None:
+        """Registers a function that is called with the project ID and deployment ID of every changed deployment."""
+        self._listeners.append(listener)
+
+    def get_resource_capacity(self) -> Optional[Tuple[float, float]]:
+        return self._resource_capacity
+
+    def get_deployment_metrics(
+        self, project_id: str, deployment_id: str, since: Optional[datetime] = None
+    ) -> List[ResourceUsageSample]:
+        self._simulate_call("get_deployment_metrics")
+        samples = self._metrics.get((project_id, deployment_id), [])
+        if since is not None:
+            samples = [sample for sample in samples if sample.timestamp > since]
+        return list(samples)
+
+    def list_services(
+        self,
+        project_id: str,
+        deployment_type: Literal[
+            DeploymentType.SERVICE, DeploymentType.EXTENSION
+        ] = DeploymentType.SERVICE,
+    ) -> List[Service]:
+        self._simulate_call("list_services")
+        return self._list_deployments(project_id, deployment_type)
+
+    def list_all_services(
+        self,
+        deployment_type: Literal[
+            DeploymentType.SERVICE, DeploymentType.EXTENSION
+        ] = DeploymentType.SERVICE,
+    ) -> Dict[str, List[Service]]:
+        self._simulate_call("list_all_services")
+        return self._list_all_deployments(deployment_type)
+
+    def deploy_service(
+        self,
+        project_id: str,
+        service: Service,
+        action_id: Optional[str] = None,
+        wait: bool = False,
+    ) -> Service:
+        self._simulate_call("deploy_service")
+        return self._store_deployment(project_id, service)
+
+    def restart_service(
+        self, project_id: str, service_id: str, wait: bool = False
+    ) -> Service:
+        self._simulate_call("restart_service")
+        with self._lock:
+            deployment = self._find_deployment(project_id, service_id)
+            if deployment is None:
+                raise ResourceNotFoundError(f"Deployment {service_id} not found.")
+            deployment.status = DeploymentStatus.RUNNING
+            deployment.started_at = datetime.now(timezone.utc)
+            deployment.stopped_at = None
+            restarted_service = deployment.copy()
+        self._notify_listeners(project_id, service_id)
+        return restarted_service  # type: ignore
+
+    def redeploy_service(
+        self, project_id: str, service: Service, wait: bool = False
+    ) -> Service:
+        self._simulate_call("redeploy_service")
+        self._get_deployment(
+            project_id,
+            service.id,  # type: ignore
+            (DeploymentType.SERVICE.value, DeploymentType.EXTENSION.value),
+        )
+        return self._store_deployment(project_id, service)
+
+    def list_deploy_service_actions(
+        self, project_id: str, service: ServiceInput
+    ) -> List[ResourceAction]:
+        return [
+            ResourceAction(
+                action_id=DEFAULT_DEPLOYMENT_ACTION_ID,
+                display_name=DEFAULT_DEPLOYMENT_ACTION_ID,
+            )
+        ]
+
+    def get_service_metadata(self, project_id: str, service_id: str) -> Service:
+        self._simulate_call("get_service_metadata")
+        return self._get_deployment(  # type: ignore
+            project_id,
+            service_id,
+            (DeploymentType.SERVICE.value, DeploymentType.EXTENSION.value),
+        )
+
+    def update_service(
+        self, project_id: str, service_id: str, service: ServiceUpdate
+    ) -> Service:
+        # Service update is only implemented on DeploymentManagerWithDB wrapper
+        raise NotImplementedError()
+
+    def update_service_access(self, project_id: str, service_id: str) -> None:
+        # Service update is only implemented on DeploymentManagerWithDB wrapper
+        raise NotImplementedError()
+
+    def delete_service(
+        self, project_id: str, service_id: str, delete_volumes: bool = False
+    ) -> None:
+        self._simulate_call("delete_service")
+        self._remove_deployments(
+            project_id,
+            (DeploymentType.SERVICE.value, DeploymentType.EXTENSION.value),
+            service_id,
+        )
+
+    def delete_services(self, project_id: str) -> None:
+        self._simulate_call("delete_services")
+        self._remove_deployments(project_id, (DeploymentType.SERVICE.value,))
+
+    def get_service_logs(
+        self,
+        project_id: str,
+        service_id: str,
+        lines: Optional[int] = None,
+        since: Optional[datetime] = None,
+        wait: bool = True,
+    ) -> str:
+        self._simulate_call("get_service_logs")
+        return self._read_logs(project_id, service_id, lines, wait)
+
+    def stream_service_logs(
+        self,
+        project_id: str,
+        service_id: str,
+        lines: Optional[int] = None,
+        since: Optional[datetime] = None,
+        follow: bool = False,
+        wait: bool = True,
+    ) -> Iterator[bytes]:
+        self._simulate_call("stream_service_logs")
+        logs = self._read_logs(project_id, service_id, lines, wait)
+        return iter([logs.encode("utf-8")] if logs else [])
+
+    def _read_logs(
+        self, project_id: str, deployment_id: str, lines: Optional[int], wait: bool
+    ) -> str:
+        with self._lock:
+            deployment = self._find_deployment(project_id, deployment_id)
+            if deployment is None:
+                raise ResourceNotFoundError(f"Deployment {deployment_id} not found.")
+            # Pending deployments are not started, so waiting returns the (empty) logs at once
+            if deployment.status == DeploymentStatus.PENDING and not wait:
+                raise ResourceNotReadyError(f"Deployment {deployment_id} is starting.")
+        logs = self._logs.get((project_id, deployment_id), "")
+        if lines is not None:
+            logs = "".join(logs.splitlines(keepends=True)[-lines:]) if lines else ""
+        return logs
+
+    def list_jobs(self, project_id: str) -> List[Job]:
+        self._simulate_call("list_jobs")
+        return self._list_deployments(project_id, DeploymentType.JOB)
+
+    def list_all_jobs(self) -> Dict[str, List[Job]]:
+        self._simulate_call("list_all_jobs")
+        return self._list_all_deployments(DeploymentType.JOB)
+
+    def deploy_job(
+        self,
+        project_id: str,
+        job: Job,
+        action_id: Optional[str] = None,
+        wait: bool = False,
+    ) -> Job:
+        self._simulate_call("deploy_job")
+        return self._store_deployment(project_id, job)
+
+    def list_deploy_job_actions(
+        self,
+        project_id: str,
+        job: JobInput,
+    ) -> List[ResourceAction]:
+        return [
+            ResourceAction(
+                action_id=DEFAULT_DEPLOYMENT_ACTION_ID,
+                display_name=DEFAULT_DEPLOYMENT_ACTION_ID,
+            )
+        ]
+
+    def get_job_metadata(self, project_id: str, job_id: str) -> Job:
+        self._simulate_call("get_job_metadata")
+        return self._get_deployment(  # type: ignore
+            project_id, job_id, (DeploymentType.JOB.value,)
+        )
+
+    def delete_job(self, project_id: str, job_id: str) -> None:
+        self._simulate_call("delete_job")
+        self._remove_deployments(project_id, (DeploymentType.JOB.value,), job_id)
+
+    def delete_jobs(self, project_id: str) -> None:
+        self._simulate_call("delete_jobs")
+        self._remove_deployments(project_id, (DeploymentType.JOB.value,))
+
+    def get_job_logs(
+        self,
+        project_id: str,
+        job_id: str,
+        lines: Optional[int] = None,
+        since: Optional[datetime] = None,
+        wait: bool = True,
+    ) -> str:
+        self._simulate_call("get_job_logs")
+        return self._read_logs(project_id, job_id, lines, wait)
+
+    def stream_job_logs(
+        self,
+        project_id: str,
+        job_id: str,
+        lines: Optional[int] = None,
+        since: Optional[datetime] = None,
+        follow: bool = False,
+        wait: bool = True,
+    ) -> Iterator[bytes]:
+        self._simulate_call("stream_job_logs")
+        logs = self._read_logs(project_id, job_id, lines, wait)
+        return iter([logs.encode("utf-8")] if logs else [])
+
+    def suggest_service_config(
+        self, project_id: str, container_image: str
+    ) -> ServiceInput:
+        raise NotImplementedError()
+
+    def list_service_actions(
+        self, project_id: str, service_id: str
+    ) -> List[ResourceAction]:
+        raise NotImplementedError()
+
+    def execute_service_action(
+        self, project_id: str, service_id: str, action_id: str
+    ) -> Any:
+        raise NotImplementedError()
+
+    def suggest_job_config(self, project_id: str, container_image: str) -> JobInput:
+        raise NotImplementedError()
+
+    def list_job_actions(self, project_id: str, job_id: str) -> List[ResourceAction]:
+        raise NotImplementedError()
+
+    def execute_job_action(self, project_id: str, job_id: str, action_id: str) -> Any:
+        raise NotImplementedError()
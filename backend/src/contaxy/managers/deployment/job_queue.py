@@ -0,0 +1,418 @@
+"""Queue of jobs that are started once the quotas for running jobs and resources allow it."""
+
+from collections import deque
+from datetime import datetime, timezone
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from loguru import logger
+from pydantic import BaseModel
+
+from contaxy import config
+from contaxy.config import settings
+from contaxy.operations import JsonDocumentOperations
+from contaxy.schema import Job
+from contaxy.schema.deployment import JobPriority
+from contaxy.schema.exceptions import (
+    ResourceAlreadyExistsError,
+    ResourceNotFoundError,
+    ResourceUpdateFailedError,
+)
+
+JOB_QUEUE_COLLECTION = "job_queue"
+JOB_QUEUE_USAGE_COLLECTION = "job_queue_usage"
+_USAGE_KEY = "usage"
+# Number of attempts to update the shared usage before the admission or dispatch gives up
+_USAGE_UPDATE_ATTEMPTS = 5
+# Order in which the priority classes are dispatched
+_PRIORITY_ORDER = [JobPriority.HIGH, JobPriority.NORMAL, JobPriority.LOW]
+
+
+def is_job_queue_enabled() -> bool:
+    return (
+        settings.JOB_QUEUE_MAX_RUNNING_JOBS > 0
+        or settings.JOB_QUEUE_MAX_RUNNING_JOBS_PER_PROJECT > 0
+        or settings.JOB_QUEUE_CHECK_RESOURCES
+    )
+
+
+class QueuedJob(BaseModel):
+    """Entry of a queued job that is shared by all app instances via the JSON DB."""
+
+    project_id: str
+    job_id: str
+    priority: JobPriority = JobPriority.NORMAL
+    queued_at: datetime
+    action_id: Optional[str] = None
+    min_cpus: float = 0
+    min_memory: float = 0
+    # Number of failed attempts to start the job
+    start_attempts: int = 0
+
+    @property
+    def key(self) -> str:
+        return get_queue_key(self.project_id, self.job_id)
+
+    @classmethod
+    def from_job(
+        cls, project_id: str, job: Job, action_id: Optional[str] = None
+    ) -> "QueuedJob":
+        return cls(
+            project_id=project_id,
+            job_id=job.id,
+            priority=job.priority,
+            queued_at=datetime.now(timezone.utc),
+            action_id=action_id,
+            min_cpus=job.compute.min_cpus or 0,
+            min_memory=job.compute.min_memory or 0,
+        )
+
+
+def get_queue_key(project_id: str, job_id: str) -> str:
+    return f"{project_id}:{job_id}"
+
+
+class ResourceUsage(BaseModel):
+    """Running jobs and minimal resources of the running deployments that are checked against the quotas.
+
+    The usage is shared by all app instances via the JSON DB.
+    """
+
+    running_jobs: int = 0
+    running_jobs_per_project: Dict[str, int] = {}
+    cpus: float = 0
+    memory: float = 0
+    # Number of CPUs and memory in Megabyte, `None` if the resources are not checked
+    capacity: Optional[Tuple[float, float]] = None
+    # Time at which the usage was loaded from the deployment platform
+    refreshed_at: Optional[datetime] = None
+
+    def add(self, project_id: str, cpus: float, memory: float, is_job: bool) -> None:
+        self.cpus += cpus
+        self.memory += memory
+        if is_job:
+            self.running_jobs += 1
+            self.running_jobs_per_project[project_id] = (
+                self.running_jobs_per_project.get(project_id, 0) + 1
+            )
+
+    def allows_project(self, project_id: str) -> bool:
+        """Returns `True` if the project has not reached its quota for running jobs."""
+        max_jobs = settings.JOB_QUEUE_MAX_RUNNING_JOBS_PER_PROJECT
+        return max_jobs <= 0 or self.running_jobs_per_project.get(project_id, 0) < (
+            max_jobs
+        )
+
+    def allows_cluster(self, cpus: float, memory: float) -> bool:
+        """Returns `True` if the global quota for running jobs and the capacity allow another job."""
+        max_jobs = settings.JOB_QUEUE_MAX_RUNNING_JOBS
+        if max_jobs > 0 and self.running_jobs >= max_jobs:
+            return False
+        if self.capacity is None:
+            return True
+        max_cpus, max_memory = self.capacity
+        # A job that exceeds the capacity on its own is started on an idle platform
+        # instead of blocking the queue forever
+        if self.cpus == 0 and self.memory == 0:
+            return True
+        return self.cpus + cpus <= max_cpus and self.memory + memory <= max_memory
+
+    def allows(self, queued_job: QueuedJob) -> bool:
+        return self.allows_project(queued_job.project_id) and self.allows_cluster(
+            queued_job.min_cpus, queued_job.min_memory
+        )
+
+
+def get_dispatch_order(queued_jobs: List[QueuedJob]) -> List[QueuedJob]:
+    """Sorts the queued jobs in the order in which they are started.
+
+    Jobs with a higher priority are started first. Within a priority class, the projects take
+    turns (starting with the project that waits the longest), so that a project with many
+    queued jobs cannot starve the other projects. The jobs of a project are started in FIFO order.
+    """
+    dispatch_order: List[QueuedJob] = []
+    for priority in _PRIORITY_ORDER:
+        project_queues: Dict[str, Deque[QueuedJob]] = {}
+        for queued_job in sorted(
+            (
+                queued_job
+                for queued_job in queued_jobs
+                if queued_job.priority == priority
+            ),
+            key=lambda queued_job: queued_job.queued_at,
+        ):
+            project_queues.setdefault(queued_job.project_id, deque()).append(queued_job)
+        while project_queues:
+            for project_id in list(project_queues):
+                project_queue = project_queues[project_id]
+                dispatch_order.append(project_queue.popleft())
+                if not project_queue:
+                    del project_queues[project_id]
+    return dispatch_order
+
+
+class JobQueue:
+    """Queue of jobs that could not be started due to the quotas of the job queue.
+
+    The queue is stored in the JSON DB, so that it is shared by all app instances and survives
+    restarts. Queued jobs are started by the `dispatch_queued_jobs` background job.
+    """
+
+    def __init__(self, json_db_manager: JsonDocumentOperations):
+        self._json_db_manager = json_db_manager
+
+    def list_queued_jobs(self) -> List[QueuedJob]:
+        """Returns all queued jobs in dispatch order."""
+        queue_docs = self._json_db_manager.list_json_documents(
+            config.SYSTEM_INTERNAL_PROJECT, JOB_QUEUE_COLLECTION
+        )
+        return get_dispatch_order(
+            [QueuedJob.parse_raw(queue_doc.json_value) for queue_doc in queue_docs]
+        )
+
+    def get_queue_positions(self) -> Dict[str, int]:
+        """Returns the position (starting at 1) of all queued jobs by their queue key."""
+        return {
+            queued_job.key: position
+            for position, queued_job in enumerate(self.list_queued_jobs(), start=1)
+        }
+
+    def enqueue(self, queued_jobs: List[QueuedJob]) -> None:
+        if not queued_jobs:
+            return
+        self._json_db_manager.create_json_documents(
+            config.SYSTEM_INTERNAL_PROJECT,
+            JOB_QUEUE_COLLECTION,
+            {queued_job.key: queued_job.json() for queued_job in queued_jobs},
+        )
+
+    def remove(self, project_id: str, job_id: str) -> bool:
+        """Removes the job from the queue.
+
+        Returns:
+            bool: `True` if the job was queued.
+        """
+        try:
+            self._json_db_manager.delete_json_document(
+                config.SYSTEM_INTERNAL_PROJECT,
+                JOB_QUEUE_COLLECTION,
+                get_queue_key(project_id, job_id),
+            )
+            return True
+        except ResourceNotFoundError:
+            return False
+
+    def admit(
+        self,
+        get_usage: Callable[[], ResourceUsage],
+        queued_jobs: List[QueuedJob],
+    ) -> List[bool]:
+        """Checks which of the new jobs can be started immediately.
+
+        A new job is not allowed to overtake queued jobs with the same or a higher priority,
+        except for jobs of other projects that wait for the quota of their project.
+
+        The jobs are admitted against the usage shared via the JSON DB, which is only loaded
+        from the deployment platform if it is older than `JOB_QUEUE_USAGE_MAX_AGE`. The admitted
+        jobs are added to the shared usage with a conditional write, so the admissions and
+        dispatches of all app instances are serialized. If the usage cannot be updated due to
+        concurrent admissions, all jobs are queued and started by the dispatcher.
+
+        Args:
+            get_usage: Loads the current usage from the deployment platform.
+            queued_jobs: The new jobs.
+
+        Returns:
+            List[bool]: `True` for every job that can be started, `False` if it needs to be queued.
+        """
+        for _ in range(_USAGE_UPDATE_ATTEMPTS):
+            usage, version = self._load_usage()
+            is_refreshed = (
+                usage is None
+                or usage.refreshed_at is None
+                or usage.refreshed_at + settings.JOB_QUEUE_USAGE_MAX_AGE
+                < datetime.now(timezone.utc)
+            )
+            if is_refreshed:
+                usage = self._refresh_usage(get_usage)
+            assert usage is not None
+            admitted = self._admit(usage, queued_jobs)
+            if not any(admitted):
+                if is_refreshed:
+                    # Store the refreshed usage for the following admissions
+                    self._save_usage(usage, version)
+                return admitted
+            if self._save_usage(usage, version):
+                return admitted
+        logger.warning(
+            "Could not update the job queue usage due to concurrent admissions, the jobs are queued."
+        )
+        return [False] * len(queued_jobs)
+
+    def dispatch(
+        self,
+        get_usage: Callable[[], ResourceUsage],
+        start_job: Callable[[QueuedJob], None],
+        fail_job: Callable[[QueuedJob], None],
+    ) -> List[QueuedJob]:
+        """Starts the queued jobs in dispatch order as long as the quotas allow it.
+
+        A job that exceeds the quota of its project only blocks the later jobs of the project.
+        A job that exceeds the global quota or the capacity blocks all later jobs, so that
+        smaller jobs with a lower priority cannot starve it.
+
+        The usage is always loaded from the deployment platform, so that finished jobs release
+        their quotas. Like the admission, the dispatch adds the started jobs to the shared usage
+        with a conditional write before the jobs are started.
+
+        A job that could not be started is queued again with its original queue time
+        until it failed `JOB_QUEUE_MAX_START_ATTEMPTS` times. Then it is marked as failed.
+
+        Args:
+            get_usage: Loads the current usage from the deployment platform. Only called if jobs are queued.
+            start_job: Starts the queued job on the deployment platform.
+            fail_job: Marks the queued job as failed.
+
+        Returns:
+            List[QueuedJob]: The jobs that were removed from the queue and started.
+        """
+        queued_jobs = self.list_queued_jobs()
+        if not queued_jobs:
+            return []
+        for _ in range(_USAGE_UPDATE_ATTEMPTS):
+            _, version = self._load_usage()
+            usage = self._refresh_usage(get_usage)
+            planned_jobs = self._plan_dispatch(usage, queued_jobs)
+            if self._save_usage(usage, version):
+                break
+        else:
+            logger.warning(
+                "Could not update the job queue usage due to concurrent admissions, the dispatch is skipped."
+            )
+            return []
+
+        dispatched_jobs: List[QueuedJob] = []
+        for queued_job in planned_jobs:
+            if not self.remove(queued_job.project_id, queued_job.job_id):
+                # The job was deleted in the meantime
+                continue
+            try:
+                start_job(queued_job)
+            except ResourceNotFoundError:
+                # The job was deleted in the meantime
+                continue
+            except Exception:
+                logger.exception(
+                    f"Could not start queued job {queued_job.job_id} of project {queued_job.project_id}."
+                )
+                self._handle_start_failure(queued_job, fail_job)
+                continue
+            dispatched_jobs.append(queued_job)
+        return dispatched_jobs
+
+    def _admit(self, usage: ResourceUsage, queued_jobs: List[QueuedJob]) -> List[bool]:
+        """Checks which of the new jobs can be started and adds the admitted jobs to the usage."""
+        project_ids = {queued_job.project_id for queued_job in queued_jobs}
+        waiting_priorities = {
+            queued_job.priority
+            for queued_job in self.list_queued_jobs()
+            if queued_job.project_id in project_ids
+            or usage.allows_project(queued_job.project_id)
+        }
+        admitted = []
+        for queued_job in queued_jobs:
+            if any(
+                _PRIORITY_ORDER.index(priority)
+                <= _PRIORITY_ORDER.index(queued_job.priority)
+                for priority in waiting_priorities
+            ) or not usage.allows(queued_job):
+                waiting_priorities.add(queued_job.priority)
+                admitted.append(False)
+                continue
+            usage.add(
+                queued_job.project_id,
+                queued_job.min_cpus,
+                queued_job.min_memory,
+                is_job=True,
+            )
+            admitted.append(True)
+        return admitted
+
+    def _plan_dispatch(
+        self, usage: ResourceUsage, queued_jobs: List[QueuedJob]
+    ) -> List[QueuedJob]:
+        """Selects the queued jobs that are started and adds them to the usage."""
+        planned_jobs: List[QueuedJob] = []
+        blocked_projects = set()
+        for queued_job in queued_jobs:
+            if queued_job.project_id in blocked_projects:
+                continue
+            if not usage.allows_project(queued_job.project_id):
+                blocked_projects.add(queued_job.project_id)
+                continue
+            if not usage.allows_cluster(queued_job.min_cpus, queued_job.min_memory):
+                break
+            usage.add(
+                queued_job.project_id,
+                queued_job.min_cpus,
+                queued_job.min_memory,
+                is_job=True,
+            )
+            planned_jobs.append(queued_job)
+        return planned_jobs
+
+    def _handle_start_failure(
+        self, queued_job: QueuedJob, fail_job: Callable[[QueuedJob], None]
+    ) -> None:
+        queued_job.start_attempts += 1
+        if queued_job.start_attempts < settings.JOB_QUEUE_MAX_START_ATTEMPTS:
+            # The original queue time is kept, so the job keeps its position
+            self.enqueue([queued_job])
+            return
+        try:
+            fail_job(queued_job)
+        except Exception:
+            logger.exception(
+                f"Could not mark queued job {queued_job.job_id} of project {queued_job.project_id} as failed."
+            )
+
+    def _load_usage(self) -> Tuple[Optional[ResourceUsage], Optional[int]]:
+        """Returns the shared usage and the version of its document, `None` if no usage is stored."""
+        try:
+            usage_doc = self._json_db_manager.get_json_document(
+                config.SYSTEM_INTERNAL_PROJECT, JOB_QUEUE_USAGE_COLLECTION, _USAGE_KEY
+            )
+        except ResourceNotFoundError:
+            return None, None
+        return ResourceUsage.parse_raw(usage_doc.json_value), usage_doc.version
+
+    def _refresh_usage(self, get_usage: Callable[[], ResourceUsage]) -> ResourceUsage:
+        usage = get_usage()
+        usage.refreshed_at = datetime.now(timezone.utc)
+        return usage
+
+    def _save_usage(self, usage: ResourceUsage, version: Optional[int]) -> bool:
+        """Stores the shared usage if its document still has the given version.
+
+        Returns:
+            bool: `False` if the usage was updated by another admission or dispatch in the meantime.
+        """
+        try:
+            if version is None:
+                self._json_db_manager.create_json_document(
+                    config.SYSTEM_INTERNAL_PROJECT,
+                    JOB_QUEUE_USAGE_COLLECTION,
+                    _USAGE_KEY,
+                    usage.json(),
+                    upsert=False,
+                )
+            else:
+                self._json_db_manager.create_json_document(
+                    config.SYSTEM_INTERNAL_PROJECT,
+                    JOB_QUEUE_USAGE_COLLECTION,
+                    _USAGE_KEY,
+                    usage.json(),
+                    expected_version=version,
+                )
+        except (ResourceAlreadyExistsError, ResourceUpdateFailedError):
+            return False
+        return True
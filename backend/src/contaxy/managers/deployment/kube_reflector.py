@@ -0,0 +1,234 @@
+"""In-memory store of Kubernetes resources that is kept in sync via the watch API.
+
+The implementation follows the reflector of JupyterHub KubeSpawner (see https://github.com/jupyterhub/kubespawner/blob/941585f0f7acb0f366c9979b6274b7f47356a630/kubespawner/reflector.py)
+but runs the watch loop in a background thread instead of an async task.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from kubernetes import watch
+from kubernetes.client.rest import ApiException
+from loguru import logger
+
+HTTP_STATUS_GONE = 410
+
+
+def _is_older(resource: Any, other_resource: Any) -> bool:
+    """Returns `True` if the resource version of `resource` is older than the one of `other_resource`.
+
+    Resource versions are treated as opaque if they are not integers (as used by etcd).
+    """
+    try:
+        return int(resource.metadata.resource_version) < int(
+            other_resource.metadata.resource_version
+        )
+    except (TypeError, ValueError):
+        return False
+
+
+class ResourceReflector:
+    """Keeps an in-memory copy of Kubernetes resources in sync via the watch API.
+
+    The reflector initially lists all resources matching the label selector and watches
+    for changes starting from the resource version of this list. If a watch times out,
+    it is resumed from the last seen resource version. If this resource version is too old
+    to be resumed (HTTP 410 Gone), all resources are listed again.
+
+    While the reflector is not ready (initial list pending or the watch failed), readers
+    should fall back to querying the Kubernetes API directly.
+    """
+
+    def __init__(
+        self,
+        list_method: Callable[..., Any],
+        kube_namespace: str,
+        label_selector: Optional[str] = None,
+        watch_timeout: int = 300,
+        request_timeout: int = 60,
+        error_backoff: float = 1.0,
+    ):
+        """Initializes the reflector. The watch is started via `start()`.
+
+        Args:
+            list_method: The namespaced list method of the Kubernetes client, e.g. `AppsV1Api().list_namespaced_deployment`.
+            kube_namespace: The Kubernetes namespace to watch.
+            label_selector: Only resources matching this selector are stored.
+            watch_timeout: Seconds after which the Kubernetes API server closes a watch, which is resumed afterwards.
+            request_timeout: Timeout in seconds of the list requests.
+            error_backoff: Seconds to wait before listing again after the watch failed.
+        """
+        self._list_method = list_method
+        self._kube_namespace = kube_namespace
+        self._label_selector = label_selector
+        self._watch_timeout = watch_timeout
+        self._request_timeout = request_timeout
+        self._error_backoff = error_backoff
+
+        self._resources: Dict[str, Any] = {}
+        self._resources_lock = threading.Lock()
+        self._ready = threading.Event()
+        self._stopped = threading.Event()
+        self._watch: Optional[watch.Watch] = None
+        self._thread: Optional[threading.Thread] = None
+        # Resource version to resume the watch from, None if a relist is required
+        self.resource_version: Optional[str] = None
+        self._listeners: List[Callable[[Any], None]] = []
+
+    @property
+    def name(self) -> str:
+        return f"{self._list_method.__name__} ({self._kube_namespace})"
+
+    @property
+    def is_ready(self) -> bool:
+        """Returns `True` if the store is in sync with the Kubernetes API."""
+        return self._ready.is_set()
+
+    def start(self) -> None:
+        """Starts the list and watch loop in a background thread."""
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name=f"kube-reflector-{self.name}", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops the watch loop. The store is not updated anymore afterwards."""
+        self._stopped.set()
+        self._ready.clear()
+        if self._thread is None:
+            return
+        deadline = time.time() + self._request_timeout
+        while self._thread.is_alive() and time.time() < deadline:
+            # Repeat since the watch might have been (re-)started in the meantime
+            if self._watch is not None:
+                self._watch.stop()
+            self._thread.join(timeout=0.1)
+        self._thread = None
+
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until the initial list is loaded.
+
+        Returns:
+            bool: `True` if the reflector is ready, `False` if the timeout expired.
+        """
+        return self._ready.wait(timeout)
+
+    def add_listener(self, listener: Callable[[Any], None]) -> None:
+        """Registers a function that is called with every resource changed by a watch event."""
+        with self._resources_lock:
+            self._listeners.append(listener)
+
+    def get(self, name: str) -> Optional[Any]:
+        """Returns the resource with the given name or `None` if it is not in the store."""
+        with self._resources_lock:
+            return self._resources.get(name)
+
+    def list(self, label_pairs: List[Tuple[str, str]] = []) -> List[Any]:
+        """Returns all resources in the store that have all the given labels."""
+        with self._resources_lock:
+            resources = list(self._resources.values())
+        return [
+            resource
+            for resource in resources
+            if all(
+                (resource.metadata.labels or {}).get(key) == value
+                for key, value in label_pairs
+            )
+        ]
+
+    def update(self, resource: Any) -> None:
+        """Stores a resource returned by a write request before its watch event is received.
+
+        This makes the resource visible for following reads of the same process immediately.
+        The update is skipped if the store already contains a newer version of the resource,
+        e.g. because a watch event was received before the write request returned.
+        """
+        with self._resources_lock:
+            stored_resource = self._resources.get(resource.metadata.name)
+            if stored_resource is not None and _is_older(resource, stored_resource):
+                return
+            self._resources[resource.metadata.name] = resource
+
+    def remove(self, name: str) -> None:
+        """Removes a deleted resource before its watch event is received."""
+        with self._resources_lock:
+            self._resources.pop(name, None)
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                if self.resource_version is None:
+                    self._list_and_update()
+                    self._ready.set()
+                self._watch_and_update()
+            except ApiException as e:
+                if e.status == HTTP_STATUS_GONE:
+                    # The resource version is too old, the watch cannot be resumed
+                    logger.debug(f"Watch of {self.name} expired. Listing again.")
+                    self.resource_version = None
+                    continue
+                self._handle_error(e)
+            except Exception as e:
+                self._handle_error(e)
+
+    def _handle_error(self, error: Exception) -> None:
+        if self._stopped.is_set():
+            return
+        logger.warning(
+            f"Error while watching {self.name}. Listing again in {self._error_backoff} seconds: {error}"
+        )
+        # The store might miss changes until everything is listed again
+        self._ready.clear()
+        self.resource_version = None
+        self._stopped.wait(self._error_backoff)
+
+    def _list_and_update(self) -> None:
+        resource_list = self._list_method(
+            namespace=self._kube_namespace,
+            label_selector=self._label_selector,
+            _request_timeout=self._request_timeout,
+        )
+        with self._resources_lock:
+            self._resources = {
+                resource.metadata.name: resource for resource in resource_list.items
+            }
+        self.resource_version = resource_list.metadata.resource_version
+
+    def _watch_and_update(self) -> None:
+        """Applies watch events to the store until the watch times out or is stopped."""
+        self._watch = watch.Watch()
+        for event in self._watch.stream(
+            self._list_method,
+            namespace=self._kube_namespace,
+            label_selector=self._label_selector,
+            resource_version=self.resource_version,
+            allow_watch_bookmarks=True,
+            timeout_seconds=self._watch_timeout,
+            # Detect stale connections if the server does not close the watch in time
+            _request_timeout=self._watch_timeout + self._request_timeout,
+        ):
+            if self._stopped.is_set():
+                break
+            event_type = event["type"]
+            resource = event["object"]
+            if event_type in ["ADDED", "MODIFIED"]:
+                self.update(resource)
+                self._notify_listeners(resource)
+            elif event_type == "DELETED":
+                self.remove(resource.metadata.name)
+                self._notify_listeners(resource)
+            # Bookmark events only update the resource version
+            self.resource_version = self._watch.resource_version
+
+    def _notify_listeners(self, resource: Any) -> None:
+        with self._resources_lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(resource)
+            except Exception as e:
+                logger.warning(f"Error in listener of {self.name}: {e}")
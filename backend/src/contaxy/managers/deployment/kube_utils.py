@@ -1,12 +1,15 @@
 import string
 import time
-from typing import Any, Dict, List, Optional, Tuple, Union
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 from kubernetes import client as kube_client
+from kubernetes import watch
 from kubernetes.client.models import (
     V1Container,
     V1Deployment,
     V1DeploymentSpec,
+    V1DeploymentStrategy,
     V1EnvVar,
     V1Job,
     V1LabelSelector,
@@ -30,6 +33,7 @@ from kubernetes.client.models import (
     V1VolumeMount,
 )
 from kubernetes.client.rest import ApiException
+from loguru import logger
 
 from contaxy.config import settings
 from contaxy.managers.deployment.utils import (
@@ -56,6 +60,13 @@ def get_label_selector(label_pairs: List[Tuple[str, str]]) -> str:
     return ",".join([get_label_string(pair[0], pair[1]) for pair in label_pairs])
 
 
+def get_since_seconds(since: Optional[datetime]) -> Optional[int]:
+    """Converts a timestamp into the relative seconds expected by the Kubernetes logs API."""
+    if since is None:
+        return None
+    return int((datetime.now(timezone.utc) - since).total_seconds()) + 1
+
+
 def get_deployment_selection_labels(
     project_id: str, deployment_type: DeploymentType = DeploymentType.SERVICE
 ) -> str:
@@ -75,6 +86,15 @@ def get_deployment_selection_labels(
     )
 
 
+def get_pod_selection_labels(project_id: str, service_id: str) -> List[Tuple[str, str]]:
+    """Return a list of labels identifying the pods of a service or job."""
+    return [
+        (Labels.NAMESPACE.value, settings.SYSTEM_NAMESPACE),
+        (Labels.PROJECT_NAME.value, project_id),
+        (Labels.DEPLOYMENT_ID.value, service_id),
+    ]
+
+
 # TODO: Return list of pods? As there can be multiple pods belonging to the same job / deployment (e.g. which were created / failed but do not run anymore)
 def get_pod(
     project_id: str,
@@ -96,11 +116,7 @@ def get_pod(
         Optional[V1Pod]: Returns the pod matching the selection criteria. In case of replicas, multiple pods can match the criteria; in this case, the first pod is selected arbitrarily.
     """
     label_selector = get_label_selector(
-        [
-            (Labels.NAMESPACE.value, settings.SYSTEM_NAMESPACE),
-            (Labels.PROJECT_NAME.value, project_id),
-            (Labels.DEPLOYMENT_ID.value, service_id),
-        ]
+        get_pod_selection_labels(project_id=project_id, service_id=service_id)
     )
 
     pods: V1PodList = core_api.list_namespaced_pod(
@@ -115,6 +131,73 @@ def get_pod(
     return pods.items[0]
 
 
+# The logs of a pod can only be read after its containers were started
+POD_PENDING_PHASES = ["Pending", "ContainerCreating"]
+
+
+def is_pod_pending(pod: V1Pod) -> bool:
+    """Returns `True` if the containers of the pod are not started yet."""
+    return pod.status is not None and pod.status.phase in POD_PENDING_PHASES
+
+
+def wait_for_pod_start(
+    pod: V1Pod,
+    kube_namespace: str,
+    core_api: kube_client.CoreV1Api,
+    timeout: int = 60,
+) -> V1Pod:
+    """Waits until the containers of the pod are started, e.g. to read its logs.
+
+    Instead of polling, only the given pod is watched via a field selector, so that the
+    function returns as soon as the phase of the pod changes.
+
+    Raises:
+        ServerBaseError: If the pod is not started within the timeout or was deleted.
+
+    Returns:
+        V1Pod: The started pod.
+    """
+    deadline = time.time() + timeout
+    pod_name = pod.metadata.name
+    field_selector = f"metadata.name={pod_name}"
+    resource_version = pod.metadata.resource_version
+    while is_pod_pending(pod):
+        remaining_seconds = int(deadline - time.time())
+        if remaining_seconds <= 0:
+            raise ServerBaseError(f"Waiting timeout for the start of pod {pod_name}")
+        pod_watch = watch.Watch()
+        try:
+            for event in pod_watch.stream(
+                core_api.list_namespaced_pod,
+                namespace=kube_namespace,
+                field_selector=field_selector,
+                resource_version=resource_version,
+                timeout_seconds=remaining_seconds,
+            ):
+                if event["type"] == "DELETED":
+                    raise ServerBaseError(f"Pod {pod_name} was deleted")
+                if event["type"] == "ERROR":
+                    continue
+                pod = event["object"]
+                resource_version = pod.metadata.resource_version
+                if not is_pod_pending(pod):
+                    break
+        except ApiException as e:
+            if e.status != 410:
+                raise
+            # The resource version expired, the pod is read again
+            pods: V1PodList = core_api.list_namespaced_pod(
+                namespace=kube_namespace, field_selector=field_selector
+            )
+            if not pods.items:
+                raise ServerBaseError(f"Pod {pod_name} was deleted")
+            pod = pods.items[0]
+            resource_version = pods.metadata.resource_version
+        finally:
+            pod_watch.stop()
+    return pod
+
+
 def create_pvc(
     pvc: Optional[V1PersistentVolumeClaim],
     kube_namespace: str,
@@ -139,12 +222,12 @@ def create_service(
     service_config: Optional[V1Service],
     kube_namespace: str,
     core_api: kube_client.CoreV1Api,
-) -> None:
+) -> Optional[V1Service]:
     if service_config is None:
-        return
+        return None
 
     try:
-        core_api.create_namespaced_service(
+        return core_api.create_namespaced_service(
             namespace=kube_namespace, body=service_config
         )
     except ApiException as e:
@@ -352,6 +435,9 @@ def build_kube_deployment_config(
             ),
             # TODO: Make min ready seconds configurable? (see https://kubernetes.io/docs/concepts/workloads/controllers/deployment/#min-ready-seconds)
             min_ready_seconds=5,
+            # A ReadWriteOnce volume cannot be mounted by the old and new pod of a rolling update
+            # on different nodes, therefore the old pod is stopped first
+            strategy=V1DeploymentStrategy(type="Recreate") if pvc is not None else None,
         ),
     )
 
@@ -416,75 +502,180 @@ def check_or_create_project_network_policy(
         )
 
 
+def is_rolled_out(deployment: V1Deployment) -> bool:
+    """Returns `True` if all replicas of the deployment run the latest pod template and are available."""
+    status = deployment.status
+    if status is None or deployment.spec is None:
+        return False
+    # The replicas are defaulted to 1 by the API server
+    replicas = 1 if deployment.spec.replicas is None else deployment.spec.replicas
+    return (
+        (status.observed_generation or 0) >= (deployment.metadata.generation or 0)
+        and (status.updated_replicas or 0) == replicas
+        and (status.replicas or 0) == replicas
+        and (status.available_replicas or 0) == replicas
+    )
+
+
 def wait_for_deployment(
     deployment_name: str,
     kube_namespace: str,
     apps_api: kube_client.AppsV1Api,
     timeout: int = 180,
 ) -> None:
-    start = time.time()
-    while time.time() - start < timeout:
-        time.sleep(5)
-        response = apps_api.read_namespaced_deployment_status(
-            namespace=kube_namespace, name=deployment_name
+    """Waits until the deployment is rolled out, e.g. after it was created, updated, or restarted.
+
+    Instead of polling, the deployment is watched, so that the function returns as soon as
+    the Kubernetes controller reports the rollout as complete.
+
+    Raises:
+        ServerBaseError: If the deployment is not rolled out within the timeout or was deleted.
+    """
+    deadline = time.time() + timeout
+    field_selector = f"metadata.name={deployment_name}"
+    while True:
+        deployments = apps_api.list_namespaced_deployment(
+            namespace=kube_namespace, field_selector=field_selector
         )
-        s = response.status
-        # TODO: Check status of pod created by deployment. Is it crashing? Or is it pulling an image?
-        if (
-            s.updated_replicas == response.spec.replicas
-            and s.replicas == response.spec.replicas
-            and s.available_replicas == response.spec.replicas
-            and s.observed_generation >= response.metadata.generation
-        ):
+        if not deployments.items:
+            raise ServerBaseError(f"Deployment {deployment_name} was deleted")
+        if is_rolled_out(deployments.items[0]):
             return
-        else:
-            # print(
-            #     f"[updated_replicas:{s.updated_replicas},replicas:{s.replicas}"
-            #     ",available_replicas:{s.available_replicas},observed_generation:{s.observed_generation}] waiting..."
-            # )
-            pass
+        remaining_seconds = int(deadline - time.time())
+        if remaining_seconds <= 0:
+            break
+        deployment_watch = watch.Watch()
+        try:
+            for event in deployment_watch.stream(
+                apps_api.list_namespaced_deployment,
+                namespace=kube_namespace,
+                field_selector=field_selector,
+                resource_version=deployments.metadata.resource_version,
+                timeout_seconds=remaining_seconds,
+            ):
+                if event["type"] == "DELETED":
+                    raise ServerBaseError(f"Deployment {deployment_name} was deleted")
+                if event["type"] != "ERROR" and is_rolled_out(event["object"]):
+                    return
+        except ApiException as e:
+            if e.status != 410:
+                raise
+            # The resource version expired, the deployment is read again
+        finally:
+            deployment_watch.stop()
+        if time.time() >= deadline:
+            break
 
     raise ServerBaseError(f"Waiting timeout for deployment {deployment_name}")
 
 
+def is_job_started(job: V1Job) -> bool:
+    """Returns `True` if a pod of the job is running or the job already succeeded."""
+    status = job.status
+    return status is not None and bool(status.active or status.succeeded)
+
+
 def wait_for_job(
     job_name: str,
     kube_namespace: str,
     batch_api: kube_client.BatchV1Api,
     timeout: int = 60,
 ) -> None:
-    start = time.time()
-    while time.time() - start < timeout:
-        response = batch_api.read_namespaced_job_status(
-            namespace=kube_namespace, name=job_name
+    """Waits until a pod of the job is running or the job succeeded.
+
+    Instead of polling, the job is watched, so that the function returns as soon as
+    the Kubernetes controller reports the job as started.
+
+    Raises:
+        ServerBaseError: If the job is not started within the timeout or was deleted.
+    """
+    deadline = time.time() + timeout
+    field_selector = f"metadata.name={job_name}"
+    while True:
+        jobs = batch_api.list_namespaced_job(
+            namespace=kube_namespace, field_selector=field_selector
         )
-        s = response.status
-        if (s.active and s.active > 0) or (s.succeeded and s.succeeded > 0):
+        if not jobs.items:
+            raise ServerBaseError(f"Job {job_name} was deleted")
+        if is_job_started(jobs.items[0]):
             return
+        remaining_seconds = int(deadline - time.time())
+        if remaining_seconds <= 0:
+            break
+        job_watch = watch.Watch()
+        try:
+            for event in job_watch.stream(
+                batch_api.list_namespaced_job,
+                namespace=kube_namespace,
+                field_selector=field_selector,
+                resource_version=jobs.metadata.resource_version,
+                timeout_seconds=remaining_seconds,
+            ):
+                if event["type"] == "DELETED":
+                    raise ServerBaseError(f"Job {job_name} was deleted")
+                if event["type"] != "ERROR" and is_job_started(event["object"]):
+                    return
+        except ApiException as e:
+            if e.status != 410:
+                raise
+            # The resource version expired, the job is read again
+        finally:
+            job_watch.stop()
+        if time.time() >= deadline:
+            break
 
-    raise RuntimeError(f"Waiting timeout for job {job_name}")
+    raise ServerBaseError(f"Waiting timeout for job {job_name}")
 
 
 def wait_for_deletion(
     api: Union[kube_client.AppsV1Api, kube_client.BatchV1Api],
     kube_namespace: str,
     deployment_id: str,
+    timeout: int = 60,
 ) -> None:
-    start = time.time()
-    timeout = 60
-    while time.time() - start < timeout:
+    """Waits until the deployment or job is deleted, e.g. after the pods are removed by a foreground deletion.
+
+    Instead of polling, the resource is watched, so that the function returns as soon as
+    the deletion is reported. If the resource still exists after the timeout, a warning is logged.
+    """
+    list_resources: Callable[..., Any] = (
+        api.list_namespaced_deployment
+        if isinstance(api, kube_client.AppsV1Api)
+        else api.list_namespaced_job
+    )
+    deadline = time.time() + timeout
+    field_selector = f"metadata.name={deployment_id}"
+    while True:
+        resources = list_resources(
+            namespace=kube_namespace, field_selector=field_selector
+        )
+        if not resources.items:
+            return
+        remaining_seconds = int(deadline - time.time())
+        if remaining_seconds <= 0:
+            break
+        deletion_watch = watch.Watch()
         try:
-            if type(api) == kube_client.AppsV1Api:
-                api.read_namespaced_deployment_status(
-                    namespace=kube_namespace, name=deployment_id
-                )
-            elif type(api) == kube_client.BatchV1Api:
-                api.read_namespaced_job(name=deployment_id, namespace=kube_namespace)
-            time.sleep(2)
-        except ApiException:
-            # Deployment is deleted
+            for event in deletion_watch.stream(
+                list_resources,
+                namespace=kube_namespace,
+                field_selector=field_selector,
+                resource_version=resources.metadata.resource_version,
+                timeout_seconds=remaining_seconds,
+            ):
+                if event["type"] == "DELETED":
+                    return
+        except ApiException as e:
+            if e.status != 410:
+                raise
+            # The resource version expired, the resource is read again
+        finally:
+            deletion_watch.stop()
+        if time.time() >= deadline:
             break
 
+    logger.warning(f"{deployment_id} was not deleted within {timeout} seconds.")
+
 
 def map_deployment(deployment: Union[V1Deployment, V1Job]) -> Dict[str, Any]:
     # We assume a 1:1 mapping between deployment/pod & containers
@@ -1,22 +1,18 @@
+import functools
 import os
-import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Any, List, Literal, Optional
+from typing import Any, Callable, Dict, Iterator, List, Literal, Optional, Tuple
 
 from kubernetes import client as kube_client
 from kubernetes import config as kube_config
-from kubernetes.client.models import (
-    V1Deployment,
-    V1DeploymentList,
-    V1Job,
-    V1JobList,
-    V1JobSpec,
-    V1ServiceList,
-)
+from kubernetes.client.models import V1Deployment, V1Job, V1JobSpec, V1Pod
 from kubernetes.client.rest import ApiException
 from loguru import logger
 
 from contaxy.config import settings
+from contaxy.managers.deployment.kube_reflector import ResourceReflector
 from contaxy.managers.deployment.kube_utils import (
     build_deployment_metadata,
     build_kube_deployment_config,
@@ -29,20 +25,38 @@ from contaxy.managers.deployment.kube_utils import (
     get_deployment_selection_labels,
     get_label_selector,
     get_pod,
+    get_pod_selection_labels,
+    get_since_seconds,
+    is_pod_pending,
     map_kube_job,
     map_kube_service,
     wait_for_deletion,
     wait_for_deployment,
     wait_for_job,
+    wait_for_pod_start,
+)
+from contaxy.managers.deployment.resource_metrics import (
+    KubernetesResourceMetricsCollector,
 )
 from contaxy.managers.deployment.utils import (
     DEFAULT_DEPLOYMENT_ACTION_ID,
     NO_LOGS_MESSAGE,
     Labels,
+    get_project_selection_labels,
 )
 from contaxy.schema import Job, JobInput, ResourceAction, Service, ServiceInput
-from contaxy.schema.deployment import DeploymentType, ServiceUpdate
-from contaxy.schema.exceptions import ResourceNotFoundError, ServerBaseError
+from contaxy.schema.deployment import DeploymentType, ResourceUsageSample, ServiceUpdate
+from contaxy.schema.exceptions import (
+    ResourceNotFoundError,
+    ResourceNotReadyError,
+    ServerBaseError,
+)
+from contaxy.utils.utils import ClosableStream
+
+# Timeout in seconds of the request used to check the connection to the Kubernetes API server
+HEALTH_CHECK_TIMEOUT = 10
+# Pod template annotation that triggers a rollout, the same as used by `kubectl rollout restart`
+RESTARTED_AT_ANNOTATION = "kubectl.kubernetes.io/restartedAt"
 
 
 class KubernetesDeploymentPlatform:
@@ -52,20 +66,16 @@ class KubernetesDeploymentPlatform:
     ):
         """Initializes the Kubernetes Deployment Manager.
 
+        The platform is meant to be created once per process and shared by all requests.
+        It owns the reflectors and the resource metrics collector, which are stopped via `close()`.
+
         Args:
             kube_namespace (str): Set the Kubernetes namespace to use. If it is not given, the manager will try to detect the namespace automatically.
         """
 
-        try:
-            # incluster config is the config given by a service account and it's role permissions
-            kube_config.load_incluster_config()
-        except kube_config.ConfigException:
-            kube_config.load_kube_config(context=os.getenv("CTXY_K8S_CONTEXT", None))
-
-        self.core_api = kube_client.CoreV1Api()
-        self.apps_api = kube_client.AppsV1Api()
-        self.batch_api = kube_client.BatchV1Api()
-        self.networking_api = kube_client.NetworkingV1Api()
+        self._connect()
+        self._watches_lock = threading.Lock()
+        self._deployment_listeners: List[Callable[[Any], None]] = []
 
         if kube_namespace is None:
             try:
@@ -81,7 +91,206 @@ class KubernetesDeploymentPlatform:
                 ) from e
         else:
             self.kube_namespace = kube_namespace
-        # TODO: when we have performance problems in the future, replicate the watch logic from JupyterHub KubeSpawner to keep Pod & other resource information in memory? (see https://github.com/jupyterhub/kubespawner/blob/941585f0f7acb0f366c9979b6274b7f47356a630/kubespawner/reflector.py#L238)
+
+        self._start_watches()
+
+    def _connect(self) -> None:
+        """Loads the Kubernetes configuration and creates the API clients, which share one connection pool."""
+        try:
+            # incluster config is the config given by a service account and it's role permissions
+            kube_config.load_incluster_config()
+        except kube_config.ConfigException:
+            kube_config.load_kube_config(context=os.getenv("CTXY_K8S_CONTEXT", None))
+
+        configuration = kube_client.Configuration.get_default_copy()
+        configuration.connection_pool_maxsize = (
+            settings.DEPLOYMENT_PLATFORM_MAX_CONNECTIONS
+        )
+        api_client = kube_client.ApiClient(configuration)
+        self.core_api = kube_client.CoreV1Api(api_client)
+        self.apps_api = kube_client.AppsV1Api(api_client)
+        self.batch_api = kube_client.BatchV1Api(api_client)
+        self.networking_api = kube_client.NetworkingV1Api(api_client)
+        self._version_api = kube_client.VersionApi(api_client)
+        self.custom_objects_api = kube_client.CustomObjectsApi(api_client)
+
+    def check_health(self) -> bool:
+        """Checks the connection to the Kubernetes API server and reconnects if the connection failed.
+
+        Returns:
+            bool: `True` if the Kubernetes API server is reachable.
+        """
+        try:
+            self._version_api.get_code(_request_timeout=HEALTH_CHECK_TIMEOUT)
+            return True
+        except Exception as e:
+            logger.warning(f"Kubernetes API server is not reachable. Reconnecting: {e}")
+
+        try:
+            # Reload the configuration, e.g. to pick up rotated service account credentials
+            self._connect()
+            self._version_api.get_code(_request_timeout=HEALTH_CHECK_TIMEOUT)
+        except Exception as e:
+            logger.error(f"Could not reconnect to the Kubernetes API server: {e}")
+            return False
+
+        # The reflectors and the metrics collector still use the API clients of the old connection
+        with self._watches_lock:
+            self._stop_watches()
+            self._start_watches()
+        return True
+
+    def close(self) -> None:
+        """Stops the reflectors and the resource metrics collector."""
+        with self._watches_lock:
+            self._stop_watches()
+
+    @property
+    def _reflectors(self) -> List[ResourceReflector]:
+        return [
+            reflector
+            for reflector in [
+                self._deployment_reflector,
+                self._pod_reflector,
+                self._job_reflector,
+                self._service_reflector,
+            ]
+            if reflector is not None
+        ]
+
+    def _start_watches(self) -> None:
+        """Starts the reflectors and the resource metrics collector with the current API clients."""
+        # Keep the resources in memory instead of querying the Kubernetes API on every read
+        self._deployment_reflector = self._create_reflector(
+            self.apps_api.list_namespaced_deployment
+        )
+        self._pod_reflector = self._create_reflector(self.core_api.list_namespaced_pod)
+        self._job_reflector = self._create_reflector(self.batch_api.list_namespaced_job)
+        self._service_reflector = self._create_reflector(
+            self.core_api.list_namespaced_service
+        )
+        for reflector in [self._deployment_reflector, self._job_reflector]:
+            if reflector is not None:
+                for listener in self._deployment_listeners:
+                    reflector.add_listener(listener)
+        self._metrics_collector = self._create_metrics_collector()
+
+    def _stop_watches(self) -> None:
+        for reflector in self._reflectors:
+            reflector.stop()
+        if self._metrics_collector is not None:
+            self._metrics_collector.stop()
+
+    def add_deployment_listener(self, listener: Callable[[str, str], None]) -> None:
+        """Registers a function that is called with the project ID and deployment ID of every changed deployment.
+
+        Changes are only reported if the reflectors are enabled.
+        """
+
+        def notify(resource: Any) -> None:
+            project_id = (resource.metadata.labels or {}).get(Labels.PROJECT_NAME.value)
+            if project_id:
+                listener(project_id, resource.metadata.name)
+
+        with self._watches_lock:
+            # Registered again on the reflectors created after a reconnect
+            self._deployment_listeners.append(notify)
+            for reflector in [self._deployment_reflector, self._job_reflector]:
+                if reflector is not None:
+                    reflector.add_listener(notify)
+
+    def get_resource_capacity(self) -> Optional[Tuple[float, float]]:
+        """Returns `None`, since the pods are distributed across nodes by the Kubernetes scheduler.
+
+        The Kubernetes scheduler already keeps pods pending until a node has enough resources.
+        """
+        return None
+
+    def _create_reflector(
+        self, list_method: Callable[..., Any]
+    ) -> Optional[ResourceReflector]:
+        """Creates and starts the reflector for the resources listed by the given method."""
+        if not settings.KUBERNETES_REFLECTOR_ENABLED:
+            return None
+
+        reflector = ResourceReflector(
+            list_method,
+            kube_namespace=self.kube_namespace,
+            label_selector=get_label_selector(
+                [(Labels.NAMESPACE.value, settings.SYSTEM_NAMESPACE)]
+            ),
+        )
+        reflector.start()
+        return reflector
+
+    def _create_metrics_collector(
+        self,
+    ) -> Optional[KubernetesResourceMetricsCollector]:
+        """Creates and starts the resource metrics collector of the namespace."""
+        if not settings.DEPLOYMENT_METRICS_ENABLED:
+            return None
+
+        metrics_collector = KubernetesResourceMetricsCollector(
+            self.custom_objects_api,
+            kube_namespace=self.kube_namespace,
+            interval=settings.DEPLOYMENT_METRICS_INTERVAL,
+            max_samples=settings.DEPLOYMENT_METRICS_MAX_SAMPLES,
+        )
+        metrics_collector.start()
+        return metrics_collector
+
+    def get_deployment_metrics(
+        self, project_id: str, deployment_id: str, since: Optional[datetime] = None
+    ) -> List[ResourceUsageSample]:
+        """Returns the sampled resource usage of the running service or job in chronological order.
+
+        Returns an empty list if the resource metrics are not collected. Network usage is not
+        reported by the Kubernetes metrics API.
+        """
+        if self._metrics_collector is None:
+            return []
+        return self._metrics_collector.get_samples(project_id, deployment_id, since)
+
+    def _list_resources(
+        self,
+        reflector: Optional[ResourceReflector],
+        list_method: Callable[..., Any],
+        label_pairs: List[Tuple[str, str]],
+    ) -> List[Any]:
+        """Lists the resources from the reflector or from the Kubernetes API if the reflector is not ready."""
+        if reflector is not None and reflector.is_ready:
+            return reflector.list(label_pairs)
+        return list_method(
+            namespace=self.kube_namespace,
+            label_selector=get_label_selector(label_pairs),
+        ).items
+
+    def _read_resource(
+        self,
+        reflector: Optional[ResourceReflector],
+        read_method: Callable[..., Any],
+        name: str,
+    ) -> Any:
+        """Reads the resource from the reflector or from the Kubernetes API if it is not (yet) in the reflector."""
+        if reflector is not None and reflector.is_ready:
+            resource = reflector.get(name)
+            if resource is not None:
+                return resource
+        return read_method(name=name, namespace=self.kube_namespace)
+
+    def _get_pod(self, project_id: str, service_id: str) -> Optional[V1Pod]:
+        if self._pod_reflector is not None and self._pod_reflector.is_ready:
+            pods = self._pod_reflector.list(
+                get_pod_selection_labels(project_id=project_id, service_id=service_id)
+            )
+            if pods:
+                return pods[0]
+        return get_pod(
+            project_id=project_id,
+            service_id=service_id,
+            kube_namespace=self.kube_namespace,
+            core_api=self.core_api,
+        )
 
     def list_services(
         self,
@@ -90,18 +299,52 @@ class KubernetesDeploymentPlatform:
             DeploymentType.SERVICE, DeploymentType.EXTENSION
         ] = DeploymentType.SERVICE,
     ) -> List[Service]:
-        label_selector = get_deployment_selection_labels(
+        label_pairs = get_project_selection_labels(
             project_id=project_id, deployment_type=deployment_type
         )
 
         try:
-            deployments: V1DeploymentList = self.apps_api.list_namespaced_deployment(
-                namespace=self.kube_namespace, label_selector=label_selector
+            deployments: List[V1Deployment] = self._list_resources(
+                self._deployment_reflector,
+                self.apps_api.list_namespaced_deployment,
+                label_pairs,
             )
-            return [map_kube_service(deployment) for deployment in deployments.items]
+            return [map_kube_service(deployment) for deployment in deployments]
         except ApiException:
             return []
 
+    def list_all_services(
+        self,
+        deployment_type: Literal[
+            DeploymentType.SERVICE, DeploymentType.EXTENSION
+        ] = DeploymentType.SERVICE,
+    ) -> Dict[str, List[Service]]:
+        """Returns the services of all projects grouped by project ID.
+
+        Uses the deployment reflector if it is ready, otherwise a single Kubernetes API call.
+        """
+        label_pairs = [
+            (Labels.NAMESPACE.value, settings.SYSTEM_NAMESPACE),
+            (Labels.DEPLOYMENT_TYPE.value, deployment_type.value),
+        ]
+        try:
+            deployments: List[V1Deployment] = self._list_resources(
+                self._deployment_reflector,
+                self.apps_api.list_namespaced_deployment,
+                label_pairs,
+            )
+        except ApiException:
+            return {}
+
+        services: Dict[str, List[Service]] = {}
+        for deployment in deployments:
+            project_id = (deployment.metadata.labels or {}).get(
+                Labels.PROJECT_NAME.value
+            )
+            if project_id:
+                services.setdefault(project_id, []).append(map_kube_service(deployment))
+        return services
+
     def deploy_service(
         self,
         project_id: str,
@@ -133,16 +376,20 @@ class KubernetesDeploymentPlatform:
             kube_namespace=self.kube_namespace,
             core_api=self.core_api,
         )
-        create_service(
+        kube_service = create_service(
             service_config=kube_service_config,
             kube_namespace=self.kube_namespace,
             core_api=self.core_api,
         )
+        if kube_service is not None and self._service_reflector is not None:
+            self._service_reflector.update(kube_service)
 
         try:
             deployment: V1Deployment = self.apps_api.create_namespaced_deployment(
                 namespace=self.kube_namespace, body=kube_deployment_config
             )
+            if self._deployment_reflector is not None:
+                self._deployment_reflector.update(deployment)
 
             if wait:
                 wait_for_deployment(
@@ -199,6 +446,103 @@ class KubernetesDeploymentPlatform:
 
         return transformed_service
 
+    def restart_service(
+        self, project_id: str, service_id: str, wait: bool = False
+    ) -> Service:
+        """Restarts the pods of the service with a rollout, like `kubectl rollout restart`.
+
+        The pod template is annotated with the restart time, so that the deployment is rolled
+        out again with its current configuration instead of being deleted and recreated.
+        """
+        # Checks that the service belongs to the project
+        self.get_service_metadata(project_id, service_id)
+        try:
+            deployment: V1Deployment = self.apps_api.patch_namespaced_deployment(
+                name=service_id,
+                namespace=self.kube_namespace,
+                body={
+                    "spec": {
+                        "template": {
+                            "metadata": {
+                                "annotations": {
+                                    RESTARTED_AT_ANNOTATION: datetime.now(
+                                        timezone.utc
+                                    ).isoformat()
+                                }
+                            }
+                        }
+                    }
+                },
+            )
+        except ApiException as e:
+            if e.status == 404:
+                raise ResourceNotFoundError(
+                    f"Could not restart service '{service_id}' for project {project_id}."
+                ) from e
+            raise ServerBaseError(f"Could not restart service '{service_id}'.") from e
+        return self._wait_for_rollout(deployment, wait)
+
+    def redeploy_service(
+        self, project_id: str, service: Service, wait: bool = False
+    ) -> Service:
+        """Applies the configuration of the service to its deployment with a rolling update.
+
+        The deployment and its Kubernetes service are replaced instead of deleted, so that the
+        Kubernetes controller replaces the pods. Changes of the volume size are not applied.
+        """
+        # Checks that the service belongs to the project
+        self.get_service_metadata(project_id, service.id)  # type: ignore
+        kube_service_config = build_kube_service_config(
+            service=service,
+            project_id=project_id,
+            kube_namespace=self.kube_namespace,
+        )
+        kube_deployment_config, _ = build_kube_deployment_config(
+            service=service,
+            project_id=project_id,
+            kube_namespace=self.kube_namespace,
+        )
+        try:
+            # The cluster IP is immutable, therefore only the ports of the service are replaced
+            self.core_api.patch_namespaced_service(
+                name=service.id,
+                namespace=self.kube_namespace,
+                body=[
+                    {
+                        "op": "replace",
+                        "path": "/spec/ports",
+                        "value": self.core_api.api_client.sanitize_for_serialization(
+                            kube_service_config.spec.ports
+                        ),
+                    }
+                ],
+            )
+            deployment: V1Deployment = self.apps_api.replace_namespaced_deployment(
+                name=service.id,
+                namespace=self.kube_namespace,
+                body=kube_deployment_config,
+            )
+        except ApiException as e:
+            if e.status == 404:
+                raise ResourceNotFoundError(
+                    f"Could not update service '{service.id}' for project {project_id}."
+                ) from e
+            raise ServerBaseError(
+                f"Could not update deployment '{service.display_name}'."
+            ) from e
+        return self._wait_for_rollout(deployment, wait)
+
+    def _wait_for_rollout(self, deployment: V1Deployment, wait: bool) -> Service:
+        if self._deployment_reflector is not None:
+            self._deployment_reflector.update(deployment)
+        if wait:
+            wait_for_deployment(
+                deployment_name=deployment.metadata.name,
+                kube_namespace=self.kube_namespace,
+                apps_api=self.apps_api,
+            )
+        return map_kube_service(deployment)
+
     def update_service(
         self, project_id: str, service_id: str, service: ServiceUpdate
     ) -> Service:
@@ -222,8 +566,10 @@ class KubernetesDeploymentPlatform:
 
     def get_service_metadata(self, project_id: str, service_id: str) -> Service:
         try:
-            deployment: V1Deployment = self.apps_api.read_namespaced_deployment(
-                name=service_id, namespace=self.kube_namespace
+            deployment: V1Deployment = self._read_resource(
+                self._deployment_reflector,
+                self.apps_api.read_namespaced_deployment,
+                service_id,
             )
 
             # Make sure that the service belongs to the same contaxy namespace as the core-backend. Also, double check that this service really belongs to the project (even though the serviceId should be unique)
@@ -249,33 +595,34 @@ class KubernetesDeploymentPlatform:
         delete_volumes: bool = False,
         retries: int = 0,
     ) -> None:
+        def delete_kube_service() -> None:
+            try:
+                self.core_api.delete_namespaced_service(
+                    name=service_id,
+                    namespace=self.kube_namespace,
+                    propagation_policy="Foreground",
+                )
+            except ApiException as e:
+                if e.reason != "NotFound":
+                    raise ServerBaseError(
+                        f"Could not delete Kubernetes service for service-id {service_id}."
+                    ) from e
 
-        try:
-            self.core_api.delete_namespaced_service(
-                name=service_id,
-                namespace=self.kube_namespace,
-                propagation_policy="Foreground",
-            )
-        except ApiException as e:
-            if e.reason != "NotFound":
-                raise ServerBaseError(
-                    f"Could not delete Kubernetes service for service-id {service_id}."
-                ) from e
-
-        try:
-            self.apps_api.delete_namespaced_deployment(
-                name=service_id,
-                namespace=self.kube_namespace,
-                propagation_policy="Foreground",
-            )
-        except ApiException as e:
-            if e.reason != "NotFound":
-                raise ServerBaseError(
-                    f"Could not delete Kubernetes deployment for service-id {service_id}."
+        def delete_deployment() -> None:
+            try:
+                self.apps_api.delete_namespaced_deployment(
+                    name=service_id,
+                    namespace=self.kube_namespace,
+                    propagation_policy="Foreground",
                 )
-        if delete_volumes:
+            except ApiException as e:
+                if e.reason != "NotFound":
+                    raise ServerBaseError(
+                        f"Could not delete Kubernetes deployment for service-id {service_id}."
+                    )
+
+        def delete_pvc() -> None:
             try:
-                # TODO: if we work with a queue system, then add it to a deletion queue
                 self.core_api.delete_namespaced_persistent_volume_claim(
                     namespace=self.kube_namespace, name=service_id
                 )
@@ -284,6 +631,12 @@ class KubernetesDeploymentPlatform:
                     raise ServerBaseError(
                         f"Could not delete Kubernetes Persistent Volume Claim for service-id {service_id}."
                     )
+
+        # The resources do not depend on each other and are deleted in parallel
+        _call_in_parallel(
+            [delete_kube_service, delete_deployment]
+            + ([delete_pvc] if delete_volumes else [])
+        )
         try:
             # wait some time for the deployment to be deleted
             wait_for_deletion(
@@ -295,54 +648,91 @@ class KubernetesDeploymentPlatform:
                 f"Error while waiting for deletion of service '{service_id}'.",
             ) from e
 
+        for reflector in [self._deployment_reflector, self._service_reflector]:
+            if reflector is not None:
+                reflector.remove(service_id)
+
     def delete_services(
         self,
         project_id: str,
     ) -> None:
+        """Deletes all services of the project with one request per resource type.
+
+        The collections are deleted in parallel via the label selector of the project and the
+        pods are removed by the garbage collector in the background, so the call does not wait
+        until all pods are terminated. Errors are logged and do not stop the other deletions.
+
+        Raises:
+            ServerBaseError: If one of the resource types could not be deleted.
+        """
         label_selector = get_deployment_selection_labels(
             project_id=project_id, deployment_type=DeploymentType.SERVICE
         )
-
-        # TODO: Replace with self.core_api.delete_collection_namespaced_service once added to the kubernetes python client
-        try:
-            services: V1ServiceList = self.core_api.list_namespaced_service(
-                namespace=self.kube_namespace, label_selector=label_selector
-            )
-            for service in services.items:
-                try:
-                    self.core_api.delete_namespaced_service(
-                        name=service.metadata.name, namespace=self.kube_namespace
-                    )
-                except ApiException as e:
-                    logger.error(
-                        f"Could not delete Kubernetes service {service.metadata.name}: {e}"
-                    )
-        except ApiException as e:
-            logger.error(
-                f"Could not list Kubernetes services for deletion in project {project_id}: {e}"
+        failed_resource_types = self._delete_collections(
+            project_id,
+            label_selector,
+            {
+                "services": self.core_api.delete_collection_namespaced_service,
+                "deployments": self.apps_api.delete_collection_namespaced_deployment,
+                "persistent volume claims": self.core_api.delete_collection_namespaced_persistent_volume_claim,
+            },
+        )
+        if failed_resource_types:
+            raise ServerBaseError(
+                f"Could not delete Kubernetes {', '.join(failed_resource_types)} for project '{project_id}'"
             )
+        self._remove_from_reflectors(
+            [self._deployment_reflector, self._service_reflector],
+            get_project_selection_labels(
+                project_id=project_id, deployment_type=DeploymentType.SERVICE
+            ),
+        )
 
-        try:
-            self.apps_api.delete_collection_namespaced_deployment(
-                namespace=self.kube_namespace,
-                label_selector=label_selector,
-                propagation_policy="Foreground",
-            )
-        except ApiException as e:
-            logger.error(
-                f"Could not delete Kubernetes deployments for project '{project_id}':\n{e}"
-            )
+    def _delete_collections(
+        self,
+        project_id: str,
+        label_selector: str,
+        delete_methods: Dict[str, Callable[..., Any]],
+    ) -> List[str]:
+        """Deletes the resources matching the label selector in parallel with background propagation.
 
-        try:
-            self.core_api.delete_collection_namespaced_persistent_volume_claim(
-                namespace=self.kube_namespace,
-                label_selector=label_selector,
-                propagation_policy="Foreground",
-            )
-        except ApiException as e:
-            logger.error(
-                f"Could not delete Kubernetes deployments for project '{project_id}':\n{e}"
-            )
+        Returns:
+            List[str]: The resource types that could not be deleted.
+        """
+        failed_resource_types: List[str] = []
+
+        def delete_collection(resource_type: str, delete_method: Callable) -> None:
+            try:
+                delete_method(
+                    namespace=self.kube_namespace,
+                    label_selector=label_selector,
+                    propagation_policy="Background",
+                )
+            except ApiException as e:
+                failed_resource_types.append(resource_type)
+                logger.error(
+                    f"Could not delete Kubernetes {resource_type} for project '{project_id}':\n{e}"
+                )
+
+        _call_in_parallel(
+            [
+                functools.partial(delete_collection, resource_type, delete_method)
+                for resource_type, delete_method in delete_methods.items()
+            ]
+        )
+        return failed_resource_types
+
+    def _remove_from_reflectors(
+        self,
+        reflectors: List[Optional[ResourceReflector]],
+        label_pairs: List[Tuple[str, str]],
+    ) -> None:
+        """Removes the deleted resources from the reflectors before the watch events are received."""
+        for reflector in reflectors:
+            if reflector is None:
+                continue
+            for resource in reflector.list(label_pairs):
+                reflector.remove(resource.metadata.name)
 
     def get_service_logs(
         self,
@@ -350,85 +740,133 @@ class KubernetesDeploymentPlatform:
         service_id: str,
         lines: Optional[int] = None,
         since: Optional[datetime] = None,
+        wait: bool = True,
     ) -> str:
-        try:
-            pod = get_pod(
-                project_id=project_id,
-                service_id=service_id,
-                kube_namespace=self.kube_namespace,
-                core_api=self.core_api,
-            )
-        except Exception:
-            pod = None
-
-        if pod is None:
-            raise ResourceNotFoundError(
-                f"Could not find service {service_id} to read logs from."
-            )
+        pod = self._get_pod_for_logs(project_id, service_id)
 
         # TODO: remove as this should not be a concern of the get_logs function
         try:
-            # Give some time to let the container within the pod start
-            start = time.time()
-            timeout = 60
-            while True:
-                if pod.status.phase in ["Pending", "ContainerCreating"]:
-                    try:
-                        pod = get_pod(
-                            project_id=project_id,
-                            service_id=service_id,
-                            kube_namespace=self.kube_namespace,
-                            core_api=self.core_api,
-                        )
-                        time.sleep(1)
-                    except Exception:
-                        pass
-                else:
-                    break
-
-                if time.time() - start > timeout:
-                    raise ServerBaseError(
-                        f"Could not read logs from service {service_id} due to status error."
-                    )
-
-            since_seconds = None
-            if since:
-                since_seconds = (
-                    int((datetime.now(timezone.utc) - since).total_seconds()) + 1
-                )
-
+            pod = self._wait_for_pod_start(service_id, pod, wait)
             try:
                 return self.core_api.read_namespaced_pod_log(
                     name=pod.metadata.name,
                     namespace=self.kube_namespace,
                     pretty="true",
                     tail_lines=lines if lines else None,
-                    since_seconds=since_seconds,
+                    since_seconds=get_since_seconds(since),
                 )
             except ApiException as e:
                 raise ServerBaseError(
                     f"Could not read logs of service {service_id}."
                 ) from e
+        except ResourceNotReadyError:
+            raise
         except Exception:
             return NO_LOGS_MESSAGE
 
+    def stream_service_logs(
+        self,
+        project_id: str,
+        service_id: str,
+        lines: Optional[int] = None,
+        since: Optional[datetime] = None,
+        follow: bool = False,
+        wait: bool = True,
+    ) -> Iterator[bytes]:
+        pod = self._get_pod_for_logs(project_id, service_id)
+        pod = self._wait_for_pod_start(service_id, pod, wait)
+        try:
+            # The response is not loaded into memory but read chunk by chunk
+            response = self.core_api.read_namespaced_pod_log(
+                name=pod.metadata.name,
+                namespace=self.kube_namespace,
+                follow=follow,
+                tail_lines=lines if lines else None,
+                since_seconds=get_since_seconds(since),
+                _preload_content=False,
+            )
+        except ApiException as e:
+            raise ServerBaseError(
+                f"Could not read logs of service {service_id}."
+            ) from e
+
+        def close() -> None:
+            # Shutting down the connection unblocks a pending read in another thread
+            if hasattr(response, "shutdown"):
+                response.shutdown()
+            response.close()
+            response.release_conn()
+
+        return ClosableStream(response.stream(), close=close)
+
+    def _get_pod_for_logs(self, project_id: str, service_id: str) -> V1Pod:
+        try:
+            pod = self._get_pod(project_id=project_id, service_id=service_id)
+        except Exception:
+            pod = None
+
+        if pod is None:
+            raise ResourceNotFoundError(
+                f"Could not find service {service_id} to read logs from."
+            )
+        return pod
+
+    def _wait_for_pod_start(self, service_id: str, pod: V1Pod, wait: bool) -> V1Pod:
+        """Gives some time to let the container within the pod start, so that the logs can be read.
+
+        Raises:
+            ResourceNotReadyError: If `wait` is `False` and the pod is still starting.
+            ServerBaseError: If the pod does not start within the timeout.
+        """
+        if not is_pod_pending(pod):
+            return pod
+        if not wait:
+            raise ResourceNotReadyError(
+                f"Could not read logs from service {service_id} since it is still starting."
+            )
+        try:
+            return wait_for_pod_start(pod, self.kube_namespace, self.core_api)
+        except ApiException as e:
+            raise ServerBaseError(
+                f"Could not read logs from service {service_id} due to status error."
+            ) from e
+
     def list_jobs(self, project_id: str) -> List[Job]:
-        label_selector = get_label_selector(
-            [
-                (Labels.NAMESPACE.value, settings.SYSTEM_NAMESPACE),
-                (Labels.PROJECT_NAME.value, project_id),
-                (Labels.DEPLOYMENT_TYPE.value, DeploymentType.JOB.value),
-            ]
+        label_pairs = get_project_selection_labels(
+            project_id=project_id, deployment_type=DeploymentType.JOB
         )
 
         try:
-            jobs: V1JobList = self.batch_api.list_namespaced_job(
-                namespace=self.kube_namespace, label_selector=label_selector
+            jobs: List[V1Job] = self._list_resources(
+                self._job_reflector, self.batch_api.list_namespaced_job, label_pairs
             )
         except ApiException:
             return []
 
-        return [map_kube_job(job) for job in jobs.items]
+        return [map_kube_job(job) for job in jobs]
+
+    def list_all_jobs(self) -> Dict[str, List[Job]]:
+        """Returns the jobs of all projects grouped by project ID.
+
+        Uses the job reflector if it is ready, otherwise a single Kubernetes API call.
+        """
+        label_pairs = [
+            (Labels.NAMESPACE.value, settings.SYSTEM_NAMESPACE),
+            (Labels.DEPLOYMENT_TYPE.value, DeploymentType.JOB.value),
+        ]
+        try:
+            kube_jobs: List[V1Job] = self._list_resources(
+                self._job_reflector, self.batch_api.list_namespaced_job, label_pairs
+            )
+        except ApiException:
+            return {}
+
+        jobs: Dict[str, List[Job]] = {}
+        for kube_job in kube_jobs:
+            project_id = (kube_job.metadata.labels or {}).get(Labels.PROJECT_NAME.value)
+            if project_id:
+                jobs.setdefault(project_id, []).append(map_kube_job(kube_job))
+        return jobs
 
     def deploy_job(
         self,
@@ -457,6 +895,8 @@ class KubernetesDeploymentPlatform:
             )
         except ApiException as e:
             raise ServerBaseError(f"Could not deploy job '{job.display_name}'.") from e
+        if self._job_reflector is not None:
+            self._job_reflector.update(deployed_job)
 
         if wait:
             wait_for_job(
@@ -482,8 +922,8 @@ class KubernetesDeploymentPlatform:
 
     def get_job_metadata(self, project_id: str, job_id: str) -> Job:
         try:
-            job: V1Job = self.batch_api.read_namespaced_job(
-                name=job_id, namespace=self.kube_namespace
+            job: V1Job = self._read_resource(
+                self._job_reflector, self.batch_api.read_namespaced_job, job_id
             )
             return map_kube_job(job)
         except ApiException as e:
@@ -506,6 +946,9 @@ class KubernetesDeploymentPlatform:
                 f"Could not delete job '{job_id}'.",
             ) from e
 
+        if self._job_reflector is not None:
+            self._job_reflector.remove(job_id)
+
     def delete_jobs(
         self,
         project_id: str,
@@ -514,16 +957,21 @@ class KubernetesDeploymentPlatform:
             project_id=project_id, deployment_type=DeploymentType.JOB
         )
 
-        try:
-            self.batch_api.delete_collection_namespaced_job(
-                namespace=self.kube_namespace,
-                label_selector=label_selector,
-                propagation_policy="Foreground",
-            )
-        except ApiException as e:
+        # The pods of the jobs are removed by the garbage collector in the background
+        if self._delete_collections(
+            project_id,
+            label_selector,
+            {"jobs": self.batch_api.delete_collection_namespaced_job},
+        ):
             raise ServerBaseError(
                 f"Could not delete Kubernetes jobs for project '{project_id}'"
-            ) from e
+            )
+        self._remove_from_reflectors(
+            [self._job_reflector],
+            get_project_selection_labels(
+                project_id=project_id, deployment_type=DeploymentType.JOB
+            ),
+        )
 
     def get_job_logs(
         self,
@@ -531,9 +979,32 @@ class KubernetesDeploymentPlatform:
         job_id: str,
         lines: Optional[int] = None,
         since: Optional[datetime] = None,
+        wait: bool = True,
     ) -> str:
         return self.get_service_logs(
-            project_id=project_id, service_id=job_id, lines=lines, since=since
+            project_id=project_id,
+            service_id=job_id,
+            lines=lines,
+            since=since,
+            wait=wait,
+        )
+
+    def stream_job_logs(
+        self,
+        project_id: str,
+        job_id: str,
+        lines: Optional[int] = None,
+        since: Optional[datetime] = None,
+        follow: bool = False,
+        wait: bool = True,
+    ) -> Iterator[bytes]:
+        return self.stream_service_logs(
+            project_id=project_id,
+            service_id=job_id,
+            lines=lines,
+            since=since,
+            follow=follow,
+            wait=wait,
         )
 
     def suggest_service_config(
@@ -559,3 +1030,13 @@ class KubernetesDeploymentPlatform:
 
     def execute_job_action(self, project_id: str, job_id: str, action_id: str) -> Any:
         raise NotImplementedError()
+
+
+def _call_in_parallel(funcs: List[Callable[[], None]]) -> None:
+    """Calls the functions in parallel and raises the first error once all calls are finished."""
+    with ThreadPoolExecutor(
+        max_workers=len(funcs), thread_name_prefix="contaxy-kube-delete"
+    ) as executor:
+        futures = [executor.submit(func) for func in funcs]
+    for future in futures:
+        future.result()
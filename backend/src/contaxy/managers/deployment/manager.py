@@ -1,22 +1,53 @@
+import functools
 import json
-import time
-from datetime import datetime, timezone
-from typing import Dict, List, Literal, Optional, Union
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Literal,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 
 from fastapi.encoders import jsonable_encoder
+from loguru import logger
 from starlette.responses import Response
 
 from contaxy import config
 from contaxy.config import settings
 from contaxy.managers.deployment.docker import DockerDeploymentPlatform
+from contaxy.managers.deployment.job_queue import (
+    JobQueue,
+    QueuedJob,
+    ResourceUsage,
+    get_queue_key,
+    is_job_queue_enabled,
+)
 from contaxy.managers.deployment.kubernetes import KubernetesDeploymentPlatform
+from contaxy.managers.deployment.resource_metrics import downsample
+from contaxy.managers.deployment.service_access import (
+    AccessLogReader,
+    ServiceAccess,
+    get_service_access_recorder,
+)
 from contaxy.managers.deployment.utils import (
+    SERVICE_DB_ONLY_FIELDS,
     create_deployment_config,
     enrich_deployment_with_runtime_info,
     get_job_collection_id,
     get_service_collection_id,
     split_image_name_and_tag,
 )
+from contaxy.managers.scheduler import register_scheduled_job
 from contaxy.operations import (
     AuthOperations,
     DeploymentOperations,
@@ -25,12 +56,15 @@ from contaxy.operations import (
 )
 from contaxy.operations.components import ComponentOperations
 from contaxy.schema import (
+    ClientBaseError,
     ClientValueError,
     Job,
     JobInput,
+    JsonDocument,
     ResourceAction,
+    ResourceAlreadyExistsError,
     ResourceNotFoundError,
-    ServerBaseError,
+    ResourceUpdateFailedError,
     Service,
     ServiceInput,
 )
@@ -40,13 +74,28 @@ from contaxy.schema.deployment import (
     ACTION_RESTART,
     ACTION_START,
     ACTION_STOP,
+    DeletionBatchResult,
+    Deployment,
+    DeploymentCompute,
+    DeploymentMetrics,
     DeploymentStatus,
     DeploymentType,
+    JobBatchResult,
     ServiceUpdate,
 )
+from contaxy.schema.exceptions import ProblemDetails
 from contaxy.schema.shared import ResourceActionExecution
 from contaxy.utils.auth_utils import parse_userid_from_resource_name
 from contaxy.utils.id_utils import generate_short_uuid
+from contaxy.utils.metrics_utils import MetricsTTLCache
+
+# TTL caches are not thread-safe
+_metadata_cache_lock = threading.Lock()
+
+# Statuses of deployments that count towards the quotas of the job queue
+_RUNNING_STATUSES = {DeploymentStatus.PENDING, DeploymentStatus.RUNNING}
+# Number of attempts to write a service access if the service is updated concurrently
+_ACCESS_UPDATE_ATTEMPTS = 3
 
 
 class DeploymentManager(DeploymentOperations):
@@ -74,6 +123,64 @@ class DeploymentManager(DeploymentOperations):
     def _auth_manager(self) -> AuthOperations:
         return self._component_manager.get_auth_manager()
 
+    @property
+    def _job_queue(self) -> JobQueue:
+        return JobQueue(self._json_db_manager)
+
+    def _get_metadata_cache(self) -> Optional[MetricsTTLCache]:
+        """Returns the TTL (time to live) cache of the service and job metadata shared by all requests of the process."""
+        if not self._global_state.settings.DEPLOYMENT_METADATA_CACHE_ENABLED:
+            return None
+        state_namespace = self._global_state[DeploymentManager]
+        cache = state_namespace.metadata_cache
+        if cache is not None:
+            return cache
+        with _metadata_cache_lock:
+            if state_namespace.metadata_cache is None:
+                cache = MetricsTTLCache(
+                    name="deployment_metadata",
+                    maxsize=self._global_state.settings.DEPLOYMENT_METADATA_CACHE_SIZE,
+                    ttl=self._global_state.settings.DEPLOYMENT_METADATA_CACHE_EXPIRY,
+                )
+                # Deployments changed outside of this process are invalidated via the platform events
+                self.deployment_platform.add_deployment_listener(
+                    functools.partial(_invalidate_cache_entries, cache)
+                )
+                state_namespace.metadata_cache = cache
+            return state_namespace.metadata_cache
+
+    def _get_cached_metadata(
+        self, cache_key: Tuple[str, str, str]
+    ) -> Optional[Deployment]:
+        cache = self._get_metadata_cache()
+        if cache is None:
+            return None
+        with _metadata_cache_lock:
+            deployment = cache.get(cache_key)
+            if deployment is None:
+                cache.record_miss()
+                return None
+            cache.record_hit()
+        # Callers are allowed to modify the returned object
+        return deployment.copy(deep=True)
+
+    def _cache_metadata(
+        self, cache_key: Tuple[str, str, str], deployment: Deployment
+    ) -> None:
+        cache = self._get_metadata_cache()
+        if cache is None:
+            return
+        with _metadata_cache_lock:
+            cache[cache_key] = deployment.copy(deep=True)
+
+    def _invalidate_metadata(
+        self, project_id: str, deployment_id: Optional[str] = None
+    ) -> None:
+        """Removes the cached metadata of the deployment or of all deployments of the project."""
+        cache = self._get_metadata_cache()
+        if cache is not None:
+            _invalidate_cache_entries(cache, project_id, deployment_id)
+
     def deploy_service(
         self,
         project_id: str,
@@ -95,6 +202,7 @@ class DeploymentManager(DeploymentOperations):
             deployment_class=Service,
         )
         self._create_service_db_document(db_service, project_id)
+        self._invalidate_metadata(project_id, db_service.id)
 
         # Start service container
         if not service_input.is_stopped:
@@ -137,13 +245,212 @@ class DeploymentManager(DeploymentOperations):
             else:
                 enrich_deployment_with_runtime_info(db_service, deployed_service)
             services.append(db_service)
-        # Add services to DB that were not added via the contaxy API
-        for deployed_service in deployed_service_lookup.values():
-            self._create_service_db_document(deployed_service, project_id)
-            services.append(deployed_service)
+        # Services that were not added via the contaxy API are added to the DB by `reconcile_services`
+        services.extend(deployed_service_lookup.values())
+
+        return services
+
+    def list_all_services(
+        self,
+        deployment_type: Literal[
+            DeploymentType.SERVICE, DeploymentType.EXTENSION
+        ] = DeploymentType.SERVICE,
+    ) -> Dict[str, List[Service]]:
+        """Lists the deployed services of all projects grouped by project ID.
 
+        The deployment platform lists the services of all projects at once and the metadata
+        is only loaded for the deployed services. Stopped services and deployed services
+        without metadata in the DB are not included.
+        """
+        services: Dict[str, List[Service]] = {}
+        for project_id, (
+            deployed_service_lookup,
+            service_docs,
+        ) in self._list_deployed_service_documents(deployment_type).items():
+            project_services = []
+            for service_doc in service_docs:
+                deployed_service = deployed_service_lookup.get(service_doc.key)
+                if deployed_service is None:
+                    continue
+                db_service = Service.parse_raw(service_doc.json_value)
+                enrich_deployment_with_runtime_info(db_service, deployed_service)
+                project_services.append(db_service)
+            if project_services:
+                services[project_id] = project_services
         return services
 
+    def reconcile_services(self) -> int:
+        """Adds the deployed services that are missing in the DB (e.g. started without the contaxy API) to the DB.
+
+        The services of all projects are listed at once and the missing services are
+        created with one DB request per project.
+
+        Returns:
+            int: The number of added services.
+        """
+        added_services = 0
+        for deployment_type in (DeploymentType.SERVICE, DeploymentType.EXTENSION):
+            for project_id, (
+                deployed_service_lookup,
+                service_docs,
+            ) in self._list_deployed_service_documents(
+                deployment_type  # type: ignore
+            ).items():
+                missing_services = dict(deployed_service_lookup)
+                for service_doc in service_docs:
+                    missing_services.pop(service_doc.key, None)
+                if not missing_services:
+                    continue
+                added_services += self._create_service_db_documents(
+                    list(missing_services.values()), project_id
+                )
+        return added_services
+
+    def _list_deployed_service_documents(
+        self,
+        deployment_type: Literal[DeploymentType.SERVICE, DeploymentType.EXTENSION],
+    ) -> Dict[str, Tuple[Dict[str, Service], List[JsonDocument]]]:
+        """Lists the deployed services of all projects together with their DB documents.
+
+        The documents of the deployed services of all projects are loaded with a single DB request.
+
+        Returns:
+            Dict[str, Tuple[Dict[str, Service], List[JsonDocument]]]: The deployed services by service ID and their DB documents, grouped by project ID.
+        """
+        deployed_services_by_project: Dict[str, Dict[str, Service]] = {}
+        for (
+            project_id,
+            deployed_services,
+        ) in self.deployment_platform.list_all_services(deployment_type).items():
+            deployed_service_lookup = {
+                service.id: service
+                for service in deployed_services
+                if service.id is not None
+            }
+            if deployed_service_lookup:
+                deployed_services_by_project[project_id] = deployed_service_lookup
+        if not deployed_services_by_project:
+            return {}
+
+        service_docs = self._json_db_manager.list_json_documents_by_keys(
+            project_id=config.SYSTEM_INTERNAL_PROJECT,
+            keys_by_collection={
+                get_service_collection_id(project_id): list(deployed_service_lookup)
+                for project_id, deployed_service_lookup in deployed_services_by_project.items()
+            },
+        )
+        return {
+            project_id: (
+                deployed_service_lookup,
+                service_docs.get(get_service_collection_id(project_id), []),
+            )
+            for project_id, deployed_service_lookup in deployed_services_by_project.items()
+        }
+
+    def flush_service_accesses(self) -> int:
+        """Writes the service accesses that were recorded by this process to the DB.
+
+        Session tokens for services and, if `SERVICE_ACCESS_LOG_PATH` is set, the requests in
+        the access log of the proxy are recorded in memory. Only the latest access per service
+        is written, so that frequently used services do not cause a DB write per request.
+
+        Returns:
+            int: The number of updated services.
+        """
+        recorder = get_service_access_recorder(self._global_state)
+        if settings.SERVICE_ACCESS_LOG_PATH:
+            try:
+                for (project_id, service_id), access_time in (
+                    AccessLogReader(settings.SERVICE_ACCESS_LOG_PATH).read().items()
+                ):
+                    recorder.record(project_id, service_id, access_time)
+            except OSError as e:
+                logger.warning(f"Could not read the service access log: {e}")
+
+        updated_services = 0
+        for (project_id, service_id), access in recorder.pop_all().items():
+            try:
+                if self._update_last_access(project_id, service_id, access):
+                    updated_services += 1
+            except ResourceNotFoundError:
+                # The service was deleted or is not managed by contaxy
+                pass
+            except Exception:
+                logger.exception(f"Could not update the access time of {service_id}.")
+                # Retried with the next flush
+                recorder.record(project_id, service_id, access.access_time, access.user)
+            self._invalidate_metadata(project_id, service_id)
+        return updated_services
+
+    def _update_last_access(
+        self, project_id: str, service_id: str, access: ServiceAccess
+    ) -> bool:
+        """Writes the access to the DB if it is newer than the stored last access.
+
+        Other app instances flush their accesses concurrently, so the access is written with
+        a conditional update on the version of the read document and retried on conflicts.
+
+        Returns:
+            bool: `False` if the stored last access is not older than the access.
+
+        Raises:
+            ResourceNotFoundError: If the service does not exist in the DB.
+            ResourceUpdateFailedError: If the document was updated concurrently in every attempt.
+        """
+        access_update: Dict[str, Any] = {"last_access_time": str(access.access_time)}
+        if access.user is not None:
+            access_update["last_access_user"] = access.user
+        for attempt in range(_ACCESS_UPDATE_ATTEMPTS):
+            service_doc = self._json_db_manager.get_json_document(
+                project_id=config.SYSTEM_INTERNAL_PROJECT,
+                collection_id=get_service_collection_id(project_id),
+                key=service_id,
+            )
+            last_access_time = Service.parse_raw(
+                service_doc.json_value
+            ).last_access_time
+            if last_access_time is not None and last_access_time >= access.access_time:
+                return False
+            try:
+                self._json_db_manager.update_json_document(
+                    project_id=config.SYSTEM_INTERNAL_PROJECT,
+                    collection_id=get_service_collection_id(project_id),
+                    key=service_id,
+                    json_document=json.dumps(access_update),
+                    expected_version=service_doc.version,
+                )
+                return True
+            except ResourceUpdateFailedError:
+                if attempt == _ACCESS_UPDATE_ATTEMPTS - 1:
+                    raise
+        return False
+
+    def _create_service_db_documents(
+        self, services: List[Service], project_id: str
+    ) -> int:
+        try:
+            self._json_db_manager.create_json_documents(
+                project_id=config.SYSTEM_INTERNAL_PROJECT,
+                collection_id=get_service_collection_id(project_id),
+                json_documents={
+                    service.id: service.json(exclude={"status", "internal_id"})
+                    for service in services
+                },
+                upsert=False,
+            )
+            return len(services)
+        except ResourceAlreadyExistsError:
+            pass
+        # A service was added in the meantime (e.g. by deploying it), the others are added one by one
+        added_services = 0
+        for service in services:
+            try:
+                self._create_service_db_document(service, project_id)
+                added_services += 1
+            except ResourceAlreadyExistsError:
+                pass
+        return added_services
+
     def _create_service_db_document(self, service: Service, project_id: str) -> None:
         self._json_db_manager.create_json_document(
             project_id=config.SYSTEM_INTERNAL_PROJECT,
@@ -154,6 +461,15 @@ class DeploymentManager(DeploymentOperations):
         )
 
     def get_service_metadata(self, project_id: str, service_id: str) -> Service:
+        cache_key = (project_id, DeploymentType.SERVICE.value, service_id)
+        cached_service = self._get_cached_metadata(cache_key)
+        if cached_service is not None:
+            return cached_service  # type: ignore
+        service = self._load_service_metadata(project_id, service_id)
+        self._cache_metadata(cache_key, service)
+        return service
+
+    def _load_service_metadata(self, project_id: str, service_id: str) -> Service:
         db_service = self._get_service_from_db(project_id, service_id)
         try:
             deployed_service = self.deployment_platform.get_service_metadata(
@@ -177,6 +493,10 @@ class DeploymentManager(DeploymentOperations):
                 service_update.container_image
             )
             self._system_manager.check_allowed_image(image_name, image_tag)
+        # Fields that are only stored in the DB do not require a new deployment
+        is_deployment_changed = not set(service_update_dict).issubset(
+            SERVICE_DB_ONLY_FIELDS
+        )
         service_update_dict.update(
             {
                 "updated_at": str(datetime.now(timezone.utc)),
@@ -191,15 +511,25 @@ class DeploymentManager(DeploymentOperations):
             key=service_id,
             json_document=json.dumps(service_update_dict),
         )
+        self._invalidate_metadata(project_id, service_id)
         db_service = Service.parse_raw(service_doc.json_value)
         try:
-            deployed_service = self._execute_restart_service_action(
+            deployed_service = self.deployment_platform.get_service_metadata(
                 project_id, service_id
             )
+            if is_deployment_changed:
+                # The platform replaces the running deployment, e.g. with a rolling update
+                self.update_service_access(project_id, service_id)
+                deployed_service = self.deployment_platform.redeploy_service(
+                    project_id, db_service, wait=True
+                )
             enrich_deployment_with_runtime_info(db_service, deployed_service)
-        except ClientValueError:
+        except ResourceNotFoundError:
+            # The service is stopped and uses the new configuration when it is started
             db_service.status = DeploymentStatus.STOPPED
             db_service.internal_id = None
+        finally:
+            self._invalidate_metadata(project_id, service_id)
 
         return db_service
 
@@ -216,6 +546,7 @@ class DeploymentManager(DeploymentOperations):
                 }
             ),
         )
+        self._invalidate_metadata(project_id, service_id)
 
     def delete_service(
         self, project_id: str, service_id: str, delete_volumes: bool = False
@@ -237,12 +568,66 @@ class DeploymentManager(DeploymentOperations):
             collection_id=get_service_collection_id(project_id),
             key=db_service.id,
         )
+        self._invalidate_metadata(project_id, db_service.id)
 
     def delete_services(self, project_id: str) -> None:
         self.deployment_platform.delete_services(project_id)
         self._json_db_manager.delete_json_collection(
             config.SYSTEM_INTERNAL_PROJECT, get_service_collection_id(project_id)
         )
+        self._invalidate_metadata(project_id)
+
+    def batch_delete_services(
+        self,
+        project_id: str,
+        service_ids: List[str],
+        delete_volumes: bool = False,
+    ) -> List[DeletionBatchResult]:
+        results = [DeletionBatchResult(id=service_id) for service_id in service_ids]
+        # Load the metadata of all services at once instead of one request per service
+        existing_service_ids = {
+            service_doc.key
+            for service_doc in self._json_db_manager.list_json_documents(
+                project_id=config.SYSTEM_INTERNAL_PROJECT,
+                collection_id=get_service_collection_id(project_id),
+                keys=service_ids,
+            )
+        }
+        for result in results:
+            if result.id not in existing_service_ids:
+                result.error = _get_problem_details(
+                    ResourceNotFoundError(
+                        f"The service with id {result.id} could not "
+                        f"be found in project {project_id}!"
+                    )
+                )
+
+        def delete(index: int) -> None:
+            try:
+                self.deployment_platform.delete_service(
+                    project_id=project_id,
+                    service_id=results[index].id,
+                    delete_volumes=delete_volumes,
+                )
+            except ResourceNotFoundError:
+                # Workspace is already stopped and service does not exist
+                pass
+            except Exception as e:
+                results[index].error = _get_problem_details(e)
+
+        _execute_batch(
+            delete, [index for index, result in enumerate(results) if not result.error]
+        )
+        deleted_service_ids = [result.id for result in results if not result.error]
+        if deleted_service_ids:
+            self._json_db_manager.delete_documents(
+                project_id=config.SYSTEM_INTERNAL_PROJECT,
+                collection_id=get_service_collection_id(project_id),
+                keys=deleted_service_ids,
+            )
+        for service_id in deleted_service_ids:
+            self._invalidate_metadata(project_id, service_id)
+        return results
 
     def _get_service_from_db(self, project_id: str, service_id: str) -> Service:
         try:
@@ -265,9 +650,38 @@ class DeploymentManager(DeploymentOperations):
         service_id: str,
         lines: Optional[int],
         since: Optional[datetime],
+        wait: bool = True,
     ) -> str:
         return self.deployment_platform.get_service_logs(
-            project_id, service_id, lines, since
+            project_id, service_id, lines, since, wait
+        )
+
+    def stream_service_logs(
+        self,
+        project_id: str,
+        service_id: str,
+        lines: Optional[int] = None,
+        since: Optional[datetime] = None,
+        follow: bool = False,
+        wait: bool = True,
+    ) -> Iterator[bytes]:
+        return self.deployment_platform.stream_service_logs(
+            project_id, service_id, lines, since, follow, wait
+        )
+
+    def get_service_metrics(
+        self,
+        project_id: str,
+        service_id: str,
+        since: Optional[datetime] = None,
+        max_samples: int = 100,
+    ) -> DeploymentMetrics:
+        db_service = self._get_service_from_db(project_id, service_id)
+        samples = self.deployment_platform.get_deployment_metrics(
+            project_id, db_service.id, since
+        )
+        return DeploymentMetrics(
+            id=db_service.id, samples=downsample(samples, max_samples)
         )
 
     def list_jobs(self, project_id: str) -> List[Job]:
@@ -278,12 +692,18 @@ class DeploymentManager(DeploymentOperations):
         deployed_job_lookup: Dict[Optional[str], Job] = {
             job.id: job for job in self.deployment_platform.list_jobs(project_id)
         }
+        queue_positions = (
+            self._job_queue.get_queue_positions() if is_job_queue_enabled() else {}
+        )
         jobs = []
         for job_doc in job_docs:
             db_job = Job.parse_raw(job_doc.json_value)
             deployed_job = deployed_job_lookup.get(db_job.id)
             if deployed_job is None:
-                db_job.status = DeploymentStatus.STOPPED
+                # Jobs that could not be started from the job queue are marked as failed in the DB
+                if db_job.status != DeploymentStatus.FAILED:
+                    db_job.status = DeploymentStatus.STOPPED
+                _set_queue_position(project_id, db_job, queue_positions)
             else:
                 enrich_deployment_with_runtime_info(db_job, deployed_job)
             jobs.append(db_job)
@@ -314,6 +734,9 @@ class DeploymentManager(DeploymentOperations):
             json_document=db_job.json(),
             upsert=False,
         )
+        self._invalidate_metadata(project_id, db_job.id)
+        if not self._admit_jobs(project_id, [db_job], action_id)[0]:
+            return db_job
         # Start job container
         deployed_job = self.deployment_platform.deploy_job(
             project_id, db_job, action_id, wait
@@ -321,7 +744,219 @@ class DeploymentManager(DeploymentOperations):
         enrich_deployment_with_runtime_info(db_job, deployed_job)
         return db_job
 
+    def deploy_jobs(
+        self,
+        project_id: str,
+        job_inputs: List[JobInput],
+        action_id: Optional[str] = None,
+        wait: bool = False,
+    ) -> List[JobBatchResult]:
+        results = [JobBatchResult() for _ in job_inputs]
+        # Check every image only once instead of once per job
+        image_errors: Dict[str, Optional[ProblemDetails]] = {}
+        for job_input in job_inputs:
+            if job_input.container_image in image_errors:
+                continue
+            try:
+                self._system_manager.check_allowed_image(
+                    *split_image_name_and_tag(job_input.container_image)
+                )
+                image_errors[job_input.container_image] = None
+            except ClientBaseError as e:
+                image_errors[job_input.container_image] = _get_problem_details(e)
+
+        db_jobs: Dict[int, Job] = {}
+        job_ids: Set[str] = set()
+        for index, job_input in enumerate(job_inputs):
+            results[index].error = image_errors[job_input.container_image]
+            if results[index].error:
+                continue
+            try:
+                db_jobs[index] = create_deployment_config(
+                    project_id=project_id,
+                    deployment_input=job_input,
+                    deployment_type=DeploymentType.JOB,
+                    authorized_subject=self._request_state.authorized_subject,
+                    system_manager=self._system_manager,
+                    auth_manager=self._auth_manager,
+                    deployment_class=Job,
+                    check_allowed_image=False,
+                )
+                if db_jobs[index].id in job_ids:
+                    raise ResourceAlreadyExistsError(
+                        f"The job ID {db_jobs[index].id} is used by another job of the batch."
+                    )
+            except ClientBaseError as e:
+                db_jobs.pop(index, None)
+                results[index].error = _get_problem_details(e)
+                continue
+            job_ids.add(db_jobs[index].id)
+
+        # Create all jobs in the DB in a single transaction
+        self._json_db_manager.create_json_documents(
+            project_id=config.SYSTEM_INTERNAL_PROJECT,
+            collection_id=get_job_collection_id(project_id),
+            json_documents={db_job.id: db_job.json() for db_job in db_jobs.values()},
+            upsert=False,
+        )
+        for db_job in db_jobs.values():
+            self._invalidate_metadata(project_id, db_job.id)
+        admitted = self._admit_jobs(project_id, list(db_jobs.values()), action_id)
+        deploy_indexes = []
+        for index, is_admitted in zip(db_jobs, admitted):
+            if is_admitted:
+                deploy_indexes.append(index)
+            else:
+                results[index].job = db_jobs[index]
+
+        def deploy(index: int) -> None:
+            db_job = db_jobs[index]
+            try:
+                deployed_job = self.deployment_platform.deploy_job(
+                    project_id, db_job, action_id, wait
+                )
+            except Exception as e:
+                results[index].error = _get_problem_details(e)
+                return
+            enrich_deployment_with_runtime_info(db_job, deployed_job)
+            results[index].job = db_job
+
+        _execute_batch(deploy, deploy_indexes)
+        return results
+
+    def _admit_jobs(
+        self, project_id: str, db_jobs: List[Job], action_id: Optional[str]
+    ) -> List[bool]:
+        """Checks the quotas of the job queue for the new jobs and queues the jobs that cannot be started.
+
+        Queued jobs are updated in place with the status `queued` and their queue position.
+
+        Returns:
+            List[bool]: `True` for every job that can be started immediately.
+        """
+        if not is_job_queue_enabled():
+            return [True] * len(db_jobs)
+        job_queue = self._job_queue
+        queued_jobs = [
+            QueuedJob.from_job(project_id, db_job, action_id) for db_job in db_jobs
+        ]
+        admitted = job_queue.admit(self._get_resource_usage, queued_jobs)
+        if all(admitted):
+            return admitted
+
+        job_queue.enqueue(
+            [
+                queued_job
+                for queued_job, is_admitted in zip(queued_jobs, admitted)
+                if not is_admitted
+            ]
+        )
+        queue_positions = job_queue.get_queue_positions()
+        for db_job, is_admitted in zip(db_jobs, admitted):
+            if not is_admitted:
+                _set_queue_position(project_id, db_job, queue_positions)
+        return admitted
+
+    def _get_resource_usage(self) -> ResourceUsage:
+        """Returns the running jobs and, if resources are checked, the minimal resources of all running deployments."""
+        usage = ResourceUsage()
+        if settings.JOB_QUEUE_CHECK_RESOURCES:
+            usage.capacity = self.deployment_platform.get_resource_capacity()
+        deployments_by_type: Dict[
+            DeploymentType, Mapping[str, Sequence[Deployment]]
+        ] = {DeploymentType.JOB: self.deployment_platform.list_all_jobs()}
+        if usage.capacity is not None:
+            deployments_by_type[
+                DeploymentType.SERVICE
+            ] = self.deployment_platform.list_all_services(DeploymentType.SERVICE)
+            deployments_by_type[
+                DeploymentType.EXTENSION
+            ] = self.deployment_platform.list_all_services(DeploymentType.EXTENSION)
+
+        for deployment_type, deployments_by_project in deployments_by_type.items():
+            for project_id, deployments in deployments_by_project.items():
+                running_deployments = {
+                    deployment.id: deployment
+                    for deployment in deployments
+                    if deployment.status in _RUNNING_STATUSES
+                }
+                if not running_deployments:
+                    continue
+                compute_lookup = (
+                    self._get_deployment_compute(
+                        project_id, deployment_type, list(running_deployments)
+                    )
+                    if usage.capacity is not None
+                    else {}
+                )
+                for deployment_id, deployment in running_deployments.items():
+                    # The platform only knows the limits, the requested resources are stored in the DB
+                    compute = compute_lookup.get(deployment_id, deployment.compute)
+                    usage.add(
+                        project_id,
+                        compute.min_cpus or 0,
+                        compute.min_memory or 0,
+                        is_job=deployment_type == DeploymentType.JOB,
+                    )
+        return usage
+
+    def _get_deployment_compute(
+        self,
+        project_id: str,
+        deployment_type: DeploymentType,
+        deployment_ids: List[str],
+    ) -> Dict[str, DeploymentCompute]:
+        if deployment_type == DeploymentType.JOB:
+            collection_id = get_job_collection_id(project_id)
+        else:
+            collection_id = get_service_collection_id(project_id)
+        return {
+            deployment_doc.key: Deployment.parse_raw(deployment_doc.json_value).compute
+            for deployment_doc in self._json_db_manager.list_json_documents(
+                project_id=config.SYSTEM_INTERNAL_PROJECT,
+                collection_id=collection_id,
+                keys=deployment_ids,
+            )
+        }
+
+    def dispatch_queued_jobs(self) -> List[QueuedJob]:
+        """Starts the queued jobs that are allowed by the quotas of the job queue.
+
+        Returns:
+            List[QueuedJob]: The started jobs.
+        """
+
+        def start_job(queued_job: QueuedJob) -> None:
+            db_job = self._get_job_from_db(queued_job.project_id, queued_job.job_id)
+            self.deployment_platform.deploy_job(
+                queued_job.project_id, db_job, queued_job.action_id, wait=False
+            )
+            self._invalidate_metadata(queued_job.project_id, queued_job.job_id)
+
+        def fail_job(queued_job: QueuedJob) -> None:
+            # The status is kept since the job does not exist on the deployment platform
+            self._json_db_manager.update_json_document(
+                project_id=config.SYSTEM_INTERNAL_PROJECT,
+                collection_id=get_job_collection_id(queued_job.project_id),
+                key=queued_job.job_id,
+                json_document=json.dumps({"status": DeploymentStatus.FAILED.value}),
+            )
+            self._invalidate_metadata(queued_job.project_id, queued_job.job_id)
+
+        return self._job_queue.dispatch(self._get_resource_usage, start_job, fail_job)
+
     def get_job_metadata(self, project_id: str, job_id: str) -> Job:
+        cache_key = (project_id, DeploymentType.JOB.value, job_id)
+        job: Optional[Job] = self._get_cached_metadata(cache_key)  # type: ignore
+        if job is None:
+            job = self._load_job_metadata(project_id, job_id)
+            self._cache_metadata(cache_key, job)
+        # The queue position changes with every dispatched job and is not cached
+        if job.status == DeploymentStatus.UNKNOWN and is_job_queue_enabled():
+            _set_queue_position(project_id, job, self._job_queue.get_queue_positions())
+        return job
+
+    def _load_job_metadata(self, project_id: str, job_id: str) -> Job:
         db_job = self._get_job_from_db(project_id, job_id)
         try:
             deployed_job = self.deployment_platform.get_job_metadata(
@@ -329,12 +964,14 @@ class DeploymentManager(DeploymentOperations):
             )
             enrich_deployment_with_runtime_info(db_job, deployed_job)
         except ResourceNotFoundError:
-            db_job.status = DeploymentStatus.UNKNOWN
+            if db_job.status != DeploymentStatus.FAILED:
+                db_job.status = DeploymentStatus.UNKNOWN
 
         return db_job
 
     def delete_job(self, project_id: str, job_id: str) -> None:
         db_job = self._get_job_from_db(project_id, job_id)
+        self._job_queue.remove(project_id, db_job.id)
 
         try:
             self.deployment_platform.delete_job(
@@ -349,6 +986,7 @@ class DeploymentManager(DeploymentOperations):
             collection_id=get_job_collection_id(project_id),
             key=db_job.id,
         )
+        self._invalidate_metadata(project_id, db_job.id)
 
     def delete_jobs(
         self,
@@ -364,10 +1002,15 @@ class DeploymentManager(DeploymentOperations):
                 ):
                     self.delete_job(project_id, db_job.id)
         else:
+            job_queue = self._job_queue
+            for queued_job in job_queue.list_queued_jobs():
+                if queued_job.project_id == project_id:
+                    job_queue.remove(project_id, queued_job.job_id)
             self.deployment_platform.delete_jobs(project_id)
             self._json_db_manager.delete_json_collection(
                 config.SYSTEM_INTERNAL_PROJECT, get_job_collection_id(project_id)
             )
+            self._invalidate_metadata(project_id)
 
     def _get_job_from_db(self, project_id: str, job_id: str) -> Job:
         try:
@@ -390,8 +1033,37 @@ class DeploymentManager(DeploymentOperations):
         job_id: str,
         lines: Optional[int] = None,
         since: Optional[datetime] = None,
+        wait: bool = True,
     ) -> str:
-        return self.deployment_platform.get_job_logs(project_id, job_id, lines, since)
+        return self.deployment_platform.get_job_logs(
+            project_id, job_id, lines, since, wait
+        )
+
+    def stream_job_logs(
+        self,
+        project_id: str,
+        job_id: str,
+        lines: Optional[int] = None,
+        since: Optional[datetime] = None,
+        follow: bool = False,
+        wait: bool = True,
+    ) -> Iterator[bytes]:
+        return self.deployment_platform.stream_job_logs(
+            project_id, job_id, lines, since, follow, wait
+        )
+
+    def get_job_metrics(
+        self,
+        project_id: str,
+        job_id: str,
+        since: Optional[datetime] = None,
+        max_samples: int = 100,
+    ) -> DeploymentMetrics:
+        db_job = self._get_job_from_db(project_id, job_id)
+        samples = self.deployment_platform.get_deployment_metrics(
+            project_id, db_job.id, since
+        )
+        return DeploymentMetrics(id=db_job.id, samples=downsample(samples, max_samples))
 
     def execute_service_action(
         self,
@@ -400,6 +1072,8 @@ class DeploymentManager(DeploymentOperations):
         action_id: str,
         action_execution: ResourceActionExecution = ResourceActionExecution(),
     ) -> Response:
+        # The status changes with every action
+        self._invalidate_metadata(project_id, service_id)
         if action_id == ACTION_START:
             self._execute_start_service_action(project_id, service_id)
         elif action_id == ACTION_STOP:
@@ -411,12 +1085,13 @@ class DeploymentManager(DeploymentOperations):
                 content=f"No implementation for action id '{action_id}'",
                 status_code=501,
             )
+        self._invalidate_metadata(project_id, service_id)
         return Response(
             content=f"Action {action_id} successfully executed.", status_code=200
         )
 
     def _execute_start_service_action(self, project_id: str, service_id: str) -> None:
-        service = self.get_service_metadata(project_id, service_id)
+        service = self._load_service_metadata(project_id, service_id)
         if service.status != DeploymentStatus.STOPPED:
             raise ClientValueError(
                 f"Action {ACTION_START} on service {service_id} can only be performed "
@@ -443,7 +1118,7 @@ class DeploymentManager(DeploymentOperations):
         project_id: str,
         service_id: str,
     ) -> None:
-        service = self.get_service_metadata(project_id, service_id)
+        service = self._load_service_metadata(project_id, service_id)
         if service.status == DeploymentStatus.STOPPED:
             raise ClientValueError(
                 f"Action {ACTION_STOP} on service {service_id} can only be performed "
@@ -456,36 +1131,18 @@ class DeploymentManager(DeploymentOperations):
     def _execute_restart_service_action(
         self, project_id: str, service_id: str
     ) -> Service:
-        service = self.get_service_metadata(project_id, service_id)
+        service = self._load_service_metadata(project_id, service_id)
         if service.status == DeploymentStatus.STOPPED:
             raise ClientValueError(
                 f"Action {ACTION_RESTART} on service {service_id} can only be performed "
                 f"when service is not stopped already!"
             )
-        return self._restart_service(project_id, service)
-
-    def _restart_service(self, project_id: str, service: Service) -> Service:
-        self.deployment_platform.delete_service(
-            project_id, service.id, delete_volumes=False
+        # Make sure the restarted service is not considered idle immediately
+        self.update_service_access(project_id, service_id)
+        # The deployment is restarted in place instead of being deleted and deployed again
+        return self.deployment_platform.restart_service(
+            project_id, service_id, wait=True
         )
-        self._wait_for_deployment_deletion(project_id, service.id)
-        return self._deploy_service(project_id, service, wait=True)
-
-    def _wait_for_deployment_deletion(
-        self, project_id: str, service_id: str, timeout_seconds: int = 60
-    ) -> None:
-        try:
-            start_time = time.time()
-            while time.time() - start_time < timeout_seconds:
-                self.deployment_platform.get_service_metadata(project_id, service_id)
-                time.sleep(3)
-            raise ServerBaseError(
-                f"Action {ACTION_RESTART} on service {service_id} failed as service "
-                f"did not stop after waiting {timeout_seconds} seconds."
-            )
-        except ResourceNotFoundError:
-            # Service was successfully deleted
-            pass
 
     def execute_job_action(
         self,
@@ -581,3 +1238,189 @@ class DeploymentManager(DeploymentOperations):
         return JobInput(
             display_name=f"Job {generate_short_uuid()}", container_image=container_image
         )
+
+
+def _invalidate_cache_entries(
+    cache: MetricsTTLCache, project_id: str, deployment_id: Optional[str] = None
+) -> None:
+    with _metadata_cache_lock:
+        if deployment_id is None:
+            for cache_key in [
+                cache_key for cache_key in cache.keys() if cache_key[0] == project_id
+            ]:
+                cache.pop(cache_key, None)
+            return
+        for deployment_type in (DeploymentType.SERVICE, DeploymentType.JOB):
+            cache.pop((project_id, deployment_type.value, deployment_id), None)
+
+
+def _is_busy(
+    deployment_platform: Union[DockerDeploymentPlatform, KubernetesDeploymentPlatform],
+    project_id: str,
+    service: Service,
+) -> bool:
+    """Returns `True` if the average CPU usage of the service during its idle timeout exceeds the threshold."""
+    samples = deployment_platform.get_deployment_metrics(
+        project_id,
+        service.id,
+        since=datetime.now(timezone.utc) - service.idle_timeout,  # type: ignore
+    )
+    cpu_usages = [
+        sample.cpu_usage for sample in samples if sample.cpu_usage is not None
+    ]
+    if not cpu_usages:
+        return False
+    return sum(cpu_usages) / len(cpu_usages) > settings.SERVICE_IDLE_CPU_THRESHOLD
+
+
+def _set_queue_position(
+    project_id: str, db_job: Job, queue_positions: Dict[str, int]
+) -> None:
+    queue_position = queue_positions.get(get_queue_key(project_id, db_job.id))
+    if queue_position is not None:
+        db_job.status = DeploymentStatus.QUEUED
+        db_job.queue_position = queue_position
+
+
+def _get_problem_details(error: Exception) -> ProblemDetails:
+    """Maps the exception of a single item of a batch request to the problem details shown to the client."""
+    if isinstance(error, ClientBaseError):
+        return ProblemDetails(
+            code=error.status_code, message=error.detail, explanation=error.explanation
+        )
+    logger.opt(exception=error).error(
+        f"Server exception {type(error).__name__} caught in batch request!"
+    )
+    return ProblemDetails(code=500, message="Internal server error!")
+
+
+def _execute_batch(func: Callable[[int], None], indexes: List[int]) -> None:
+    """Calls the function for all item indexes of a batch request in parallel.
+
+    The first item is processed alone, so that resources shared by all deployments of
+    the project (e.g. the Docker network) are created only once.
+    """
+    if not indexes:
+        return
+    func(indexes[0])
+    with ThreadPoolExecutor(
+        max_workers=settings.DEPLOYMENT_BATCH_MAX_WORKERS,
+        thread_name_prefix="contaxy-batch",
+    ) as executor:
+        for index in indexes[1:]:
+            executor.submit(func, index)
+
+
+def check_deployment_platform_health(component_manager: ComponentOperations) -> None:
+    """Checks the connection of the deployment platform and reconnects if it failed. Meant to be called regularly in the background."""
+    service_manager = component_manager.get_service_manager()
+    if isinstance(service_manager, DeploymentManager):
+        service_manager.deployment_platform.check_health()
+
+
+def dispatch_queued_jobs(component_manager: ComponentOperations) -> None:
+    job_manager = component_manager.get_job_manager()
+    if isinstance(job_manager, DeploymentManager):
+        job_manager.dispatch_queued_jobs()
+
+
+def reconcile_services(component_manager: ComponentOperations) -> None:
+    service_manager = component_manager.get_service_manager()
+    if isinstance(service_manager, DeploymentManager):
+        service_manager.reconcile_services()
+
+
+def flush_service_accesses(component_manager: ComponentOperations) -> None:
+    service_manager = component_manager.get_service_manager()
+    if isinstance(service_manager, DeploymentManager):
+        service_manager.flush_service_accesses()
+
+
+def stop_idle_services(component_manager: ComponentOperations) -> None:
+    service_manager = component_manager.get_service_manager()
+    if isinstance(service_manager, DeploymentManager):
+        # The accesses recorded by other app instances are flushed by their own job
+        service_manager.flush_service_accesses()
+        # List the services of all projects at once instead of one request per project
+        services_by_project = service_manager.list_all_services()
+    else:
+        services_by_project = {
+            project.id: service_manager.list_services(project.id)
+            for project in component_manager.get_project_manager().list_projects()
+        }
+    idle_services = [
+        (project_id, service)
+        for project_id, services in services_by_project.items()
+        for service in services
+        # Only check running services
+        if service.status == DeploymentStatus.RUNNING
+        # If idle timeout is not set or 0, the service should never be stopped automatically
+        if service.idle_timeout is not None and service.idle_timeout != timedelta(0)
+        # Last access time must be set to compute idle time
+        if service.last_access_time is not None
+        # Check if time last access time is longer ago than idle timeout
+        if datetime.now(timezone.utc) - service.last_access_time > service.idle_timeout
+    ]
+    if settings.SERVICE_IDLE_CPU_THRESHOLD > 0 and isinstance(
+        service_manager, DeploymentManager
+    ):
+        # Services that compute something without being accessed are not idle
+        idle_services = [
+            (project_id, service)
+            for project_id, service in idle_services
+            if not _is_busy(service_manager.deployment_platform, project_id, service)
+        ]
+    if not idle_services:
+        return
+
+    def stop_service(project_id: str, service: Service) -> None:
+        logger.info(
+            f"Stopping idle service {service.display_name}(id: {service.id}) with last "
+            f"access time {service.last_access_time} and idle timeout {service.idle_timeout}."
+        )
+        try:
+            service_manager.execute_service_action(
+                project_id,
+                service.id,
+                action_id=ACTION_STOP,
+            )
+        except Exception:
+            logger.exception(f"Could not stop idle service {service.id}.")
+
+    with ThreadPoolExecutor(
+        max_workers=settings.SERVICE_IDLE_STOP_MAX_WORKERS,
+        thread_name_prefix="contaxy-idle-stop",
+    ) as executor:
+        for project_id, service in idle_services:
+            executor.submit(stop_service, project_id, service)
+
+
+register_scheduled_job(
+    "stop_idle_services",
+    stop_idle_services,
+    interval=settings.SERVICE_IDLE_CHECK_INTERVAL,
+)
+register_scheduled_job(
+    "reconcile_services",
+    reconcile_services,
+    interval=settings.SERVICE_RECONCILE_INTERVAL,
+)
+register_scheduled_job(
+    "dispatch_queued_jobs",
+    dispatch_queued_jobs,
+    interval=settings.JOB_QUEUE_DISPATCH_INTERVAL,
+)
+# Every app instance writes the service accesses that it recorded in memory
+register_scheduled_job(
+    "flush_service_accesses",
+    flush_service_accesses,
+    interval=settings.SERVICE_ACCESS_FLUSH_INTERVAL,
+    run_once_per_cluster=False,
+)
+# The connection is checked in every app instance, since every instance has its own connection
+register_scheduled_job(
+    "check_deployment_platform_health",
+    check_deployment_platform_health,
+    interval=settings.DEPLOYMENT_PLATFORM_HEALTH_CHECK_INTERVAL,
+    run_once_per_cluster=False,
+)
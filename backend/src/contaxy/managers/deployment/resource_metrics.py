@@ -0,0 +1,371 @@
+"""Resource usage of the deployments that is sampled in the background and kept in memory."""
+
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import docker.errors
+import docker.models.containers
+from docker import DockerClient
+from kubernetes.utils import parse_quantity
+from loguru import logger
+
+from contaxy.config import settings
+from contaxy.managers.deployment.utils import Labels, get_label_string
+from contaxy.schema.deployment import ResourceUsageSample
+
+# (project_id, deployment_id)
+DeploymentKey = Tuple[str, str]
+
+
+def downsample(
+    samples: List[ResourceUsageSample], max_samples: int
+) -> List[ResourceUsageSample]:
+    """Averages the samples into equally sized buckets, so that at most `max_samples` samples are returned.
+
+    Every bucket is represented by the time of its last sample. Values that are not set
+    in any sample of the bucket are also not set in the averaged sample.
+    """
+    if max_samples <= 0 or len(samples) <= max_samples:
+        return samples
+    bucket_size = math.ceil(len(samples) / max_samples)
+    return [
+        _average(samples[bucket_start : bucket_start + bucket_size])
+        for bucket_start in range(0, len(samples), bucket_size)
+    ]
+
+
+def _average(samples: List[ResourceUsageSample]) -> ResourceUsageSample:
+    def average_of(field: str) -> Optional[float]:
+        values = [
+            getattr(sample, field)
+            for sample in samples
+            if getattr(sample, field) is not None
+        ]
+        return sum(values) / len(values) if values else None
+
+    return ResourceUsageSample(
+        timestamp=samples[-1].timestamp,
+        cpu_usage=average_of("cpu_usage"),
+        memory_usage=average_of("memory_usage"),
+        network_receive_rate=average_of("network_receive_rate"),
+        network_transmit_rate=average_of("network_transmit_rate"),
+    )
+
+
+class ResourceMetricsCollector(ABC):
+    """Samples the resource usage of all deployments in a background thread.
+
+    The samples are kept in a ring buffer per deployment, so that the memory is bounded
+    by the number of deployments. The history of a deployment is dropped once it is not
+    running anymore. Subclasses implement `_sample()` for a deployment platform.
+    """
+
+    _thread_name = "resource-metrics-collector"
+
+    def __init__(
+        self,
+        interval: timedelta = timedelta(seconds=15),
+        max_samples: int = 240,
+    ):
+        """Initializes the collector. The collection is started via `start()`.
+
+        Args:
+            interval: Interval in which the resource usage is sampled.
+            max_samples: Number of samples that are kept per deployment.
+        """
+        self._interval = interval
+        self._max_samples = max_samples
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._samples: Dict[DeploymentKey, Deque[ResourceUsageSample]] = {}
+        # Only the first of consecutive failures is logged as warning
+        self._failing = False
+
+    def start(self) -> None:
+        """Starts the collection in a background thread."""
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name=self._thread_name, daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops the collection. The collected samples are kept."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+
+    def get_samples(
+        self,
+        project_id: str,
+        deployment_id: str,
+        since: Optional[datetime] = None,
+    ) -> List[ResourceUsageSample]:
+        """Returns the collected samples of the deployment in chronological order."""
+        with self._lock:
+            samples = list(self._samples.get((project_id, deployment_id), []))
+        if since is not None:
+            samples = [sample for sample in samples if sample.timestamp > since]
+        return samples
+
+    def collect(self) -> None:
+        """Samples the resource usage of all running deployments once."""
+        samples = self._sample()
+        with self._lock:
+            for deployment_key, sample in samples.items():
+                if sample is None:
+                    continue
+                if deployment_key not in self._samples:
+                    self._samples[deployment_key] = deque(maxlen=self._max_samples)
+                self._samples[deployment_key].append(sample)
+            for deployment_key in list(self._samples):
+                if deployment_key not in samples:
+                    del self._samples[deployment_key]
+
+    @abstractmethod
+    def _sample(self) -> Dict[DeploymentKey, Optional[ResourceUsageSample]]:
+        """Returns the current resource usage of all running deployments.
+
+        Deployments that are running, but could not be sampled, are mapped to `None`.
+        """
+        pass
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                self.collect()
+                self._failing = False
+            except Exception as e:
+                if self._failing:
+                    logger.debug(f"Could not collect the resource usage: {e}")
+                else:
+                    logger.warning(f"Could not collect the resource usage: {e}")
+                self._failing = True
+            self._stopped.wait(self._interval.total_seconds())
+
+
+@dataclass
+class _ContainerCounters:
+    """Cumulative counters of a container that are used to compute the rates of the next sample."""
+
+    read_at: float
+    cpu_time: Optional[float]
+    network_received: Optional[float]
+    network_transmitted: Optional[float]
+
+
+class DockerResourceMetricsCollector(ResourceMetricsCollector):
+    """Samples the resource usage of all running contaxy containers via the Docker stats API.
+
+    Every container is read once per interval in one-shot mode instead of keeping a stats
+    stream (connection and thread) open per container. The CPU usage and network rates
+    are computed from the cumulative counters of two consecutive samples.
+    """
+
+    _thread_name = "docker-resource-metrics"
+
+    def __init__(
+        self,
+        client: DockerClient,
+        interval: timedelta = timedelta(seconds=15),
+        max_samples: int = 240,
+        max_workers: int = 10,
+    ):
+        """Initializes the collector. The collection is started via `start()`.
+
+        Args:
+            client: Docker client used to list the containers and to read their stats.
+            interval: Interval in which the resource usage is sampled.
+            max_samples: Number of samples that are kept per deployment.
+            max_workers: Number of containers whose stats are read in parallel.
+        """
+        super().__init__(interval, max_samples)
+        self._client = client
+        self._max_workers = max_workers
+        self._namespace_label = get_label_string(
+            Labels.NAMESPACE.value, settings.SYSTEM_NAMESPACE
+        )
+        # container_id -> counters of the previous sample
+        self._counters: Dict[str, _ContainerCounters] = {}
+
+    def _sample(self) -> Dict[DeploymentKey, Optional[ResourceUsageSample]]:
+        # Only running containers are listed
+        containers = self._client.containers.list(
+            filters={"label": [self._namespace_label]}
+        )
+        with ThreadPoolExecutor(
+            max_workers=self._max_workers,
+            thread_name_prefix="contaxy-metrics",
+        ) as executor:
+            stats = list(executor.map(self._read_stats, containers))
+
+        samples: Dict[DeploymentKey, Optional[ResourceUsageSample]] = {}
+        counters: Dict[str, _ContainerCounters] = {}
+        for container, container_stats in zip(containers, stats):
+            deployment_key = (
+                container.labels.get(Labels.PROJECT_NAME.value, ""),
+                container.labels.get(Labels.DEPLOYMENT_ID.value, ""),
+            )
+            if container_stats is None:
+                samples[deployment_key] = None
+                continue
+            read_at, stats_dict = container_stats
+            counters[container.id] = _get_container_counters(read_at, stats_dict)
+            samples[deployment_key] = _create_docker_sample(
+                stats_dict,
+                counters[container.id],
+                self._counters.get(container.id),
+            )
+        # Counters of removed containers are dropped
+        self._counters = counters
+        return samples
+
+    def _read_stats(
+        self, container: docker.models.containers.Container
+    ) -> Optional[Tuple[float, dict]]:
+        try:
+            stats = self._client.api.stats(container.id, stream=False, one_shot=True)
+            return time.monotonic(), stats
+        except docker.errors.APIError as e:
+            logger.debug(f"Could not read the stats of container {container.name}: {e}")
+            return None
+
+
+def _get_container_counters(read_at: float, stats: dict) -> _ContainerCounters:
+    cpu_time = ((stats.get("cpu_stats") or {}).get("cpu_usage") or {}).get(
+        "total_usage"
+    )
+    networks = stats.get("networks")
+    return _ContainerCounters(
+        read_at=read_at,
+        # Nanoseconds to seconds
+        cpu_time=cpu_time / 1e9 if cpu_time is not None else None,
+        network_received=sum(
+            network.get("rx_bytes", 0) for network in networks.values()
+        )
+        if networks
+        else None,
+        network_transmitted=sum(
+            network.get("tx_bytes", 0) for network in networks.values()
+        )
+        if networks
+        else None,
+    )
+
+
+def _create_docker_sample(
+    stats: dict,
+    counters: _ContainerCounters,
+    previous_counters: Optional[_ContainerCounters],
+) -> ResourceUsageSample:
+    def get_rate(field: str) -> Optional[float]:
+        if previous_counters is None:
+            return None
+        value = getattr(counters, field)
+        previous_value = getattr(previous_counters, field)
+        elapsed_seconds = counters.read_at - previous_counters.read_at
+        if value is None or previous_value is None or elapsed_seconds <= 0:
+            return None
+        if value < previous_value:
+            # The counters are reset when the container is restarted
+            return None
+        return (value - previous_value) / elapsed_seconds
+
+    return ResourceUsageSample(
+        timestamp=datetime.now(timezone.utc),
+        cpu_usage=get_rate("cpu_time"),
+        memory_usage=_get_docker_memory_usage(stats.get("memory_stats") or {}),
+        network_receive_rate=get_rate("network_received"),
+        network_transmit_rate=get_rate("network_transmitted"),
+    )
+
+
+def _get_docker_memory_usage(memory_stats: dict) -> Optional[float]:
+    """Returns the used memory in Megabyte without the page cache, like `docker stats`."""
+    usage = memory_stats.get("usage")
+    if usage is None:
+        return None
+    detailed_stats = memory_stats.get("stats") or {}
+    # cgroup v1 reports `total_inactive_file`, cgroup v2 `inactive_file`
+    inactive_file = detailed_stats.get(
+        "total_inactive_file", detailed_stats.get("inactive_file", 0)
+    )
+    if inactive_file < usage:
+        usage -= inactive_file
+    return usage / 1024 / 1024
+
+
+class KubernetesResourceMetricsCollector(ResourceMetricsCollector):
+    """Samples the resource usage of all contaxy pods via the Kubernetes metrics API.
+
+    The metrics API (provided by the metrics-server) reports the CPU and memory usage of
+    all pods of the namespace with a single request. Network usage is not reported.
+    """
+
+    _thread_name = "kube-resource-metrics"
+
+    def __init__(
+        self,
+        custom_objects_api: Any,
+        kube_namespace: str,
+        interval: timedelta = timedelta(seconds=15),
+        max_samples: int = 240,
+    ):
+        """Initializes the collector. The collection is started via `start()`.
+
+        Args:
+            custom_objects_api: Kubernetes `CustomObjectsApi` used to read the pod metrics.
+            kube_namespace: Namespace of the contaxy pods.
+            interval: Interval in which the resource usage is sampled.
+            max_samples: Number of samples that are kept per deployment.
+        """
+        super().__init__(interval, max_samples)
+        self._custom_objects_api = custom_objects_api
+        self._kube_namespace = kube_namespace
+
+    def _sample(self) -> Dict[DeploymentKey, Optional[ResourceUsageSample]]:
+        pod_metrics = self._custom_objects_api.list_namespaced_custom_object(
+            group="metrics.k8s.io",
+            version="v1beta1",
+            namespace=self._kube_namespace,
+            plural="pods",
+            label_selector=get_label_string(
+                Labels.NAMESPACE.value, settings.SYSTEM_NAMESPACE
+            ),
+        )
+        timestamp = datetime.now(timezone.utc)
+        samples: Dict[DeploymentKey, Optional[ResourceUsageSample]] = {}
+        for pod in pod_metrics.get("items", []):
+            labels = (pod.get("metadata") or {}).get("labels") or {}
+            deployment_key = (
+                labels.get(Labels.PROJECT_NAME.value, ""),
+                labels.get(Labels.DEPLOYMENT_ID.value, ""),
+            )
+            cpu_usage = 0.0
+            memory_usage = 0.0
+            for container in pod.get("containers", []):
+                usage = container.get("usage") or {}
+                cpu_usage += float(parse_quantity(usage.get("cpu", "0")))
+                memory_usage += float(parse_quantity(usage.get("memory", "0")))
+            sample = samples.get(deployment_key)
+            if sample is not None:
+                # The usage of all replicas is summed up
+                cpu_usage += sample.cpu_usage or 0
+                memory_usage += (sample.memory_usage or 0) * 1024 * 1024
+            samples[deployment_key] = ResourceUsageSample(
+                timestamp=timestamp,
+                cpu_usage=cpu_usage,
+                memory_usage=memory_usage / 1024 / 1024,
+            )
+        return samples
@@ -0,0 +1,156 @@
+"""Accesses of services that are aggregated in memory and written to the DB in batches."""
+
+import fcntl
+import os
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from loguru import logger
+
+from contaxy.utils.state_utils import GlobalState
+
+# (project_id, service_id)
+ServiceKey = Tuple[str, str]
+
+_recorder_lock = threading.Lock()
+
+
+@dataclass
+class ServiceAccess:
+    access_time: datetime
+    # `None` if the user is unknown, e.g. for accesses read from the access log
+    user: Optional[str] = None
+
+
+class ServiceAccessRecorder:
+    """Keeps the latest access of every service of the process in memory until it is written to the DB.
+
+    Recording an access is a dictionary update, so that service requests and session tokens do not
+    cause a DB write. The accesses are written by the `flush_service_accesses` background job.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._accesses: Dict[ServiceKey, ServiceAccess] = {}
+
+    def record(
+        self,
+        project_id: str,
+        service_id: str,
+        access_time: Optional[datetime] = None,
+        user: Optional[str] = None,
+    ) -> None:
+        """Records an access of the service. Earlier accesses than the recorded one are ignored."""
+        access = ServiceAccess(access_time or datetime.now(timezone.utc), user)
+        service_key = (project_id, service_id)
+        with self._lock:
+            recorded_access = self._accesses.get(service_key)
+            if recorded_access is None or recorded_access.access_time < (
+                access.access_time
+            ):
+                if access.user is None and recorded_access is not None:
+                    access.user = recorded_access.user
+                self._accesses[service_key] = access
+
+    def pop_all(self) -> Dict[ServiceKey, ServiceAccess]:
+        """Returns and removes all recorded accesses."""
+        with self._lock:
+            accesses = self._accesses
+            self._accesses = {}
+        return accesses
+
+
+def get_service_access_recorder(global_state: GlobalState) -> ServiceAccessRecorder:
+    """Returns the access recorder of the process."""
+    state_namespace = global_state[ServiceAccessRecorder]
+    recorder = state_namespace.recorder
+    if recorder is not None:
+        return recorder
+    with _recorder_lock:
+        if state_namespace.recorder is None:
+            state_namespace.recorder = ServiceAccessRecorder()
+        return state_namespace.recorder
+
+
+def parse_access_log_line(line: str) -> Optional[Tuple[ServiceKey, datetime]]:
+    """Parses a line of the service access log in the format `<msec> <project_id> <service_id>`.
+
+    Returns:
+        Optional[Tuple[ServiceKey, datetime]]: The service and the time of the access or `None` if the line is invalid.
+    """
+    fields = line.split()
+    if len(fields) != 3:
+        return None
+    try:
+        access_time = datetime.fromtimestamp(float(fields[0]), timezone.utc)
+    except ValueError:
+        return None
+    return (fields[1], fields[2]), access_time
+
+
+class AccessLogReader:
+    """Reads the service accesses that were appended to the access log of the proxy since the last read.
+
+    The log is shared by all app instances of the container. Therefore, the read position is
+    stored next to the log and reads are serialized via a file lock, so that every line is read
+    by exactly one app instance. If another app instance currently reads the log, nothing is read.
+    """
+
+    def __init__(self, log_path: str):
+        self._log_path = log_path
+        self._lock_path = log_path + ".lock"
+        self._position_path = log_path + ".position"
+
+    def read(self) -> Dict[ServiceKey, datetime]:
+        """Returns the latest access of every service that was logged since the last read."""
+        if not os.path.exists(self._log_path):
+            return {}
+        with open(self._lock_path, "a") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return {}
+            try:
+                return self._read_new_lines()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_new_lines(self) -> Dict[ServiceKey, datetime]:
+        accesses: Dict[ServiceKey, datetime] = {}
+        with open(self._log_path, "rb") as log_file:
+            log_stat = os.fstat(log_file.fileno())
+            inode, position = self._read_position()
+            if inode != log_stat.st_ino or position > log_stat.st_size:
+                # The log was rotated or truncated
+                position = 0
+            log_file.seek(position)
+            for line in log_file:
+                if not line.endswith(b"\n"):
+                    # The line is still written and read again next time
+                    break
+                position += len(line)
+                access = parse_access_log_line(line.decode("utf-8", errors="replace"))
+                if access is None:
+                    continue
+                service_key, access_time = access
+                if service_key not in accesses or accesses[service_key] < access_time:
+                    accesses[service_key] = access_time
+        self._write_position(log_stat.st_ino, position)
+        return accesses
+
+    def _read_position(self) -> Tuple[int, int]:
+        try:
+            with open(self._position_path, "r") as position_file:
+                inode, position = position_file.read().split()
+                return int(inode), int(position)
+        except (OSError, ValueError):
+            return 0, 0
+
+    def _write_position(self, inode: int, position: int) -> None:
+        try:
+            with open(self._position_path, "w") as position_file:
+                position_file.write(f"{inode} {position}")
+        except OSError as e:
+            logger.warning(f"Could not store the read position of the access log: {e}")
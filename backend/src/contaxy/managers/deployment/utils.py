@@ -1,15 +1,12 @@
 import string
 import subprocess
 import time
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 from enum import Enum
 from typing import Any, Dict, List, Optional, Tuple, Type, TypeVar
 
-from loguru import logger
-
 from contaxy.config import settings
 from contaxy.operations import AuthOperations, SystemOperations
-from contaxy.operations.components import ComponentOperations
 from contaxy.schema import (
     AccessLevel,
     ClientValueError,
@@ -21,7 +18,6 @@ from contaxy.schema.deployment import (
     Deployment,
     DeploymentCompute,
     DeploymentInput,
-    DeploymentStatus,
     DeploymentType,
     Job,
     Service,
@@ -31,6 +27,15 @@ from contaxy.utils.auth_utils import parse_userid_from_resource_name
 
 DEFAULT_DEPLOYMENT_ACTION_ID = "default"
 NO_LOGS_MESSAGE = "No logs available."
+# Service fields that are only stored in the DB and are not part of the deployed container
+SERVICE_DB_ONLY_FIELDS = {
+    "idle_timeout",
+    "clear_volume_on_stop",
+    "graphql_endpoint",
+    "openapi_endpoint",
+    "health_endpoint",
+    "is_stopped",
+}
 
 _MAX_DEPLOYMENT_NAME_LENGTH = 15
 
@@ -74,35 +79,6 @@ class MappedLabels:
     created_by: Optional[str] = None
 
 
-# This function is registered in api/api.py to run in regular intervals
-def stop_idle_services(component_manager: ComponentOperations) -> None:
-    project_manager = component_manager.get_project_manager()
-    service_manager = component_manager.get_service_manager()
-    idle_services = [
-        (project.id, service)
-        for project in project_manager.list_projects()
-        for service in service_manager.list_services(project.id)
-        # Only check running services
-        if service.status == DeploymentStatus.RUNNING
-        # If idle timeout is not set or 0, the service should never be stopped automatically
-        if service.idle_timeout is not None and service.idle_timeout != timedelta(0)
-        # Last access time must be set to compute idle time
-        if service.last_access_time is not None
-        # Check if time last access time is longer ago than idle timeout
-        if datetime.now(timezone.utc) - service.last_access_time > service.idle_timeout
-    ]
-    for project_id, service in idle_services:
-        logger.info(
-            f"Stopping idle service {service.display_name}(id: {service.id}) with last "
-            f"access time {service.last_access_time} and idle timeout {service.idle_timeout}."
-        )
-        service_manager.execute_service_action(
-            project_id,
-            service.id,
-            action_id="stop",
-        )
-
-
 def get_service_collection_id(project_id: str) -> str:
     return f"project_{project_id}_service_metadata"
 
@@ -122,14 +98,18 @@ def create_deployment_config(
     system_manager: SystemOperations,
     auth_manager: AuthOperations,
     deployment_class: Type[DeploymentClass],
+    check_allowed_image: bool = True,
 ) -> DeploymentClass:
     # Check if display name is set
     if deployment_input.display_name is None:
         raise ClientValueError(message="Service display_name not defined!")
 
-    # Check if image is allowed
-    image_name, image_tag = split_image_name_and_tag(deployment_input.container_image)
-    system_manager.check_allowed_image(image_name, image_tag)
+    # Check if image is allowed (batch deployments check every image only once beforehand)
+    if check_allowed_image:
+        image_name, image_tag = split_image_name_and_tag(
+            deployment_input.container_image
+        )
+        system_manager.check_allowed_image(image_name, image_tag)
 
     deployment_id = get_deployment_id(
         project_id,
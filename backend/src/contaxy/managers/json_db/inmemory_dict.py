@@ -1,11 +1,16 @@
 import json
+import threading
 from datetime import datetime, timezone
 from typing import Dict, List, Optional
 
 import json_merge_patch
 
 from contaxy.operations import JsonDocumentOperations
-from contaxy.schema.exceptions import ResourceAlreadyExistsError, ResourceNotFoundError
+from contaxy.schema.exceptions import (
+    PreconditionFailedError,
+    ResourceAlreadyExistsError,
+    ResourceNotFoundError,
+)
 from contaxy.schema.json_db import JsonDocument
 from contaxy.utils.state_utils import GlobalState, RequestState
 
@@ -26,6 +31,14 @@ class InMemoryDictJsonDocumentManager(JsonDocumentOperations):
         self._request_state = request_state
         self._dict_db: Optional[Dict] = None
 
+    @property
+    def _lock(self) -> threading.Lock:
+        # Guards the read-modify-write sequences to make conditional writes atomic
+        state_namespace = self._global_state[InMemoryDictJsonDocumentManager]
+        if not state_namespace.lock:
+            state_namespace.lock = threading.Lock()
+        return state_namespace.lock
+
     def _get_collection(self, project_id: str, collection_id: str) -> Dict:
         """Lazyloads the specified collection.
 
@@ -59,6 +72,7 @@ class InMemoryDictJsonDocumentManager(JsonDocumentOperations):
         key: str,
         json_document: str,
         upsert: bool = True,
+        expected_version: Optional[int] = None,
     ) -> JsonDocument:
         """Creates a JSON document for a given key.
 
@@ -70,32 +84,92 @@ class InMemoryDictJsonDocumentManager(JsonDocumentOperations):
             key: Key of the JSON document.
             json_document: The actual JSON document value.
             upsert: If `True`, the document will be updated/overwritten if it already exists.
+            expected_version (optional): Only overwrite the existing document if it has this version.
+
+        Raises:
+            ResourceAlreadyExistsError: If a document already exists for the given key and `upsert` is False.
+            PreconditionFailedError: If the document does not exist or has a different version than `expected_version`.
 
         Returns:
             JsonDocument: The created JSON document.
         """
         collection = self._get_collection(project_id, collection_id)
 
-        if not upsert and key in collection:
-            raise ResourceAlreadyExistsError(
-                "A document with the key {key} already exists."
+        with self._lock:
+            if not upsert and key in collection:
+                raise ResourceAlreadyExistsError(
+                    "A document with the key {key} already exists."
+                )
+
+            current_version = collection[key]["version"] if key in collection else 0
+            if expected_version is not None and (
+                key not in collection or current_version != expected_version
+            ):
+                raise PreconditionFailedError(
+                    f"The json document {key} does not exist in version {expected_version}."
+                )
+
+            created_document = JsonDocument(
+                key=key,
+                json_value=json_document,
+                version=current_version + 1,
+                created_at=datetime.now(timezone.utc),
+                updated_at=datetime.now(timezone.utc),
             )
-
-        created_document = JsonDocument(
-            key=key,
-            json_value=json_document,
-            created_at=datetime.now(timezone.utc),
-            updated_at=datetime.now(timezone.utc),
-        )
-        collection[key] = created_document.dict()
+            collection[key] = created_document.dict()
         return created_document
 
+    def create_json_documents(
+        self,
+        project_id: str,
+        collection_id: str,
+        json_documents: Dict[str, str],
+        upsert: bool = True,
+    ) -> List[JsonDocument]:
+        """Creates multiple JSON documents. Either all documents are created or none of them.
+
+        Args:
+            project_id: Project ID associated with the collection.
+            collection_id: ID of the collection (database) to use to store the JSON documents.
+            json_documents: The actual JSON document values by key.
+            upsert: If `True`, existing documents will be updated/overwritten.
+
+        Raises:
+            ResourceAlreadyExistsError: If a document already exists for one of the keys and `upsert` is False.
+
+        Returns:
+            List[JsonDocument]: The created JSON documents.
+        """
+        collection = self._get_collection(project_id, collection_id)
+
+        with self._lock:
+            if not upsert:
+                for key in json_documents:
+                    if key in collection:
+                        raise ResourceAlreadyExistsError(
+                            f"A document with the key {key} already exists."
+                        )
+
+            created_documents = []
+            for key, json_document in json_documents.items():
+                created_document = JsonDocument(
+                    key=key,
+                    json_value=json_document,
+                    version=collection[key]["version"] + 1 if key in collection else 1,
+                    created_at=datetime.now(timezone.utc),
+                    updated_at=datetime.now(timezone.utc),
+                )
+                collection[key] = created_document.dict()
+                created_documents.append(created_document)
+        return created_documents
+
     def update_json_document(
         self,
         project_id: str,
         collection_id: str,
         key: str,
         json_document: str,
+        expected_version: Optional[int] = None,
     ) -> JsonDocument:
         """Updates a JSON document.
 
@@ -106,24 +180,35 @@ class InMemoryDictJsonDocumentManager(JsonDocumentOperations):
             collection_id: ID of the collection (database) that the JSON document is stored in.
             key: Key of the JSON document.
             json_document: The actual JSON document value.
+            expected_version (optional): Only apply the update if the document has this version.
 
         Raises:
             ResourceNotFoundError: If no JSON document is found with the given `key`.
+            PreconditionFailedError: If the document has a different version than `expected_version`.
 
         Returns:
             JsonDocument: The updated JSON document.
         """
         collection = self._get_collection(project_id, collection_id)
 
-        current_document = self.get_json_document(project_id, collection_id, key)
-
-        updated_json = json_merge_patch.merge(
-            json.loads(current_document.json_value), json.loads(json_document)
-        )
+        with self._lock:
+            current_document = self.get_json_document(project_id, collection_id, key)
+            if (
+                expected_version is not None
+                and current_document.version != expected_version
+            ):
+                raise PreconditionFailedError(
+                    f"Update failed - The document {key} has version {current_document.version} (expected {expected_version})"
+                )
+
+            updated_json = json_merge_patch.merge(
+                json.loads(current_document.json_value), json.loads(json_document)
+            )
 
-        current_document.json_value = json.dumps(updated_json)
-        current_document.updated_at = datetime.now(timezone.utc)
-        collection[key] = current_document.dict()
+            current_document.json_value = json.dumps(updated_json)
+            current_document.version = (current_document.version or 0) + 1
+            current_document.updated_at = datetime.now(timezone.utc)
+            collection[key] = current_document.dict()
 
         return self.get_json_document(project_id, collection_id, key)
 
@@ -145,11 +230,11 @@ class InMemoryDictJsonDocumentManager(JsonDocumentOperations):
         Returns:
             List[JsonDocument]: List of JSON documents.
         """
-        # TODO: support keys parameter
         collection = self._get_collection(project_id, collection_id)
         documents: List[JsonDocument] = []
-        for doc_key in collection.keys():
-            documents.append(JsonDocument(**collection[doc_key]))
+        for doc_key in collection.keys() if keys is None else keys:
+            if doc_key in collection:
+                documents.append(JsonDocument(**collection[doc_key]))
 
         if filter:
             # TODO: filter currently not working since json path of postgres is different than the impl below
@@ -168,6 +253,29 @@ class InMemoryDictJsonDocumentManager(JsonDocumentOperations):
 
         return documents
 
+    def list_json_documents_by_keys(
+        self,
+        project_id: str,
+        keys_by_collection: Dict[str, List[str]],
+    ) -> Dict[str, List[JsonDocument]]:
+        """Returns the JSON documents with the given keys from multiple collections of a project.
+
+        Collections that do not exist and keys without a document are skipped.
+
+        Args:
+            project_id: Project ID associated with the collections.
+            keys_by_collection: The keys of the requested JSON documents by collection ID.
+
+        Returns:
+            Dict[str, List[JsonDocument]]: The found JSON documents by collection ID.
+        """
+        return {
+            collection_id: self.list_json_documents(
+                project_id, collection_id, keys=keys
+            )
+            for collection_id, keys in keys_by_collection.items()
+        }
+
     def get_json_document(
         self,
         project_id: str,
@@ -220,6 +328,32 @@ class InMemoryDictJsonDocumentManager(JsonDocumentOperations):
             )
         del collection[key]
 
+    def delete_documents(
+        self,
+        project_id: str,
+        collection_id: str,
+        keys: List[str],
+    ) -> int:
+        """Deletes multiple JSON documents by key.
+
+        Keys without a document are skipped.
+
+        Args:
+            project_id: Project ID associated with the collection.
+            collection_id: ID of the collection (database) that the JSON documents are stored in.
+            keys: Keys of the JSON documents.
+
+        Returns:
+            int: The number of deleted documents.
+        """
+        collection = self._get_collection(project_id, collection_id)
+        deleted_documents = 0
+        with self._lock:
+            for key in keys:
+                if collection.pop(key, None) is not None:
+                    deleted_documents += 1
+        return deleted_documents
+
     def delete_json_collection(
         self,
         project_id: str,
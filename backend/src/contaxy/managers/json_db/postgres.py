@@ -1,33 +1,53 @@
 import json
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set
 
 import json_merge_patch
-from loguru import logger
-from sqlalchemy import Column, DateTime, MetaData, Table, func, text
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    Table,
+    column,
+    func,
+    literal,
+    select,
+    table,
+    text,
+    union_all,
+)
 from sqlalchemy.dialects import postgresql
 from sqlalchemy.engine import Row
-from sqlalchemy.exc import (
-    IntegrityError,
-    NoResultFound,
-    OperationalError,
-    ProgrammingError,
-)
-from sqlalchemy.future import Engine, create_engine
+from sqlalchemy.exc import IntegrityError, NoResultFound, ProgrammingError
+from sqlalchemy.future import Engine
+from sqlalchemy.sql.expression import TableClause
 
 from contaxy.operations import JsonDocumentOperations
 from contaxy.schema.exceptions import (
     ClientValueError,
+    PreconditionFailedError,
     ResourceAlreadyExistsError,
     ResourceNotFoundError,
     ServerBaseError,
 )
 from contaxy.schema.json_db import JsonDocument
-from contaxy.utils.postgres_utils import create_schema
+from contaxy.utils.postgres_utils import create_schema, get_db_engine
+from contaxy.utils.prometheus_utils import time_json_db_operation
 from contaxy.utils.state_utils import GlobalState, RequestState
 
 
 class PostgresJsonDocumentManager(JsonDocumentOperations):
+    _DOCUMENT_COLUMNS = (
+        "key",
+        "json_value",
+        "version",
+        "created_at",
+        "created_by",
+        "updated_at",
+        "updated_by",
+    )
+
     def __init__(
         self,
         global_state: GlobalState,
@@ -44,6 +64,7 @@ class PostgresJsonDocumentManager(JsonDocumentOperations):
         self._engine = self._create_db_engine()
         self._metadata = MetaData()
 
+    @time_json_db_operation
     def create_json_document(
         self,
         project_id: str,
@@ -51,21 +72,26 @@ class PostgresJsonDocumentManager(JsonDocumentOperations):
         key: str,
         json_document: str,
         upsert: bool = True,
+        expected_version: Optional[int] = None,
     ) -> JsonDocument:
         """Creates a json document for a given key.
 
         An upsert strategy is used, i.e. if a document already exists for the given key it will be overwritten. The project is equivalent to the DB schema and the collection to a DB table inside the respective DB schema. Schema as well as table will be lazily created.
 
+        If `expected_version` is provided, the existing document is only overwritten if the version column still matches (compare-and-swap).
+
         Args:
             project_id (str): Project Id, i.e. DB schema.
             collection_id (str): Json document collection Id, i.e. DB table.
             key (str): Json Document Id, i.e. DB row key.
             json_document (Dict): The actual Json document.
             upsert (bool): Indicates, wheter upsert strategy is used.
+            expected_version (Optional[int]): Only overwrite the document if it has this version.
 
         Raises:
             ClientValueError: If the given json_document does not contain valid json.
             ResourceAlreadyExistsError: If a document already exists for the given key and `upsert` is False.
+            PreconditionFailedError: If the document does not exist or has a different version than `expected_version`.
 
         Returns:
             JsonDocument: The created Json document.
@@ -77,9 +103,29 @@ class PostgresJsonDocumentManager(JsonDocumentOperations):
 
         table = self._get_collection_table(project_id, collection_id)
 
+        if expected_version is not None:
+            replace_statement = (
+                table.update()
+                .where(table.c.key == key, table.c.version == expected_version)
+                .values(
+                    **self._add_metadata_for_update(
+                        {"json_value": json_dict, "version": table.c.version + 1}
+                    )
+                )
+            )
+            with self._engine.begin() as conn:
+                result = conn.execute(replace_statement)
+                if result.rowcount == 0:
+                    raise PreconditionFailedError(
+                        f"The Json document {key} does not exist in version {expected_version}."
+                    )
+                conn.commit()
+            return self.get_json_document(project_id, collection_id, key)
+
         insert_data = {"key": key, "json_value": json_dict}
         insert_data = self._add_metadata_for_insert(insert_data)
         upsert_data = self._add_metadata_for_update(insert_data)
+        upsert_data["version"] = table.c.version + 1
 
         stmt = postgresql.insert(table).values(**insert_data)
         if upsert:
@@ -100,6 +146,69 @@ class PostgresJsonDocumentManager(JsonDocumentOperations):
 
         return self.get_json_document(project_id, collection_id, key)
 
+    @time_json_db_operation
+    def create_json_documents(
+        self,
+        project_id: str,
+        collection_id: str,
+        json_documents: Dict[str, str],
+        upsert: bool = True,
+    ) -> List[JsonDocument]:
+        """Creates multiple Json documents with a single insert statement.
+
+        Either all documents are created or none of them.
+
+        Args:
+            project_id (str): Project Id, i.e. DB schema.
+            collection_id (str): Json document collection Id, i.e. DB table.
+            json_documents (Dict[str, str]): The actual Json documents by DB row key.
+            upsert (bool): Indicates, wheter upsert strategy is used.
+
+        Raises:
+            ClientValueError: If one of the given documents does not contain valid json.
+            ResourceAlreadyExistsError: If a document already exists for one of the keys and `upsert` is False.
+
+        Returns:
+            List[JsonDocument]: The created Json documents.
+        """
+        if not json_documents:
+            return []
+        insert_rows = []
+        for key, json_document in json_documents.items():
+            try:
+                json_dict = json.loads(json_document)
+            except json.decoder.JSONDecodeError:
+                raise ClientValueError(f"Invalid Json provided for key {key}")
+            insert_rows.append(
+                self._add_metadata_for_insert({"key": key, "json_value": json_dict})
+            )
+
+        table = self._get_collection_table(project_id, collection_id)
+        stmt = postgresql.insert(table).values(insert_rows)
+        if upsert:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["key"],
+                set_={
+                    "json_value": stmt.excluded.json_value,
+                    "updated_at": stmt.excluded.updated_at,
+                    "version": table.c.version + 1,
+                },
+            )
+
+        with self._engine.begin() as conn:
+            try:
+                conn.execute(stmt)
+                conn.commit()
+            except IntegrityError:
+                raise ResourceAlreadyExistsError(
+                    "A Json document for one of the keys already exists."
+                )
+
+        return self.list_json_documents(
+            project_id, collection_id, keys=list(json_documents)
+        )
+
+    @time_json_db_operation
     def get_json_document(
         self, project_id: str, collection_id: str, key: str
     ) -> JsonDocument:
@@ -129,12 +238,14 @@ class PostgresJsonDocumentManager(JsonDocumentOperations):
                 raise ResourceNotFoundError(f"No document with key {key} found")
         return self._map_db_row_to_document_model(row)
 
+    @time_json_db_operation
     def update_json_document(
         self,
         project_id: str,
         collection_id: str,
         key: str,
         json_document: str,
+        expected_version: Optional[int] = None,
     ) -> JsonDocument:
         """Updates a Json document via Json Merge Patch strategy.
 
@@ -145,9 +256,11 @@ class PostgresJsonDocumentManager(JsonDocumentOperations):
             collection_id (str): Json document collection Id, i.e. DB table.
             key (str): Json Document Id, i.e. DB row key.
             json_document (Dict): The actual Json document.
+            expected_version (Optional[int]): Only apply the update if the document has this version.
 
         Raises:
             ResourceNotFoundError: If no JSON document is found with the given `key`.
+            PreconditionFailedError: If the document has a different version than `expected_version`.
             ServerBaseError: Document not updatded for an unknown reason.
 
         Returns:
@@ -168,6 +281,12 @@ class PostgresJsonDocumentManager(JsonDocumentOperations):
                 )
             row = result.one()
 
+            if expected_version is not None and row["version"] != expected_version:
+                raise PreconditionFailedError(
+                    f"Update failed - The document {key} has version {row['version']} (expected {expected_version})"
+                )
+
+            update_data["version"] = row["version"] + 1
             update_data["json_value"] = json_merge_patch.merge(
                 # TODO: Allow passing dict directly to avoid converting a dict to json and right back to a dict here
                 row["json_value"],
@@ -185,6 +304,7 @@ class PostgresJsonDocumentManager(JsonDocumentOperations):
 
         return self.get_json_document(project_id, collection_id, key)
 
+    @time_json_db_operation
     def delete_json_document(
         self, project_id: str, collection_id: str, key: str
     ) -> None:
@@ -215,6 +335,7 @@ class PostgresJsonDocumentManager(JsonDocumentOperations):
                 )
             conn.commit()
 
+    @time_json_db_operation
     def delete_documents(
         self, project_id: str, collection_id: str, keys: List[str]
     ) -> int:
@@ -226,8 +347,9 @@ class PostgresJsonDocumentManager(JsonDocumentOperations):
             project_id (str): Project Id, i.e. DB schema.
             collection_id (str): Json document collection Id, i.e. DB table.
             keys (List[str]): Json Document Ids, i.e. DB row keys.
-            json_document (Dict): The actual Json document.
 
+        Returns:
+            int: The number of deleted documents.
         """
         table = self._get_collection_table(project_id, collection_id)
         delete_statement = table.delete().where(table.c.key.in_(keys))
@@ -237,6 +359,7 @@ class PostgresJsonDocumentManager(JsonDocumentOperations):
 
         return result.rowcount
 
+    @time_json_db_operation
     def list_json_documents(
         self,
         project_id: str,
@@ -280,6 +403,75 @@ class PostgresJsonDocumentManager(JsonDocumentOperations):
             rows = result.fetchall()
         return self._map_db_rows_to_document_models(rows)
 
+    @time_json_db_operation
+    def list_json_documents_by_keys(
+        self,
+        project_id: str,
+        keys_by_collection: Dict[str, List[str]],
+    ) -> Dict[str, List[JsonDocument]]:
+        """Returns the JSON documents with the given keys from multiple collections of a project.
+
+        The documents of all existing collections are selected with a single `UNION ALL` query. Collections that do not exist are skipped and not lazily created.
+
+        Args:
+            project_id (str): Project Id, i.e. DB schema.
+            keys_by_collection (Dict[str, List[str]]): Json Document Ids by collection Id, i.e. DB row keys by DB table.
+
+        Returns:
+            Dict[str, List[JsonDocument]]: The found Json documents by collection Id.
+        """
+        documents: Dict[str, List[JsonDocument]] = {
+            collection_id: [] for collection_id in keys_by_collection
+        }
+        requested_collections = [
+            collection_id for collection_id, keys in keys_by_collection.items() if keys
+        ]
+        if not requested_collections:
+            return documents
+
+        schema_name = self._get_schema_name(project_id)
+        with self._engine.begin() as conn:
+            existing_collections = conn.execute(
+                select(column("tablename"))
+                .select_from(table("pg_tables"))
+                .where(
+                    column("schemaname") == schema_name,
+                    column("tablename").in_(requested_collections),
+                )
+            ).scalars()
+
+            selects = []
+            collections = []
+            for collection_id in existing_collections:
+                collection = table(
+                    collection_id,
+                    *[column(column_name) for column_name in self._DOCUMENT_COLUMNS],
+                    schema=schema_name,
+                )
+                collections.append(collection)
+                selects.append(
+                    select(
+                        literal(collection_id).label("collection_id"),
+                        *collection.columns,
+                    ).where(collection.c.key.in_(keys_by_collection[collection_id]))
+                )
+        if not selects:
+            return documents
+
+        # The tables are not loaded via `_get_collection_table`, which migrates old tables
+        for collection in collections:
+            self._ensure_version_column(collection)
+        with self._engine.begin() as conn:
+            rows = conn.execute(union_all(*selects)).fetchall()
+
+        for row in rows:
+            collection_id = row.collection_id
+            documents[collection_id].append(
+                self._map_db_row_to_document_model(row, exclude={"collection_id"})
+            )
+        return documents
+
+    @time_json_db_operation
     def delete_json_collections(
         self,
         project_id: str,
@@ -297,6 +489,7 @@ class PostgresJsonDocumentManager(JsonDocumentOperations):
             conn.execute(stmt)
             conn.commit()
 
+    @time_json_db_operation
     def delete_json_collection(
         self,
         project_id: str,
@@ -339,9 +532,13 @@ class PostgresJsonDocumentManager(JsonDocumentOperations):
             docs.append(self._map_db_row_to_document_model(row))
         return docs
 
-    def _map_db_row_to_document_model(self, row: Row) -> JsonDocument:
+    def _map_db_row_to_document_model(
+        self, row: Row, exclude: Set[str] = set()
+    ) -> JsonDocument:
         data: Dict = {}
         for column_name, value in row._mapping.items():
+            if column_name in exclude:
+                continue
             if column_name == "json_value":
                 value = json.dumps(value)
             data.update({column_name: value})
@@ -354,6 +551,7 @@ class PostgresJsonDocumentManager(JsonDocumentOperations):
             self._metadata,
             Column("key", postgresql.VARCHAR, primary_key=True),
             Column("json_value", postgresql.JSONB),
+            Column("version", Integer, nullable=False, server_default=text("1")),
             Column("created_at", DateTime),
             Column("created_by", postgresql.VARCHAR),
             Column("updated_at", DateTime),
@@ -366,26 +564,39 @@ class PostgresJsonDocumentManager(JsonDocumentOperations):
             collection.create(self._engine, checkfirst=True)
         except ProgrammingError:
             create_schema(self._engine, self._get_schema_name(project_id))
-            collection.create(self._engine, checkfirst=True)
+            try:
+                collection.create(self._engine, checkfirst=True)
+            except IntegrityError:
+                # The table was created concurrently by another request
+                pass
+        except IntegrityError:
+            # The table was created concurrently by another request
+            pass
 
+        self._ensure_version_column(collection)
         return collection
 
-    def _create_db_engine(self) -> Engine:
+    def _ensure_version_column(self, collection: TableClause) -> None:
+        # Tables created before documents were versioned do not have the version column yet.
+        # The migration only needs to be checked once per table and process.
         state_namespace = self.global_state[PostgresJsonDocumentManager]
-        if not state_namespace.db_engine:
-            url = self.global_state.settings.POSTGRES_CONNECTION_URI
-            engine = create_engine(url, future=True)
-            # Test the DB connection and set to global state if succesful
-            try:
-                with engine.begin():
-                    state_namespace.db_engine = engine
-            except OperationalError as ex:
-                logger.exception("POSTGRES DB Problem")
-                raise ServerBaseError(
-                    "Postgres DB connection failed. Validate connection URI."
-                ) from ex
-            logger.info("Postgres DB Engine created")
-        return state_namespace.db_engine
+        if state_namespace.migrated_tables is None:
+            state_namespace.migrated_tables = set()
+        if collection.fullname in state_namespace.migrated_tables:
+            return
+
+        with self._engine.begin() as conn:
+            conn.execute(
+                text(
+                    f'ALTER TABLE "{collection.schema}"."{collection.name}" '
+                    "ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1"
+                )
+            )
+            conn.commit()
+        state_namespace.migrated_tables.add(collection.fullname)
+
+    def _create_db_engine(self) -> Engine:
+        return get_db_engine(self.global_state)
 
     def _get_schema_name(self, project_id: str) -> str:
         prefix = self.global_state.settings.SYSTEM_NAMESPACE
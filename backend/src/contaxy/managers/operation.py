@@ -0,0 +1,442 @@
+import asyncio
+import json
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from loguru import logger
+from pydantic import BaseModel
+from starlette.datastructures import State
+from starlette.responses import Response
+
+from contaxy import config
+from contaxy.managers.scheduler import register_scheduled_job
+from contaxy.operations import JsonDocumentOperations
+from contaxy.operations.components import ComponentOperations
+from contaxy.schema.auth import AuthorizedAccess
+from contaxy.schema.exceptions import (
+    ClientBaseError,
+    ProblemDetails,
+    ResourceNotFoundError,
+    ResourceUpdateFailedError,
+)
+from contaxy.schema.operation import Operation, OperationState
+from contaxy.utils.id_utils import generate_short_uuid
+from contaxy.utils.state_utils import RequestState
+
+OperationFunction = Callable[[ComponentOperations], Any]
+
+
+def get_operation_collection_id(project_id: str) -> str:
+    return f"project_{project_id}_operations"
+
+
+def _set_done(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class LocalOperations:
+    """Operations executed by this app instance (process) and the requests waiting for them."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # operation ID -> (project ID, operation)
+        self._operations: Dict[str, Tuple[str, Operation]] = {}
+        self._waiters: Dict[
+            str, List[Tuple[asyncio.AbstractEventLoop, "asyncio.Future[None]"]]
+        ] = {}
+
+    def add(self, project_id: str, operation: Operation) -> None:
+        with self._lock:
+            self._operations[operation.id] = (project_id, operation)
+
+    def list(self) -> List[Tuple[str, Operation]]:
+        with self._lock:
+            return list(self._operations.values())
+
+    def finish(self, operation_id: str) -> None:
+        """Removes the operation and wakes up all requests waiting for it."""
+        with self._lock:
+            self._operations.pop(operation_id, None)
+            waiters = self._waiters.pop(operation_id, [])
+        for loop, future in waiters:
+            try:
+                loop.call_soon_threadsafe(_set_done, future)
+            except RuntimeError:
+                # The event loop of the waiting request is already closed
+                pass
+
+    def add_waiter(
+        self, operation_id: str, loop: asyncio.AbstractEventLoop
+    ) -> "Optional[asyncio.Future[None]]":
+        """Returns a future that is done once the operation is finished or `None` if the operation is not executed by this app instance."""
+        with self._lock:
+            if operation_id not in self._operations:
+                return None
+            future: "asyncio.Future[None]" = loop.create_future()
+            self._waiters.setdefault(operation_id, []).append((loop, future))
+            return future
+
+    def remove_waiter(self, operation_id: str, future: "asyncio.Future[None]") -> None:
+        with self._lock:
+            waiters = self._waiters.get(operation_id, [])
+            self._waiters[operation_id] = [
+                waiter for waiter in waiters if waiter[1] is not future
+            ]
+            if not self._waiters[operation_id]:
+                del self._waiters[operation_id]
+
+
+class OperationManager:
+    """Runs long-running operations (e.g. deployments) in a background thread pool.
+
+    The state of every operation is stored in the JSON DB, so that it can be requested
+    from every app instance (process) and not only from the one executing the operation.
+    The executing app instance regularly renews the heartbeat of its operations. Pending or
+    running operations without a recent heartbeat are marked as failed, and finished
+    operations are deleted after the retention time.
+    """
+
+    _PROJECT_COLLECTION = "projects"
+    _state_lock = threading.Lock()
+
+    def __init__(self, component_manager: ComponentOperations):
+        """Initializes the operation manager.
+
+        Args:
+            component_manager: Instance of the component manager that grants access to the other managers.
+        """
+        self._global_state = component_manager.global_state
+        self._request_state = component_manager.request_state
+        self._component_manager = component_manager
+
+    @property
+    def _json_db_manager(self) -> JsonDocumentOperations:
+        return self._component_manager.get_json_db_manager()
+
+    @property
+    def _instance_id(self) -> str:
+        """Unique ID of this app instance (process) that is stored with the executed operations."""
+        state_namespace = self._global_state[OperationManager]
+        with self._state_lock:
+            if not state_namespace.instance_id:
+                state_namespace.instance_id = (
+                    f"{socket.gethostname()}-{os.getpid()}-{generate_short_uuid()}"
+                )
+        return state_namespace.instance_id
+
+    @property
+    def _local_operations(self) -> LocalOperations:
+        state_namespace = self._global_state[OperationManager]
+        with self._state_lock:
+            if not state_namespace.local_operations:
+                state_namespace.local_operations = LocalOperations()
+        return state_namespace.local_operations
+
+    @property
+    def _executor(self) -> ThreadPoolExecutor:
+        # The executor is shared by all requests of this app instance (process)
+        state_namespace = self._global_state[OperationManager]
+        with self._state_lock:
+            if not state_namespace.executor:
+                executor = ThreadPoolExecutor(
+                    max_workers=self._global_state.settings.OPERATION_EXECUTOR_MAX_WORKERS,
+                    thread_name_prefix="contaxy-operation",
+                )
+                self._global_state.register_close_callback(
+                    lambda: executor.shutdown(wait=False)
+                )
+                state_namespace.executor = executor
+        return state_namespace.executor
+
+    def start_operation(
+        self,
+        project_id: str,
+        operation_type: str,
+        resource_name: str,
+        func: OperationFunction,
+    ) -> Operation:
+        """Starts the given function as operation in the background.
+
+        The function is called with a new component manager, since the component manager
+        of the request is closed once the response is sent. The new component manager
+        is authorized with the access of the current request.
+
+        Args:
+            project_id: Project ID associated with the operation.
+            operation_type: ID of the API operation that is executed (e.g. `deploy_service`).
+            resource_name: Name of the resource that is changed by the operation.
+            func: Function that executes the operation. If it returns a pydantic model, it is stored as result of the operation.
+
+        Returns:
+            Operation: The pending operation.
+        """
+        created_at = datetime.now(timezone.utc)
+        operation = Operation(
+            id=generate_short_uuid(),
+            operation_type=operation_type,
+            resource_name=resource_name,
+            state=OperationState.PENDING,
+            created_at=created_at,
+            created_by=self._request_state.authorized_subject or None,
+            instance_id=self._instance_id,
+            heartbeat_at=created_at,
+        )
+        # The operation is updated while it is executed
+        executed_operation = operation.copy()
+        self._local_operations.add(project_id, executed_operation)
+        self._save_operation(project_id, operation)
+        self._executor.submit(
+            self._run_operation,
+            project_id,
+            executed_operation,
+            func,
+            self._request_state.authorized_access,
+        )
+        return operation
+
+    def get_operation(self, project_id: str, operation_id: str) -> Operation:
+        """Returns the operation with the given ID.
+
+        Raises:
+            ResourceNotFoundError: If the operation does not exist.
+        """
+        try:
+            operation_doc = self._json_db_manager.get_json_document(
+                config.SYSTEM_INTERNAL_PROJECT,
+                get_operation_collection_id(project_id),
+                operation_id,
+            )
+        except ResourceNotFoundError:
+            raise ResourceNotFoundError(
+                f"The operation with id {operation_id} could not be found in project {project_id}!"
+            )
+        return Operation.parse_raw(operation_doc.json_value)
+
+    def list_operations(self, project_id: str) -> List[Operation]:
+        operation_docs = self._json_db_manager.list_json_documents(
+            config.SYSTEM_INTERNAL_PROJECT, get_operation_collection_id(project_id)
+        )
+        return [
+            Operation.parse_raw(operation_doc.json_value)
+            for operation_doc in operation_docs
+        ]
+
+    def delete_operations(self, project_id: str) -> None:
+        """Deletes all operations of the project, e.g. once the project is deleted."""
+        self._json_db_manager.delete_json_collection(
+            config.SYSTEM_INTERNAL_PROJECT, get_operation_collection_id(project_id)
+        )
+
+    async def wait_for_operation(
+        self, project_id: str, operation_id: str, timeout: float
+    ) -> Operation:
+        """Waits until the operation is done without blocking a worker thread.
+
+        If the operation is executed by this app instance, the request is woken up as soon as
+        the operation is finished. Operations executed by other app instances are requested
+        from the JSON DB in the poll interval.
+
+        Returns:
+            Operation: The finished operation or the current state of the operation if the timeout expired.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        poll_interval = self._global_state.settings.OPERATION_POLL_INTERVAL
+        while True:
+            # Registered before the operation is read, so that the notification cannot be missed
+            done_future = self._local_operations.add_waiter(operation_id, loop)
+            try:
+                operation = await run_in_threadpool(
+                    self.get_operation, project_id, operation_id
+                )
+                remaining_time = deadline - loop.time()
+                if operation.is_done or remaining_time <= 0:
+                    return operation
+                if done_future is None:
+                    await asyncio.sleep(min(poll_interval, remaining_time))
+                    continue
+                try:
+                    await asyncio.wait_for(done_future, remaining_time)
+                except asyncio.TimeoutError:
+                    pass
+            finally:
+                if done_future is not None:
+                    self._local_operations.remove_waiter(operation_id, done_future)
+
+    def renew_heartbeats(self) -> None:
+        """Renews the heartbeat of all operations executed by this app instance."""
+        heartbeat_at = datetime.now(timezone.utc)
+        for project_id, operation in self._local_operations.list():
+            operation.heartbeat_at = heartbeat_at
+            try:
+                # Only the heartbeat is patched to not overwrite a concurrent state change
+                self._json_db_manager.update_json_document(
+                    config.SYSTEM_INTERNAL_PROJECT,
+                    get_operation_collection_id(project_id),
+                    operation.id,
+                    json.dumps(jsonable_encoder({"heartbeat_at": heartbeat_at})),
+                )
+            except ResourceNotFoundError:
+                # The operations of the project were deleted
+                pass
+
+    def cleanup_operations(self) -> None:
+        """Deletes expired operations and marks stale operations of all projects as failed."""
+        for project_doc in self._json_db_manager.list_json_documents(
+            config.SYSTEM_INTERNAL_PROJECT, self._PROJECT_COLLECTION
+        ):
+            try:
+                self._cleanup_project_operations(project_doc.key)
+            except Exception:
+                logger.exception(
+                    f"Could not clean up the operations of project {project_doc.key}."
+                )
+
+    def _cleanup_project_operations(self, project_id: str) -> None:
+        now = datetime.now(timezone.utc)
+        settings = self._global_state.settings
+        collection_id = get_operation_collection_id(project_id)
+        for operation_doc in self._json_db_manager.list_json_documents(
+            config.SYSTEM_INTERNAL_PROJECT, collection_id
+        ):
+            operation = Operation.parse_raw(operation_doc.json_value)
+            if operation.is_done:
+                finished_at = operation.finished_at or operation.created_at
+                if finished_at and now - finished_at > settings.OPERATION_RETENTION:
+                    try:
+                        self._json_db_manager.delete_json_document(
+                            config.SYSTEM_INTERNAL_PROJECT, collection_id, operation.id
+                        )
+                    except ResourceNotFoundError:
+                        pass
+                continue
+
+            last_heartbeat = operation.heartbeat_at or operation.created_at
+            if (
+                last_heartbeat is None
+                or now - last_heartbeat <= settings.OPERATION_HEARTBEAT_TIMEOUT
+            ):
+                continue
+            logger.warning(
+                f"Operation {operation.operation_type} ({operation.id}) on {operation.resource_name} "
+                f"of app instance {operation.instance_id} has no heartbeat since {last_heartbeat}. Marking it as failed."
+            )
+            operation.state = OperationState.FAILED
+            operation.finished_at = now
+            operation.error = ProblemDetails(
+                code=500,
+                message="The operation was aborted, since the app instance executing it stopped.",
+            )
+            try:
+                # Not applied if the executing app instance updated the operation in the meantime
+                self._json_db_manager.update_json_document(
+                    config.SYSTEM_INTERNAL_PROJECT,
+                    collection_id,
+                    operation.id,
+                    operation.json(),
+                    expected_version=operation_doc.version,
+                )
+            except (ResourceNotFoundError, ResourceUpdateFailedError):
+                pass
+
+    def _run_operation(
+        self,
+        project_id: str,
+        operation: Operation,
+        func: OperationFunction,
+        authorized_access: Optional[AuthorizedAccess],
+    ) -> None:
+        try:
+            self._execute_operation(project_id, operation, func, authorized_access)
+        finally:
+            # Wakes up the requests waiting for the operation
+            self._local_operations.finish(operation.id)
+
+    def _execute_operation(
+        self,
+        project_id: str,
+        operation: Operation,
+        func: OperationFunction,
+        authorized_access: Optional[AuthorizedAccess],
+    ) -> None:
+        # Import here to prevent circular imports
+        from contaxy.managers.components import ComponentManager
+
+        with ComponentManager(
+            self._global_state, RequestState(State())
+        ) as component_manager:
+            if authorized_access:
+                component_manager.request_state.authorized_access = authorized_access
+            operation_manager = OperationManager(component_manager)
+            operation.state = OperationState.RUNNING
+            operation.started_at = datetime.now(timezone.utc)
+            operation.heartbeat_at = operation.started_at
+            operation_manager._save_operation(project_id, operation)
+
+            try:
+                result = func(component_manager)
+                if isinstance(result, Response) and result.status_code >= 400:
+                    # Some operations (e.g. actions) return errors as response
+                    raise HTTPException(
+                        status_code=result.status_code,
+                        detail=bytes(result.body).decode("utf-8"),
+                    )
+                if isinstance(result, BaseModel):
+                    operation.result = jsonable_encoder(result)
+                operation.state = OperationState.SUCCEEDED
+            except HTTPException as e:
+                operation.state = OperationState.FAILED
+                operation.error = ProblemDetails(code=e.status_code, message=e.detail)
+                if isinstance(e, ClientBaseError) and e.explanation:
+                    operation.error.explanation = e.explanation
+            except Exception:
+                logger.exception(
+                    f"Operation {operation.operation_type} ({operation.id}) on {operation.resource_name} failed."
+                )
+                operation.state = OperationState.FAILED
+                operation.error = ProblemDetails(
+                    code=500, message="Internal server error!"
+                )
+            operation.finished_at = datetime.now(timezone.utc)
+            operation_manager._save_operation(project_id, operation)
+
+    def _save_operation(self, project_id: str, operation: Operation) -> None:
+        self._json_db_manager.create_json_document(
+            config.SYSTEM_INTERNAL_PROJECT,
+            get_operation_collection_id(project_id),
+            operation.id,
+            operation.json(),
+            upsert=True,
+        )
+
+
+def renew_operation_heartbeats(component_manager: ComponentOperations) -> None:
+    """Renews the heartbeat of the operations executed by this app instance. Meant to be called regularly in the background."""
+    OperationManager(component_manager).renew_heartbeats()
+
+
+def cleanup_operations(component_manager: ComponentOperations) -> None:
+    """Deletes expired operations and marks stale operations as failed. Meant to be called regularly in the background."""
+    OperationManager(component_manager).cleanup_operations()
+
+
+# Every app instance renews the heartbeat of the operations it executes
+register_scheduled_job(
+    "renew_operation_heartbeats",
+    renew_operation_heartbeats,
+    interval=config.settings.OPERATION_HEARTBEAT_INTERVAL,
+    run_once_per_cluster=False,
+)
+register_scheduled_job(
+    "cleanup_operations",
+    cleanup_operations,
+    interval=config.settings.OPERATION_CLEANUP_INTERVAL,
+)
@@ -5,6 +5,7 @@ from typing import List
 from loguru import logger
 
 from contaxy import config
+from contaxy.managers.operation import OperationManager
 from contaxy.operations import AuthOperations, JsonDocumentOperations, ProjectOperations
 from contaxy.operations.components import ComponentOperations
 from contaxy.schema.auth import (
@@ -212,6 +213,8 @@ class ProjectManager(ProjectOperations):
         for project_member in project_members:
             # Remove all project permissions from all users
             self.remove_project_member(project_id, project_member.id)
+        # The operations are stored outside of the project collections
+        OperationManager(self._component_manager).delete_operations(project_id)
         self._json_db_manager.delete_json_document(
             config.SYSTEM_INTERNAL_PROJECT, self._PROJECT_COLLECTION, project_id
         )
@@ -0,0 +1,259 @@
+import asyncio
+import os
+import random
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from loguru import logger
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import State
+
+from contaxy import config
+from contaxy.operations import JsonDocumentOperations
+from contaxy.operations.components import ComponentOperations
+from contaxy.schema.exceptions import (
+    ResourceAlreadyExistsError,
+    ResourceNotFoundError,
+    ResourceUpdateFailedError,
+)
+from contaxy.utils.id_utils import generate_short_uuid
+from contaxy.utils.prometheus_utils import SCHEDULED_JOB_DURATION, SCHEDULED_JOB_RUNS
+from contaxy.utils.state_utils import GlobalState, RequestState
+
+SCHEDULED_JOB_COLLECTION = "scheduled_jobs"
+
+
+@dataclass
+class ScheduledJob:
+    name: str
+    func: Callable[[ComponentOperations], Any]
+    interval: timedelta
+    # If `True`, the job is executed by only one app instance of the cluster per interval.
+    # Otherwise, every app instance (process) executes the job (e.g. for checking local connections).
+    run_once_per_cluster: bool = True
+
+
+class ScheduledJobLease(BaseModel):
+    """Execution state of a scheduled job that is shared by all app instances via the JSON DB."""
+
+    holder: Optional[str] = None
+    lease_expires_at: Optional[datetime] = None
+    next_run_at: datetime
+    last_started_at: Optional[datetime] = None
+    last_finished_at: Optional[datetime] = None
+    last_duration: Optional[float] = None
+
+
+_scheduled_jobs: Dict[str, ScheduledJob] = {}
+
+
+def register_scheduled_job(
+    name: str,
+    func: Callable[[ComponentOperations], Any],
+    interval: timedelta,
+    run_once_per_cluster: bool = True,
+) -> None:
+    """Registers a job that is executed in regular intervals once the API server is started.
+
+    The job is called with a new component manager for every execution.
+    A job registered with an existing name replaces the previous job.
+
+    Args:
+        name: Unique name of the job. Used to coordinate the executions across app instances.
+        func: Function that executes the job.
+        interval: Time between two executions.
+        run_once_per_cluster: If `True`, only one app instance executes the job per interval.
+    """
+    _scheduled_jobs[name] = ScheduledJob(
+        name=name,
+        func=func,
+        interval=interval,
+        run_once_per_cluster=run_once_per_cluster,
+    )
+
+
+def get_scheduled_jobs() -> List[ScheduledJob]:
+    return list(_scheduled_jobs.values())
+
+
+class JobScheduler:
+    """Executes the registered jobs in regular intervals in the background of an app instance.
+
+    Every app instance (e.g. Gunicorn worker or replica) runs its own scheduler. For jobs that
+    should run once per cluster, the app instances compete for a lease stored in the JSON DB.
+    The lease is acquired with a conditional update, so only one app instance executes
+    the job per interval and a job is never executed in parallel.
+    """
+
+    def __init__(self, global_state: GlobalState, instance_id: Optional[str] = None):
+        """Initializes the job scheduler. The jobs are started via `start()`.
+
+        Args:
+            global_state: Global state of the app instance.
+            instance_id: Unique ID of the app instance. Defaults to a combination of hostname and process ID.
+        """
+        self._global_state = global_state
+        self.instance_id = (
+            instance_id
+            or f"{socket.gethostname()}-{os.getpid()}-{generate_short_uuid()}"
+        )
+        self._running_jobs: Set[str] = set()
+        self._lock = threading.Lock()
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self, jobs: Optional[List[ScheduledJob]] = None) -> None:
+        """Starts the scheduling of the given jobs or of all registered jobs. Needs to be called from within the event loop."""
+        for job in get_scheduled_jobs() if jobs is None else jobs:
+            self._tasks.append(asyncio.create_task(self._schedule(job)))
+
+    def stop(self) -> None:
+        """Stops the scheduling. Running job executions are not interrupted."""
+        for task in self._tasks:
+            task.cancel()
+        self._tasks.clear()
+
+    def run_job(self, job: ScheduledJob) -> bool:
+        """Executes the job if it is not running already and, for cluster jobs, if it is due.
+
+        Returns:
+            bool: `True` if the job was executed by this app instance.
+        """
+        with self._lock:
+            if job.name in self._running_jobs:
+                # Overlap protection within the app instance
+                SCHEDULED_JOB_RUNS.labels(job=job.name, result="skipped").inc()
+                return False
+            self._running_jobs.add(job.name)
+
+        # Import here to prevent circular imports
+        from contaxy.managers.components import ComponentManager
+
+        try:
+            with ComponentManager(
+                self._global_state, RequestState(State())
+            ) as component_manager:
+                json_db_manager = component_manager.get_json_db_manager()
+                if job.run_once_per_cluster and not self._acquire_lease(
+                    json_db_manager, job
+                ):
+                    SCHEDULED_JOB_RUNS.labels(job=job.name, result="skipped").inc()
+                    return False
+
+                result = "succeeded"
+                start_time = time.perf_counter()
+                try:
+                    job.func(component_manager)
+                except Exception:
+                    result = "failed"
+                    logger.exception(f"Error while executing scheduled job {job.name}!")
+                duration = time.perf_counter() - start_time
+                SCHEDULED_JOB_RUNS.labels(job=job.name, result=result).inc()
+                SCHEDULED_JOB_DURATION.labels(job=job.name).observe(duration)
+
+                if job.run_once_per_cluster:
+                    self._release_lease(json_db_manager, job, duration)
+                return True
+        finally:
+            with self._lock:
+                self._running_jobs.discard(job.name)
+
+    async def _schedule(self, job: ScheduledJob) -> None:
+        jitter = self._global_state.settings.SCHEDULED_JOB_JITTER
+        interval = job.interval.total_seconds()
+        while True:
+            await asyncio.sleep(interval * random.uniform(1 - jitter, 1 + jitter))
+            try:
+                await run_in_threadpool(self.run_job, job)
+            except Exception:
+                logger.exception(f"Error while scheduling job {job.name}!")
+
+    def _acquire_lease(
+        self, json_db_manager: JsonDocumentOperations, job: ScheduledJob
+    ) -> bool:
+        now = datetime.now(timezone.utc)
+        jitter = self._global_state.settings.SCHEDULED_JOB_JITTER
+        lease = ScheduledJobLease(
+            holder=self.instance_id,
+            lease_expires_at=now + self._global_state.settings.SCHEDULED_JOB_TIMEOUT,
+            # The next execution is due slightly before the interval passed,
+            # so that the next app instance is not skipped due to the jitter
+            next_run_at=now + job.interval * (1 - jitter),
+            last_started_at=now,
+        )
+        try:
+            lease_doc = json_db_manager.get_json_document(
+                config.SYSTEM_INTERNAL_PROJECT, SCHEDULED_JOB_COLLECTION, job.name
+            )
+        except ResourceNotFoundError:
+            try:
+                json_db_manager.create_json_document(
+                    config.SYSTEM_INTERNAL_PROJECT,
+                    SCHEDULED_JOB_COLLECTION,
+                    job.name,
+                    lease.json(),
+                    upsert=False,
+                )
+                return True
+            except ResourceAlreadyExistsError:
+                # Another app instance acquired the lease in the meantime
+                return False
+
+        current_lease = ScheduledJobLease.parse_raw(lease_doc.json_value)
+        if current_lease.next_run_at > now:
+            return False
+        if (
+            current_lease.holder is not None
+            and current_lease.lease_expires_at is not None
+            and current_lease.lease_expires_at > now
+        ):
+            # The job is still executed by another app instance
+            return False
+
+        lease.last_finished_at = current_lease.last_finished_at
+        lease.last_duration = current_lease.last_duration
+        try:
+            json_db_manager.create_json_document(
+                config.SYSTEM_INTERNAL_PROJECT,
+                SCHEDULED_JOB_COLLECTION,
+                job.name,
+                lease.json(),
+                expected_version=lease_doc.version,
+            )
+            return True
+        except ResourceUpdateFailedError:
+            # Another app instance acquired the lease in the meantime
+            return False
+
+    def _release_lease(
+        self,
+        json_db_manager: JsonDocumentOperations,
+        job: ScheduledJob,
+        duration: float,
+    ) -> None:
+        try:
+            lease_doc = json_db_manager.get_json_document(
+                config.SYSTEM_INTERNAL_PROJECT, SCHEDULED_JOB_COLLECTION, job.name
+            )
+            lease = ScheduledJobLease.parse_raw(lease_doc.json_value)
+            if lease.holder != self.instance_id:
+                # The lease expired and was acquired by another app instance
+                return
+            lease.holder = None
+            lease.lease_expires_at = None
+            lease.last_finished_at = datetime.now(timezone.utc)
+            lease.last_duration = duration
+            json_db_manager.create_json_document(
+                config.SYSTEM_INTERNAL_PROJECT,
+                SCHEDULED_JOB_COLLECTION,
+                job.name,
+                lease.json(),
+                expected_version=lease_doc.version,
+            )
+        except Exception as e:
+            # The lease expires after the job timeout
+            logger.warning(f"Could not release the lease of job {job.name}: {e}")
@@ -1,10 +1,15 @@
+import fnmatch
 import json
-from typing import Any, List, Optional
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Pattern, Set
 
 from loguru import logger
 
 from contaxy import __version__, config
 from contaxy.config import settings
+from contaxy.managers.auth import AuthManager
 from contaxy.operations import AuthOperations, SystemOperations
 from contaxy.operations.components import ComponentOperations
 from contaxy.operations.json_db import JsonDocumentOperations
@@ -29,7 +34,67 @@ from contaxy.schema.system import (
     SystemState,
     SystemStatistics,
 )
-from contaxy.utils import auth_utils
+from contaxy.utils import auth_utils, id_utils
+
+_allowed_image_index_lock = threading.Lock()
+
+
+class AllowedImageIndex:
+    """In-memory index of the allowed images to check images without DB requests.
+
+    Image names are matched case-insensitive. Tags are either matched exactly or, if they
+    contain wildcards (e.g. `*` or `0.2.*`), as shell-style patterns.
+    """
+
+    def __init__(self, allowed_images: List[AllowedImageInfo], version: Optional[str]):
+        """Initializes the index.
+
+        Args:
+            allowed_images: All allowed images stored in the DB.
+            version: The version of the allowed images in the DB when they were loaded.
+        """
+        self.version = version
+        # Time when the version was compared with the DB the last time
+        self.checked_at = time.monotonic()
+        self._exact_tags: Dict[str, Set[str]] = {}
+        self._tag_patterns: Dict[str, Pattern] = {}
+        for allowed_image in allowed_images:
+            image_name = allowed_image.image_name.lower()
+            exact_tags = self._exact_tags.setdefault(image_name, set())
+            tag_patterns = []
+            for image_tag in allowed_image.image_tags:
+                if any(wildcard in image_tag for wildcard in "*?["):
+                    tag_patterns.append(fnmatch.translate(image_tag))
+                else:
+                    exact_tags.add(image_tag)
+            if tag_patterns:
+                self._tag_patterns[image_name] = re.compile("|".join(tag_patterns))
+
+    @property
+    def is_empty(self) -> bool:
+        return not self._exact_tags
+
+    def check(self, image_name: str, image_tag: str) -> None:
+        """Checks if the image is allowed. If no images are in the index, all images are allowed.
+
+        Raises:
+            ClientValueError: If the image or its tag is not allowed.
+        """
+        if self.is_empty:
+            return
+        image_name_key = image_name.lower()
+        exact_tags = self._exact_tags.get(image_name_key)
+        if exact_tags is None:
+            raise ClientValueError(
+                f"Image {image_name} is not on the list of allowed images!"
+            )
+        if image_tag in exact_tags:
+            return
+        tag_pattern = self._tag_patterns.get(image_name_key)
+        if tag_pattern is None or not tag_pattern.match(image_tag):
+            raise ClientValueError(
+                f"Image {image_name} is on the list of allowed images but tag {image_tag} is not allowed!"
+            )
 
 
 class SystemManager(SystemOperations):
@@ -37,6 +102,8 @@ class SystemManager(SystemOperations):
 
     _SYSTEM_PROPERTIES_COLLECTION = "system-properties"
     _SYSTEM_PROPERTY_IS_INITIALIZED = "is-initialized"
+    # Changed with every change of the allowed images to invalidate the index of all processes
+    _SYSTEM_PROPERTY_ALLOWED_IMAGES_VERSION = "allowed-images-version"
 
     def __init__(
         self,
@@ -80,8 +147,16 @@ class SystemManager(SystemOperations):
 
     def get_system_statistics(self) -> SystemStatistics:
         # TODO: Implement system statistics
+        auth_manager = self._component_manager.get_auth_manager()
         return SystemStatistics(
-            project_count=0, user_count=0, job_count=0, service_count=0, file_count=0
+            project_count=0,
+            user_count=0,
+            job_count=0,
+            service_count=0,
+            file_count=0,
+            auth=auth_manager.get_auth_statistics()
+            if isinstance(auth_manager, AuthManager)
+            else None,
         )
 
     def initialize_system(
@@ -152,6 +227,9 @@ class SystemManager(SystemOperations):
         self._set_system_property(SystemManager._SYSTEM_PROPERTY_IS_INITIALIZED, True)
 
     def check_allowed_image(self, image_name: str, image_tag: str) -> None:
+        if self._global_state.settings.ALLOWED_IMAGES_CACHE_ENABLED:
+            self._get_allowed_image_index().check(image_name, image_tag)
+            return
         # If allowed image list is empty (default), then allow all images
         if len(self.list_allowed_images()) == 0:
             return
@@ -161,14 +239,9 @@ class SystemManager(SystemOperations):
             raise ClientValueError(
                 f"Image {image_name} is not on the list of allowed images!"
             )
-
-        if not (
-            "*" in allowed_image_info.image_tags
-            or image_tag in allowed_image_info.image_tags
-        ):
-            raise ClientValueError(
-                f"Image {image_name} is on the list of allowed images but tag {image_tag} is not allowed!"
-            )
+        AllowedImageIndex([allowed_image_info], version=None).check(
+            image_name, image_tag
+        )
 
     def add_allowed_image(self, allowed_image: AllowedImageInfo) -> AllowedImageInfo:
         allowed_image_doc = self._json_db_manager.create_json_document(
@@ -178,6 +251,7 @@ class SystemManager(SystemOperations):
             json_document=allowed_image.json(),
             upsert=True,
         )
+        self._invalidate_allowed_image_index()
         return AllowedImageInfo.parse_raw(allowed_image_doc.json_value)
 
     def list_allowed_images(self) -> List[AllowedImageInfo]:
@@ -203,6 +277,39 @@ class SystemManager(SystemOperations):
             self._ALLOWED_IMAGES_COLLECTION,
             key=image_name,
         )
+        self._invalidate_allowed_image_index()
+
+    def _get_allowed_image_index(self) -> AllowedImageIndex:
+        """Returns the index of the allowed images of the process.
+
+        After the cache expiry, the index is only loaded again if the allowed images were changed by another process.
+        """
+        state_namespace = self._global_state[SystemManager]
+        expiry = self._global_state.settings.ALLOWED_IMAGES_CACHE_EXPIRY
+        index = state_namespace.allowed_image_index
+        if index is not None and time.monotonic() - index.checked_at < expiry:
+            return index
+        with _allowed_image_index_lock:
+            index = state_namespace.allowed_image_index
+            if index is not None and time.monotonic() - index.checked_at < expiry:
+                return index
+            version = self._get_system_property(
+                self._SYSTEM_PROPERTY_ALLOWED_IMAGES_VERSION, default=None
+            )
+            if index is not None and index.version == version:
+                index.checked_at = time.monotonic()
+                return index
+            index = AllowedImageIndex(self.list_allowed_images(), version)
+            state_namespace.allowed_image_index = index
+            return index
+
+    def _invalidate_allowed_image_index(self) -> None:
+        self._set_system_property(
+            self._SYSTEM_PROPERTY_ALLOWED_IMAGES_VERSION, id_utils.generate_short_uuid()
+        )
+        # Under the lock to not be overwritten by an index that is currently loaded
+        with _allowed_image_index_lock:
+            self._global_state[SystemManager].allowed_image_index = None
 
     _is_initialized_cache = False
 
@@ -1,9 +1,15 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import Any, List, Literal, Optional
+from typing import Any, Iterator, List, Literal, Optional
 
 from contaxy.schema import Job, JobInput, ResourceAction, Service, ServiceInput
-from contaxy.schema.deployment import DeploymentType, ServiceUpdate
+from contaxy.schema.deployment import (
+    DeletionBatchResult,
+    DeploymentMetrics,
+    DeploymentType,
+    JobBatchResult,
+    ServiceUpdate,
+)
 from contaxy.schema.shared import ResourceActionExecution
 
 
@@ -149,6 +155,27 @@ class ServiceOperations(ABC):
         """
         pass
 
+    @abstractmethod
+    def batch_delete_services(
+        self,
+        project_id: str,
+        service_ids: List[str],
+        delete_volumes: bool = False,
+    ) -> List[DeletionBatchResult]:
+        """Deletes multiple services of a project in parallel.
+
+        A failed deletion does not stop the deletion of the other services.
+
+        Args:
+            project_id (str): The project ID associated with the services.
+            service_ids (List[str]): The IDs of the services.
+            delete_volumes (bool, optional): If `True`, all attached volumes will be deleted. Defaults to `False`.
+
+        Returns:
+            List[DeletionBatchResult]: The result for every service ID in the given order.
+        """
+        pass
+
     @abstractmethod
     def get_service_logs(
         self,
@@ -156,6 +183,7 @@ class ServiceOperations(ABC):
         service_id: str,
         lines: Optional[int],
         since: Optional[datetime],
+        wait: bool = True,
     ) -> str:
         """Returns the logs of a service.
 
@@ -164,16 +192,75 @@ class ServiceOperations(ABC):
             service_id (str): The ID of the service.
             lines (Optional[int]): If provided, just the last `n` lines are returned from the log. Defaults to `None`.
             since (Optional[datetime]): If provided, just the logs since the given timestamp are returned. Defaults to `None`.
+            wait (bool): If `True`, waits until the service is started. Defaults to `True`.
 
         Raises:
             NotImplementedError: [description]
             RuntimeError: If reading the logs of the given service fails.
+            ResourceNotReadyError: If `wait` is `False` and the service is still starting.
 
         Returns:
             str: The logs of the service.
         """
         pass
 
+    @abstractmethod
+    def stream_service_logs(
+        self,
+        project_id: str,
+        service_id: str,
+        lines: Optional[int] = None,
+        since: Optional[datetime] = None,
+        follow: bool = False,
+        wait: bool = True,
+    ) -> Iterator[bytes]:
+        """Returns the logs of a service as stream of chunks.
+
+        In contrast to `get_service_logs`, the logs are not loaded into memory at once.
+        The returned stream should be closed if it is not read until the end.
+
+        Args:
+            project_id (str): The ID of the project into which the service is deployed in.
+            service_id (str): The ID of the service.
+            lines (Optional[int]): If provided, just the last `n` lines are returned from the log. Defaults to `None`.
+            since (Optional[datetime]): If provided, just the logs since the given timestamp are returned. Defaults to `None`.
+            follow (bool): If `True`, the stream is kept open and new logs are returned until the service is stopped. Defaults to `False`.
+            wait (bool): If `True`, waits until the service is started. Defaults to `True`.
+
+        Raises:
+            ResourceNotFoundError: If the service does not exist.
+            ResourceNotReadyError: If `wait` is `False` and the service is still starting.
+            ServerBaseError: If reading the logs of the given service fails.
+
+        Returns:
+            Iterator[bytes]: The chunks of the logs.
+        """
+        pass
+
+    @abstractmethod
+    def get_service_metrics(
+        self,
+        project_id: str,
+        service_id: str,
+        since: Optional[datetime] = None,
+        max_samples: int = 100,
+    ) -> DeploymentMetrics:
+        """Returns the sampled CPU, memory and network usage of a running service.
+
+        Args:
+            project_id (str): The ID of the project into which the service is deployed in.
+            service_id (str): The ID of the service.
+            since (Optional[datetime]): If provided, just the usage sampled after the given timestamp is returned. Defaults to `None`.
+            max_samples (int): Maximum number of returned samples. More samples are averaged into equally sized buckets. Defaults to `100`.
+
+        Raises:
+            ResourceNotFoundError: If the service does not exist.
+
+        Returns:
+            DeploymentMetrics: The resource usage of the service in chronological order.
+        """
+        pass
+
     @abstractmethod
     def suggest_service_config(
         self,
@@ -253,6 +340,30 @@ class JobOperations(ABC):
     ) -> Job:
         pass
 
+    @abstractmethod
+    def deploy_jobs(
+        self,
+        project_id: str,
+        job_inputs: List[JobInput],
+        action_id: Optional[str] = None,
+        wait: bool = False,
+    ) -> List[JobBatchResult]:
+        """Deploys multiple jobs of a project in parallel.
+
+        The job configurations are validated and stored at once before the jobs are started.
+        A failed job does not stop the deployment of the other jobs.
+
+        Args:
+            project_id (str): The project ID associated with the jobs.
+            job_inputs (List[JobInput]): The configurations of the jobs.
+            action_id (Optional[str], optional): The ID of the selected deploy action.
+            wait (bool, optional): If `True`, waits until all jobs are started.
+
+        Returns:
+            List[JobBatchResult]: The result for every job input in the given order.
+        """
+        pass
+
     @abstractmethod
     def list_deploy_job_actions(
         self,
@@ -296,7 +407,33 @@ class JobOperations(ABC):
         job_id: str,
         lines: Optional[int] = None,
         since: Optional[datetime] = None,
+        wait: bool = True,
     ) -> str:
+        """Returns the logs of a job. See `get_service_logs` for details."""
+        pass
+
+    @abstractmethod
+    def stream_job_logs(
+        self,
+        project_id: str,
+        job_id: str,
+        lines: Optional[int] = None,
+        since: Optional[datetime] = None,
+        follow: bool = False,
+        wait: bool = True,
+    ) -> Iterator[bytes]:
+        """Returns the logs of a job as stream of chunks. See `stream_service_logs` for details."""
+        pass
+
+    @abstractmethod
+    def get_job_metrics(
+        self,
+        project_id: str,
+        job_id: str,
+        since: Optional[datetime] = None,
+        max_samples: int = 100,
+    ) -> DeploymentMetrics:
+        """Returns the sampled resource usage of a running job. See `get_service_metrics` for details."""
         pass
 
     @abstractmethod
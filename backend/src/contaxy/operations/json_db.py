@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from contaxy.schema import JsonDocument
 
@@ -13,27 +13,59 @@ class JsonDocumentOperations(ABC):
         key: str,
         json_document: str,
         upsert: bool = True,
+        expected_version: Optional[int] = None,
     ) -> JsonDocument:
         """Creates a JSON document for a given key.
 
         If a document already exists for the given key, the document will be overwritten if `upsert` is True, otherwise an error is raised.
 
+        If `expected_version` is provided, the write is conditional: the existing document is only replaced if its current `version` matches (optimistic concurrency control).
+
         Args:
             project_id: Project ID associated with the collection.
             collection_id: ID of the collection (database) to use to store this JSON document.
             key: Key of the JSON document.
             json_document: The actual JSON document value.
             upsert: If `True`, the document will be updated/overwritten if it already exists.
+            expected_version (optional): Only overwrite the existing document if it has this version.
 
         Raises:
             ClientValueError: If the given json_document does not contain valid json.
             ResourceAlreadyExistsError: If a document already exists for the given key and `upsert` is False.
+            PreconditionFailedError: If `expected_version` is provided and the document does not exist or has a different version.
 
         Returns:
             JsonDocument: The created JSON document.
         """
         pass
 
+    @abstractmethod
+    def create_json_documents(
+        self,
+        project_id: str,
+        collection_id: str,
+        json_documents: Dict[str, str],
+        upsert: bool = True,
+    ) -> List[JsonDocument]:
+        """Creates multiple JSON documents in a single transaction.
+
+        Either all documents are created or none of them.
+
+        Args:
+            project_id: Project ID associated with the collection.
+            collection_id: ID of the collection (database) to use to store the JSON documents.
+            json_documents: The actual JSON document values by key.
+            upsert: If `True`, existing documents will be updated/overwritten.
+
+        Raises:
+            ClientValueError: If one of the given documents does not contain valid json.
+            ResourceAlreadyExistsError: If a document already exists for one of the given keys and `upsert` is False.
+
+        Returns:
+            List[JsonDocument]: The created JSON documents.
+        """
+        pass
+
     @abstractmethod
     def update_json_document(
         self,
@@ -41,6 +73,7 @@ class JsonDocumentOperations(ABC):
         collection_id: str,
         key: str,
         json_document: str,
+        expected_version: Optional[int] = None,
     ) -> JsonDocument:
         """Updates a JSON document.
 
@@ -51,9 +84,11 @@ class JsonDocumentOperations(ABC):
             collection_id: ID of the collection (database) that the JSON document is stored in.
             key: Key of the JSON document.
             json_document: The actual JSON document value.
+            expected_version (optional): Only apply the update if the document has this version.
 
         Raises:
             ResourceNotFoundError: If no JSON document is found with the given `key`.
+            PreconditionFailedError: If `expected_version` is provided and does not match the version of the document.
 
         Returns:
             JsonDocument: The updated JSON document.
@@ -84,6 +119,25 @@ class JsonDocumentOperations(ABC):
         """
         pass
 
+    @abstractmethod
+    def list_json_documents_by_keys(
+        self,
+        project_id: str,
+        keys_by_collection: Dict[str, List[str]],
+    ) -> Dict[str, List[JsonDocument]]:
+        """Returns the JSON documents with the given keys from multiple collections of a project.
+
+        Collections that do not exist and keys without a document are skipped.
+
+        Args:
+            project_id: Project ID associated with the collections.
+            keys_by_collection: The keys of the requested JSON documents by collection ID.
+
+        Returns:
+            Dict[str, List[JsonDocument]]: The found JSON documents by collection ID.
+        """
+        pass
+
     @abstractmethod
     def get_json_document(
         self,
@@ -127,6 +181,27 @@ class JsonDocumentOperations(ABC):
         """
         pass
 
+    @abstractmethod
+    def delete_documents(
+        self,
+        project_id: str,
+        collection_id: str,
+        keys: List[str],
+    ) -> int:
+        """Deletes multiple JSON documents by key.
+
+        Keys without a document are skipped.
+
+        Args:
+            project_id: Project ID associated with the collection.
+            collection_id: ID of the collection (database) that the JSON documents are stored in.
+            keys: Keys of the JSON documents.
+
+        Returns:
+            int: The number of deleted documents.
+        """
+        pass
+
     @abstractmethod
     def delete_json_collections(
         self,
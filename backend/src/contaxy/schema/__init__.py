@@ -27,8 +27,10 @@ from .exceptions import (
     ClientBaseError,
     ClientValueError,
     PermissionDeniedError,
+    PreconditionFailedError,
     ResourceAlreadyExistsError,
     ResourceNotFoundError,
+    ResourceNotReadyError,
     ResourceUpdateFailedError,
     ServerBaseError,
     UnauthenticatedError,
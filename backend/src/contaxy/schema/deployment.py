@@ -2,9 +2,10 @@ from datetime import datetime, timedelta
 from enum import Enum
 from typing import Dict, List, Optional
 
-from fastapi import Path
+from fastapi import Path, Query
 from pydantic import BaseModel, Field
 
+from contaxy.schema.exceptions import ProblemDetails
 from contaxy.schema.shared import Resource, ResourceInput
 
 SERVICE_ID_PARAM = Path(
@@ -21,6 +22,32 @@ JOB_ID_PARAM = Path(
     # TODO: add length restriction
 )
 
+LOGS_STREAM_PARAM = Query(
+    False,
+    description="If true, the logs are sent in chunks while they are read instead of all at once.",
+)
+
+METRICS_SINCE_PARAM = Query(
+    None, description="Only show the resource usage sampled after a given date."
+)
+
+METRICS_MAX_SAMPLES_PARAM = Query(
+    100,
+    ge=1,
+    le=10000,
+    description="Maximum number of returned samples. The collected samples are averaged into equally sized buckets if there are more.",
+)
+
+LOGS_FOLLOW_PARAM = Query(
+    False,
+    description="If true, the connection is kept open and new logs are sent until the deployment is stopped. Implies `stream`.",
+)
+
+LOGS_WAIT_PARAM = Query(
+    True,
+    description="If true, waits until the deployment is started before the logs are read. Otherwise, a 503 error is returned immediately if the deployment is still starting.",
+)
+
 
 class DeploymentType(str, Enum):
     CORE_BACKEND = "core-backend"
@@ -45,6 +72,8 @@ class DeploymentStatus(str, Enum):
     STOPPED = "stopped"
     # Deployment state cannot be obtained.
     UNKNOWN = "unknown"
+    # Job waits in the job queue until the quotas allow to start it.
+    QUEUED = "queued"
     # Deployment is paused (only on docker?)/
     # PAUSED = "paused"
     # Other possible options:
@@ -287,8 +316,18 @@ class Service(ServiceBase, Deployment):
     )
 
 
+class JobPriority(str, Enum):
+    # Queued jobs with a higher priority are started first
+    HIGH = "high"
+    NORMAL = "normal"
+    LOW = "low"
+
+
 class JobBase(BaseModel):
-    pass
+    priority: JobPriority = Field(
+        JobPriority.NORMAL,
+        description="Priority of the job in the job queue. Queued jobs with a higher priority are started first.",
+    )
 
 
 class JobInput(JobBase, DeploymentInput):
@@ -301,7 +340,65 @@ class JobInput(JobBase, DeploymentInput):
 
 
 class Job(JobBase, Deployment):
-    pass
+    queue_position: Optional[int] = Field(
+        None,
+        example=3,
+        description="Position of the job in the job queue (starting at 1). Only set if the job is queued.",
+    )
+
+
+class JobBatchResult(BaseModel):
+    job: Optional[Job] = Field(
+        None,
+        description="The deployed job. Not set if the job could not be created.",
+    )
+    error: Optional[ProblemDetails] = Field(
+        None,
+        description="The problem that prevented the deployment of the job. Not set if the job was deployed successfully.",
+    )
+
+
+class DeletionBatchResult(BaseModel):
+    id: str = Field(..., description="ID of the resource.")
+    error: Optional[ProblemDetails] = Field(
+        None,
+        description="The problem that prevented the deletion. Not set if the resource was deleted successfully.",
+    )
+
+
+class ResourceUsageSample(BaseModel):
+    timestamp: datetime = Field(
+        ...,
+        description="Time of the sample. For downsampled metrics, the time of the last sample in the bucket.",
+    )
+    cpu_usage: Optional[float] = Field(
+        None,
+        example=0.5,
+        description="Used CPU cores. Not set if it could not be determined.",
+    )
+    memory_usage: Optional[float] = Field(
+        None,
+        example=512,
+        description="Used memory in Megabyte. Not set if it could not be determined.",
+    )
+    network_receive_rate: Optional[float] = Field(
+        None,
+        example=1024,
+        description="Received network traffic in bytes per second. Not set if the deployment platform does not report network usage.",
+    )
+    network_transmit_rate: Optional[float] = Field(
+        None,
+        example=1024,
+        description="Transmitted network traffic in bytes per second. Not set if the deployment platform does not report network usage.",
+    )
+
+
+class DeploymentMetrics(BaseModel):
+    id: str = Field(..., description="ID of the deployment.")
+    samples: List[ResourceUsageSample] = Field(
+        [],
+        description="Resource usage of the deployment in chronological order. Empty if resource metrics are not collected.",
+    )
 
 
 ACTION_DELIMITER = "-"
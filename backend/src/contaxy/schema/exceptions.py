@@ -340,6 +340,80 @@ class ResourceUpdateFailedError(ClientBaseError):
         )
 
 
+class PreconditionFailedError(ResourceUpdateFailedError):
+    """Client error that indicates that a conditional write was rejected since the resource has a different version, e.g.:
+
+    - The document 'xxx' has version 3 (expected 2).
+
+    In contrast to other update conflicts, the client should read the resource again before retrying the write.
+    The error details will be shown to the client (user) if it is not handled otherwise.
+    """
+
+    _HTTP_STATUS_CODE = status.HTTP_412_PRECONDITION_FAILED
+    _DEFAULT_MESSAGE = "The resource was modified in the meantime."
+    _DEFAULT_EXPLANATION = "The resource does not have the version required by the request (e.g. via the If-Match header). Please read the resource again and retry the update."
+
+    def __init__(
+        self,
+        message: Optional[str] = None,
+        explanation: Optional[str] = None,
+        metadata: Optional[Dict] = None,
+        resource: Optional[str] = None,
+    ) -> None:
+        """Initializes the error.
+
+        Args:
+            message (optional): A message shown to the user that overwrites the default message.
+            explanation (optional): A human readable explanation specific to this error that is helpful to locate the problem and give advice on how to proceed.
+            metadata (optional): Additional problem details/metadata.
+            resource (optional): A resource name (relative URI reference) of a specific resource instance associated with the error.
+        """
+        ClientBaseError.__init__(
+            self,
+            status_code=PreconditionFailedError._HTTP_STATUS_CODE,
+            message=message or PreconditionFailedError._DEFAULT_MESSAGE,
+            explanation=explanation or PreconditionFailedError._DEFAULT_EXPLANATION,
+            metadata=metadata,
+            resource=resource,
+        )
+
+
+class ResourceNotReadyError(ClientBaseError):
+    """Client error that indicates that a resource exists but cannot be used yet, e.g.:
+
+    - The logs of service 'xxx' cannot be read since it is still starting.
+
+    The request can be retried later. The error details will be shown to the client (user) if it is not handled otherwise.
+    """
+
+    _HTTP_STATUS_CODE = status.HTTP_503_SERVICE_UNAVAILABLE
+    _DEFAULT_MESSAGE = "The resource is not ready yet. Try again later."
+    _DEFAULT_EXPLANATION = "The requested resource exists but is still being started or updated. Please try the request again later."
+
+    def __init__(
+        self,
+        message: Optional[str] = None,
+        explanation: Optional[str] = None,
+        metadata: Optional[Dict] = None,
+        resource: Optional[str] = None,
+    ) -> None:
+        """Initializes the error.
+
+        Args:
+            message (optional): A message shown to the user that overwrites the default message.
+            explanation (optional): A human readable explanation specific to this error that is helpful to locate the problem and give advice on how to proceed.
+            metadata (optional): Additional problem details/metadata.
+            resource (optional): A resource name (relative URI reference) of a specific resource instance associated with the error.
+        """
+        super(ResourceNotReadyError, self).__init__(
+            status_code=ResourceNotReadyError._HTTP_STATUS_CODE,
+            message=message or ResourceNotReadyError._DEFAULT_MESSAGE,
+            explanation=explanation or ResourceNotReadyError._DEFAULT_EXPLANATION,
+            metadata=metadata,
+            resource=resource,
+        )
+
+
 CREATE_RESOURCE_RESPONSES: Mapping[Union[int, str], Dict[str, Any]] = {
     status.HTTP_409_CONFLICT: {
         "description": "The resource already exists.",
@@ -362,6 +436,13 @@ UPDATE_RESOURCE_RESPONSES: Mapping[Union[int, str], Dict[str, Any]] = {
     },
 }
 
+CONDITIONAL_WRITE_RESPONSES: Mapping[Union[int, str], Dict[str, Any]] = {
+    status.HTTP_412_PRECONDITION_FAILED: {
+        "description": "The resource does not have the version of the If-Match header.",
+        "model": ProblemDetails,
+    },
+}
+
 AUTH_ERROR_RESPONSES: Mapping[Union[int, str], Dict[str, Any]] = {
     status.HTTP_401_UNAUTHORIZED: {
         "description": "Invalid authentication credentials.",
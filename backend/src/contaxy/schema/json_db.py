@@ -15,6 +15,11 @@ class JsonDocument(BaseModel):
         example="{'foo': 'bar'}",
         description="JSON value of the document.",
     )
+    version: Optional[int] = Field(
+        None,
+        example=1,
+        description="Version of the document. It is incremented on every write and can be used for conditional updates.",
+    )
     created_at: Optional[datetime] = Field(
         None,
         example="2021-04-23T10:20:30.400+02:30",
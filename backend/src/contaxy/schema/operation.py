@@ -0,0 +1,90 @@
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, Optional, Union
+
+from fastapi import Path, Query, status
+from pydantic import BaseModel, Field
+
+from contaxy.schema.exceptions import ProblemDetails
+
+OPERATION_ID_PARAM = Path(
+    ...,
+    title="Operation ID",
+    description="A valid operation ID.",
+)
+
+
+class OperationState(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class Operation(BaseModel):
+    """Long-running operation that is executed in the background."""
+
+    id: str = Field(
+        ...,
+        example="ac9ldprwdi68oihk34jli3kdp",
+        description="Resource ID of the operation.",
+    )
+    operation_type: str = Field(
+        ...,
+        example="deploy_service",
+        description="ID of the API operation that is executed (e.g. `deploy_service`).",
+    )
+    resource_name: str = Field(
+        ...,
+        example="projects/my-project/services/my-service",
+        description="Name of the resource that is changed by the operation.",
+    )
+    state: OperationState = Field(
+        OperationState.PENDING, description="The state of the operation."
+    )
+    created_at: Optional[datetime] = Field(
+        None, description="Timestamp of the operation creation."
+    )
+    created_by: Optional[str] = Field(
+        None,
+        example="16fd2706-8baf-433b-82eb-8c7fada847da",
+        description="Id of the user that started the operation.",
+    )
+    started_at: Optional[datetime] = Field(
+        None, description="Timestamp when the execution of the operation started."
+    )
+    finished_at: Optional[datetime] = Field(
+        None, description="Timestamp when the operation succeeded or failed."
+    )
+    instance_id: Optional[str] = Field(
+        None,
+        description="ID of the app instance (process) that executes the operation.",
+    )
+    heartbeat_at: Optional[datetime] = Field(
+        None,
+        description="Timestamp of the last heartbeat of the app instance that executes the operation. Pending or running operations without a recent heartbeat are marked as failed.",
+    )
+    result: Optional[Dict[str, Any]] = Field(
+        None,
+        description="The resource returned by the operation (e.g. the deployed service), if it succeeded.",
+    )
+    error: Optional[ProblemDetails] = Field(
+        None, description="Details about the problem, if the operation failed."
+    )
+
+    @property
+    def is_done(self) -> bool:
+        return self.state in [OperationState.SUCCEEDED, OperationState.FAILED]
+
+
+BACKGROUND_OPERATION_PARAM = Query(
+    False,
+    description="If true, the request is executed as long-running operation in the background and the operation is returned with status code 202.",
+)
+
+ACCEPTED_OPERATION_RESPONSES: Dict[Union[int, str], Dict[str, Any]] = {
+    status.HTTP_202_ACCEPTED: {
+        "model": Operation,
+        "description": "The request is executed as long-running operation in the background.",
+    }
+}
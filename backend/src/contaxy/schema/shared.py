@@ -72,6 +72,10 @@ class CoreOperations(str, Enum):
     LIST_ALLOWED_IMAGES = "list_allowed_images"
     GET_ALLOWED_IMAGE = "get_allowed_image"
     DELETE_ALLOWED_IMAGE = "delete_allowed_image"
+    # Operation Endpoints
+    LIST_OPERATIONS = "list_operations"
+    GET_OPERATION = "get_operation"
+    WAIT_FOR_OPERATION = "wait_for_operation"
     # Secrets Endpoints
     CREATE_SECRET = "create_secret"
     DELETE_SECRET = "delete_secret"
@@ -86,6 +90,7 @@ class CoreOperations(str, Enum):
     # JSON Document Endpoints
     LIST_JSON_DOCUMENTS = "list_json_documents"
     CREATE_JSON_DOCUMENT = "create_json_document"
+    CREATE_JSON_DOCUMENTS = "create_json_documents"
     UPDATE_JSON_DOCUMENT = "update_json_document"
     DELETE_JSON_DOCUMENT = "delete_json_document"
     DELETE_JSON_COLLECTION = "delete_json_collection"
@@ -103,9 +108,11 @@ class ExtensibleOperations(str, Enum):
     DEPLOY_SERVICE = "deploy_service"
     DELETE_SERVICE = "delete_service"
     DELETE_SERVICES = "delete_services"
+    BATCH_DELETE_SERVICES = "batch_delete_services"
     UPDATE_SERVICE = "update_service"
     UPDATE_SERVICE_ACCESS = "update_service_access"
     GET_SERVICE_LOGS = "get_service_logs"
+    GET_SERVICE_METRICS = "get_service_metrics"
     LIST_SERVICE_ACTIONS = "list_service_actions"
     EXECUTE_SERVICE_ACTION = "execute_service_action"
     SUGGEST_SERVICE_CONFIG = "suggest_service_config"
@@ -118,9 +125,11 @@ class ExtensibleOperations(str, Enum):
     EXECUTE_JOB_ACTION = "execute_job_action"
     SUGGEST_JOB_CONFIG = "suggest_job_config"
     DEPLOY_JOB = "deploy_job"
+    DEPLOY_JOBS = "deploy_jobs"
     DELETE_JOB = "delete_job"
     DELETE_JOBS = "delete_jobs"
     GET_JOB_LOGS = "get_job_logs"
+    GET_JOB_METRICS = "get_job_metrics"
     # File Endpoints
     LIST_FILES = "list_files"
     GET_FILE_METADATA = "get_file_metadata"
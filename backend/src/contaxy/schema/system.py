@@ -30,6 +30,46 @@ class SystemInfo(BaseModel):
     )
 
 
+class CacheStatistics(BaseModel):
+    size: int = Field(..., description="Number of items currently in the cache.")
+    max_size: int = Field(..., description="Maximum number of items in the cache.")
+    hits: int = Field(..., description="Number of lookups served from the cache.")
+    misses: int = Field(..., description="Number of lookups not found in the cache.")
+    evictions: int = Field(
+        ...,
+        description="Number of items removed because the cache was full or the items expired.",
+    )
+
+
+class HistogramStatistics(BaseModel):
+    count: int = Field(..., description="Number of observations.")
+    sum: float = Field(..., description="Sum of all observed values.")
+    buckets: Dict[str, int] = Field(
+        ...,
+        example={"0.01": 5, "0.1": 8, "inf": 9},
+        description="Cumulative number of observations that are less than or equal to the bucket's upper bound.",
+    )
+
+
+class AuthStatistics(BaseModel):
+    caches: Dict[str, CacheStatistics] = Field(
+        ..., description="Statistics of the auth caches by cache name."
+    )
+    verify_access_seconds: HistogramStatistics = Field(
+        ..., description="Duration of access verifications."
+    )
+    lock_wait_seconds: HistogramStatistics = Field(
+        ..., description="Time spent waiting for the cache lock on cache misses."
+    )
+    db_resolve_seconds: Dict[str, HistogramStatistics] = Field(
+        ...,
+        description="Duration of resolving tokens, permissions, and access verifications via the DB.",
+    )
+    role_resolution_depth: HistogramStatistics = Field(
+        ..., description="Depth of the role hierarchy resolved for a permission lookup."
+    )
+
+
 class SystemStatistics(BaseModel):
     # TODO: finish model
     project_count: int
@@ -37,6 +77,9 @@ class SystemStatistics(BaseModel):
     job_count: int
     service_count: int
     file_count: int
+    auth: Optional[AuthStatistics] = Field(
+        None, description="Metrics of the access verification of this instance."
+    )
 
 
 class AllowedImageInfo(BaseModel):
@@ -48,7 +91,7 @@ class AllowedImageInfo(BaseModel):
     image_tags: List[str] = Field(
         ...,
         example=["0.2.1", "0.3.0"],
-        description='List of tags that are allowed for this image. Can be set to ["*"] to allow all tags.',
+        description='List of tags that are allowed for this image. Tags can contain wildcards, e.g. "0.2.*". Can be set to ["*"] to allow all tags.',
     )
     metadata: Optional[Dict[str, str]] = Field(
         None,
@@ -3,12 +3,14 @@
 import asyncio
 import inspect
 from datetime import timedelta
-from typing import Any, Callable, Type
+from typing import Any, Callable, Iterator, Type
 
 from fastapi import FastAPI, Form
 from loguru import logger
 from pydantic import BaseModel
 from starlette.concurrency import run_in_threadpool
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
 
 
 def schedule_call(func: Callable, interval: timedelta) -> None:
@@ -30,6 +32,35 @@ def schedule_call(func: Callable, interval: timedelta) -> None:
     asyncio.create_task(loop())
 
 
+class ClosableStreamingResponse(StreamingResponse):
+    """Streaming response that closes the content stream once the response is sent or the client disconnected.
+
+    The chunks of a synchronous stream are read in a worker thread. If the stream blocks while waiting
+    for new content (e.g. when following logs), the thread is only released once the stream is closed.
+    The content stream needs a `close` method that can be called from another thread.
+    """
+
+    def __init__(self, content: Iterator[bytes], **kwargs: Any):
+        super().__init__(content, **kwargs)
+        self._content_stream = content
+
+    async def listen_for_disconnect(self, receive: Receive) -> None:
+        await super().listen_for_disconnect(receive)
+        # Unblock the worker thread that waits for the next chunk
+        self._close_content_stream()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self._close_content_stream()
+
+    def _close_content_stream(self) -> None:
+        close = getattr(self._content_stream, "close", None)
+        if close is not None:
+            close()
+
+
 def as_form(cls: Type[BaseModel]) -> Any:
     """Adds an as_form class method to decorated models.
 
@@ -0,0 +1,69 @@
+"""Utilities for collecting in-process metrics."""
+from typing import Any, List, Optional, Tuple
+
+from cachetools import Cache, TTLCache
+
+from contaxy.schema.system import CacheStatistics
+from contaxy.utils import prometheus_utils
+
+
+class MetricsTTLCache(TTLCache):
+    """TTL cache that reports its size, hits, misses, and evictions as Prometheus metrics.
+
+    Hits and misses need to be recorded by the caller since the cache cannot distinguish
+    between lookups and other accesses. Evictions are counted for items that are removed
+    because the cache is full or because their time to live expired.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float, **kwargs: Any):
+        """Initializes the cache.
+
+        Args:
+            name: Name of the cache that is used as `cache` label of the metrics.
+            maxsize: Maximum number of items in the cache.
+            ttl: Time to live of the items in seconds.
+        """
+        super().__init__(maxsize, ttl, **kwargs)
+        self.name = name
+        self._hits = prometheus_utils.CACHE_REQUESTS.labels(cache=name, result="hit")
+        self._misses = prometheus_utils.CACHE_REQUESTS.labels(cache=name, result="miss")
+        self._evictions = prometheus_utils.CACHE_EVICTIONS.labels(cache=name)
+        self._size = prometheus_utils.CACHE_SIZE.labels(cache=name)
+        self._size.set(0)
+        prometheus_utils.CACHE_MAX_SIZE.labels(cache=name).set(maxsize)
+
+    def _update_size(self) -> None:
+        # The currsize property of the TTL cache expires items, which would call expire() recursively
+        self._size.set(Cache.currsize.fget(self))  # type: ignore
+
+    def record_hit(self) -> None:
+        self._hits.inc()
+
+    def record_miss(self) -> None:
+        self._misses.inc()
+
+    def __setitem__(self, key: Any, value: Any, **kwargs: Any) -> None:
+        super().__setitem__(key, value, **kwargs)
+        self._update_size()
+
+    def __delitem__(self, key: Any, **kwargs: Any) -> None:
+        super().__delitem__(key, **kwargs)
+        self._update_size()
+
+    def popitem(self) -> Tuple[Any, Any]:
+        item = super().popitem()
+        self._evictions.inc()
+        return item
+
+    def expire(self, time: Optional[float] = None) -> List[Tuple[Any, Any]]:
+        expired_items = super().expire(time)
+        # Older cachetools versions do not return the expired items
+        self._evictions.inc(len(expired_items or []))
+        self._update_size()
+        return expired_items
+
+    def get_statistics(self) -> CacheStatistics:
+        """Returns the statistics of all caches with the name of this cache. In multiprocess mode, all worker processes are included."""
+        return prometheus_utils.get_cache_statistics(
+            prometheus_utils.collect_samples(), self.name
+        )
@@ -1,8 +1,38 @@
 from loguru import logger
-from sqlalchemy.exc import ProgrammingError
-from sqlalchemy.future import Engine
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqlalchemy.future import Engine, create_engine
 from sqlalchemy.schema import CreateSchema
 
+from contaxy.schema.exceptions import ServerBaseError
+from contaxy.utils.prometheus_utils import instrument_db_engine
+from contaxy.utils.state_utils import GlobalState
+
+
+def get_db_engine(global_state: GlobalState) -> Engine:
+    """Returns the Postgres DB engine shared by all managers of this process.
+
+    The engine (and its connection pool) is lazily created and stored in the global state.
+
+    Raises:
+        ServerBaseError: If the connection to the Postgres DB failed.
+    """
+    state_namespace = global_state.shared_namespace
+    if not state_namespace.db_engine:
+        url = global_state.settings.POSTGRES_CONNECTION_URI
+        engine = create_engine(url, future=True)
+        # Test the DB connection and set to global state if succesful
+        try:
+            with engine.begin():
+                state_namespace.db_engine = engine
+            instrument_db_engine(engine)
+        except OperationalError as ex:
+            logger.exception("POSTGRES DB Problem")
+            raise ServerBaseError(
+                "Postgres DB connection failed. Validate connection URI."
+            ) from ex
+        logger.info("Postgres DB Engine created")
+    return state_namespace.db_engine
+
 
 def create_schema(engine: Engine, schema_name: str) -> None:
     with engine.begin() as conn:
@@ -0,0 +1,380 @@
+"""Utilities to expose metrics of the API server in the Prometheus text format.
+
+If the environment variable `PROMETHEUS_MULTIPROC_DIR` is set (e.g. when running with multiple Gunicorn workers),
+all metrics are written to this directory and aggregated across all worker processes on collection.
+"""
+
+import os
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+from weakref import WeakSet
+
+from anyio import to_thread
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.samples import Sample
+from sqlalchemy import event
+from sqlalchemy.future import Engine
+from sqlalchemy.pool import QueuePool
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from contaxy.schema.system import CacheStatistics, HistogramStatistics
+
+MULTIPROC_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+# Default latency buckets in seconds
+LATENCY_BUCKETS: Sequence[float] = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+)
+
+# Used for requests that do not match any route to keep the label cardinality bounded
+UNMATCHED_ROUTE = "unmatched"
+
+REQUEST_COUNT = Counter(
+    "contaxy_http_requests_total",
+    "Number of handled HTTP requests.",
+    ["method", "route", "operation_id", "status_code"],
+)
+REQUEST_LATENCY = Histogram(
+    "contaxy_http_request_duration_seconds",
+    "Latency of handled HTTP requests in seconds.",
+    ["method", "route", "operation_id"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "contaxy_http_requests_in_progress",
+    "Number of HTTP requests that are currently handled.",
+    ["method", "route"],
+    multiprocess_mode="livesum",
+)
+
+THREAD_POOL_CAPACITY = Gauge(
+    "contaxy_thread_pool_capacity",
+    "Maximum number of worker threads used to run synchronous endpoints.",
+    multiprocess_mode="livesum",
+)
+THREAD_POOL_ACTIVE_THREADS = Gauge(
+    "contaxy_thread_pool_active_threads",
+    "Number of worker threads that are currently running synchronous endpoints.",
+    multiprocess_mode="livesum",
+)
+THREAD_POOL_TASKS_WAITING = Gauge(
+    "contaxy_thread_pool_tasks_waiting",
+    "Number of synchronous endpoints that are waiting for a free worker thread.",
+    multiprocess_mode="livesum",
+)
+
+DB_POOL_SIZE = Gauge(
+    "contaxy_db_pool_size",
+    "Configured size of the database connection pool.",
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "contaxy_db_pool_checked_out_connections",
+    "Number of database connections that are currently checked out from the pool.",
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "contaxy_db_pool_overflow_connections",
+    "Number of database connections that are opened in addition to the pool size.",
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKOUTS = Counter(
+    "contaxy_db_pool_checkouts",
+    "Number of database connection checkouts from the pool.",
+)
+
+JSON_DB_OPERATION_LATENCY = Histogram(
+    "contaxy_json_db_operation_duration_seconds",
+    "Latency of JSON DB operations in seconds.",
+    ["operation"],
+    buckets=LATENCY_BUCKETS,
+)
+
+SCHEDULED_JOB_RUNS = Counter(
+    "contaxy_scheduled_job_runs",
+    "Number of scheduled job executions by result (succeeded, failed or skipped).",
+    ["job", "result"],
+)
+SCHEDULED_JOB_DURATION = Histogram(
+    "contaxy_scheduled_job_duration_seconds",
+    "Duration of scheduled job executions in seconds.",
+    ["job"],
+    buckets=(0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0),
+)
+WARM_POOL_REQUESTS = Counter(
+    "contaxy_warm_pool_requests",
+    "Number of deployments whose container image was (hit) or was not (miss) pre-pulled by the warm pool.",
+    ["result"],
+)
+DEPLOYMENT_TIME_TO_READY = Histogram(
+    "contaxy_deployment_time_to_ready_seconds",
+    "Time from the deployment request until the container is started in seconds.",
+    ["deployment_type", "warm_pool"],
+    buckets=(0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0),
+)
+
+CACHE_REQUESTS = Counter(
+    "contaxy_cache_requests",
+    "Number of cache lookups by cache name and result (hit or miss).",
+    ["cache", "result"],
+)
+CACHE_EVICTIONS = Counter(
+    "contaxy_cache_evictions",
+    "Number of items removed from the cache because it was full or the items expired.",
+    ["cache"],
+)
+CACHE_SIZE = Gauge(
+    "contaxy_cache_size",
+    "Number of items currently in the cache.",
+    ["cache"],
+    multiprocess_mode="livesum",
+)
+CACHE_MAX_SIZE = Gauge(
+    "contaxy_cache_max_size",
+    "Maximum number of items in the cache.",
+    ["cache"],
+    multiprocess_mode="livesum",
+)
+
+AUTH_VERIFY_ACCESS_LATENCY = Histogram(
+    "contaxy_auth_verify_access_duration_seconds",
+    "Duration of access verifications in seconds.",
+    buckets=LATENCY_BUCKETS,
+)
+AUTH_CACHE_LOCK_WAIT = Histogram(
+    "contaxy_auth_cache_lock_wait_seconds",
+    "Time spent waiting for the auth cache lock on cache misses in seconds.",
+    buckets=LATENCY_BUCKETS,
+)
+AUTH_DB_RESOLVE_LATENCY = Histogram(
+    "contaxy_auth_db_resolve_duration_seconds",
+    "Duration of resolving tokens, permissions, and access verifications via the DB in seconds.",
+    ["operation"],
+    buckets=LATENCY_BUCKETS,
+)
+AUTH_ROLE_RESOLUTION_DEPTH = Histogram(
+    "contaxy_auth_role_resolution_depth",
+    "Depth of the role hierarchy resolved for a permission lookup.",
+    buckets=(0, 1, 2, 3, 5, 10),
+)
+
+F = TypeVar("F", bound=Callable)
+
+_instrumented_pools: "WeakSet[QueuePool]" = WeakSet()
+
+
+def is_multiprocess_mode() -> bool:
+    """Returns `True` if the metrics are collected across multiple processes."""
+    return MULTIPROC_DIR_ENV in os.environ
+
+
+def _get_registry() -> CollectorRegistry:
+    """Returns a registry that aggregates the metrics of all worker processes in multiprocess mode."""
+    if is_multiprocess_mode():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def generate_metrics() -> Tuple[bytes, str]:
+    """Returns all metrics in the Prometheus text format together with the matching content type.
+
+    In multiprocess mode, the metrics of all worker processes are aggregated.
+    """
+    return generate_latest(_get_registry()), CONTENT_TYPE_LATEST
+
+
+def collect_samples() -> List[Sample]:
+    """Returns the current samples of all metrics. In multiprocess mode, the samples of all worker processes are aggregated."""
+    return [sample for metric in _get_registry().collect() for sample in metric.samples]
+
+
+def _matches_labels(sample: Sample, labels: Optional[Dict[str, str]]) -> bool:
+    return all(sample.labels.get(key) == value for key, value in (labels or {}).items())
+
+
+def get_sample_value(
+    samples: List[Sample], name: str, labels: Optional[Dict[str, str]] = None
+) -> float:
+    """Returns the sum of all samples with the given name that have the given labels."""
+    return sum(
+        sample.value
+        for sample in samples
+        if sample.name == name and _matches_labels(sample, labels)
+    )
+
+
+def get_histogram_statistics(
+    samples: List[Sample], name: str, labels: Optional[Dict[str, str]] = None
+) -> HistogramStatistics:
+    """Returns the count, sum, and cumulative buckets of a histogram from the collected samples."""
+    buckets: Dict[str, int] = {}
+    for sample in samples:
+        if sample.name == name + "_bucket" and _matches_labels(sample, labels):
+            upper_bound = sample.labels["le"]
+            bucket_name = "inf" if upper_bound == "+Inf" else upper_bound
+            buckets[bucket_name] = buckets.get(bucket_name, 0) + int(sample.value)
+    return HistogramStatistics(
+        count=int(get_sample_value(samples, name + "_count", labels)),
+        sum=get_sample_value(samples, name + "_sum", labels),
+        buckets=buckets,
+    )
+
+
+def get_cache_statistics(samples: List[Sample], cache: str) -> CacheStatistics:
+    """Returns the statistics of the cache with the given name from the collected samples."""
+    return CacheStatistics(
+        size=int(get_sample_value(samples, "contaxy_cache_size", {"cache": cache})),
+        max_size=int(
+            get_sample_value(samples, "contaxy_cache_max_size", {"cache": cache})
+        ),
+        hits=int(
+            get_sample_value(
+                samples,
+                "contaxy_cache_requests_total",
+                {"cache": cache, "result": "hit"},
+            )
+        ),
+        misses=int(
+            get_sample_value(
+                samples,
+                "contaxy_cache_requests_total",
+                {"cache": cache, "result": "miss"},
+            )
+        ),
+        evictions=int(
+            get_sample_value(samples, "contaxy_cache_evictions_total", {"cache": cache})
+        ),
+    )
+
+
+def mark_process_dead(pid: int) -> None:
+    """Removes the live gauge values of a terminated worker process.
+
+    Should be called by the process manager (e.g. in the `child_exit` hook of Gunicorn).
+    """
+    if is_multiprocess_mode():
+        multiprocess.mark_process_dead(pid)
+
+
+def update_thread_pool_metrics() -> None:
+    """Updates the thread pool metrics. Needs to be called from within the event loop.
+
+    The thread pool is used by FastAPI to run all synchronous endpoints and dependencies.
+    """
+    statistics = to_thread.current_default_thread_limiter().statistics()
+    THREAD_POOL_CAPACITY.set(statistics.total_tokens)
+    THREAD_POOL_ACTIVE_THREADS.set(statistics.borrowed_tokens)
+    THREAD_POOL_TASKS_WAITING.set(statistics.tasks_waiting)
+
+
+def instrument_db_engine(engine: Engine) -> None:
+    """Tracks the connection pool usage of the given database engine."""
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        # Only queue pools have a fixed size and overflow
+        return
+
+    _instrumented_pools.add(pool)
+    update_db_pool_metrics()
+
+    @event.listens_for(pool, "checkout")
+    def _on_checkout(*args: object) -> None:
+        DB_POOL_CHECKOUTS.inc()
+        update_db_pool_metrics()
+
+
+def update_db_pool_metrics() -> None:
+    """Updates the connection pool metrics of all instrumented database engines.
+
+    The pool metrics are updated on every checkout and after every request,
+    since the pool statistics are only updated after the checkin events are emitted.
+    """
+    pools = list(_instrumented_pools)
+    DB_POOL_SIZE.set(sum(pool.size() for pool in pools))
+    DB_POOL_CHECKED_OUT.set(sum(pool.checkedout() for pool in pools))
+    DB_POOL_OVERFLOW.set(sum(max(pool.overflow(), 0) for pool in pools))
+
+
+def time_json_db_operation(func: F) -> F:
+    """Decorator that records the latency of a JSON DB operation."""
+    return JSON_DB_OPERATION_LATENCY.labels(operation=func.__name__).time()(func)
+
+
+def _get_route_labels(scope: Scope) -> Tuple[str, str]:
+    """Returns the path template and operation ID of the route that handles the request."""
+    app = scope.get("app")
+    for route in getattr(app, "routes", []):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path, getattr(route, "operation_id", None) or ""
+    return UNMATCHED_ROUTE, ""
+
+
+class MetricsMiddleware:
+    """ASGI middleware that records the request count, latency and in-flight requests per route.
+
+    The path template of the route (e.g. `/projects/{project_id}`) is used as label
+    instead of the actual path to keep the number of time series bounded.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route, operation_id = _get_route_labels(scope)
+        # Unhandled exceptions are returned as internal server error
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        requests_in_progress = REQUESTS_IN_PROGRESS.labels(method=method, route=route)
+        requests_in_progress.inc()
+        update_thread_pool_metrics()
+        start_time = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUEST_LATENCY.labels(
+                method=method, route=route, operation_id=operation_id
+            ).observe(time.perf_counter() - start_time)
+            REQUEST_COUNT.labels(
+                method=method,
+                route=route,
+                operation_id=operation_id,
+                status_code=str(status_code),
+            ).inc()
+            requests_in_progress.dec()
+            update_thread_pool_metrics()
+            update_db_pool_metrics()
@@ -1,5 +1,45 @@
-from typing import Dict
+import threading
+from typing import Callable, Dict, Iterable, Iterator
 
 
 def remove_none_values_from_dict(dictionary: Dict) -> Dict:
     return {k: v for k, v in dictionary.items() if v is not None}
+
+
+class ClosableStream(Iterator[bytes]):
+    """Iterator over the chunks of a stream (e.g. an HTTP response) that can be closed from another thread.
+
+    Closing the stream unblocks a thread that waits for the next chunk,
+    e.g. when following logs and the client disconnected.
+    """
+
+    def __init__(self, chunks: Iterable[bytes], close: Callable[[], None]):
+        """Initializes the stream.
+
+        Args:
+            chunks: The chunks of the stream.
+            close: Function that closes the underlying stream. It is called at most once.
+        """
+        self._chunks = iter(chunks)
+        self._close = close
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def __next__(self) -> bytes:
+        try:
+            return next(self._chunks)
+        except StopIteration:
+            self.close()
+            raise
+        except Exception:
+            if self._closed:
+                # Reading from the stream fails once it was closed by another thread
+                raise StopIteration
+            raise
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._close()
@@ -0,0 +1,202 @@
+"""Measures the overhead of the deployment manager with many projects and services.
+
+The deployments are kept by the in-process `FakeDeploymentPlatform` and the DB is the
+in-memory JSON DB, so the measured times only contain the work done by the manager.
+Run with `BENCHMARK_TESTS=true pytest tests/benchmarks`.
+"""
+
+import statistics
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Generator, List
+
+import pytest
+from loguru import logger
+from starlette.datastructures import State
+
+from contaxy import config
+from contaxy.config import settings
+from contaxy.managers.components import ComponentManager
+from contaxy.managers.deployment.fake import FakeDeploymentPlatform
+from contaxy.managers.deployment.manager import (
+    DeploymentManager,
+    reconcile_services,
+    stop_idle_services,
+)
+from contaxy.managers.deployment.service_access import get_service_access_recorder
+from contaxy.managers.deployment.utils import get_service_collection_id
+from contaxy.managers.json_db.inmemory_dict import InMemoryDictJsonDocumentManager
+from contaxy.operations import JsonDocumentOperations
+from contaxy.schema import Service, ServiceInput
+from contaxy.schema.auth import AuthorizedAccess
+from contaxy.schema.deployment import DeploymentStatus, DeploymentType
+from contaxy.utils.state_utils import GlobalState, RequestState
+
+from ..conftest import test_settings
+
+pytestmark = [
+    pytest.mark.slow,
+    pytest.mark.skipif(
+        not test_settings.BENCHMARK_TESTS, reason="Benchmark tests are disabled"
+    ),
+]
+
+
+PROJECTS = 1000
+SERVICES_PER_PROJECT = 50
+# Every n-th service was not accessed within its idle timeout
+IDLE_SERVICE_RATIO = 10
+
+
+def measure(name: str, func: Callable[[], Any], repetitions: int = 1) -> List[float]:
+    """Executes the function and prints the mean and maximum duration in milliseconds."""
+    durations = []
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+    print(
+        f"{name}: mean {statistics.mean(durations):.3f} ms, max {max(durations):.3f} ms"
+        f" ({repetitions} repetitions)"
+    )
+    return durations
+
+
+@dataclass
+class BenchmarkSetup:
+    platform: FakeDeploymentPlatform
+    component_manager: ComponentManager
+    deployment_manager: DeploymentManager
+
+
+@pytest.fixture(scope="module")
+def setup() -> Generator[BenchmarkSetup, None, None]:
+    """Creates the services of all projects in the DB and on the fake platform once for all benchmarks."""
+
+    def get_json_db_manager(
+        component_manager: ComponentManager,
+    ) -> JsonDocumentOperations:
+        return InMemoryDictJsonDocumentManager(
+            component_manager.global_state, component_manager.request_state
+        )
+
+    monkeypatch = pytest.MonkeyPatch()
+    monkeypatch.setattr(ComponentManager, "get_json_db_manager", get_json_db_manager)
+    # The idle check logs every stopped service
+    logger.disable("contaxy")
+    global_state = GlobalState(State())
+    global_state.settings = settings
+    platform = FakeDeploymentPlatform()
+    # Used by the component manager instead of a Docker or Kubernetes platform
+    global_state[DeploymentManager].deployment_platform = platform
+    component_manager = ComponentManager(global_state, RequestState(State()))
+    component_manager.request_state.authorized_access = AuthorizedAccess(
+        authorized_subject="users/benchmark-user"
+    )
+
+    start = time.perf_counter()
+    json_db_manager = component_manager.get_json_db_manager()
+    now = datetime.now(timezone.utc)
+    for project_index in range(PROJECTS):
+        project_id = f"project-{project_index}"
+        services = [
+            Service(
+                id=f"service-{service_index}",
+                display_name=f"service-{service_index}",
+                container_image="ubuntu:20.04",
+                deployment_type=DeploymentType.SERVICE,
+                idle_timeout=timedelta(hours=1),
+                last_access_time=now - timedelta(hours=2)
+                if service_index % IDLE_SERVICE_RATIO == 0
+                else now,
+            )
+            for service_index in range(SERVICES_PER_PROJECT)
+        ]
+        json_db_manager.create_json_documents(
+            config.SYSTEM_INTERNAL_PROJECT,
+            get_service_collection_id(project_id),
+            {
+                service.id: service.json(exclude={"status", "internal_id"})  # type: ignore
+                for service in services
+            },
+        )
+        platform.add_deployments(project_id, services)
+    print(
+        f"Setup of {PROJECTS} projects with {SERVICES_PER_PROJECT} services:"
+        f" {time.perf_counter() - start:.1f} s"
+    )
+
+    deployment_manager = component_manager.get_service_manager()
+    assert isinstance(deployment_manager, DeploymentManager)
+    yield BenchmarkSetup(platform, component_manager, deployment_manager)
+    global_state.close()
+    logger.enable("contaxy")
+    monkeypatch.undo()
+
+
+def test_list_services(setup: BenchmarkSetup) -> None:
+    services = []
+
+    def list_services() -> None:
+        services.extend(setup.deployment_manager.list_services("project-0"))
+
+    measure("list_services", list_services, repetitions=100)
+    assert len(services) == 100 * SERVICES_PER_PROJECT
+
+
+def test_list_all_services(setup: BenchmarkSetup) -> None:
+    measure("list_all_services", setup.deployment_manager.list_all_services, 3)
+
+
+def test_get_service_metadata(setup: BenchmarkSetup) -> None:
+    measure(
+        "get_service_metadata",
+        lambda: setup.deployment_manager.get_service_metadata("project-1", "service-1"),
+        repetitions=1000,
+    )
+
+
+def test_deploy_service(setup: BenchmarkSetup) -> None:
+    service_inputs = iter(
+        ServiceInput(
+            display_name=f"deployed-service-{index}", container_image="ubuntu:20.04"
+        )
+        for index in range(100)
+    )
+    measure(
+        "deploy_service",
+        lambda: setup.deployment_manager.deploy_service(
+            "project-2", next(service_inputs)
+        ),
+        repetitions=100,
+    )
+
+
+def test_flush_service_accesses(setup: BenchmarkSetup) -> None:
+    recorder = get_service_access_recorder(setup.component_manager.global_state)
+    for project_index in range(PROJECTS):
+        for service_index in range(1, SERVICES_PER_PROJECT, IDLE_SERVICE_RATIO):
+            recorder.record(f"project-{project_index}", f"service-{service_index}")
+    measure("flush_service_accesses", setup.deployment_manager.flush_service_accesses)
+
+
+def test_reconcile_services(setup: BenchmarkSetup) -> None:
+    measure("reconcile_services", lambda: reconcile_services(setup.component_manager))
+
+
+def test_stop_idle_services(setup: BenchmarkSetup) -> None:
+    measure("stop_idle_services", lambda: stop_idle_services(setup.component_manager))
+    running_services = [
+        service
+        for service in setup.platform.list_services("project-3")
+        if service.status == DeploymentStatus.RUNNING
+    ]
+    assert len(running_services) == SERVICES_PER_PROJECT - (
+        SERVICES_PER_PROJECT // IDLE_SERVICE_RATIO
+    )
+    # Nothing is stopped anymore in the next check
+    measure(
+        "stop_idle_services (no idle services)",
+        lambda: stop_idle_services(setup.component_manager),
+    )
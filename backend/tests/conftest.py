@@ -23,6 +23,7 @@ class TestSettings(BaseSettings):
     REMOTE_BACKEND_ENDPOINT: Optional[str] = None
     DOCKER_INTEGRATION_TESTS: bool = True
     KUBERNETES_INTEGRATION_TESTS: bool = False
+    BENCHMARK_TESTS: bool = False
 
 
 test_settings = TestSettings()
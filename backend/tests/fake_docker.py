@@ -0,0 +1,282 @@
+"""Minimal stand-in for the Docker client used to test the Docker platform without a Docker daemon.
+
+Containers are stored as raw container attributes and container events are sent via `send_event`.
+"""
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+import docker.errors
+from docker.models.containers import Container
+from docker.models.networks import Network
+
+from contaxy.config import settings
+from contaxy.managers.deployment.utils import Labels
+from contaxy.schema.deployment import DeploymentType
+
+
+class FakeImage:
+    tags = ["ubuntu:20.04"]
+    short_id = "sha256:abc"
+
+
+class FakeEventsStream:
+    """Blocking stream of the events of the given type that ends at the requested time or when it is closed."""
+
+    def __init__(
+        self,
+        events: List[dict],
+        since: Optional[int],
+        until: Optional[int],
+        event_type: Optional[str],
+    ) -> None:
+        self._events = events
+        self._since = since
+        self._until = until
+        self._event_type = event_type
+        self._closed = False
+
+    def __iter__(self) -> Iterator[dict]:
+        next_index = 0
+        while not self._closed:
+            if self._until is not None and time.time() >= self._until:
+                return
+            if next_index >= len(self._events):
+                time.sleep(0.05)
+                continue
+            event = self._events[next_index]
+            next_index += 1
+            if self._since is not None and event["time"] < self._since:
+                continue
+            if self._event_type is None or event["Type"] == self._event_type:
+                yield event
+
+    def close(self) -> None:
+        self._closed = True
+
+
+class FakeLogStream:
+    """Stream of log chunks. In follow mode, the stream blocks after the last chunk until it is closed."""
+
+    def __init__(self, log_chunks: List[bytes], follow: bool) -> None:
+        self._log_chunks = iter(log_chunks)
+        self._follow = follow
+        self.closed = threading.Event()
+
+    def __iter__(self) -> Iterator[bytes]:
+        return self
+
+    def __next__(self) -> bytes:
+        for log_chunk in self._log_chunks:
+            return log_chunk
+        if self._follow:
+            self.closed.wait()
+        raise StopIteration
+
+    def close(self) -> None:
+        self.closed.set()
+
+
+class FakeDockerClient:
+    """Stand-in for the Docker client that counts the container API calls."""
+
+    def __init__(self) -> None:
+        self.container_attrs: Dict[str, dict] = {}
+        # All sent events, every events stream replays the events since its start time
+        self.sent_events: List[dict] = []
+        self.calls: Dict[str, int] = {
+            "list": 0,
+            "get": 0,
+            "events": 0,
+            "ping": 0,
+            "logs": 0,
+            "pull": 0,
+            "network_list": 0,
+            "network_create": 0,
+            "network_connect": 0,
+        }
+        self.network_attrs: Dict[str, dict] = {}
+        # Log chunks of the containers
+        self.container_logs: Dict[str, List[bytes]] = {}
+        # Stats (as returned by the Docker stats API) of the containers
+        self.container_stats: Dict[str, dict] = {}
+        # Images that were pulled and images for which the pull fails
+        self.pulled_images: List[str] = []
+        self.unavailable_images: List[str] = []
+        # If set to False, all ping requests fail
+        self.reachable = True
+        client = self
+
+        class Containers:
+            def list(self, all: bool = False, filters: dict = {}) -> List[Container]:
+                client.calls["list"] += 1
+                return [
+                    Container(attrs=attrs, client=client)
+                    for attrs in client.container_attrs.values()
+                    if client._matches_labels(attrs, filters.get("label", []))
+                ]
+
+            def get(self, container_id: str) -> Container:
+                client.calls["get"] += 1
+                if container_id not in client.container_attrs:
+                    raise docker.errors.NotFound(f"No such container: {container_id}")
+                return Container(
+                    attrs=client.container_attrs[container_id], client=client
+                )
+
+        class Images:
+            def get(self, image_id: str) -> FakeImage:
+                return FakeImage()
+
+            def pull(self, repository: str, tag: Optional[str] = None) -> FakeImage:
+                client.calls["pull"] += 1
+                image = f"{repository}:{tag}"
+                if image in client.unavailable_images:
+                    raise docker.errors.NotFound(f"No such image: {image}")
+                client.pulled_images.append(image)
+                return FakeImage()
+
+        class Networks:
+            def list(self, filters: dict = {}) -> List[Network]:
+                client.calls["network_list"] += 1
+                return [
+                    Network(attrs=attrs, client=client)
+                    for attrs in client.network_attrs.values()
+                ]
+
+            def get(self, network_id: str) -> Network:
+                for attrs in client.network_attrs.values():
+                    if network_id in (attrs["Id"], attrs["Name"]):
+                        return Network(attrs=attrs, client=client)
+                raise docker.errors.NotFound(f"No such network: {network_id}")
+
+            def create(
+                self, name: str, ipam: Optional[dict] = None, **kwargs: Any
+            ) -> Network:
+                client.calls["network_create"] += 1
+                subnet = (ipam or {}).get("Config", [{}])[0].get("Subnet")
+                network_id = client.add_network(name, subnet)
+                return self.get(network_id)
+
+        class Api:
+            def logs(
+                self, container_id: str, stream: bool = False, **kwargs: Any
+            ) -> Any:
+                client.calls["logs"] += 1
+                log_chunks = client.container_logs.get(container_id, [])
+                if stream:
+                    return FakeLogStream(log_chunks, follow=kwargs.get("follow", False))
+                return b"".join(log_chunks)
+
+            def stats(self, container_id: str, **kwargs: Any) -> dict:
+                if container_id not in client.container_stats:
+                    raise docker.errors.NotFound(f"No such container: {container_id}")
+                return client.container_stats[container_id]
+
+            def connect_container_to_network(
+                self, container_id: str, network_id: str, **kwargs: Any
+            ) -> None:
+                client.calls["network_connect"] += 1
+                network_name = client.network_attrs[network_id]["Name"]
+                client.container_attrs[container_id]["NetworkSettings"]["Networks"][
+                    network_name
+                ] = {"NetworkID": network_id}
+
+            def remove_network(self, network_id: str) -> None:
+                del client.network_attrs[network_id]
+
+        self.containers = Containers()
+        self.images = Images()
+        self.networks = Networks()
+        self.api = Api()
+
+    def ping(self) -> bool:
+        self.calls["ping"] += 1
+        if not self.reachable:
+            raise docker.errors.APIError("Docker daemon is not reachable.")
+        return True
+
+    def events(
+        self,
+        decode: bool = False,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+        filters: dict = {},
+    ) -> FakeEventsStream:
+        self.calls["events"] += 1
+        return FakeEventsStream(self.sent_events, since, until, filters.get("type"))
+
+    def add_container(
+        self,
+        name: str,
+        project_id: str = "test-project",
+        deployment_type: DeploymentType = DeploymentType.SERVICE,
+        status: str = "running",
+    ) -> str:
+        container_id = f"id-{name}"
+        self.container_attrs[container_id] = {
+            "Id": container_id,
+            "Name": f"/{name}",
+            "Image": "sha256:abc",
+            "Config": {
+                "Labels": {
+                    Labels.NAMESPACE.value: settings.SYSTEM_NAMESPACE,
+                    Labels.PROJECT_NAME.value: project_id,
+                    Labels.DEPLOYMENT_TYPE.value: deployment_type.value,
+                    Labels.DEPLOYMENT_ID.value: name,
+                    Labels.DISPLAY_NAME.value: name,
+                },
+                "Env": [],
+                "Entrypoint": [],
+                "Cmd": [],
+            },
+            "HostConfig": {"NanoCpus": 1e9, "Memory": 100 * 1000 * 1000},
+            "NetworkSettings": {"Networks": {}},
+            "State": {
+                "Status": status,
+                "ExitCode": 0,
+                "StartedAt": "2022-01-01T00:00:00.000000000Z",
+                "FinishedAt": "0001-01-01T00:00:00Z",
+            },
+        }
+        return container_id
+
+    def add_network(self, name: str, subnet: Optional[str] = None) -> str:
+        """Adds a network. Like the Docker daemon, fails if the name or the subnet is already used."""
+        for attrs in self.network_attrs.values():
+            if attrs["Name"] == name:
+                raise docker.errors.APIError(f"Network with name {name} already exists")
+            if subnet is not None and subnet in [
+                config["Subnet"] for config in attrs["IPAM"]["Config"]
+            ]:
+                raise docker.errors.APIError(f"Pool overlaps with {attrs['Name']}")
+        network_id = f"net-{name}"
+        self.network_attrs[network_id] = {
+            "Id": network_id,
+            "Name": name,
+            "IPAM": {"Config": [{"Subnet": subnet}] if subnet else []},
+        }
+        return network_id
+
+    def send_event(
+        self,
+        action: str,
+        actor_id: str,
+        event_type: str = "container",
+        attributes: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.sent_events.append(
+            {
+                "Type": event_type,
+                "Action": action,
+                "Actor": {"ID": actor_id, "Attributes": attributes or {}},
+                "time": time.time(),
+            }
+        )
+
+    def _matches_labels(self, attrs: dict, label_filters: List[str]) -> bool:
+        labels = attrs["Config"]["Labels"]
+        return all(
+            labels.get(label_filter.split("=", 1)[0]) == label_filter.split("=", 1)[1]
+            for label_filter in label_filters
+        )
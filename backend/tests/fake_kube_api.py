@@ -0,0 +1,406 @@
+"""Minimal stand-in for the Kubernetes API server used to test the Kubernetes platform without a cluster.
+
+Supports version requests, pod logs as well as get, list, watch, patch, replace and delete requests for namespaced resources. Resources are created,
+updated and deleted directly via the server object and every change is recorded as watch event with an increasing resource version.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+# Maps the resource plural to the API path prefix and kind
+RESOURCE_TYPES = {
+    "deployments": ("/apis/apps/v1", "Deployment"),
+    "jobs": ("/apis/batch/v1", "Job"),
+    "persistentvolumeclaims": ("/api/v1", "PersistentVolumeClaim"),
+    "pods": ("/api/v1", "Pod"),
+    "services": ("/api/v1", "Service"),
+}
+
+VERSION_INFO = {
+    "major": "1",
+    "minor": "24",
+    "gitVersion": "v1.24.0",
+    "gitCommit": "fake",
+    "gitTreeState": "clean",
+    "buildDate": "2022-05-03T13:36:49Z",
+    "goVersion": "go1.18.1",
+    "compiler": "gc",
+    "platform": "linux/amd64",
+}
+
+
+class FakeKubeApiServer:
+    def __init__(self) -> None:
+        self._resources: Dict[str, Dict[str, dict]] = {
+            plural: {} for plural in RESOURCE_TYPES
+        }
+        self._events: List[Tuple[int, str, str, dict]] = []
+        self._resource_version = 1
+        # Watches starting before this resource version are answered with 410 Gone
+        self._oldest_resource_version = 1
+        self._watch_generation = 0
+        self._condition = threading.Condition()
+        self._stopped = False
+        # Log chunks of the pods. In follow mode, the logs are kept open until the server is stopped.
+        self.pod_logs: Dict[str, List[bytes]] = {}
+        # Log of all handled requests as (plural, request type, query parameters)
+        self.requests: List[Tuple[str, str, Dict[str, str]]] = []
+
+        server = self
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:
+                try:
+                    server._handle_get(self)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client closed the connection (e.g. stopped watch)
+                    self.close_connection = True
+
+            def do_DELETE(self) -> None:
+                server._handle_delete(self)
+
+            def do_PATCH(self) -> None:
+                server._handle_update(self)
+
+            def do_PUT(self) -> None:
+                server._handle_update(self)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        self._http_server = ThreadingHTTPServer(("127.0.0.1", 0), RequestHandler)
+        self._http_server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._http_server.serve_forever, daemon=True
+        )
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._http_server.server_address[1]}"
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        self._http_server.shutdown()
+        self._http_server.server_close()
+
+    def count_requests(self, plural: str, request_type: str) -> int:
+        return len(
+            [
+                request
+                for request in self.requests
+                if request[0] == plural and request[1] == request_type
+            ]
+        )
+
+    def create(self, plural: str, manifest: dict) -> dict:
+        return self._store(plural, manifest, "ADDED")
+
+    def update(self, plural: str, manifest: dict) -> dict:
+        return self._store(plural, manifest, "MODIFIED")
+
+    def delete(self, plural: str, name: str) -> None:
+        with self._condition:
+            resource = self._resources[plural].pop(name)
+            self._resource_version += 1
+            resource["metadata"]["resourceVersion"] = str(self._resource_version)
+            self._events.append((self._resource_version, plural, "DELETED", resource))
+            self._condition.notify_all()
+
+    def expire_watches(self) -> None:
+        """Closes all open watches and expires the event history, so that watches cannot be resumed."""
+        with self._condition:
+            self._resource_version += 1
+            self._oldest_resource_version = self._resource_version
+            self._watch_generation += 1
+            self._condition.notify_all()
+
+    def _store(self, plural: str, manifest: dict, event_type: str) -> dict:
+        with self._condition:
+            self._resource_version += 1
+            resource = json.loads(json.dumps(manifest))
+            metadata = resource.setdefault("metadata", {})
+            metadata["resourceVersion"] = str(self._resource_version)
+            metadata.setdefault("uid", f"uid-{metadata['name']}")
+            metadata.setdefault("labels", {})
+            metadata.setdefault("annotations", {})
+            self._resources[plural][metadata["name"]] = resource
+            self._events.append((self._resource_version, plural, event_type, resource))
+            self._condition.notify_all()
+            return resource
+
+    def _handle_get(self, handler: BaseHTTPRequestHandler) -> None:
+        parsed_url = urlparse(handler.path)
+        query = {key: values[0] for key, values in parse_qs(parsed_url.query).items()}
+        if parsed_url.path.rstrip("/") == "/version":
+            self.requests.append(("version", "get", query))
+            self._send_json(handler, 200, VERSION_INFO)
+            return
+        path_segments = parsed_url.path.strip("/").split("/")
+        namespaces_index = path_segments.index("namespaces")
+        plural = path_segments[namespaces_index + 2]
+        name: Optional[str] = (
+            path_segments[namespaces_index + 3]
+            if len(path_segments) > namespaces_index + 3
+            else None
+        )
+
+        if name is not None and path_segments[-1] == "log":
+            self.requests.append((plural, "log", query))
+            self._send_logs(handler, name, query)
+        elif name is not None:
+            self.requests.append((plural, "get", query))
+            resource = self._resources[plural].get(name)
+            if resource is None:
+                self._send_json(
+                    handler,
+                    404,
+                    {
+                        "kind": "Status",
+                        "apiVersion": "v1",
+                        "status": "Failure",
+                        "reason": "NotFound",
+                        "code": 404,
+                    },
+                )
+            else:
+                self._send_json(handler, 200, resource)
+        elif query.get("watch") in ["true", "True", "1"]:
+            self.requests.append((plural, "watch", query))
+            self._watch(handler, plural, query)
+        else:
+            self.requests.append((plural, "list", query))
+            with self._condition:
+                items = [
+                    resource
+                    for resource in self._resources[plural].values()
+                    if self._matches_selector(resource, query)
+                ]
+                resource_version = self._resource_version
+            self._send_json(
+                handler,
+                200,
+                {
+                    "kind": RESOURCE_TYPES[plural][1] + "List",
+                    "apiVersion": RESOURCE_TYPES[plural][0].split("/", 2)[-1],
+                    "metadata": {"resourceVersion": str(resource_version)},
+                    "items": items,
+                },
+            )
+
+    def _watch(
+        self, handler: BaseHTTPRequestHandler, plural: str, query: Dict[str, str]
+    ) -> None:
+        handler.send_response(200)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Transfer-Encoding", "chunked")
+        handler.end_headers()
+
+        last_resource_version = int(query.get("resourceVersion") or 0)
+        deadline = time.time() + int(query.get("timeoutSeconds") or 300)
+        with self._condition:
+            watch_generation = self._watch_generation
+            if last_resource_version < self._oldest_resource_version:
+                self._send_chunk(
+                    handler,
+                    {
+                        "type": "ERROR",
+                        "object": {
+                            "kind": "Status",
+                            "apiVersion": "v1",
+                            "status": "Failure",
+                            "message": "too old resource version",
+                            "reason": "Expired",
+                            "code": 410,
+                        },
+                    },
+                )
+                self._end_chunks(handler)
+                return
+
+        while True:
+            with self._condition:
+                events = [
+                    event
+                    for event in self._events
+                    if event[0] > last_resource_version and event[1] == plural
+                ]
+                if not events:
+                    remaining_time = deadline - time.time()
+                    if (
+                        self._stopped
+                        or remaining_time <= 0
+                        or watch_generation != self._watch_generation
+                    ):
+                        break
+                    self._condition.wait(min(remaining_time, 0.1))
+                    continue
+            for resource_version, _, event_type, resource in events:
+                last_resource_version = resource_version
+                if self._matches_selector(resource, query):
+                    self._send_chunk(handler, {"type": event_type, "object": resource})
+        self._end_chunks(handler)
+
+    def _handle_delete(self, handler: BaseHTTPRequestHandler) -> None:
+        parsed_url = urlparse(handler.path)
+        query = {key: values[0] for key, values in parse_qs(parsed_url.query).items()}
+        # The request body contains the delete options
+        handler.rfile.read(int(handler.headers.get("Content-Length") or 0))
+        path_segments = parsed_url.path.strip("/").split("/")
+        namespaces_index = path_segments.index("namespaces")
+        plural = path_segments[namespaces_index + 2]
+        if len(path_segments) > namespaces_index + 3:
+            name = path_segments[namespaces_index + 3]
+            self.requests.append((plural, "delete", query))
+            names = [name] if name in self._resources[plural] else []
+            if not names:
+                self._send_json(
+                    handler,
+                    404,
+                    {
+                        "kind": "Status",
+                        "apiVersion": "v1",
+                        "status": "Failure",
+                        "reason": "NotFound",
+                        "code": 404,
+                    },
+                )
+                return
+        else:
+            self.requests.append((plural, "deletecollection", query))
+            with self._condition:
+                names = [
+                    name
+                    for name, resource in self._resources[plural].items()
+                    if self._matches_selector(resource, query)
+                ]
+        for name in names:
+            self.delete(plural, name)
+        self._send_json(
+            handler, 200, {"kind": "Status", "apiVersion": "v1", "status": "Success"}
+        )
+
+    def _send_logs(
+        self, handler: BaseHTTPRequestHandler, name: str, query: Dict[str, str]
+    ) -> None:
+        handler.send_response(200)
+        handler.send_header("Content-Type", "text/plain")
+        handler.send_header("Transfer-Encoding", "chunked")
+        handler.end_headers()
+        for log_chunk in self.pod_logs.get(name, []):
+            handler.wfile.write(
+                f"{len(log_chunk):x}\r\n".encode("utf-8") + log_chunk + b"\r\n"
+            )
+            handler.wfile.flush()
+        if query.get("follow") in ["true", "True", "1"]:
+            with self._condition:
+                while not self._stopped:
+                    self._condition.wait(0.1)
+        self._end_chunks(handler)
+
+    def _matches_selector(self, resource: dict, query: Dict[str, str]) -> bool:
+        field_selector = query.get("fieldSelector")
+        if (
+            field_selector
+            and field_selector != f"metadata.name={resource['metadata']['name']}"
+        ):
+            # Only the selection by name is supported
+            return False
+        label_selector = query.get("labelSelector")
+        if not label_selector:
+            return True
+        labels = resource["metadata"].get("labels") or {}
+        for requirement in label_selector.split(","):
+            key, value = requirement.split("=", 1)
+            if labels.get(key) != value:
+                return False
+        return True
+
+    def _handle_update(self, handler: BaseHTTPRequestHandler) -> None:
+        """Handles merge patches, JSON patches that replace fields, and replace requests.
+
+        Like the Kubernetes API server, the generation is increased if the spec changes.
+        """
+        parsed_url = urlparse(handler.path)
+        body = json.loads(
+            handler.rfile.read(int(handler.headers.get("Content-Length") or 0))
+        )
+        path_segments = parsed_url.path.strip("/").split("/")
+        namespaces_index = path_segments.index("namespaces")
+        plural = path_segments[namespaces_index + 2]
+        name = path_segments[namespaces_index + 3]
+        self.requests.append((plural, handler.command.lower(), {}))
+        with self._condition:
+            resource = self._resources[plural].get(name)
+        if resource is None:
+            self._send_json(
+                handler,
+                404,
+                {
+                    "kind": "Status",
+                    "apiVersion": "v1",
+                    "status": "Failure",
+                    "reason": "NotFound",
+                    "code": 404,
+                },
+            )
+            return
+        resource = json.loads(json.dumps(resource))
+        if handler.command == "PUT":
+            updated_resource = {**body, "status": resource.get("status", {})}
+        elif isinstance(body, list):
+            updated_resource = resource
+            for operation in body:
+                assert operation["op"] == "replace"
+                target = updated_resource
+                *parents, field = operation["path"].strip("/").split("/")
+                for parent in parents:
+                    target = target.setdefault(parent, {})
+                target[field] = operation["value"]
+        else:
+            updated_resource = _merge(resource, body)
+        generation = resource["metadata"].get("generation", 1)
+        if updated_resource.get("spec") != resource.get("spec"):
+            generation += 1
+        updated_resource.setdefault("metadata", {})["generation"] = generation
+        self._send_json(handler, 200, self.update(plural, updated_resource))
+
+    def _send_json(
+        self, handler: BaseHTTPRequestHandler, status_code: int, content: dict
+    ) -> None:
+        body = json.dumps(content).encode("utf-8")
+        handler.send_response(status_code)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def _send_chunk(self, handler: BaseHTTPRequestHandler, content: dict) -> None:
+        data = (json.dumps(content) + "\n").encode("utf-8")
+        handler.wfile.write(f"{len(data):x}\r\n".encode("utf-8") + data + b"\r\n")
+        handler.wfile.flush()
+
+    def _end_chunks(self, handler: BaseHTTPRequestHandler) -> None:
+        handler.wfile.write(b"0\r\n\r\n")
+        handler.wfile.flush()
+
+
+def _merge(resource: dict, patch: dict) -> dict:
+    """Applies a JSON merge patch to the resource."""
+    for key, value in patch.items():
+        if isinstance(value, dict) and isinstance(resource.get(key), dict):
+            _merge(resource[key], value)
+        elif value is None:
+            resource.pop(key, None)
+        else:
+            resource[key] = value
+    return resource
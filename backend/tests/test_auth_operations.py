@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from random import randrange
 from typing import Generator, List, Set
 
@@ -12,14 +13,18 @@ from contaxy import config
 from contaxy.clients import AuthClient, JsonDocumentClient
 from contaxy.config import settings
 from contaxy.managers.auth import AuthManager
+from contaxy.managers.auth_postgres import PostgresAuthManager
 from contaxy.managers.json_db.inmemory_dict import InMemoryDictJsonDocumentManager
 from contaxy.managers.json_db.postgres import PostgresJsonDocumentManager
 from contaxy.operations import AuthOperations, JsonDocumentOperations
 from contaxy.schema.auth import (
     AccessLevel,
+    AccessToken,
+    AuthorizedAccess,
     OAuth2Error,
     OAuth2TokenGrantTypes,
     OAuth2TokenRequestFormNew,
+    TokenPurpose,
     TokenType,
     User,
     UserRegistration,
@@ -123,6 +128,25 @@ class AuthOperationsTests(ABC):
         )
         assert len(self.auth_manager.list_permissions(resource_name)) == 0
 
+    def test_concurrent_permission_updates(self) -> None:
+        resource_name = "users/" + id_utils.generate_short_uuid()
+        permissions = [
+            f"projects/{id_utils.generate_short_uuid()}#read" for _ in range(10)
+        ]
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            list(
+                executor.map(
+                    lambda permission: self.auth_manager.add_permission(
+                        resource_name, permission
+                    ),
+                    permissions,
+                )
+            )
+        # No update is allowed to get lost
+        assert set(self.auth_manager.list_permissions(resource_name)) == set(
+            permissions
+        )
+
     def test_list_permissions(self, user_data: List[UserRegistration]) -> None:
         # create role
         TEST_ROLE = "roles/test"
@@ -261,6 +285,72 @@ class AuthOperationsTests(ABC):
             is AccessLevel.READ
         )
 
+    def test_logout_session(self) -> None:
+        if not isinstance(self.auth_manager, AuthManager):
+            pytest.skip("The session is only logged out via the request state.")
+        USER = "users/" + id_utils.generate_short_uuid()
+        token = self.auth_manager.create_token(
+            token_subject=USER,
+            scopes=["projects#read"],
+            token_type=TokenType.API_TOKEN,
+            token_purpose=TokenPurpose.LOGIN_TOKEN,
+        )
+        self.auth_manager.verify_access(token, use_cache=False)
+        self.auth_manager._request_state.authorized_access = AuthorizedAccess(
+            authorized_subject=USER,
+            access_token=AccessToken(
+                token=token,
+                token_type=TokenType.API_TOKEN,
+                subject=USER,
+                scopes=["projects#read"],
+            ),
+        )
+
+        self.auth_manager.logout_session()
+        # The login token is revoked
+        with pytest.raises(UnauthenticatedError):
+            self.auth_manager.verify_access(token, use_cache=False)
+        # Logging out again does not fail
+        self.auth_manager.logout_session()
+
+    def test_delete_expired_api_tokens(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        if not isinstance(self.auth_manager, AuthManager):
+            pytest.skip("Expired tokens are only deleted by the scheduled job.")
+        USER = "users/" + id_utils.generate_short_uuid()
+        monkeypatch.setattr(
+            settings,
+            "API_TOKEN_EXPIRY",
+            {TokenPurpose.PROJECT_API_TOKEN: timedelta(seconds=-1)},
+        )
+        valid_token = self.auth_manager.create_token(
+            token_subject=USER,
+            scopes=["projects#read"],
+            token_type=TokenType.API_TOKEN,
+            token_purpose=TokenPurpose.USER_API_TOKEN,
+        )
+        expired_tokens = [
+            self.auth_manager.create_token(
+                token_subject=USER,
+                scopes=["projects#read"],
+                token_type=TokenType.API_TOKEN,
+                token_purpose=TokenPurpose.PROJECT_API_TOKEN,
+            )
+            for _ in range(2)
+        ]
+
+        # Expired tokens are rejected even if they still exist in the DB
+        with pytest.raises(UnauthenticatedError):
+            self.auth_manager.verify_access(expired_tokens[0])
+        assert self.auth_manager.introspect_token(expired_tokens[0]).active is False
+        self.auth_manager.verify_access(valid_token)
+
+        # The expired tokens are deleted in several batches
+        monkeypatch.setattr(settings, "API_TOKEN_CLEANUP_BATCH_SIZE", 1)
+        assert self.auth_manager.delete_expired_api_tokens() == 2
+        assert [token.token for token in self.auth_manager.list_api_tokens(USER)] == [
+            valid_token
+        ]
+
     def test_revoke_token(self) -> None:
         PROJECT = "projects/" + id_utils.generate_short_uuid()
         USER = "users/" + id_utils.generate_short_uuid()
@@ -487,6 +577,35 @@ class TestAuthManagerWithPostgresDB(AuthOperationsTests):
         return self._json_db
 
 
+@pytest.mark.skipif(
+    not test_settings.POSTGRES_INTEGRATION_TESTS,
+    reason="Postgres Integration Tests are deactivated, use POSTGRES_INTEGRATION_TESTS to activate.",
+)
+@pytest.mark.integration
+class TestPostgresAuthManager(AuthOperationsTests):
+    @pytest.fixture(autouse=True)
+    def _init_auth_manager(
+        self, global_state: GlobalState, request_state: RequestState
+    ) -> Generator:
+        self._json_db = PostgresJsonDocumentManager(global_state, request_state)
+        # Cleanup everything at the startup (also drops the auth tables)
+        self._json_db.delete_json_collections(config.SYSTEM_INTERNAL_PROJECT)
+        self._auth_manager = PostgresAuthManager(
+            ComponentManagerMock(
+                global_state, request_state, json_db_manager=self._json_db
+            )
+        )
+        yield
+
+    @property
+    def auth_manager(self) -> AuthManager:
+        return self._auth_manager
+
+    @property
+    def json_db(self) -> JsonDocumentOperations:
+        return self._json_db
+
+
 @pytest.mark.unit
 class TestAuthManagerWithInMemoryDB(AuthOperationsTests):
     @pytest.fixture(autouse=True)
@@ -547,6 +666,38 @@ class TestAuthManagerWithInMemoryDB(AuthOperationsTests):
         assert payload.get("sub") == USER
         assert len(self.auth_manager.list_api_tokens(USER)) == 2
 
+    def test_get_auth_statistics(self) -> None:
+        USER = "users/" + id_utils.generate_short_uuid()
+        self.auth_manager.add_permission(USER, "projects#read")
+        token = self.auth_manager.create_token(
+            token_subject=USER,
+            scopes=["projects#read"],
+            token_type=TokenType.API_TOKEN,
+        )
+        initial_statistics = self.auth_manager.get_auth_statistics()
+
+        self.auth_manager.verify_access(token, "projects#read")
+        self.auth_manager.verify_access(token, "projects#read")
+
+        statistics = self.auth_manager.get_auth_statistics()
+        verify_access_cache = statistics.caches["verify_access"]
+        initial_verify_access_cache = initial_statistics.caches["verify_access"]
+        assert verify_access_cache.misses == initial_verify_access_cache.misses + 1
+        assert verify_access_cache.hits == initial_verify_access_cache.hits + 1
+        assert (
+            statistics.verify_access_seconds.count
+            == initial_statistics.verify_access_seconds.count + 2
+        )
+        assert (
+            statistics.db_resolve_seconds["verify_access"].count
+            == initial_statistics.db_resolve_seconds["verify_access"].count + 1
+        )
+        assert statistics.lock_wait_seconds.count > 0
+        assert (
+            statistics.verify_access_seconds.buckets["inf"]
+            == statistics.verify_access_seconds.count
+        )
+
 
 @pytest.mark.skipif(
     not test_settings.REMOTE_BACKEND_ENDPOINT,
@@ -0,0 +1,82 @@
+from typing import Any, Generator, List
+
+import docker
+import pytest
+from starlette.datastructures import State
+
+from contaxy.config import DeploymentManager as DeploymentManagerType
+from contaxy.config import settings
+from contaxy.managers.components import ComponentManager
+from contaxy.managers.deployment.docker import DockerDeploymentPlatform
+from contaxy.managers.deployment.manager import (
+    DeploymentManager,
+    check_deployment_platform_health,
+)
+from contaxy.utils.state_utils import GlobalState, RequestState
+
+from .fake_docker import FakeDockerClient
+
+
+@pytest.mark.unit
+class TestDeploymentPlatformSharing:
+    @pytest.fixture(autouse=True)
+    def _init_global_state(self, monkeypatch: pytest.MonkeyPatch) -> Generator:
+        self.created_clients: List[FakeDockerClient] = []
+        self.docker_reachable = True
+
+        def from_env(**kwargs: Any) -> FakeDockerClient:
+            client = FakeDockerClient()
+            client.reachable = self.docker_reachable
+            self.created_clients.append(client)
+            return client
+
+        monkeypatch.setattr(docker, "from_env", from_env)
+        # Skip reconnecting to the Docker networks, the container cache and the metrics collector
+        monkeypatch.setattr(DockerDeploymentPlatform, "_is_initialized", True)
+        monkeypatch.setattr(settings, "DOCKER_CONTAINER_CACHE_ENABLED", False)
+        monkeypatch.setattr(settings, "DEPLOYMENT_METRICS_ENABLED", False)
+        monkeypatch.setattr(
+            settings, "DEPLOYMENT_MANAGER", DeploymentManagerType.DOCKER
+        )
+
+        self.global_state = GlobalState(State())
+        self.global_state.settings = settings
+        yield
+        self.global_state.close()
+
+    def get_service_manager(self) -> DeploymentManager:
+        component_manager = ComponentManager(self.global_state, RequestState(State()))
+        service_manager = component_manager.get_service_manager()
+        assert isinstance(service_manager, DeploymentManager)
+        return service_manager
+
+    def test_platform_is_created_once(self) -> None:
+        deployment_platform = self.get_service_manager().deployment_platform
+        for _ in range(5):
+            assert self.get_service_manager().deployment_platform is deployment_platform
+        assert len(self.created_clients) == 1
+
+    def test_health_check(self) -> None:
+        component_manager = ComponentManager(self.global_state, RequestState(State()))
+        check_deployment_platform_health(component_manager)
+        assert self.created_clients[0].calls["ping"] == 1
+        assert len(self.created_clients) == 1
+
+    def test_reconnect_on_failed_health_check(self) -> None:
+        deployment_platform = self.get_service_manager().deployment_platform
+        assert isinstance(deployment_platform, DockerDeploymentPlatform)
+        self.created_clients[0].reachable = False
+
+        assert deployment_platform.check_health()
+        assert len(self.created_clients) == 2
+        assert deployment_platform.client is self.created_clients[1]
+
+    def test_failed_reconnect(self) -> None:
+        deployment_platform = self.get_service_manager().deployment_platform
+        assert isinstance(deployment_platform, DockerDeploymentPlatform)
+        self.created_clients[0].reachable = False
+        self.docker_reachable = False
+
+        assert not deployment_platform.check_health()
+        # The previous client is kept until the reconnect succeeds
+        assert deployment_platform.client is self.created_clients[0]
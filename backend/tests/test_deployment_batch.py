@@ -0,0 +1,185 @@
+import threading
+from typing import Any, Callable, Generator, List, Optional
+
+import pytest
+from starlette.datastructures import State
+
+from contaxy import config
+from contaxy.config import settings
+from contaxy.managers.components import ComponentManager
+from contaxy.managers.deployment.manager import DeploymentManager
+from contaxy.managers.deployment.utils import (
+    get_job_collection_id,
+    get_service_collection_id,
+)
+from contaxy.managers.json_db.inmemory_dict import InMemoryDictJsonDocumentManager
+from contaxy.managers.system import SystemManager
+from contaxy.operations import JsonDocumentOperations
+from contaxy.schema import Job, JobInput, Service
+from contaxy.schema.auth import AuthorizedAccess
+from contaxy.schema.deployment import DeploymentStatus
+from contaxy.schema.exceptions import ResourceNotFoundError, ServerBaseError
+from contaxy.schema.system import AllowedImageInfo
+from contaxy.utils.state_utils import GlobalState, RequestState
+
+
+class RecordingDeploymentPlatform:
+    """Deployment platform that records the deployed jobs and deleted services."""
+
+    def __init__(self) -> None:
+        self.deployed_jobs: List[str] = []
+        self.deleted_services: List[str] = []
+        self.thread_names: List[str] = []
+        self._lock = threading.Lock()
+
+    def deploy_job(
+        self, project_id: str, job: Job, action_id: Optional[str], wait: bool
+    ) -> Job:
+        if job.display_name == "failing-job":
+            raise ServerBaseError("Could not start the container.")
+        with self._lock:
+            self.deployed_jobs.append(job.display_name)  # type: ignore
+            self.thread_names.append(threading.current_thread().name)
+        return Job(**job.dict(exclude={"status"}), status=DeploymentStatus.RUNNING)
+
+    def add_deployment_listener(self, listener: Callable[[str, str], None]) -> None:
+        pass
+
+    def delete_service(
+        self, project_id: str, service_id: str, delete_volumes: bool = False
+    ) -> None:
+        if service_id == "broken-service":
+            raise ServerBaseError("Could not remove the container.")
+        if service_id == "stopped-service":
+            raise ResourceNotFoundError("Container does not exist.")
+        with self._lock:
+            self.deleted_services.append(service_id)
+
+
+@pytest.mark.unit
+class TestDeploymentBatches:
+    @pytest.fixture(autouse=True)
+    def _init_managers(self, monkeypatch: pytest.MonkeyPatch) -> Generator:
+        def get_json_db_manager(
+            component_manager: ComponentManager,
+        ) -> JsonDocumentOperations:
+            return InMemoryDictJsonDocumentManager(
+                component_manager.global_state, component_manager.request_state
+            )
+
+        monkeypatch.setattr(
+            ComponentManager, "get_json_db_manager", get_json_db_manager
+        )
+        self.image_checks: List[str] = []
+        check_allowed_image = SystemManager.check_allowed_image
+
+        def count_image_checks(
+            system_manager: SystemManager, image_name: str, image_tag: str
+        ) -> None:
+            self.image_checks.append(f"{image_name}:{image_tag}")
+            check_allowed_image(system_manager, image_name, image_tag)
+
+        monkeypatch.setattr(SystemManager, "check_allowed_image", count_image_checks)
+
+        self.global_state = GlobalState(State())
+        self.global_state.settings = settings
+        self.component_manager = ComponentManager(
+            self.global_state, RequestState(State())
+        )
+        self.component_manager.request_state.authorized_access = AuthorizedAccess(
+            authorized_subject="users/test-user"
+        )
+        self.platform = RecordingDeploymentPlatform()
+        self.deployment_manager = DeploymentManager(
+            self.platform, self.component_manager  # type: ignore
+        )
+        yield
+        self.global_state.close()
+
+    def test_deploy_jobs(self) -> None:
+        self.component_manager.get_system_manager().add_allowed_image(
+            AllowedImageInfo(image_name="ubuntu", image_tags=["20.04"])
+        )
+        job_inputs = [
+            JobInput(display_name=f"job-{i}", container_image="ubuntu:20.04")
+            for i in range(5)
+        ]
+        job_inputs.append(
+            JobInput(display_name="forbidden-job", container_image="ubuntu:22.04")
+        )
+        job_inputs.append(
+            JobInput(display_name="failing-job", container_image="ubuntu:20.04")
+        )
+
+        results = self.deployment_manager.deploy_jobs("test-project", job_inputs)
+
+        assert [result.job.display_name for result in results[:5]] == [  # type: ignore
+            f"job-{i}" for i in range(5)
+        ]
+        assert all(
+            result.job.status == DeploymentStatus.RUNNING  # type: ignore
+            for result in results[:5]
+        )
+        assert results[5].job is None and results[5].error.code == 400  # type: ignore
+        assert results[6].job is None and results[6].error.code == 500  # type: ignore
+        # Every image is checked only once
+        assert sorted(self.image_checks) == ["ubuntu:20.04", "ubuntu:22.04"]
+        # All valid jobs are stored, also if the deployment failed
+        assert sorted(
+            Job.parse_raw(job_doc.json_value).display_name  # type: ignore
+            for job_doc in self.component_manager.get_json_db_manager().list_json_documents(
+                config.SYSTEM_INTERNAL_PROJECT, get_job_collection_id("test-project")
+            )
+        ) == sorted([f"job-{i}" for i in range(5)] + ["failing-job"])
+        assert any(
+            name.startswith("contaxy-batch") for name in self.platform.thread_names
+        )
+
+    def test_batch_delete_services(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        json_db_manager = self.component_manager.get_json_db_manager()
+        for service_id in ["first-service", "broken-service", "stopped-service"]:
+            json_db_manager.create_json_document(
+                config.SYSTEM_INTERNAL_PROJECT,
+                get_service_collection_id("test-project"),
+                service_id,
+                Service(
+                    id=service_id, display_name=service_id, container_image="ubuntu"
+                ).json(),
+            )
+
+        deleted_keys: List[List[str]] = []
+        delete_documents = InMemoryDictJsonDocumentManager.delete_documents
+
+        def record_delete_documents(
+            json_db_manager: InMemoryDictJsonDocumentManager,
+            project_id: str,
+            collection_id: str,
+            keys: List[str],
+        ) -> int:
+            deleted_keys.append(keys)
+            return delete_documents(json_db_manager, project_id, collection_id, keys)
+
+        monkeypatch.setattr(
+            InMemoryDictJsonDocumentManager, "delete_documents", record_delete_documents
+        )
+
+        results = self.deployment_manager.batch_delete_services(
+            "test-project",
+            ["first-service", "broken-service", "stopped-service", "missing-service"],
+        )
+
+        errors: List[Any] = [
+            result.error.code if result.error else None for result in results
+        ]
+        assert errors == [None, 500, None, 404]
+        assert self.platform.deleted_services == ["first-service"]
+        remaining_keys = [
+            doc.key
+            for doc in json_db_manager.list_json_documents(
+                config.SYSTEM_INTERNAL_PROJECT,
+                get_service_collection_id("test-project"),
+            )
+        ]
+        assert remaining_keys == ["broken-service"]
+        # The documents of all deleted services are removed with a single DB request
+        assert deleted_keys == [["first-service", "stopped-service"]]
@@ -0,0 +1,132 @@
+from typing import Callable, Dict, Generator, List
+
+import pytest
+from starlette.datastructures import State
+
+from contaxy import config
+from contaxy.config import settings
+from contaxy.managers.components import ComponentManager
+from contaxy.managers.deployment.manager import DeploymentManager
+from contaxy.managers.deployment.utils import get_service_collection_id
+from contaxy.managers.json_db.inmemory_dict import InMemoryDictJsonDocumentManager
+from contaxy.operations import JsonDocumentOperations
+from contaxy.schema import Service
+from contaxy.schema.auth import AuthorizedAccess
+from contaxy.schema.deployment import DeploymentStatus, DeploymentType
+from contaxy.schema.exceptions import ResourceNotFoundError
+from contaxy.utils.state_utils import GlobalState, RequestState
+
+
+class CountingDeploymentPlatform:
+    """Deployment platform that counts the metadata requests and sends deployment events."""
+
+    def __init__(self) -> None:
+        self.services: Dict[str, Service] = {}
+        self.metadata_requests = 0
+        self.listeners: List[Callable[[str, str], None]] = []
+
+    def add_deployment_listener(self, listener: Callable[[str, str], None]) -> None:
+        self.listeners.append(listener)
+
+    def get_service_metadata(self, project_id: str, service_id: str) -> Service:
+        self.metadata_requests += 1
+        try:
+            return self.services[service_id]
+        except KeyError:
+            raise ResourceNotFoundError("Container does not exist.")
+
+    def delete_services(self, project_id: str) -> None:
+        self.services.clear()
+
+    def set_status(
+        self, project_id: str, service_id: str, status: DeploymentStatus
+    ) -> None:
+        self.services[service_id].status = status
+        for listener in self.listeners:
+            listener(project_id, service_id)
+
+
+@pytest.mark.unit
+class TestDeploymentMetadataCache:
+    @pytest.fixture(autouse=True)
+    def _init_managers(self, monkeypatch: pytest.MonkeyPatch) -> Generator:
+        def get_json_db_manager(
+            component_manager: ComponentManager,
+        ) -> JsonDocumentOperations:
+            return InMemoryDictJsonDocumentManager(
+                component_manager.global_state, component_manager.request_state
+            )
+
+        monkeypatch.setattr(
+            ComponentManager, "get_json_db_manager", get_json_db_manager
+        )
+        self.monkeypatch = monkeypatch
+        self.global_state = GlobalState(State())
+        self.global_state.settings = settings
+        self.component_manager = ComponentManager(
+            self.global_state, RequestState(State())
+        )
+        self.component_manager.request_state.authorized_access = AuthorizedAccess(
+            authorized_subject="users/test-user"
+        )
+        self.platform = CountingDeploymentPlatform()
+        self.deployment_manager = DeploymentManager(
+            self.platform, self.component_manager  # type: ignore
+        )
+        service = Service(
+            id="test-service",
+            display_name="test-service",
+            container_image="ubuntu:20.04",
+            deployment_type=DeploymentType.SERVICE,
+            status=DeploymentStatus.RUNNING,
+        )
+        self.platform.services[service.id] = service.copy()  # type: ignore
+        self.component_manager.get_json_db_manager().create_json_document(
+            config.SYSTEM_INTERNAL_PROJECT,
+            get_service_collection_id("test-project"),
+            "test-service",
+            service.json(),
+        )
+        yield
+        self.global_state.close()
+
+    def get_service(self) -> Service:
+        return self.deployment_manager.get_service_metadata(
+            "test-project", "test-service"
+        )
+
+    def test_reads_from_cache(self) -> None:
+        cache = self.deployment_manager._get_metadata_cache()
+        assert cache is not None
+        initial_hits = cache.get_statistics().hits
+        service = self.get_service()
+        # Modifications of the returned service must not change the cached service
+        service.display_name = "modified"
+        assert self.get_service().display_name == "test-service"
+        assert self.platform.metadata_requests == 1
+        assert cache.get_statistics().hits == initial_hits + 1
+
+    def test_invalidated_by_update(self) -> None:
+        self.get_service()
+        self.deployment_manager.update_service_access("test-project", "test-service")
+        assert self.get_service().last_access_user == "users/test-user"
+        assert self.platform.metadata_requests == 2
+
+    def test_invalidated_by_platform_event(self) -> None:
+        assert self.get_service().status == DeploymentStatus.RUNNING
+        self.platform.set_status(
+            "test-project", "test-service", DeploymentStatus.STOPPED
+        )
+        assert self.get_service().status == DeploymentStatus.STOPPED
+
+    def test_invalidated_by_delete(self) -> None:
+        self.get_service()
+        self.deployment_manager.delete_services("test-project")
+        with pytest.raises(ResourceNotFoundError):
+            self.get_service()
+
+    def test_disabled_cache(self) -> None:
+        self.monkeypatch.setattr(settings, "DEPLOYMENT_METADATA_CACHE_ENABLED", False)
+        self.get_service()
+        self.get_service()
+        assert self.platform.metadata_requests == 2
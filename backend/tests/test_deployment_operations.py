@@ -172,6 +172,35 @@ class DeploymentOperationsTests(ABC):
         assert job_1.started_at < job_1.stopped_at
         self.deployment_manager.delete_jobs(self.project_id)
 
+    def test_deploy_jobs_batch(self) -> None:
+        job_inputs = [
+            create_test_echo_job_input(
+                display_name=f"{self.service_display_name}-{i}",
+            )
+            for i in range(3)
+        ]
+        results = self.deployment_manager.deploy_jobs(self.project_id, job_inputs)
+        assert [result.error for result in results] == [None, None, None]
+        assert len({result.job.id for result in results}) == 3  # type: ignore
+        assert len(self.deployment_manager.list_jobs(self.project_id)) == 3
+        self.deployment_manager.delete_jobs(self.project_id)
+
+    def test_batch_delete_services(self) -> None:
+        service_ids = [
+            self.deploy_service(
+                project_id=self.project_id,
+                service=create_test_service_input(
+                    display_name=f"{self.service_display_name}-{i}",
+                ),
+            ).id
+            for i in range(2)
+        ]
+        results = self.deployment_manager.batch_delete_services(
+            self.project_id, service_ids + ["missing-service"]
+        )
+        assert [result.error is None for result in results] == [True, True, False]
+        assert self.deployment_manager.list_services(self.project_id) == []
+
     def test_update_service(self) -> None:
         test_service_input = create_test_service_input(
             display_name=self.service_display_name
@@ -352,8 +381,8 @@ class DeploymentOperationsTests(ABC):
         )
         # Service should still be running after restart
         assert restarted_service.status == DeploymentStatus.RUNNING
-        # Internal id should change after a restart
-        assert restarted_service.internal_id != service.internal_id
+        # The deployment is restarted in place instead of being recreated
+        assert restarted_service.internal_id == service.internal_id
 
     def test_delete_services(self) -> None:
         project_1 = f"{self.project_id}-1"
@@ -598,6 +627,22 @@ class DeploymentOperationsTests(ABC):
         assert logs
         assert logs.startswith(log_input)
 
+    def test_stream_logs(self) -> None:
+        log_input = "foobar"
+        job_input = create_test_echo_job_input(
+            display_name=self.service_display_name,
+            log_input=log_input,
+        )
+
+        job = self.deploy_job(job=job_input, project_id=self.project_id)
+
+        log_stream = self.deployment_manager.stream_job_logs(
+            project_id=self.project_id, job_id=job.id
+        )
+        logs = b"".join(log_stream).decode("utf-8")
+        self.deployment_manager.delete_job(project_id=self.project_id, job_id=job.id)
+        assert logs.startswith(log_input)
+
     def test_list_service_access_actions(self) -> None:
         test_service_input = create_test_service_input(
             display_name=self.service_display_name
@@ -885,6 +930,7 @@ class TestKubernetesDeploymentManager(DeploymentOperationsTests):
                 # service not found
                 return
 
+        self._kubernetes_deployment_platform.close()
         self._kubernetes_deployment_platform.core_api.delete_namespace(
             _kube_namespace, propagation_policy="Foreground"
         )
@@ -0,0 +1,230 @@
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Callable, Generator, List
+
+import docker
+import pytest
+
+from contaxy.config import settings
+from contaxy.managers.deployment.docker import DockerDeploymentPlatform
+from contaxy.managers.deployment.docker_cache import ContainerCache
+from contaxy.managers.deployment.docker_utils import wait_for_container
+from contaxy.schema.deployment import DeploymentType
+from contaxy.schema.exceptions import ResourceNotFoundError
+
+from .fake_docker import FakeDockerClient
+
+
+def _wait_for(condition: Callable[[], bool], timeout: float = 10) -> None:
+    start = time.time()
+    while not condition():
+        if time.time() - start > timeout:
+            raise TimeoutError("Condition was not met in time.")
+        time.sleep(0.05)
+
+
+@pytest.mark.unit
+class TestContainerCache:
+    @pytest.fixture(autouse=True)
+    def _init_cache(self) -> Generator:
+        self.client = FakeDockerClient()
+        self._caches: List[ContainerCache] = []
+        yield
+        for cache in self._caches:
+            cache.stop()
+
+    def create_cache(self, resync_interval: int = 300) -> ContainerCache:
+        cache = ContainerCache(
+            self.client,  # type: ignore
+            resync_interval=timedelta(seconds=resync_interval),
+            error_backoff=0.1,
+        )
+        self._caches.append(cache)
+        cache.start()
+        assert cache.wait_until_ready(timeout=10)
+        return cache
+
+    def list_ids(
+        self,
+        cache: ContainerCache,
+        project_id: str = "test-project",
+        deployment_type: DeploymentType = DeploymentType.SERVICE,
+    ) -> List[Any]:
+        return sorted(
+            deployment.id
+            for deployment in cache.list_deployments(project_id, deployment_type)
+        )
+
+    def test_initial_list(self) -> None:
+        self.client.add_container("first-service")
+        self.client.add_container("other-service", project_id="other-project")
+        self.client.add_container("first-job", deployment_type=DeploymentType.JOB)
+
+        cache = self.create_cache()
+        assert self.list_ids(cache) == ["first-service"]
+        assert self.list_ids(cache, project_id="other-project") == ["other-service"]
+        assert self.list_ids(cache, deployment_type=DeploymentType.JOB) == ["first-job"]
+        job = cache.get_deployment("test-project", "first-job", DeploymentType.JOB)
+        assert job is not None and job.id == "first-job"
+        assert (
+            cache.get_deployment("test-project", "first-job", DeploymentType.SERVICE)
+            is None
+        )
+        assert self.client.calls["list"] == 1
+
+    def test_list_all_deployments(self) -> None:
+        self.client.add_container("first-service")
+        self.client.add_container("other-service", project_id="other-project")
+        self.client.add_container("first-job", deployment_type=DeploymentType.JOB)
+
+        cache = self.create_cache()
+        assert {
+            project_id: [deployment.id for deployment in deployments]
+            for project_id, deployments in cache.list_all_deployments(
+                DeploymentType.SERVICE
+            ).items()
+        } == {"test-project": ["first-service"], "other-project": ["other-service"]}
+
+    def test_apply_events(self) -> None:
+        cache = self.create_cache()
+        assert self.list_ids(cache) == []
+
+        container_id = self.client.add_container("new-service", status="created")
+        self.client.send_event("create", container_id)
+        _wait_for(lambda: self.list_ids(cache) == ["new-service"])
+
+        self.client.container_attrs[container_id]["State"]["Status"] = "running"
+        self.client.send_event("start", container_id)
+        _wait_for(
+            lambda: cache.get_deployment(  # type: ignore
+                "test-project", "new-service", DeploymentType.SERVICE
+            ).status
+            == "running"
+        )
+
+        # Events that do not change the container are ignored
+        get_calls = self.client.calls["get"]
+        self.client.send_event("exec_start: /bin/sh", container_id)
+
+        del self.client.container_attrs[container_id]
+        self.client.send_event("destroy", container_id)
+        _wait_for(lambda: self.list_ids(cache) == [])
+        assert self.client.calls["get"] == get_calls
+        assert self.client.calls["list"] == 1
+
+    def test_notify_listeners(self) -> None:
+        cache = self.create_cache()
+        notifications: List[Any] = []
+        cache.add_listener(
+            lambda project_id, deployment_id: notifications.append(
+                (project_id, deployment_id)
+            )
+        )
+
+        container_id = self.client.add_container("new-service")
+        self.client.send_event("start", container_id)
+        _wait_for(lambda: notifications == [("test-project", "new-service")])
+
+        del self.client.container_attrs[container_id]
+        self.client.send_event("destroy", container_id)
+        _wait_for(lambda: len(notifications) == 2)
+        assert notifications[-1] == ("test-project", "new-service")
+
+    def test_periodic_resync(self) -> None:
+        cache = self.create_cache(resync_interval=1)
+        # Changes without an event are picked up by the next resync
+        self.client.add_container("missed-service")
+        _wait_for(lambda: self.list_ids(cache) == ["missed-service"])
+        assert self.client.calls["list"] > 1
+
+    def test_resync_keeps_previous_state_until_loaded(self) -> None:
+        self.client.add_container("first-service")
+        self.client.add_container("second-service")
+        cache = self.create_cache()
+
+        # Record what readers see while the containers are mapped during the resync
+        observed_ids: List[Any] = []
+        map_container = cache._map_container
+
+        def recording_map_container(container: Any) -> Any:
+            observed_ids.append(self.list_ids(cache))
+            return map_container(container)
+
+        cache._map_container = recording_map_container  # type: ignore
+        cache._resync()
+        assert observed_ids == [["first-service", "second-service"]] * 2
+        assert self.list_ids(cache) == ["first-service", "second-service"]
+
+    def test_stop(self) -> None:
+        cache = self.create_cache()
+        cache.stop()
+        assert not cache.is_ready
+
+        container_id = self.client.add_container("new-service")
+        self.client.send_event("create", container_id)
+        time.sleep(0.3)
+        assert self.list_ids(cache) == []
+
+
+@pytest.mark.unit
+def test_wait_for_container() -> None:
+    client = FakeDockerClient()
+    container_id = client.add_container("new-service", status="created")
+
+    def start_container() -> None:
+        time.sleep(0.2)
+        client.container_attrs[container_id]["State"]["Status"] = "running"
+        client.send_event("start", container_id)
+
+    threading.Thread(target=start_container, daemon=True).start()
+    container = wait_for_container(
+        client.containers.get(container_id), client, timeout=10  # type: ignore
+    )
+    assert container.status == "running"
+    # The container is only read before and after the start event instead of being polled
+    assert client.calls["get"] == 3
+    assert client.calls["events"] == 1
+
+
+@pytest.mark.unit
+class TestDockerDeploymentPlatformWithCache:
+    @pytest.fixture(autouse=True)
+    def _init_platform(self, monkeypatch: pytest.MonkeyPatch) -> Generator:
+        self.client = FakeDockerClient()
+        self.client.add_container("test-service")
+        monkeypatch.setattr(docker, "from_env", lambda **kwargs: self.client)
+        # Skip reconnecting to the Docker networks and start a new cache with the fake client
+        monkeypatch.setattr(DockerDeploymentPlatform, "_is_initialized", True)
+        monkeypatch.setattr(DockerDeploymentPlatform, "_container_cache", None)
+        monkeypatch.setattr(settings, "DOCKER_CONTAINER_CACHE_ENABLED", True)
+        monkeypatch.setattr(settings, "DEPLOYMENT_METRICS_ENABLED", False)
+
+        self.platform = DockerDeploymentPlatform()
+        assert DockerDeploymentPlatform._container_cache is not None
+        assert DockerDeploymentPlatform._container_cache.wait_until_ready(timeout=10)
+        yield
+        DockerDeploymentPlatform._container_cache.stop()
+
+    def test_reads_from_cache(self) -> None:
+        # The cache is shared by all platform instances of the process
+        DockerDeploymentPlatform()
+        assert self.client.calls["list"] == 1
+
+        for _ in range(3):
+            services = self.platform.list_services("test-project")
+            assert [service.id for service in services] == ["test-service"]
+        assert self.platform.list_services("other-project") == []
+        assert (
+            self.platform.get_service_metadata("test-project", "test-service").id
+            == "test-service"
+        )
+        assert self.platform.list_jobs("test-project") == []
+        assert self.client.calls["list"] == 1
+        assert self.client.calls["get"] == 0
+
+    def test_get_missing_service_metadata(self) -> None:
+        # Deployments missing in the cache are read from the Docker API
+        with pytest.raises(ResourceNotFoundError):
+            self.platform.get_service_metadata("test-project", "missing-service")
+        assert self.client.calls["list"] == 2
@@ -0,0 +1,109 @@
+import time
+from typing import Callable, Generator, List
+
+import pytest
+
+from contaxy.managers.deployment.docker_network_registry import NetworkRegistry
+from contaxy.managers.deployment.docker_utils import get_network_subnet
+from contaxy.managers.deployment.utils import get_network_name
+
+from .fake_docker import FakeDockerClient
+
+
+def _wait_for(condition: Callable[[], bool], timeout: float = 10) -> None:
+    start = time.time()
+    while not condition():
+        if time.time() - start > timeout:
+            raise TimeoutError("Condition was not met in time.")
+        time.sleep(0.05)
+
+
+@pytest.mark.unit
+class TestNetworkRegistry:
+    @pytest.fixture(autouse=True)
+    def _init_registry(self, monkeypatch: pytest.MonkeyPatch) -> Generator:
+        self.client = FakeDockerClient()
+        self.client.add_network("bridge", "172.17.0.0/16")
+        self.client.add_network("existing", "10.0.5.0/24")
+        # The backend runs in a container
+        self.backend_container_id = self.client.add_container("backend")
+        monkeypatch.setenv("IS_CONTAXY_CONTAINER", "true")
+        monkeypatch.setenv("HOSTNAME", self.backend_container_id)
+        self._registries: List[NetworkRegistry] = []
+        yield
+        for registry in self._registries:
+            registry.stop()
+
+    def create_registry(self) -> NetworkRegistry:
+        registry = NetworkRegistry(self.client, error_backoff=0.1)  # type: ignore
+        self._registries.append(registry)
+        registry.start()
+        assert registry.wait_until_ready(timeout=10)
+        return registry
+
+    def get_subnet(self, project_id: str) -> str:
+        network = self.client.networks.get(get_network_name(project_id))
+        return str(get_network_subnet(network.attrs))
+
+    def test_allocate_subnets(self) -> None:
+        registry = self.create_registry()
+        registry.handle_network(self.client, "project-a")  # type: ignore
+        registry.handle_network(self.client, "project-b")  # type: ignore
+        registry.handle_network(self.client, "project-a")  # type: ignore
+
+        assert self.get_subnet("project-a") == "10.0.6.0/24"
+        assert self.get_subnet("project-b") == "10.0.7.0/24"
+        assert self.client.calls["network_create"] == 2
+        # The networks are only listed once on start
+        assert self.client.calls["network_list"] == 1
+
+    def test_connect_backend(self) -> None:
+        registry = self.create_registry()
+        registry.handle_network(self.client, "project-a")  # type: ignore
+        registry.handle_network(self.client, "project-a")  # type: ignore
+
+        backend_networks = self.client.container_attrs[self.backend_container_id][
+            "NetworkSettings"
+        ]["Networks"]
+        assert get_network_name("project-a") in backend_networks
+        assert self.client.calls["network_connect"] == 1
+
+    def test_apply_events(self) -> None:
+        registry = self.create_registry()
+        # Network created by another process
+        network_id = self.client.add_network(
+            get_network_name("project-a"), "10.0.6.0/24"
+        )
+        self.client.send_event("create", network_id, event_type="network")
+        _wait_for(
+            lambda: registry.get_network_id(get_network_name("project-a")) is not None
+        )
+        self.client.send_event(
+            "connect",
+            network_id,
+            event_type="network",
+            attributes={"container": self.backend_container_id},
+        )
+        time.sleep(0.2)
+
+        registry.handle_network(self.client, "project-a")  # type: ignore
+        registry.handle_network(self.client, "project-b")  # type: ignore
+        assert self.client.calls["network_create"] == 1
+        # The backend was connected to the network by another process
+        assert self.client.calls["network_connect"] == 1
+        assert self.get_subnet("project-b") == "10.0.7.0/24"
+
+        self.client.send_event("destroy", network_id, event_type="network")
+        _wait_for(
+            lambda: registry.get_network_id(get_network_name("project-a")) is None
+        )
+
+    def test_missed_network(self) -> None:
+        registry = self.create_registry()
+        # The subnet was used by another process before the event is received
+        self.client.add_network("other", "10.0.6.0/24")
+
+        registry.handle_network(self.client, "project-a")  # type: ignore
+        # All networks are listed again to find a free subnet
+        assert self.get_subnet("project-a") == "10.0.7.0/24"
+        assert self.client.calls["network_list"] == 2
@@ -0,0 +1,103 @@
+import time
+from datetime import timedelta
+from typing import Callable, Generator
+
+import docker
+import pytest
+from prometheus_client import REGISTRY
+
+from contaxy.config import settings
+from contaxy.managers.deployment.docker import DockerDeploymentPlatform
+from contaxy.managers.deployment.docker_warm_pool import ImageWarmPool
+
+from .fake_docker import FakeDockerClient
+
+
+def _wait_for(condition: Callable[[], bool], timeout: float = 10) -> None:
+    start = time.time()
+    while not condition():
+        if time.time() - start > timeout:
+            raise TimeoutError("Condition was not met in time.")
+        time.sleep(0.05)
+
+
+def _get_request_count(result: str) -> float:
+    return (
+        REGISTRY.get_sample_value(
+            "contaxy_warm_pool_requests_total", {"result": result}
+        )
+        or 0.0
+    )
+
+
+@pytest.mark.unit
+class TestImageWarmPool:
+    def test_refill(self) -> None:
+        client = FakeDockerClient()
+        client.unavailable_images = ["missing:1.0"]
+        warm_pool = ImageWarmPool(
+            client,  # type: ignore
+            images=["ubuntu", "registry:5000/workspace:0.1", "missing:1.0"],
+            refresh_interval=timedelta(hours=1),
+        )
+        warm_pool.refill()
+        assert client.pulled_images == [
+            "ubuntu:latest",
+            "registry:5000/workspace:0.1",
+        ]
+        assert warm_pool.contains("ubuntu:latest")
+        assert warm_pool.contains("registry:5000/workspace:0.1")
+        assert not warm_pool.contains("missing:1.0")
+        assert not warm_pool.contains("ubuntu:20.04")
+
+        # Images that cannot be pulled anymore are removed from the pool
+        client.unavailable_images = ["ubuntu:latest"]
+        warm_pool.refill()
+        assert not warm_pool.contains("ubuntu")
+
+    def test_periodic_refill(self) -> None:
+        client = FakeDockerClient()
+        warm_pool = ImageWarmPool(
+            client,  # type: ignore
+            images=["ubuntu:20.04"],
+            refresh_interval=timedelta(seconds=0.1),
+        )
+        warm_pool.start()
+        try:
+            _wait_for(lambda: client.calls["pull"] > 1)
+            assert warm_pool.contains("ubuntu:20.04")
+        finally:
+            warm_pool.stop()
+
+
+@pytest.mark.unit
+class TestDockerDeploymentPlatformWithWarmPool:
+    @pytest.fixture(autouse=True)
+    def _init_platform(self, monkeypatch: pytest.MonkeyPatch) -> Generator:
+        self.client = FakeDockerClient()
+        monkeypatch.setattr(docker, "from_env", lambda **kwargs: self.client)
+        monkeypatch.setattr(DockerDeploymentPlatform, "_is_initialized", True)
+        monkeypatch.setattr(DockerDeploymentPlatform, "_warm_pool", None)
+        monkeypatch.setattr(settings, "DOCKER_CONTAINER_CACHE_ENABLED", False)
+        monkeypatch.setattr(settings, "DEPLOYMENT_METRICS_ENABLED", False)
+        monkeypatch.setattr(settings, "DOCKER_WARM_POOL_IMAGES", ["workspace:0.1"])
+        self.platform = DockerDeploymentPlatform()
+        assert DockerDeploymentPlatform._warm_pool is not None
+        yield
+        DockerDeploymentPlatform._warm_pool.stop()
+
+    def test_record_hit_rate(self) -> None:
+        # The warm pool is shared by all platform instances of the process
+        DockerDeploymentPlatform()
+        _wait_for(lambda: self.platform._check_warm_pool("workspace:0.1") == "hit")
+        assert self.client.calls["pull"] == 1
+
+        initial_misses = _get_request_count("miss")
+        assert self.platform._check_warm_pool("other:0.1") == "miss"
+        assert _get_request_count("miss") == initial_misses + 1
+
+
+@pytest.mark.unit
+def test_warm_pool_images_from_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("DOCKER_WARM_POOL_IMAGES", "ubuntu:20.04, workspace:0.1")
+    assert type(settings)().DOCKER_WARM_POOL_IMAGES == ["ubuntu:20.04", "workspace:0.1"]
@@ -0,0 +1,168 @@
+import time
+from typing import Generator
+
+import pytest
+from starlette.datastructures import State
+
+from contaxy.config import settings
+from contaxy.managers.components import ComponentManager
+from contaxy.managers.deployment.fake import FakeDeploymentPlatform
+from contaxy.managers.deployment.manager import ACTION_RESTART, DeploymentManager
+from contaxy.managers.json_db.inmemory_dict import InMemoryDictJsonDocumentManager
+from contaxy.operations import JsonDocumentOperations
+from contaxy.schema import JobInput, ServiceInput
+from contaxy.schema.auth import AuthorizedAccess
+from contaxy.schema.deployment import DeploymentStatus, ServiceUpdate
+from contaxy.schema.exceptions import (
+    ResourceNotFoundError,
+    ResourceNotReadyError,
+    ServerBaseError,
+)
+from contaxy.utils.state_utils import GlobalState, RequestState
+
+
+@pytest.mark.unit
+class TestFakeDeploymentPlatform:
+    @pytest.fixture(autouse=True)
+    def _init_managers(self, monkeypatch: pytest.MonkeyPatch) -> Generator:
+        def get_json_db_manager(
+            component_manager: ComponentManager,
+        ) -> JsonDocumentOperations:
+            return InMemoryDictJsonDocumentManager(
+                component_manager.global_state, component_manager.request_state
+            )
+
+        monkeypatch.setattr(
+            ComponentManager, "get_json_db_manager", get_json_db_manager
+        )
+        self.global_state = GlobalState(State())
+        self.global_state.settings = settings
+        self.component_manager = ComponentManager(
+            self.global_state, RequestState(State())
+        )
+        self.component_manager.request_state.authorized_access = AuthorizedAccess(
+            authorized_subject="users/test-user"
+        )
+        self.platform = FakeDeploymentPlatform(seed=0)
+        self.deployment_manager = DeploymentManager(
+            self.platform, self.component_manager  # type: ignore
+        )
+        yield
+        self.global_state.close()
+
+    def deploy_service(self, display_name: str = "test-service") -> str:
+        service = self.deployment_manager.deploy_service(
+            "test-project",
+            ServiceInput(display_name=display_name, container_image="ubuntu:20.04"),
+        )
+        assert service.id is not None
+        return service.id
+
+    def test_service_lifecycle(self) -> None:
+        service_id = self.deploy_service()
+        assert self.platform.calls["deploy_service"] == 1
+
+        (service,) = self.deployment_manager.list_services("test-project")
+        assert service.id == service_id
+        assert service.status == DeploymentStatus.RUNNING
+        assert service.internal_id is not None
+
+        self.platform.set_logs("test-project", service_id, "line 1\nline 2\n")
+        assert (
+            self.deployment_manager.get_service_logs(
+                "test-project", service_id, lines=1, since=None
+            )
+            == "line 2\n"
+        )
+
+        self.deployment_manager.delete_service("test-project", service_id)
+        assert self.deployment_manager.list_services("test-project") == []
+
+    def test_restart_service(self) -> None:
+        service_id = self.deploy_service()
+        service = self.deployment_manager.get_service_metadata(
+            "test-project", service_id
+        )
+
+        self.deployment_manager.execute_service_action(
+            "test-project", service_id, ACTION_RESTART
+        )
+        assert self.platform.calls["restart_service"] == 1
+        assert self.platform.calls["delete_service"] == 0
+        assert self.platform.calls["deploy_service"] == 1
+        restarted_service = self.deployment_manager.get_service_metadata(
+            "test-project", service_id
+        )
+        assert restarted_service.internal_id == service.internal_id
+        assert restarted_service.started_at != service.started_at
+
+    def test_update_service(self) -> None:
+        service_id = self.deploy_service()
+
+        # Fields that are only stored in the DB do not change the deployment
+        self.deployment_manager.update_service(
+            "test-project", service_id, ServiceUpdate(idle_timeout=120)
+        )
+        assert self.platform.calls["redeploy_service"] == 0
+
+        service = self.deployment_manager.update_service(
+            "test-project", service_id, ServiceUpdate(parameters={"FOO": "bar"})
+        )
+        assert self.platform.calls["redeploy_service"] == 1
+        assert service.parameters["FOO"] == "bar"
+        assert service.status == DeploymentStatus.RUNNING
+
+    def test_logs_of_starting_service(self) -> None:
+        service_id = self.deploy_service()
+        self.platform.set_status("test-project", service_id, DeploymentStatus.PENDING)
+
+        with pytest.raises(ResourceNotReadyError):
+            self.deployment_manager.get_service_logs(
+                "test-project", service_id, lines=None, since=None, wait=False
+            )
+        assert (
+            self.deployment_manager.get_service_logs(
+                "test-project", service_id, lines=None, since=None
+            )
+            == ""
+        )
+
+    def test_job_lifecycle(self) -> None:
+        job = self.deployment_manager.deploy_job(
+            "test-project",
+            JobInput(display_name="test-job", container_image="ubuntu:20.04"),
+        )
+        assert job.id is not None
+        assert self.platform.list_services("test-project") == []
+
+        self.platform.finish_job("test-project", job.id)
+        job = self.deployment_manager.get_job_metadata("test-project", job.id)
+        assert job.status == DeploymentStatus.SUCCEEDED
+        assert job.stopped_at is not None
+
+    def test_injected_failures(self) -> None:
+        self.platform.inject_failure("deploy_service")
+        with pytest.raises(ServerBaseError):
+            self.deploy_service()
+        # Only the next call fails
+        self.deploy_service("retried-service")
+
+        self.platform.inject_failure(
+            "get_service_metadata", ResourceNotFoundError("Not found.")
+        )
+        with pytest.raises(ResourceNotFoundError):
+            self.platform.get_service_metadata("test-project", "test-service")
+
+        platform = FakeDeploymentPlatform(failure_rates={"check_health": 1})
+        assert not platform.check_health()
+
+    def test_latencies(self) -> None:
+        platform = FakeDeploymentPlatform(
+            latencies={"list_services": 0.05}, default_latency=0
+        )
+        start = time.perf_counter()
+        platform.list_services("test-project")
+        assert time.perf_counter() - start >= 0.05
+        start = time.perf_counter()
+        platform.list_jobs("test-project")
+        assert time.perf_counter() - start < 0.05
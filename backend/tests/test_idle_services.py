@@ -0,0 +1,190 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Generator, List, Optional, Tuple
+
+import docker
+import pytest
+from starlette.datastructures import State
+from starlette.responses import Response
+
+from contaxy import config
+from contaxy.config import DeploymentManager as DeploymentManagerType
+from contaxy.config import settings
+from contaxy.managers.components import ComponentManager
+from contaxy.managers.deployment.docker import DockerDeploymentPlatform
+from contaxy.managers.deployment.manager import DeploymentManager, stop_idle_services
+from contaxy.managers.deployment.utils import get_service_collection_id
+from contaxy.managers.json_db.inmemory_dict import InMemoryDictJsonDocumentManager
+from contaxy.operations import JsonDocumentOperations
+from contaxy.schema.deployment import DeploymentStatus, ResourceUsageSample, Service
+from contaxy.schema.json_db import JsonDocument
+from contaxy.utils.state_utils import GlobalState, RequestState
+
+from .fake_docker import FakeDockerClient
+
+
+@pytest.mark.unit
+class TestStopIdleServices:
+    @pytest.fixture(autouse=True)
+    def _init_managers(self, monkeypatch: pytest.MonkeyPatch) -> Generator:
+        self.docker_client = FakeDockerClient()
+        self.monkeypatch = monkeypatch
+        self.stopped_services: List[Tuple[str, str]] = []
+
+        def get_json_db_manager(
+            component_manager: ComponentManager,
+        ) -> JsonDocumentOperations:
+            return InMemoryDictJsonDocumentManager(
+                component_manager.global_state, component_manager.request_state
+            )
+
+        def execute_service_action(
+            service_manager: DeploymentManager,
+            project_id: str,
+            service_id: str,
+            action_id: str,
+            **kwargs: Any,
+        ) -> Response:
+            self.stopped_services.append((project_id, service_id))
+            return Response(status_code=200)
+
+        def list_projects(*args: Any, **kwargs: Any) -> None:
+            raise AssertionError("The projects should not be listed.")
+
+        monkeypatch.setattr(docker, "from_env", lambda **kwargs: self.docker_client)
+        monkeypatch.setattr(DockerDeploymentPlatform, "_is_initialized", True)
+        monkeypatch.setattr(settings, "DOCKER_CONTAINER_CACHE_ENABLED", False)
+        monkeypatch.setattr(settings, "DEPLOYMENT_METRICS_ENABLED", False)
+        monkeypatch.setattr(
+            settings, "DEPLOYMENT_MANAGER", DeploymentManagerType.DOCKER
+        )
+        monkeypatch.setattr(
+            ComponentManager, "get_json_db_manager", get_json_db_manager
+        )
+        monkeypatch.setattr(
+            DeploymentManager, "execute_service_action", execute_service_action
+        )
+        monkeypatch.setattr(ComponentManager, "get_project_manager", list_projects)
+
+        self.global_state = GlobalState(State())
+        self.global_state.settings = settings
+        self.component_manager = ComponentManager(
+            self.global_state, RequestState(State())
+        )
+        yield
+        self.global_state.close()
+
+    def add_service(
+        self,
+        project_id: str,
+        service_id: str,
+        idle_timeout: timedelta,
+        last_access_time: datetime,
+    ) -> None:
+        self.docker_client.add_container(service_id, project_id=project_id)
+        service = Service(
+            id=service_id,
+            display_name=service_id,
+            container_image="ubuntu:20.04",
+            idle_timeout=idle_timeout,
+            last_access_time=last_access_time,
+        )
+        self.component_manager.get_json_db_manager().create_json_document(
+            config.SYSTEM_INTERNAL_PROJECT,
+            get_service_collection_id(project_id),
+            service_id,
+            service.json(),
+        )
+
+    def test_list_all_services(self) -> None:
+        now = datetime.now(timezone.utc)
+        self.add_service("project-a", "service-a", timedelta(hours=1), now)
+        self.add_service("project-b", "service-b", timedelta(hours=1), now)
+        # Deployed services without metadata are ignored
+        self.docker_client.add_container("unknown", project_id="project-b")
+        # Only the metadata of deployed services is loaded
+        self.add_service("project-b", "stopped", timedelta(hours=1), now)
+        del self.docker_client.container_attrs["id-stopped"]
+
+        loaded_keys: List[Dict[str, List[str]]] = []
+        list_json_documents_by_keys = (
+            InMemoryDictJsonDocumentManager.list_json_documents_by_keys
+        )
+
+        def count_list_json_documents_by_keys(
+            json_db_manager: InMemoryDictJsonDocumentManager,
+            project_id: str,
+            keys_by_collection: Dict[str, List[str]],
+        ) -> Dict[str, List[JsonDocument]]:
+            loaded_keys.append(keys_by_collection)
+            return list_json_documents_by_keys(
+                json_db_manager, project_id, keys_by_collection
+            )
+
+        self.monkeypatch.setattr(
+            InMemoryDictJsonDocumentManager,
+            "list_json_documents_by_keys",
+            count_list_json_documents_by_keys,
+        )
+
+        service_manager = self.component_manager.get_service_manager()
+        assert isinstance(service_manager, DeploymentManager)
+        services = service_manager.list_all_services()
+
+        assert {
+            project_id: [service.id for service in project_services]
+            for project_id, project_services in services.items()
+        } == {"project-a": ["service-a"], "project-b": ["service-b"]}
+        assert services["project-a"][0].status == DeploymentStatus.RUNNING
+        assert services["project-a"][0].idle_timeout == timedelta(hours=1)
+        # The services of all projects are listed with a single Docker API call
+        assert self.docker_client.calls["list"] == 1
+        # The metadata of all projects is loaded with a single DB request
+        assert len(loaded_keys) == 1
+        assert "stopped" not in loaded_keys[0][get_service_collection_id("project-b")]
+
+    def test_stop_idle_services(self) -> None:
+        now = datetime.now(timezone.utc)
+        idle_access_time = now - timedelta(hours=2)
+        self.add_service("project-a", "idle-a", timedelta(hours=1), idle_access_time)
+        self.add_service("project-b", "idle-b", timedelta(hours=1), idle_access_time)
+        self.add_service("project-b", "active", timedelta(hours=1), now)
+        self.add_service("project-b", "no-timeout", timedelta(0), idle_access_time)
+
+        stop_idle_services(self.component_manager)
+
+        assert sorted(self.stopped_services) == [
+            ("project-a", "idle-a"),
+            ("project-b", "idle-b"),
+        ]
+        assert self.docker_client.calls["list"] == 1
+
+    def test_busy_services_are_not_stopped(self) -> None:
+        self.monkeypatch.setattr(settings, "SERVICE_IDLE_CPU_THRESHOLD", 0.5)
+        cpu_usages = {"busy": [0.2, 1.8], "quiet": [0.1, 0.2]}
+
+        def get_deployment_metrics(
+            deployment_platform: DockerDeploymentPlatform,
+            project_id: str,
+            deployment_id: str,
+            since: Optional[datetime] = None,
+        ) -> List[ResourceUsageSample]:
+            return [
+                ResourceUsageSample(timestamp=datetime.now(timezone.utc), cpu_usage=cpu)
+                for cpu in cpu_usages.get(deployment_id, [])
+            ]
+
+        self.monkeypatch.setattr(
+            DockerDeploymentPlatform, "get_deployment_metrics", get_deployment_metrics
+        )
+        idle_access_time = datetime.now(timezone.utc) - timedelta(hours=2)
+        for service_id in ["busy", "quiet", "unsampled"]:
+            self.add_service(
+                "project-a", service_id, timedelta(hours=1), idle_access_time
+            )
+
+        stop_idle_services(self.component_manager)
+
+        assert sorted(self.stopped_services) == [
+            ("project-a", "quiet"),
+            ("project-a", "unsampled"),
+        ]
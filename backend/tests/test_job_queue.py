@@ -0,0 +1,343 @@
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Generator, List, Optional, Set, Tuple
+
+import pytest
+from starlette.datastructures import State
+
+from contaxy.config import settings
+from contaxy.managers.components import ComponentManager
+from contaxy.managers.deployment.job_queue import (
+    JobQueue,
+    QueuedJob,
+    ResourceUsage,
+    get_dispatch_order,
+)
+from contaxy.managers.deployment.manager import DeploymentManager
+from contaxy.managers.json_db.inmemory_dict import InMemoryDictJsonDocumentManager
+from contaxy.operations import JsonDocumentOperations
+from contaxy.schema import Job, JobInput
+from contaxy.schema.auth import AuthorizedAccess
+from contaxy.schema.deployment import DeploymentCompute, DeploymentStatus, JobPriority
+from contaxy.schema.exceptions import ResourceNotFoundError, ServerBaseError
+from contaxy.schema.system import AllowedImageInfo
+from contaxy.utils.state_utils import GlobalState, RequestState
+
+
+class RunningJobsPlatform:
+    """Deployment platform that keeps the deployed jobs running until they are finished."""
+
+    def __init__(self) -> None:
+        # project_id -> job_id -> job
+        self.jobs: Dict[str, Dict[str, Job]] = {}
+        self.capacity: Optional[Tuple[float, float]] = None
+        self.listeners: List[Callable[[str, str], None]] = []
+        # Display names of the jobs that cannot be started
+        self.failing_jobs: Set[str] = set()
+        self.list_calls = 0
+
+    def add_deployment_listener(self, listener: Callable[[str, str], None]) -> None:
+        self.listeners.append(listener)
+
+    def deploy_job(
+        self, project_id: str, job: Job, action_id: Optional[str], wait: bool
+    ) -> Job:
+        if job.display_name in self.failing_jobs:
+            raise ServerBaseError("Could not start the container.")
+        deployed_job = Job(
+            **job.dict(exclude={"status", "compute"}),
+            status=DeploymentStatus.RUNNING,
+        )
+        self.jobs.setdefault(project_id, {})[job.id] = deployed_job  # type: ignore
+        return deployed_job
+
+    def finish_job(self, project_id: str, job_id: str) -> None:
+        self.jobs[project_id][job_id].status = DeploymentStatus.SUCCEEDED
+        for listener in self.listeners:
+            listener(project_id, job_id)
+
+    def list_jobs(self, project_id: str) -> List[Job]:
+        return list(self.jobs.get(project_id, {}).values())
+
+    def list_all_jobs(self) -> Dict[str, List[Job]]:
+        self.list_calls += 1
+        return {
+            project_id: list(jobs.values()) for project_id, jobs in self.jobs.items()
+        }
+
+    def list_all_services(self, deployment_type: str) -> dict:
+        return {}
+
+    def get_job_metadata(self, project_id: str, job_id: str) -> Job:
+        try:
+            return self.jobs[project_id][job_id]
+        except KeyError:
+            raise ResourceNotFoundError("Container does not exist.")
+
+    def delete_job(self, project_id: str, job_id: str) -> None:
+        if job_id not in self.jobs.get(project_id, {}):
+            raise ResourceNotFoundError("Container does not exist.")
+        del self.jobs[project_id][job_id]
+
+    def get_resource_capacity(self) -> Optional[Tuple[float, float]]:
+        return self.capacity
+
+
+def create_queued_job(
+    project_id: str, job_id: str, priority: JobPriority, queued_minutes_ago: int
+) -> QueuedJob:
+    return QueuedJob(
+        project_id=project_id,
+        job_id=job_id,
+        priority=priority,
+        queued_at=datetime.now(timezone.utc) - timedelta(minutes=queued_minutes_ago),
+    )
+
+
+@pytest.mark.unit
+def test_dispatch_order() -> None:
+    queued_jobs = [
+        create_queued_job("project-a", "a-1", JobPriority.NORMAL, 10),
+        create_queued_job("project-a", "a-2", JobPriority.NORMAL, 9),
+        create_queued_job("project-a", "a-3", JobPriority.NORMAL, 8),
+        create_queued_job("project-b", "b-1", JobPriority.NORMAL, 5),
+        create_queued_job("project-b", "b-low", JobPriority.LOW, 20),
+        create_queued_job("project-c", "c-high", JobPriority.HIGH, 1),
+    ]
+    # Higher priorities first, then the projects take turns in FIFO order
+    assert [queued_job.job_id for queued_job in get_dispatch_order(queued_jobs)] == [
+        "c-high",
+        "a-1",
+        "b-1",
+        "a-2",
+        "a-3",
+        "b-low",
+    ]
+
+
+@pytest.mark.unit
+class TestJobQueue:
+    @pytest.fixture(autouse=True)
+    def _init_managers(self, monkeypatch: pytest.MonkeyPatch) -> Generator:
+        def get_json_db_manager(
+            component_manager: ComponentManager,
+        ) -> JsonDocumentOperations:
+            return InMemoryDictJsonDocumentManager(
+                component_manager.global_state, component_manager.request_state
+            )
+
+        monkeypatch.setattr(
+            ComponentManager, "get_json_db_manager", get_json_db_manager
+        )
+        self.monkeypatch = monkeypatch
+        self.global_state = GlobalState(State())
+        self.global_state.settings = settings
+        self.component_manager = ComponentManager(
+            self.global_state, RequestState(State())
+        )
+        self.component_manager.request_state.authorized_access = AuthorizedAccess(
+            authorized_subject="users/test-user"
+        )
+        self.component_manager.get_system_manager().add_allowed_image(
+            AllowedImageInfo(image_name="ubuntu", image_tags=["20.04"])
+        )
+        self.platform = RunningJobsPlatform()
+        # display name -> job ID
+        self.job_ids: Dict[str, str] = {}
+        self.deployment_manager = DeploymentManager(
+            self.platform, self.component_manager  # type: ignore
+        )
+        yield
+        self.global_state.close()
+
+    def deploy_job(
+        self,
+        project_id: str,
+        display_name: str,
+        priority: JobPriority = JobPriority.NORMAL,
+        min_cpus: float = 1,
+    ) -> Job:
+        job = self.deployment_manager.deploy_job(
+            project_id,
+            JobInput(
+                display_name=display_name,
+                container_image="ubuntu:20.04",
+                priority=priority,
+                compute=DeploymentCompute(min_cpus=min_cpus),
+            ),
+        )
+        self.job_ids[display_name] = job.id  # type: ignore
+        return job
+
+    def finish_job(self, project_id: str, display_name: str) -> None:
+        self.platform.finish_job(project_id, self.job_ids[display_name])
+
+    def get_job(self, project_id: str, display_name: str) -> Job:
+        return self.deployment_manager.get_job_metadata(
+            project_id, self.job_ids[display_name]
+        )
+
+    def get_dispatched_jobs(self) -> List[str]:
+        display_names = {job_id: name for name, job_id in self.job_ids.items()}
+        return [
+            display_names[queued_job.job_id]
+            for queued_job in self.deployment_manager.dispatch_queued_jobs()
+        ]
+
+    def test_project_quota(self) -> None:
+        self.monkeypatch.setattr(settings, "JOB_QUEUE_MAX_RUNNING_JOBS_PER_PROJECT", 1)
+        assert self.deploy_job("project-a", "job-a1").status == DeploymentStatus.RUNNING
+        queued_job = self.deploy_job("project-a", "job-a2")
+        assert queued_job.status == DeploymentStatus.QUEUED
+        assert queued_job.queue_position == 1
+        # The quota of the other project is not affected
+        assert self.deploy_job("project-b", "job-b1").status == DeploymentStatus.RUNNING
+
+        jobs = {
+            job.display_name: job
+            for job in self.deployment_manager.list_jobs("project-a")
+        }
+        assert jobs["job-a2"].status == DeploymentStatus.QUEUED
+        assert jobs["job-a2"].queue_position == 1
+        assert self.get_job("project-a", "job-a2").status == DeploymentStatus.QUEUED
+
+        assert self.get_dispatched_jobs() == []
+        self.finish_job("project-a", "job-a1")
+        assert self.get_dispatched_jobs() == ["job-a2"]
+        assert self.get_job("project-a", "job-a2").status == DeploymentStatus.RUNNING
+
+    def test_global_quota_with_priorities(self) -> None:
+        self.monkeypatch.setattr(settings, "JOB_QUEUE_MAX_RUNNING_JOBS", 1)
+        assert self.deploy_job("project-a", "first").status == DeploymentStatus.RUNNING
+        assert (
+            self.deploy_job("project-a", "low-job", JobPriority.LOW).queue_position == 1
+        )
+        # Queued jobs with a higher priority are started first
+        assert (
+            self.deploy_job("project-b", "high-job", JobPriority.HIGH).queue_position
+            == 1
+        )
+        assert self.get_job("project-a", "low-job").queue_position == 2
+
+        self.finish_job("project-a", "first")
+        assert self.get_dispatched_jobs() == ["high-job"]
+        self.finish_job("project-b", "high-job")
+        assert self.get_dispatched_jobs() == ["low-job"]
+
+    def test_no_overtaking(self) -> None:
+        self.monkeypatch.setattr(settings, "JOB_QUEUE_MAX_RUNNING_JOBS", 1)
+        self.deploy_job("project-a", "first")
+        self.deploy_job("project-a", "second")
+        self.finish_job("project-a", "first")
+        # The quota allows another job, but the new job must not overtake the queued job
+        assert self.deploy_job("project-a", "third").queue_position == 2
+        assert self.get_dispatched_jobs() == ["second"]
+
+    def test_resource_capacity(self) -> None:
+        self.monkeypatch.setattr(settings, "JOB_QUEUE_CHECK_RESOURCES", True)
+        self.platform.capacity = (4, 100000)
+        assert (
+            self.deploy_job("project-a", "big-job", min_cpus=3).status
+            == DeploymentStatus.RUNNING
+        )
+        assert (
+            self.deploy_job("project-b", "too-big", min_cpus=2).status
+            == DeploymentStatus.QUEUED
+        )
+        # A job that exceeds the capacity on its own waits until the platform is idle
+        assert (
+            self.deploy_job("project-c", "huge-job", min_cpus=8).status
+            == DeploymentStatus.QUEUED
+        )
+
+        self.finish_job("project-a", "big-job")
+        assert self.get_dispatched_jobs() == ["too-big"]
+        self.finish_job("project-b", "too-big")
+        assert self.get_dispatched_jobs() == ["huge-job"]
+
+    def test_delete_queued_job(self) -> None:
+        self.monkeypatch.setattr(settings, "JOB_QUEUE_MAX_RUNNING_JOBS", 1)
+        self.deploy_job("project-a", "first")
+        self.deploy_job("project-a", "deleted")
+        self.deployment_manager.delete_job("project-a", self.job_ids["deleted"])
+
+        self.finish_job("project-a", "first")
+        assert self.get_dispatched_jobs() == []
+
+    def test_deploy_jobs_batch(self) -> None:
+        self.monkeypatch.setattr(settings, "JOB_QUEUE_MAX_RUNNING_JOBS_PER_PROJECT", 2)
+        results = self.deployment_manager.deploy_jobs(
+            "project-a",
+            [
+                JobInput(display_name=f"job-{i}", container_image="ubuntu:20.04")
+                for i in range(4)
+            ],
+        )
+        assert [result.job.status for result in results] == [  # type: ignore
+            DeploymentStatus.RUNNING,
+            DeploymentStatus.RUNNING,
+            DeploymentStatus.QUEUED,
+            DeploymentStatus.QUEUED,
+        ]
+        assert [result.job.queue_position for result in results] == [  # type: ignore
+            None,
+            None,
+            1,
+            2,
+        ]
+        assert len(self.platform.list_jobs("project-a")) == 2
+
+    def test_usage_is_shared_by_admissions(self) -> None:
+        self.monkeypatch.setattr(settings, "JOB_QUEUE_MAX_RUNNING_JOBS", 2)
+        assert self.deploy_job("project-a", "first").status == DeploymentStatus.RUNNING
+        assert self.deploy_job("project-b", "second").status == DeploymentStatus.RUNNING
+        assert self.deploy_job("project-a", "third").status == DeploymentStatus.QUEUED
+        # The usage is only loaded from the platform for the first admission
+        assert self.platform.list_calls == 1
+
+        self.finish_job("project-a", "first")
+        assert self.get_dispatched_jobs() == ["third"]
+        assert self.platform.list_calls == 2
+
+    def test_concurrent_admissions(self) -> None:
+        self.monkeypatch.setattr(settings, "JOB_QUEUE_MAX_RUNNING_JOBS", 1)
+        job_queue = JobQueue(self.component_manager.get_json_db_manager())
+        concurrent_admissions: List[List[bool]] = []
+
+        def get_usage() -> ResourceUsage:
+            # Another app instance admits a job while the usage is loaded
+            if not concurrent_admissions:
+                concurrent_admissions.append(
+                    job_queue.admit(
+                        ResourceUsage,
+                        [
+                            create_queued_job(
+                                "project-b", "other", JobPriority.NORMAL, 0
+                            )
+                        ],
+                    )
+                )
+            return ResourceUsage()
+
+        assert job_queue.admit(
+            get_usage, [create_queued_job("project-a", "job", JobPriority.NORMAL, 0)]
+        ) == [False]
+        assert concurrent_admissions == [[True]]
+
+    def test_failed_start(self) -> None:
+        self.monkeypatch.setattr(settings, "JOB_QUEUE_MAX_RUNNING_JOBS", 1)
+        self.monkeypatch.setattr(settings, "JOB_QUEUE_MAX_START_ATTEMPTS", 2)
+        self.deploy_job("project-a", "first")
+        self.deploy_job("project-a", "broken")
+        self.deploy_job("project-a", "last")
+        self.platform.failing_jobs.add("broken")
+        self.finish_job("project-a", "first")
+
+        # The job is queued again and keeps its position
+        assert self.get_dispatched_jobs() == []
+        assert self.get_job("project-a", "broken").queue_position == 1
+        # The job is marked as failed after the last attempt
+        assert self.get_dispatched_jobs() == []
+        broken_job = self.get_job("project-a", "broken")
+        assert broken_job.status == DeploymentStatus.FAILED
+        assert broken_job.queue_position is None
+        assert self.get_dispatched_jobs() == ["last"]
@@ -7,6 +7,7 @@ from uuid import uuid4
 import pytest
 import requests
 from fastapi.testclient import TestClient
+from sqlalchemy import text
 
 from contaxy import config
 from contaxy.clients import AuthClient, JsonDocumentClient
@@ -20,6 +21,7 @@ from contaxy.schema.auth import (
 )
 from contaxy.schema.exceptions import (
     ClientValueError,
+    PreconditionFailedError,
     ResourceAlreadyExistsError,
     ResourceNotFoundError,
 )
@@ -91,6 +93,51 @@ class JsonDocumentOperationsTests(ABC):
         with pytest.raises(ClientValueError):
             self._create_doc(self.json_document_manager, self.project_id, defaults)
 
+    def test_create_json_documents(self) -> None:
+        json_documents = {str(uuid4()): json.dumps({"index": i}) for i in range(3)}
+        created_docs = self.json_document_manager.create_json_documents(
+            self.project_id, self.COLLECTTION, json_documents, upsert=False
+        )
+        assert sorted(doc.key for doc in created_docs) == sorted(json_documents)
+
+        # Test - Upsert case
+        upserted_keys = list(json_documents)[:2]
+        upserted_docs = self.json_document_manager.create_json_documents(
+            self.project_id,
+            self.COLLECTTION,
+            {key: "{}" for key in upserted_keys},
+        )
+        for doc in upserted_docs:
+            assert json.loads(doc.json_value) == {}
+            assert doc.version == 2
+
+        # Test - Insert case with existing key
+        with pytest.raises(ResourceAlreadyExistsError):
+            self.json_document_manager.create_json_documents(
+                self.project_id,
+                self.COLLECTTION,
+                {upserted_keys[0]: "{}"},
+                upsert=False,
+            )
+
+    def test_create_json_documents_in_transaction(self) -> None:
+        existing_doc = self._create_doc(
+            self.json_document_manager, self.project_id, get_defaults()
+        )
+        new_key = str(uuid4())
+        with pytest.raises(ResourceAlreadyExistsError):
+            self.json_document_manager.create_json_documents(
+                self.project_id,
+                self.COLLECTTION,
+                {new_key: "{}", existing_doc.key: "{}"},
+                upsert=False,
+            )
+        # None of the documents is created if one insert fails
+        with pytest.raises(ResourceNotFoundError):
+            self.json_document_manager.get_json_document(
+                self.project_id, self.COLLECTTION, new_key
+            )
+
     def test_get_json_document(self) -> None:
         defaults = get_defaults()
         created_doc = self._create_doc(
@@ -183,6 +230,60 @@ class JsonDocumentOperationsTests(ABC):
                 "{}",
             )
 
+    def test_conditional_writes(self) -> None:
+        created_doc = self.json_document_manager.create_json_document(
+            self.project_id, self.COLLECTTION, str(uuid4()), '{"foo": "bar"}'
+        )
+        assert created_doc.version is not None
+
+        replaced_doc = self.json_document_manager.create_json_document(
+            self.project_id,
+            self.COLLECTTION,
+            created_doc.key,
+            '{"foo": "baz"}',
+            expected_version=created_doc.version,
+        )
+        assert replaced_doc.version == created_doc.version + 1
+
+        # Stale version must not overwrite the document
+        with pytest.raises(PreconditionFailedError):
+            self.json_document_manager.create_json_document(
+                self.project_id,
+                self.COLLECTTION,
+                created_doc.key,
+                '{"foo": "stale"}',
+                expected_version=created_doc.version,
+            )
+
+        with pytest.raises(PreconditionFailedError):
+            self.json_document_manager.update_json_document(
+                self.project_id,
+                self.COLLECTTION,
+                created_doc.key,
+                '{"foo": "stale"}',
+                expected_version=created_doc.version,
+            )
+
+        updated_doc = self.json_document_manager.update_json_document(
+            self.project_id,
+            self.COLLECTTION,
+            created_doc.key,
+            '{"added": true}',
+            expected_version=replaced_doc.version,
+        )
+        assert updated_doc.version == replaced_doc.version + 1
+        assert json.loads(updated_doc.json_value) == {"foo": "baz", "added": True}
+
+        # Conditional writes require an existing document
+        with pytest.raises(PreconditionFailedError):
+            self.json_document_manager.create_json_document(
+                self.project_id,
+                self.COLLECTTION,
+                str(uuid4()),
+                "{}",
+                expected_version=1,
+            )
+
     def test_list_json_documents(self) -> None:
 
         collection_id = self.COLLECTTION
@@ -303,6 +404,43 @@ class JsonDocumentOperationsTests(ABC):
             )
             db_keys.index(doc.key)
 
+    def test_delete_documents(self) -> None:
+        db_keys: List[str] = []
+        for _ in range(5):
+            doc = self._create_doc(
+                self.json_document_manager, self.project_id, get_defaults()
+            )
+            db_keys.append(doc.key)
+
+        delete_count = self.json_document_manager.delete_documents(
+            self.project_id, self.COLLECTTION, db_keys
+        )
+        assert delete_count == len(db_keys)
+        docs = self.json_document_manager.list_json_documents(
+            self.project_id, self.COLLECTTION, keys=db_keys
+        )
+
+        assert len(docs) == 0
+
+    def test_list_json_documents_by_keys(self) -> None:
+        docs = [
+            self._create_doc(
+                self.json_document_manager, self.project_id, get_defaults()
+            )
+            for _ in range(3)
+        ]
+        documents = self.json_document_manager.list_json_documents_by_keys(
+            self.project_id,
+            {
+                self.COLLECTTION: [docs[0].key, docs[1].key, "missing-key"],
+                "missing-collection": [docs[0].key],
+            },
+        )
+        assert sorted(doc.key for doc in documents[self.COLLECTTION]) == sorted(
+            [docs[0].key, docs[1].key]
+        )
+        assert documents["missing-collection"] == []
+
     def test_delete_json_collections(self) -> None:
         # Currently, there is no operation function to check whether the collections themselves are actually deleted
         key = "test"
@@ -382,24 +520,26 @@ class TestJsonDocumentManagerWithPostgres(JsonDocumentOperationsTests):
     def project_id(self) -> str:
         return self._project_id
 
-    def test_delete_documents(self) -> None:
-        # Not implemented in default operations and endpoints.
-        db_keys: List[str] = []
-        for _ in range(5):
-            doc = self._create_doc(
-                self.json_document_manager, self.project_id, get_defaults()
+    def test_list_json_documents_by_keys_of_unversioned_table(self) -> None:
+        doc = self._create_doc(
+            self.json_document_manager, self.project_id, get_defaults()
+        )
+        # Simulate a table that was created before the documents were versioned
+        schema_name = self._json_db._get_schema_name(self.project_id)
+        with self._json_db._engine.begin() as conn:
+            conn.execute(
+                text(
+                    f'ALTER TABLE "{schema_name}"."{self.COLLECTTION}" DROP COLUMN version'
+                )
             )
-            db_keys.append(doc.key)
+            conn.commit()
+        self._json_db.global_state[PostgresJsonDocumentManager].migrated_tables = None
 
-        delete_count = self.json_document_manager.delete_documents(
-            self.project_id, self.COLLECTTION, db_keys
+        documents = self._json_db.list_json_documents_by_keys(
+            self.project_id, {self.COLLECTTION: [doc.key]}
         )
-        assert delete_count == len(db_keys)
-        docs = self.json_document_manager.list_json_documents(
-            self.project_id, self.COLLECTTION, keys=db_keys
-        )
-
-        assert len(docs) == 0
+        assert [document.key for document in documents[self.COLLECTTION]] == [doc.key]
+        assert documents[self.COLLECTTION][0].version == 1
 
 
 @pytest.mark.skipif(
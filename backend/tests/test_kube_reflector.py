@@ -0,0 +1,548 @@
+import json
+import threading
+import time
+from typing import Any, Callable, Generator, List
+
+import pytest
+import yaml
+from kubernetes import client as kube_client
+from kubernetes.client.rest import ApiException
+from kubernetes.config import kube_config
+
+from contaxy.config import settings
+from contaxy.managers.deployment.kube_reflector import ResourceReflector
+from contaxy.managers.deployment.kube_utils import (
+    wait_for_deletion,
+    wait_for_deployment,
+    wait_for_job,
+)
+from contaxy.managers.deployment.kubernetes import (
+    RESTARTED_AT_ANNOTATION,
+    KubernetesDeploymentPlatform,
+)
+from contaxy.managers.deployment.utils import Labels
+from contaxy.schema.deployment import DeploymentType
+from contaxy.schema.exceptions import (
+    ResourceNotFoundError,
+    ResourceNotReadyError,
+    ServerBaseError,
+)
+
+from .fake_kube_api import FakeKubeApiServer
+
+KUBE_NAMESPACE = "contaxy-test"
+
+
+def _wait_for(condition: Callable[[], bool], timeout: float = 10) -> None:
+    start = time.time()
+    while not condition():
+        if time.time() - start > timeout:
+            raise TimeoutError("Condition was not met in time.")
+        time.sleep(0.05)
+
+
+def _create_deployment_manifest(name: str, project_id: str = "test-project") -> dict:
+    labels = {
+        Labels.NAMESPACE.value: settings.SYSTEM_NAMESPACE,
+        Labels.PROJECT_NAME.value: project_id,
+        Labels.DEPLOYMENT_TYPE.value: DeploymentType.SERVICE.value,
+        Labels.DEPLOYMENT_ID.value: name,
+        Labels.DISPLAY_NAME.value: name,
+    }
+    return {
+        "apiVersion": "apps/v1",
+        "kind": "Deployment",
+        "metadata": {"name": name, "namespace": KUBE_NAMESPACE, "labels": labels},
+        "spec": {
+            "selector": {"matchLabels": labels},
+            "template": {
+                "metadata": {"labels": labels},
+                "spec": {
+                    "containers": [
+                        {
+                            "name": name,
+                            "image": "ubuntu:20.04",
+                            "env": [],
+                            "resources": {
+                                "requests": {"cpu": "1", "memory": "100Mi"},
+                                "limits": {"cpu": "2", "memory": "200Mi"},
+                            },
+                        }
+                    ]
+                },
+            },
+        },
+        "status": {"replicas": 1, "readyReplicas": 1},
+    }
+
+
+def _create_labeled_manifest(
+    kind: str, name: str, project_id: str = "test-project"
+) -> dict:
+    return {
+        "apiVersion": "v1",
+        "kind": kind,
+        "metadata": {
+            "name": name,
+            "namespace": KUBE_NAMESPACE,
+            "labels": {
+                Labels.NAMESPACE.value: settings.SYSTEM_NAMESPACE,
+                Labels.PROJECT_NAME.value: project_id,
+                Labels.DEPLOYMENT_TYPE.value: DeploymentType.SERVICE.value,
+            },
+        },
+    }
+
+
+@pytest.fixture()
+def fake_kube_api() -> Generator[FakeKubeApiServer, None, None]:
+    server = FakeKubeApiServer()
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.mark.unit
+class TestResourceReflector:
+    @pytest.fixture(autouse=True)
+    def _init_reflector(self, fake_kube_api: FakeKubeApiServer) -> Generator:
+        configuration = kube_client.Configuration(host=fake_kube_api.url)
+        self.apps_api = kube_client.AppsV1Api(kube_client.ApiClient(configuration))
+        self.fake_kube_api = fake_kube_api
+        self._reflectors: List[ResourceReflector] = []
+        yield
+        for reflector in self._reflectors:
+            reflector.stop()
+
+    def create_reflector(self, watch_timeout: int = 300) -> ResourceReflector:
+        reflector = ResourceReflector(
+            self.apps_api.list_namespaced_deployment,
+            kube_namespace=KUBE_NAMESPACE,
+            label_selector=f"{Labels.NAMESPACE.value}={settings.SYSTEM_NAMESPACE}",
+            watch_timeout=watch_timeout,
+            request_timeout=5,
+            error_backoff=0.1,
+        )
+        self._reflectors.append(reflector)
+        reflector.start()
+        assert reflector.wait_until_ready(timeout=10)
+        return reflector
+
+    def test_list_and_watch(self) -> None:
+        self.fake_kube_api.create("deployments", _create_deployment_manifest("first"))
+        # Resources of other contaxy namespaces are ignored
+        other_deployment = _create_deployment_manifest("other")
+        other_deployment["metadata"]["labels"][Labels.NAMESPACE.value] = "other"
+        self.fake_kube_api.create("deployments", other_deployment)
+
+        reflector = self.create_reflector()
+        assert reflector.get("first") is not None
+        assert reflector.get("other") is None
+
+        self.fake_kube_api.create(
+            "deployments", _create_deployment_manifest("second", "other-project")
+        )
+        _wait_for(lambda: reflector.get("second") is not None)
+        assert [
+            deployment.metadata.name
+            for deployment in reflector.list(
+                [(Labels.PROJECT_NAME.value, "other-project")]
+            )
+        ] == ["second"]
+
+        updated_deployment = _create_deployment_manifest("second", "other-project")
+        updated_deployment["status"]["readyReplicas"] = 0
+        self.fake_kube_api.update("deployments", updated_deployment)
+        _wait_for(
+            lambda: reflector.get("second").status.ready_replicas == 0  # type: ignore
+        )
+
+        self.fake_kube_api.delete("deployments", "first")
+        _wait_for(lambda: reflector.get("first") is None)
+
+        # All changes were received via the initial watch
+        assert self.fake_kube_api.count_requests("deployments", "list") == 1
+        assert self.fake_kube_api.count_requests("deployments", "watch") == 1
+
+    def test_resume_watch(self) -> None:
+        self.fake_kube_api.create("deployments", _create_deployment_manifest("first"))
+        reflector = self.create_reflector(watch_timeout=1)
+
+        # Wait until the first watch timed out
+        _wait_for(lambda: self.fake_kube_api.count_requests("deployments", "watch") > 1)
+        self.fake_kube_api.create("deployments", _create_deployment_manifest("second"))
+        _wait_for(lambda: reflector.get("second") is not None)
+
+        # The watch is resumed from the last resource version without listing again
+        assert self.fake_kube_api.count_requests("deployments", "list") == 1
+        watch_requests = [
+            query
+            for plural, request_type, query in self.fake_kube_api.requests
+            if request_type == "watch"
+        ]
+        assert all(query.get("resourceVersion") for query in watch_requests)
+
+    def test_relist_after_expired_watch(self) -> None:
+        self.fake_kube_api.create("deployments", _create_deployment_manifest("first"))
+        reflector = self.create_reflector()
+
+        # Changes that happen while the watch history is expired are not received as events
+        self.fake_kube_api.expire_watches()
+        self.fake_kube_api.delete("deployments", "first")
+        self.fake_kube_api.create("deployments", _create_deployment_manifest("second"))
+        self.fake_kube_api.expire_watches()
+
+        _wait_for(lambda: self.fake_kube_api.count_requests("deployments", "list") > 1)
+        _wait_for(lambda: reflector.get("second") is not None)
+        assert reflector.get("first") is None
+        assert reflector.is_ready
+
+    def test_stop(self) -> None:
+        reflector = self.create_reflector()
+        reflector.stop()
+        assert not reflector.is_ready
+        watch_requests = self.fake_kube_api.count_requests("deployments", "watch")
+
+        self.fake_kube_api.create("deployments", _create_deployment_manifest("first"))
+        time.sleep(0.5)
+        assert reflector.get("first") is None
+        assert (
+            self.fake_kube_api.count_requests("deployments", "watch") == watch_requests
+        )
+
+    def test_update_skips_older_resource_version(self) -> None:
+        self.fake_kube_api.create("deployments", _create_deployment_manifest("first"))
+        reflector = self.create_reflector()
+        stored_deployment = reflector.get("first")
+        assert stored_deployment is not None
+
+        stale_deployment = self.apps_api.read_namespaced_deployment(
+            "first", KUBE_NAMESPACE
+        )
+        stale_deployment.metadata.resource_version = str(
+            int(stored_deployment.metadata.resource_version) - 1
+        )
+        reflector.update(stale_deployment)
+        assert reflector.get("first") is stored_deployment
+
+        newer_deployment = self.apps_api.read_namespaced_deployment(
+            "first", KUBE_NAMESPACE
+        )
+        newer_deployment.metadata.resource_version = str(
+            int(stored_deployment.metadata.resource_version) + 1
+        )
+        reflector.update(newer_deployment)
+        assert reflector.get("first") is newer_deployment
+
+
+@pytest.mark.unit
+class TestKubernetesDeploymentPlatformWithReflector:
+    @pytest.fixture(autouse=True)
+    def _init_platform(
+        self,
+        fake_kube_api: FakeKubeApiServer,
+        tmp_path: str,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> Generator:
+        kubeconfig_path = f"{tmp_path}/kubeconfig"
+        with open(kubeconfig_path, "w") as kubeconfig_file:
+            yaml.safe_dump(
+                {
+                    "apiVersion": "v1",
+                    "kind": "Config",
+                    "clusters": [
+                        {"name": "fake", "cluster": {"server": fake_kube_api.url}}
+                    ],
+                    "users": [{"name": "fake", "user": {}}],
+                    "contexts": [
+                        {"name": "fake", "context": {"cluster": "fake", "user": "fake"}}
+                    ],
+                    "current-context": "fake",
+                },
+                kubeconfig_file,
+            )
+        monkeypatch.setattr(
+            kube_config, "KUBE_CONFIG_DEFAULT_LOCATION", kubeconfig_path
+        )
+        monkeypatch.delenv("CTXY_K8S_CONTEXT", raising=False)
+        monkeypatch.setattr(settings, "KUBERNETES_REFLECTOR_ENABLED", True)
+        monkeypatch.setattr(settings, "DEPLOYMENT_METRICS_ENABLED", False)
+
+        self.fake_kube_api = fake_kube_api
+        self.fake_kube_api.create(
+            "deployments", _create_deployment_manifest("test-service")
+        )
+        self.platform = KubernetesDeploymentPlatform(kube_namespace=KUBE_NAMESPACE)
+        for reflector in self.platform._reflectors:
+            assert reflector.wait_until_ready(timeout=10)
+        yield
+        self.platform.close()
+
+    def test_reads_from_reflector(self) -> None:
+        assert self.fake_kube_api.count_requests("deployments", "list") == 1
+
+        for _ in range(3):
+            services = self.platform.list_services("test-project")
+            assert [service.id for service in services] == ["test-service"]
+        assert self.platform.list_services("other-project") == []
+        assert (
+            self.platform.get_service_metadata("test-project", "test-service").id
+            == "test-service"
+        )
+        assert self.fake_kube_api.count_requests("deployments", "list") == 1
+        assert self.fake_kube_api.count_requests("deployments", "get") == 0
+
+        self.fake_kube_api.create(
+            "deployments", _create_deployment_manifest("new-service")
+        )
+        _wait_for(lambda: len(self.platform.list_services("test-project")) == 2)
+
+    def test_get_missing_service_metadata(self) -> None:
+        # Resources missing in the store are read from the Kubernetes API
+        with pytest.raises(ResourceNotFoundError):
+            self.platform.get_service_metadata("test-project", "missing-service")
+        assert self.fake_kube_api.count_requests("deployments", "get") == 1
+
+    def test_health_check(self) -> None:
+        assert self.platform.check_health()
+        assert self.fake_kube_api.count_requests("version", "get") == 1
+
+    def test_reconnect_restarts_reflectors(self) -> None:
+        notifications: List[str] = []
+        self.platform.add_deployment_listener(
+            lambda project_id, deployment_id: notifications.append(deployment_id)
+        )
+        old_reflectors = self.platform._reflectors
+
+        def unreachable(**kwargs: Any) -> None:
+            raise ConnectionError("Kubernetes API server is not reachable.")
+
+        self.platform._version_api.get_code = unreachable  # type: ignore
+        # Reconnecting creates new API clients and reflectors that use them
+        assert self.platform.check_health()
+        assert not any(reflector.is_ready for reflector in old_reflectors)
+        new_reflectors = self.platform._reflectors
+        assert len(new_reflectors) == len(old_reflectors)
+        assert not set(map(id, new_reflectors)) & set(map(id, old_reflectors))
+        for reflector in new_reflectors:
+            assert reflector.wait_until_ready(timeout=10)
+        assert self.fake_kube_api.count_requests("deployments", "list") == 2
+
+        # Deployment listeners are registered on the new reflectors
+        self.fake_kube_api.create(
+            "deployments", _create_deployment_manifest("new-service")
+        )
+        _wait_for(lambda: "new-service" in notifications)
+
+    def create_pod(self, phase: str) -> None:
+        labels = {
+            Labels.NAMESPACE.value: settings.SYSTEM_NAMESPACE,
+            Labels.PROJECT_NAME.value: "test-project",
+            Labels.DEPLOYMENT_ID.value: "test-service",
+        }
+        self.fake_kube_api.create(
+            "pods",
+            {
+                "apiVersion": "v1",
+                "kind": "Pod",
+                "metadata": {
+                    "name": "test-service-pod",
+                    "namespace": KUBE_NAMESPACE,
+                    "labels": labels,
+                },
+                "status": {"phase": phase},
+            },
+        )
+
+    def test_stream_service_logs(self) -> None:
+        self.create_pod("Running")
+        self.fake_kube_api.pod_logs["test-service-pod"] = [b"first\n", b"second\n"]
+        _wait_for(
+            lambda: self.platform._get_pod("test-project", "test-service") is not None
+        )
+
+        log_stream = self.platform.stream_service_logs(
+            "test-project", "test-service", follow=True
+        )
+        assert next(log_stream) == b"first\n"
+        assert next(log_stream) == b"second\n"
+        # In follow mode, the stream is open until it is closed
+        threading.Timer(0.1, log_stream.close).start()  # type: ignore
+        assert list(log_stream) == []
+        assert self.fake_kube_api.count_requests("pods", "log") == 1
+
+    def test_get_logs_of_starting_service(self) -> None:
+        self.create_pod("Pending")
+        self.fake_kube_api.pod_logs["test-service-pod"] = [b"started\n"]
+        _wait_for(
+            lambda: self.platform._pod_reflector.get("test-service-pod") is not None  # type: ignore
+        )
+
+        with pytest.raises(ResourceNotReadyError):
+            self.platform.get_service_logs("test-project", "test-service", wait=False)
+        assert self.fake_kube_api.count_requests("pods", "log") == 0
+
+        def start_pod() -> None:
+            # Started after the pod is watched in addition to the reflector
+            _wait_for(lambda: self.fake_kube_api.count_requests("pods", "watch") > 1)
+            pod = json.loads(
+                json.dumps(self.fake_kube_api._resources["pods"]["test-service-pod"])
+            )
+            pod["status"]["phase"] = "Running"
+            self.fake_kube_api.update("pods", pod)
+
+        threading.Thread(target=start_pod, daemon=True).start()
+        assert "started" in self.platform.get_service_logs(
+            "test-project", "test-service"
+        )
+        watch_queries = [
+            query
+            for plural, request_type, query in self.fake_kube_api.requests
+            if plural == "pods" and request_type == "watch"
+        ]
+        assert watch_queries[-1]["fieldSelector"] == "metadata.name=test-service-pod"
+        # The pod is read from the reflector and not listed again while it is starting
+        assert self.fake_kube_api.count_requests("pods", "list") == 1
+
+    def test_delete_services(self) -> None:
+        for project_id in ["test-project", "other-project"]:
+            self.fake_kube_api.create(
+                "deployments",
+                _create_deployment_manifest(f"{project_id}-service", project_id),
+            )
+            self.fake_kube_api.create(
+                "services",
+                _create_labeled_manifest(
+                    "Service", f"{project_id}-service", project_id
+                ),
+            )
+            self.fake_kube_api.create(
+                "persistentvolumeclaims",
+                _create_labeled_manifest(
+                    "PersistentVolumeClaim", f"{project_id}-service", project_id
+                ),
+            )
+        _wait_for(lambda: len(self.platform.list_services("test-project")) == 2)
+
+        self.platform.delete_services("test-project")
+        # The deleted services are removed from the reflector immediately
+        assert self.platform.list_services("test-project") == []
+        assert [
+            service.id for service in self.platform.list_services("other-project")
+        ] == ["other-project-service"]
+        # One request per resource type without waiting for the pods to terminate
+        for plural in ["services", "deployments", "persistentvolumeclaims"]:
+            delete_requests = [
+                query
+                for request_plural, request_type, query in self.fake_kube_api.requests
+                if request_plural == plural and request_type.startswith("delete")
+            ]
+            assert len(delete_requests) == 1
+            assert delete_requests[0]["propagationPolicy"] == "Background"
+        assert self.fake_kube_api.count_requests("deployments", "get") == 0
+
+    def test_delete_services_with_failed_resource_type(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        def fail_deletion(**kwargs: Any) -> None:
+            raise ApiException(status=500, reason="Internal Server Error")
+
+        monkeypatch.setattr(
+            self.platform.core_api,
+            "delete_collection_namespaced_persistent_volume_claim",
+            fail_deletion,
+        )
+        with pytest.raises(ServerBaseError):
+            self.platform.delete_services("test-project")
+        # The other resource types are deleted anyway
+        assert "test-service" not in self.fake_kube_api._resources["deployments"]
+
+    def test_wait_for_deletion(self) -> None:
+        def is_deployment_watched() -> bool:
+            # The reflector watches all deployments without a field selector
+            return any(
+                plural == "deployments"
+                and request_type == "watch"
+                and query.get("fieldSelector") == "metadata.name=test-service"
+                for plural, request_type, query in list(self.fake_kube_api.requests)
+            )
+
+        def delete_deployment() -> None:
+            _wait_for(is_deployment_watched)
+            self.fake_kube_api.delete("deployments", "test-service")
+
+        threading.Thread(target=delete_deployment, daemon=True).start()
+        wait_for_deletion(
+            self.platform.apps_api, KUBE_NAMESPACE, "test-service", timeout=10
+        )
+        assert "test-service" not in self.fake_kube_api._resources["deployments"]
+        # The deployment is watched instead of polled
+        assert is_deployment_watched()
+        assert self.fake_kube_api.count_requests("deployments", "get") == 0
+
+    def roll_out(self, name: str) -> None:
+        """Reports the rollout of the latest generation as complete, like the deployment controller."""
+        deployment = json.loads(
+            json.dumps(self.fake_kube_api._resources["deployments"][name])
+        )
+        deployment["status"] = {
+            "replicas": 1,
+            "updatedReplicas": 1,
+            "availableReplicas": 1,
+            "observedGeneration": deployment["metadata"].get("generation", 1),
+        }
+        self.fake_kube_api.update("deployments", deployment)
+
+    def test_restart_service(self) -> None:
+        def roll_out_after_restart() -> None:
+            _wait_for(
+                lambda: self.fake_kube_api.count_requests("deployments", "watch") > 1
+            )
+            self.roll_out("test-service")
+
+        threading.Thread(target=roll_out_after_restart, daemon=True).start()
+        self.platform.restart_service("test-project", "test-service", wait=True)
+
+        deployment = self.fake_kube_api._resources["deployments"]["test-service"]
+        assert RESTARTED_AT_ANNOTATION in (
+            deployment["spec"]["template"]["metadata"]["annotations"]
+        )
+        # The deployment is not deleted and the rollout is watched instead of polled
+        assert self.fake_kube_api.count_requests("deployments", "delete") == 0
+        assert self.fake_kube_api.count_requests("deployments", "patch") == 1
+        watch_queries = [
+            query
+            for plural, request_type, query in self.fake_kube_api.requests
+            if plural == "deployments" and request_type == "watch"
+        ]
+        assert watch_queries[-1]["fieldSelector"] == "metadata.name=test-service"
+
+    def test_restart_missing_service(self) -> None:
+        with pytest.raises(ResourceNotFoundError):
+            self.platform.restart_service("other-project", "test-service")
+        assert self.fake_kube_api.count_requests("deployments", "patch") == 0
+
+    def test_wait_for_rolled_out_deployment(self) -> None:
+        self.roll_out("test-service")
+        wait_for_deployment("test-service", KUBE_NAMESPACE, self.platform.apps_api)
+        # The deployment is only watched if it is not rolled out yet
+        assert self.fake_kube_api.count_requests("deployments", "watch") == 1
+
+    def test_wait_for_job(self) -> None:
+        job = _create_labeled_manifest("Job", "test-job")
+        job["apiVersion"] = "batch/v1"
+        self.fake_kube_api.create("jobs", job)
+
+        def start_job() -> None:
+            _wait_for(lambda: self.fake_kube_api.count_requests("jobs", "watch") > 1)
+            job["status"] = {"active": 1}
+            self.fake_kube_api.update("jobs", job)
+
+        threading.Thread(target=start_job, daemon=True).start()
+        wait_for_job("test-job", KUBE_NAMESPACE, self.platform.batch_api, timeout=10)
+        watch_queries = [
+            query
+            for plural, request_type, query in self.fake_kube_api.requests
+            if plural == "jobs" and request_type == "watch"
+        ]
+        assert watch_queries[-1]["fieldSelector"] == "metadata.name=test-job"
@@ -0,0 +1,111 @@
+import asyncio
+import threading
+from typing import Any, Generator, Iterator, List
+
+import docker
+import pytest
+
+from contaxy.config import settings
+from contaxy.managers.deployment.docker import DockerDeploymentPlatform
+from contaxy.utils.fastapi_utils import ClosableStreamingResponse
+from contaxy.utils.utils import ClosableStream
+
+from .fake_docker import FakeDockerClient, FakeLogStream
+
+
+@pytest.mark.unit
+class TestClosableStream:
+    def test_close_from_other_thread(self) -> None:
+        unblock_read = threading.Event()
+
+        def read_chunks() -> Iterator[bytes]:
+            yield b"first"
+            unblock_read.wait(10)
+            # Reading from a closed connection fails
+            raise OSError("Connection closed.")
+
+        stream = ClosableStream(read_chunks(), close=unblock_read.set)
+        assert next(stream) == b"first"
+        threading.Timer(0.1, stream.close).start()
+        assert list(stream) == []
+
+    def test_close_at_end(self) -> None:
+        close_calls: List[bool] = []
+        stream = ClosableStream([b"first", b"second"], lambda: close_calls.append(True))
+        assert b"".join(stream) == b"firstsecond"
+        stream.close()
+        assert close_calls == [True]
+
+
+@pytest.mark.unit
+class TestClosableStreamingResponse:
+    def call_response(
+        self, response: ClosableStreamingResponse, disconnect_after_first_chunk: bool
+    ) -> List[dict]:
+        messages: List[dict] = []
+
+        async def call() -> None:
+            disconnect = asyncio.Event()
+
+            async def receive() -> dict:
+                await disconnect.wait()
+                return {"type": "http.disconnect"}
+
+            async def send(message: dict) -> None:
+                messages.append(message)
+                if message.get("body") and disconnect_after_first_chunk:
+                    disconnect.set()
+
+            await asyncio.wait_for(
+                response({"type": "http"}, receive, send), timeout=10  # type: ignore
+            )
+
+        asyncio.run(call())
+        return messages
+
+    def test_close_on_disconnect(self) -> None:
+        # The stream blocks after the first chunk until it is closed
+        log_stream = FakeLogStream([b"first"], follow=True)
+        messages = self.call_response(
+            ClosableStreamingResponse(log_stream, media_type="text/plain"),
+            disconnect_after_first_chunk=True,
+        )
+        assert log_stream.closed.is_set()
+        assert [message.get("body") for message in messages][1] == b"first"
+
+    def test_close_after_response(self) -> None:
+        log_stream = FakeLogStream([b"first", b"second"], follow=False)
+        messages = self.call_response(
+            ClosableStreamingResponse(log_stream, media_type="text/plain"),
+            disconnect_after_first_chunk=False,
+        )
+        assert log_stream.closed.is_set()
+        assert b"".join(message.get("body", b"") for message in messages) == (
+            b"firstsecond"
+        )
+
+
+@pytest.mark.unit
+class TestDockerLogStreaming:
+    @pytest.fixture(autouse=True)
+    def _init_platform(self, monkeypatch: pytest.MonkeyPatch) -> Generator:
+        self.client = FakeDockerClient()
+        monkeypatch.setattr(docker, "from_env", lambda **kwargs: self.client)
+        monkeypatch.setattr(DockerDeploymentPlatform, "_is_initialized", True)
+        monkeypatch.setattr(settings, "DOCKER_CONTAINER_CACHE_ENABLED", False)
+        monkeypatch.setattr(settings, "DEPLOYMENT_METRICS_ENABLED", False)
+        self.platform = DockerDeploymentPlatform()
+        yield
+
+    def test_stream_service_logs(self) -> None:
+        container_id = self.client.add_container("test-service")
+        self.client.container_logs[container_id] = [b"first\n", b"second\n"]
+
+        log_stream: Any = self.platform.stream_service_logs(
+            "test-project", "test-service", follow=True
+        )
+        assert next(log_stream) == b"first\n"
+        assert next(log_stream) == b"second\n"
+        # In follow mode, the stream is open until it is closed
+        threading.Timer(0.1, log_stream.close).start()
+        assert list(log_stream) == []
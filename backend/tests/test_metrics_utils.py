@@ -0,0 +1,36 @@
+import pytest
+
+from contaxy.utils import id_utils
+from contaxy.utils.metrics_utils import MetricsTTLCache
+
+
+@pytest.mark.unit
+def test_metrics_ttl_cache() -> None:
+    current_time = 0.0
+    cache = MetricsTTLCache(
+        name="test-" + id_utils.generate_short_uuid(),
+        maxsize=2,
+        ttl=10,
+        timer=lambda: current_time,
+    )
+    cache["a"] = 1
+    cache["b"] = 2
+    # Evicts the oldest item since the cache is full
+    cache["c"] = 3
+    cache.record_hit()
+    cache.record_miss()
+
+    statistics = cache.get_statistics()
+    assert statistics.size == 2
+    assert statistics.max_size == 2
+    assert statistics.hits == 1
+    assert statistics.misses == 1
+    assert statistics.evictions == 1
+
+    # Expires all remaining items
+    current_time = 20.0
+    assert "c" not in cache
+    cache.expire()
+    statistics = cache.get_statistics()
+    assert statistics.evictions == 3
+    assert statistics.size == 0
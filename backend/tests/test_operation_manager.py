@@ -0,0 +1,267 @@
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Generator, Optional
+
+import pytest
+from pydantic import BaseModel
+from starlette.datastructures import State
+from starlette.responses import Response
+
+from contaxy import config
+from contaxy.config import settings
+from contaxy.managers.components import ComponentManager
+from contaxy.managers.json_db.inmemory_dict import InMemoryDictJsonDocumentManager
+from contaxy.managers.operation import OperationManager, get_operation_collection_id
+from contaxy.operations import JsonDocumentOperations
+from contaxy.operations.components import ComponentOperations
+from contaxy.schema.auth import AuthorizedAccess
+from contaxy.schema.exceptions import ClientValueError, ResourceNotFoundError
+from contaxy.schema.operation import Operation, OperationState
+from contaxy.utils.state_utils import GlobalState, RequestState
+
+
+class OperationResult(BaseModel):
+    authorized_subject: Optional[str]
+
+
+@pytest.mark.unit
+class TestOperationManager:
+    @pytest.fixture(autouse=True)
+    def _init_managers(self, monkeypatch: pytest.MonkeyPatch) -> Generator:
+        def get_json_db_manager(
+            component_manager: ComponentManager,
+        ) -> JsonDocumentOperations:
+            return InMemoryDictJsonDocumentManager(
+                component_manager.global_state, component_manager.request_state
+            )
+
+        # Operations are executed with a new component manager, which uses the in-memory JSON DB
+        monkeypatch.setattr(
+            ComponentManager, "get_json_db_manager", get_json_db_manager
+        )
+        monkeypatch.setattr(settings, "OPERATION_POLL_INTERVAL", 0.05)
+
+        self.global_state = GlobalState(State())
+        self.global_state.settings = settings
+        self.component_manager = ComponentManager(
+            self.global_state, RequestState(State())
+        )
+        self.component_manager.request_state.authorized_access = AuthorizedAccess(
+            authorized_subject="users/test-user"
+        )
+        self.operation_manager = self.component_manager.get_operation_manager()
+        yield
+        self.global_state.close()
+
+    def wait_for_operation(
+        self, operation: Operation, timeout: float = 10
+    ) -> Operation:
+        return asyncio.run(
+            self.operation_manager.wait_for_operation(
+                "test-project", operation.id, timeout=timeout
+            )
+        )
+
+    def test_successful_operation(self) -> None:
+        def get_authorized_subject(
+            component_manager: ComponentOperations,
+        ) -> OperationResult:
+            # The operation is executed with the access of the request that started it
+            return OperationResult(
+                authorized_subject=component_manager.request_state.authorized_subject
+            )
+
+        operation = self.operation_manager.start_operation(
+            "test-project",
+            "deploy_service",
+            "projects/test-project/services",
+            get_authorized_subject,
+        )
+        assert operation.state == OperationState.PENDING
+        assert operation.created_by == "users/test-user"
+
+        finished_operation = self.wait_for_operation(operation)
+        assert finished_operation.state == OperationState.SUCCEEDED
+        assert finished_operation.result == {"authorized_subject": "users/test-user"}
+        assert finished_operation.started_at and finished_operation.finished_at
+        assert finished_operation.error is None
+        assert [
+            listed_operation.id
+            for listed_operation in self.operation_manager.list_operations(
+                "test-project"
+            )
+        ] == [operation.id]
+
+    def test_failed_operation(self) -> None:
+        def fail(component_manager: ComponentOperations) -> None:
+            raise ClientValueError("Invalid service.", explanation="Use another image.")
+
+        operation = self.operation_manager.start_operation(
+            "test-project", "deploy_service", "projects/test-project/services", fail
+        )
+        finished_operation = self.wait_for_operation(operation)
+        assert finished_operation.state == OperationState.FAILED
+        assert finished_operation.error is not None
+        assert finished_operation.error.code == 400
+        assert finished_operation.error.message == "Invalid service."
+        assert finished_operation.error.explanation == "Use another image."
+
+    def test_failed_response(self) -> None:
+        def execute_action(component_manager: ComponentOperations) -> Response:
+            return Response(content="No implementation.", status_code=501)
+
+        operation = self.operation_manager.start_operation(
+            "test-project",
+            "execute_service_action",
+            "projects/test-project/services/test-service",
+            execute_action,
+        )
+        finished_operation = self.wait_for_operation(operation)
+        assert finished_operation.state == OperationState.FAILED
+        assert finished_operation.error is not None
+        assert finished_operation.error.code == 501
+
+    def test_wait_timeout(self) -> None:
+        operation_started = threading.Event()
+        finish_operation = threading.Event()
+
+        def block(component_manager: ComponentOperations) -> None:
+            operation_started.set()
+            finish_operation.wait(10)
+
+        operation = self.operation_manager.start_operation(
+            "test-project",
+            "delete_service",
+            "projects/test-project/services/test-service",
+            block,
+        )
+        assert operation_started.wait(10)
+        # The current state is returned if the operation is not done in time
+        assert (
+            self.wait_for_operation(operation, timeout=0.2).state
+            == OperationState.RUNNING
+        )
+        finish_operation.set()
+        assert self.wait_for_operation(operation).state == OperationState.SUCCEEDED
+
+    def start_blocking_operation(self, finish_operation: threading.Event) -> Operation:
+        operation_started = threading.Event()
+
+        def block(component_manager: ComponentOperations) -> None:
+            operation_started.set()
+            finish_operation.wait(10)
+
+        operation = self.operation_manager.start_operation(
+            "test-project",
+            "delete_service",
+            "projects/test-project/services/test-service",
+            block,
+        )
+        assert operation_started.wait(10)
+        return operation
+
+    def test_wait_is_notified_by_local_operation(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        # Operations of this app instance are not polled
+        monkeypatch.setattr(settings, "OPERATION_POLL_INTERVAL", 60)
+        finish_operation = threading.Event()
+        operation = self.start_blocking_operation(finish_operation)
+
+        threading.Timer(0.2, finish_operation.set).start()
+        start = time.time()
+        assert self.wait_for_operation(operation).state == OperationState.SUCCEEDED
+        assert time.time() - start < 5
+
+    def test_renew_heartbeats(self) -> None:
+        finish_operation = threading.Event()
+        operation = self.start_blocking_operation(finish_operation)
+        running_operation = self.operation_manager.get_operation(
+            "test-project", operation.id
+        )
+        assert running_operation.instance_id == operation.instance_id is not None
+        assert running_operation.heartbeat_at is not None
+
+        self.operation_manager.renew_heartbeats()
+        renewed_operation = self.operation_manager.get_operation(
+            "test-project", operation.id
+        )
+        assert renewed_operation.heartbeat_at is not None
+        assert renewed_operation.heartbeat_at > running_operation.heartbeat_at
+        assert renewed_operation.state == OperationState.RUNNING
+        finish_operation.set()
+        assert self.wait_for_operation(operation).state == OperationState.SUCCEEDED
+
+    def save_operation(self, operation: Operation) -> None:
+        self.operation_manager._json_db_manager.create_json_document(
+            config.SYSTEM_INTERNAL_PROJECT,
+            get_operation_collection_id("test-project"),
+            operation.id,
+            operation.json(),
+        )
+
+    def test_cleanup_operations(self) -> None:
+        self.operation_manager._json_db_manager.create_json_document(
+            config.SYSTEM_INTERNAL_PROJECT,
+            OperationManager._PROJECT_COLLECTION,
+            "test-project",
+            "{}",
+        )
+        now = datetime.now(timezone.utc)
+        expired_at = now - settings.OPERATION_RETENTION - timedelta(minutes=1)
+        stale_at = now - settings.OPERATION_HEARTBEAT_TIMEOUT - timedelta(minutes=1)
+        operations = {
+            name: Operation(
+                id=name,
+                operation_type="deploy_service",
+                resource_name="projects/test-project/services",
+                state=state,
+                created_at=created_at,
+                finished_at=created_at if state == OperationState.SUCCEEDED else None,
+                instance_id="stopped-instance",
+                heartbeat_at=created_at,
+            )
+            for name, state, created_at in [
+                ("expired", OperationState.SUCCEEDED, expired_at),
+                ("finished", OperationState.SUCCEEDED, now),
+                ("stale", OperationState.RUNNING, stale_at),
+                ("running", OperationState.RUNNING, now),
+            ]
+        }
+        for operation in operations.values():
+            self.save_operation(operation)
+
+        self.operation_manager.cleanup_operations()
+        remaining_operations = {
+            operation.id: operation
+            for operation in self.operation_manager.list_operations("test-project")
+        }
+        assert sorted(remaining_operations) == ["finished", "running", "stale"]
+        assert remaining_operations["running"].state == OperationState.RUNNING
+        stale_operation = remaining_operations["stale"]
+        assert stale_operation.state == OperationState.FAILED
+        assert stale_operation.finished_at is not None
+        assert stale_operation.error is not None and stale_operation.error.code == 500
+
+    def test_delete_operations(self) -> None:
+        def succeed(component_manager: ComponentOperations) -> None:
+            pass
+
+        operation = self.operation_manager.start_operation(
+            "test-project", "delete_service", "projects/test-project", succeed
+        )
+        self.wait_for_operation(operation)
+        self.operation_manager.delete_operations("test-project")
+        assert self.operation_manager.list_operations("test-project") == []
+
+    def test_get_missing_operation(self) -> None:
+        with pytest.raises(ResourceNotFoundError):
+            self.operation_manager.get_operation("test-project", "missing-operation")
+
+    def test_executor_is_shared(self) -> None:
+        other_operation_manager = OperationManager(
+            ComponentManager(self.global_state, RequestState(State()))
+        )
+        assert other_operation_manager._executor is self.operation_manager._executor
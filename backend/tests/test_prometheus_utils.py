@@ -0,0 +1,150 @@
+from typing import Optional
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy.future import create_engine
+from sqlalchemy.pool import QueuePool
+
+from contaxy.utils import prometheus_utils
+
+
+def _get_sample_value(name: str, labels: Optional[dict] = None) -> float:
+    return REGISTRY.get_sample_value(name, labels or {}) or 0.0
+
+
+@pytest.mark.unit
+def test_metrics_middleware() -> None:
+    app = FastAPI()
+    app.add_middleware(prometheus_utils.MetricsMiddleware)
+
+    @app.get("/items/{item_id}", operation_id="get_test_item")
+    def get_item(item_id: str) -> dict:
+        return {"item_id": item_id}
+
+    request_labels = {
+        "method": "GET",
+        "route": "/items/{item_id}",
+        "operation_id": "get_test_item",
+    }
+    initial_count = _get_sample_value(
+        "contaxy_http_requests_total", {**request_labels, "status_code": "200"}
+    )
+    initial_unmatched_count = _get_sample_value(
+        "contaxy_http_requests_total",
+        {
+            "method": "GET",
+            "route": prometheus_utils.UNMATCHED_ROUTE,
+            "operation_id": "",
+            "status_code": "404",
+        },
+    )
+
+    client = TestClient(app)
+    assert client.get("/items/foo").status_code == 200
+    assert client.get("/items/bar").status_code == 200
+    assert client.get("/unknown/path").status_code == 404
+
+    # Requests are recorded per route template instead of the actual path
+    assert (
+        _get_sample_value(
+            "contaxy_http_requests_total", {**request_labels, "status_code": "200"}
+        )
+        == initial_count + 2
+    )
+    assert _get_sample_value(
+        "contaxy_http_request_duration_seconds_count", request_labels
+    ) >= (initial_count + 2)
+    assert (
+        _get_sample_value(
+            "contaxy_http_requests_total",
+            {
+                "method": "GET",
+                "route": prometheus_utils.UNMATCHED_ROUTE,
+                "operation_id": "",
+                "status_code": "404",
+            },
+        )
+        == initial_unmatched_count + 1
+    )
+    assert (
+        _get_sample_value(
+            "contaxy_http_requests_in_progress",
+            {"method": "GET", "route": "/items/{item_id}"},
+        )
+        == 0
+    )
+    assert _get_sample_value("contaxy_thread_pool_capacity") > 0
+
+    metrics, content_type = prometheus_utils.generate_metrics()
+    assert content_type.startswith("text/plain")
+    assert b'route="/items/{item_id}"' in metrics
+
+
+@pytest.mark.unit
+def test_instrument_db_engine() -> None:
+    prometheus_utils.update_db_pool_metrics()
+    initial_pool_size = _get_sample_value("contaxy_db_pool_size")
+    initial_checked_out = _get_sample_value("contaxy_db_pool_checked_out_connections")
+    initial_checkouts = _get_sample_value("contaxy_db_pool_checkouts_total")
+
+    engine = create_engine("sqlite://", poolclass=QueuePool, pool_size=2)
+    prometheus_utils.instrument_db_engine(engine)
+    assert _get_sample_value("contaxy_db_pool_size") == initial_pool_size + 2
+    with engine.connect():
+        assert (
+            _get_sample_value("contaxy_db_pool_checked_out_connections")
+            == initial_checked_out + 1
+        )
+    prometheus_utils.update_db_pool_metrics()
+    assert (
+        _get_sample_value("contaxy_db_pool_checked_out_connections")
+        == initial_checked_out
+    )
+    assert _get_sample_value("contaxy_db_pool_checkouts_total") == initial_checkouts + 1
+
+
+@pytest.mark.unit
+def test_time_json_db_operation() -> None:
+    @prometheus_utils.time_json_db_operation
+    def get_test_document() -> str:
+        return "document"
+
+    labels = {"operation": "get_test_document"}
+    initial_count = _get_sample_value(
+        "contaxy_json_db_operation_duration_seconds_count", labels
+    )
+    assert get_test_document() == "document"
+    assert (
+        _get_sample_value("contaxy_json_db_operation_duration_seconds_count", labels)
+        == initial_count + 1
+    )
+
+
+@pytest.mark.unit
+def test_get_histogram_statistics() -> None:
+    labels = {"operation": "permissions"}
+    initial_statistics = prometheus_utils.get_histogram_statistics(
+        prometheus_utils.collect_samples(),
+        "contaxy_auth_db_resolve_duration_seconds",
+        labels,
+    )
+    prometheus_utils.AUTH_DB_RESOLVE_LATENCY.labels(**labels).observe(0.002)
+
+    statistics = prometheus_utils.get_histogram_statistics(
+        prometheus_utils.collect_samples(),
+        "contaxy_auth_db_resolve_duration_seconds",
+        labels,
+    )
+    assert statistics.count == initial_statistics.count + 1
+    assert statistics.sum == pytest.approx(initial_statistics.sum + 0.002)
+    assert statistics.buckets["0.001"] == initial_statistics.buckets.get("0.001", 0)
+    assert (
+        statistics.buckets["0.0025"] == initial_statistics.buckets.get("0.0025", 0) + 1
+    )
+    assert statistics.buckets["inf"] == statistics.count
+    # The auth metrics are exposed together with all other metrics
+    assert b"contaxy_auth_db_resolve_duration_seconds_bucket" in (
+        prometheus_utils.generate_metrics()[0]
+    )
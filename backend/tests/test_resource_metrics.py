@@ -0,0 +1,181 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional
+
+import pytest
+
+from contaxy.managers.deployment import resource_metrics
+from contaxy.managers.deployment.resource_metrics import (
+    DeploymentKey,
+    DockerResourceMetricsCollector,
+    KubernetesResourceMetricsCollector,
+    ResourceMetricsCollector,
+    downsample,
+)
+from contaxy.managers.deployment.utils import Labels
+from contaxy.schema.deployment import ResourceUsageSample
+
+from .fake_docker import FakeDockerClient
+
+
+def create_sample(minute: int, cpu_usage: Optional[float]) -> ResourceUsageSample:
+    return ResourceUsageSample(
+        timestamp=datetime(2022, 1, 1, 0, minute, tzinfo=timezone.utc),
+        cpu_usage=cpu_usage,
+        memory_usage=100,
+    )
+
+
+def create_stats(cpu_seconds: float, memory_bytes: int, network_bytes: int) -> dict:
+    return {
+        "cpu_stats": {"cpu_usage": {"total_usage": int(cpu_seconds * 1e9)}},
+        "memory_stats": {
+            "usage": memory_bytes + 1024 * 1024,
+            "stats": {"inactive_file": 1024 * 1024},
+        },
+        "networks": {
+            "eth0": {"rx_bytes": network_bytes, "tx_bytes": network_bytes // 2}
+        },
+    }
+
+
+class StaticMetricsCollector(ResourceMetricsCollector):
+    def __init__(self) -> None:
+        super().__init__(max_samples=3)
+        self.samples: Dict[DeploymentKey, Optional[ResourceUsageSample]] = {}
+
+    def _sample(self) -> Dict[DeploymentKey, Optional[ResourceUsageSample]]:
+        return self.samples
+
+
+@pytest.mark.unit
+def test_downsample() -> None:
+    samples = [create_sample(minute, minute) for minute in range(10)]
+    assert downsample(samples, 20) == samples
+
+    downsampled = downsample(samples, 4)
+    # Buckets of 3 samples, the last bucket contains the remaining sample
+    assert [sample.cpu_usage for sample in downsampled] == [1, 4, 7, 9]
+    assert [sample.timestamp.minute for sample in downsampled] == [2, 5, 8, 9]
+
+    # Values that are not set are ignored
+    samples = [create_sample(0, None), create_sample(1, 3), create_sample(2, None)]
+    assert downsample(samples, 1)[0].cpu_usage == 3
+    assert downsample(samples[:1], 1)[0].cpu_usage is None
+
+
+@pytest.mark.unit
+def test_ring_buffer() -> None:
+    collector = StaticMetricsCollector()
+    for minute in range(5):
+        collector.samples = {
+            ("project-a", "service-a"): create_sample(minute, minute),
+            # Running, but could not be sampled
+            ("project-a", "service-b"): None,
+        }
+        collector.collect()
+
+    samples = collector.get_samples("project-a", "service-a")
+    assert [sample.cpu_usage for sample in samples] == [2, 3, 4]
+    since = datetime(2022, 1, 1, 0, 3, tzinfo=timezone.utc)
+    assert len(collector.get_samples("project-a", "service-a", since)) == 1
+    assert collector.get_samples("project-a", "service-b") == []
+
+    # The history of stopped deployments is dropped
+    collector.samples = {}
+    collector.collect()
+    assert collector.get_samples("project-a", "service-a") == []
+
+
+@pytest.mark.unit
+def test_docker_collector(monkeypatch: pytest.MonkeyPatch) -> None:
+    client = FakeDockerClient()
+    container_id = client.add_container("test-service")
+    client.add_container("unavailable-stats")
+    read_times: Iterator[float] = iter([100.0, 110.0])
+    monkeypatch.setattr(resource_metrics.time, "monotonic", lambda: next(read_times))
+    collector = DockerResourceMetricsCollector(
+        client, interval=timedelta(seconds=10)  # type: ignore
+    )
+
+    client.container_stats[container_id] = create_stats(5, 200 * 1024 * 1024, 1000)
+    collector.collect()
+    client.container_stats[container_id] = create_stats(10, 100 * 1024 * 1024, 3000)
+    collector.collect()
+
+    first_sample, second_sample = collector.get_samples("test-project", "test-service")
+    # The rates require two samples
+    assert first_sample.cpu_usage is None
+    assert first_sample.network_receive_rate is None
+    # The page cache is not counted as used memory
+    assert first_sample.memory_usage == 200
+    assert second_sample.cpu_usage == 0.5
+    assert second_sample.memory_usage == 100
+    assert second_sample.network_receive_rate == 200
+    assert second_sample.network_transmit_rate == 100
+    assert collector.get_samples("test-project", "unavailable-stats") == []
+
+
+@pytest.mark.unit
+def test_docker_collector_counter_reset(monkeypatch: pytest.MonkeyPatch) -> None:
+    client = FakeDockerClient()
+    container_id = client.add_container("test-service")
+    read_times: Iterator[float] = iter([100.0, 110.0])
+    monkeypatch.setattr(resource_metrics.time, "monotonic", lambda: next(read_times))
+    collector = DockerResourceMetricsCollector(client)  # type: ignore
+
+    client.container_stats[container_id] = create_stats(50, 1024 * 1024, 1000)
+    collector.collect()
+    # The counters start at 0 after a restart of the container
+    client.container_stats[container_id] = create_stats(1, 1024 * 1024, 10)
+    collector.collect()
+
+    samples: List[ResourceUsageSample] = collector.get_samples(
+        "test-project", "test-service"
+    )
+    assert samples[-1].cpu_usage is None
+    assert samples[-1].network_receive_rate is None
+
+
+class FakeCustomObjectsApi:
+    def __init__(self, pod_metrics: List[dict]) -> None:
+        self.pod_metrics = pod_metrics
+
+    def list_namespaced_custom_object(self, **kwargs: str) -> dict:
+        assert kwargs["group"] == "metrics.k8s.io"
+        return {"items": self.pod_metrics}
+
+
+def create_pod_metrics(deployment_id: str, cpu: str, memory: str) -> dict:
+    return {
+        "metadata": {
+            "labels": {
+                Labels.PROJECT_NAME.value: "test-project",
+                Labels.DEPLOYMENT_ID.value: deployment_id,
+            }
+        },
+        "containers": [{"usage": {"cpu": cpu, "memory": memory}}],
+    }
+
+
+@pytest.mark.unit
+def test_kubernetes_collector() -> None:
+    collector = KubernetesResourceMetricsCollector(
+        FakeCustomObjectsApi(
+            [
+                create_pod_metrics("test-service", "250m", "100Mi"),
+                # Replicas of the same deployment are summed up
+                create_pod_metrics("test-service", "500000000n", "50Mi"),
+                create_pod_metrics("test-job", "2", "1Gi"),
+            ]
+        ),
+        kube_namespace="test-namespace",
+    )
+    collector.collect()
+
+    (service_sample,) = collector.get_samples("test-project", "test-service")
+    assert service_sample.cpu_usage == 0.75
+    assert service_sample.memory_usage == 150
+    assert service_sample.network_receive_rate is None
+    (job_sample,) = collector.get_samples("test-project", "test-job")
+    assert job_sample.cpu_usage == 2
+    assert job_sample.memory_usage == 1024
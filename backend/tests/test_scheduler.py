@@ -0,0 +1,155 @@
+import threading
+from datetime import timedelta
+from typing import Generator, List
+
+import pytest
+from prometheus_client import REGISTRY
+from starlette.datastructures import State
+
+from contaxy import config
+from contaxy.config import settings
+from contaxy.managers.components import ComponentManager
+from contaxy.managers.json_db.inmemory_dict import InMemoryDictJsonDocumentManager
+from contaxy.managers.scheduler import (
+    SCHEDULED_JOB_COLLECTION,
+    JobScheduler,
+    ScheduledJob,
+    ScheduledJobLease,
+    get_scheduled_jobs,
+)
+from contaxy.operations import JsonDocumentOperations
+from contaxy.operations.components import ComponentOperations
+from contaxy.utils.state_utils import GlobalState, RequestState
+
+
+def _get_run_count(job_name: str, result: str) -> float:
+    return (
+        REGISTRY.get_sample_value(
+            "contaxy_scheduled_job_runs_total", {"job": job_name, "result": result}
+        )
+        or 0.0
+    )
+
+
+@pytest.mark.unit
+class TestJobScheduler:
+    @pytest.fixture(autouse=True)
+    def _init_schedulers(self, monkeypatch: pytest.MonkeyPatch) -> Generator:
+        def get_json_db_manager(
+            component_manager: ComponentManager,
+        ) -> JsonDocumentOperations:
+            return InMemoryDictJsonDocumentManager(
+                component_manager.global_state, component_manager.request_state
+            )
+
+        monkeypatch.setattr(
+            ComponentManager, "get_json_db_manager", get_json_db_manager
+        )
+        # All app instances share the JSON DB
+        self.global_state = GlobalState(State())
+        self.global_state.settings = settings
+        self.first_scheduler = JobScheduler(self.global_state, instance_id="first")
+        self.second_scheduler = JobScheduler(self.global_state, instance_id="second")
+        self.executions: List[str] = []
+        yield
+        self.global_state.close()
+
+    def create_job(
+        self,
+        name: str,
+        interval: timedelta = timedelta(hours=1),
+        run_once_per_cluster: bool = True,
+    ) -> ScheduledJob:
+        def run(component_manager: ComponentOperations) -> None:
+            self.executions.append(name)
+
+        return ScheduledJob(name, run, interval, run_once_per_cluster)
+
+    def get_lease(self, job_name: str) -> ScheduledJobLease:
+        json_db_manager = InMemoryDictJsonDocumentManager(
+            self.global_state, RequestState(State())
+        )
+        return ScheduledJobLease.parse_raw(
+            json_db_manager.get_json_document(
+                config.SYSTEM_INTERNAL_PROJECT, SCHEDULED_JOB_COLLECTION, job_name
+            ).json_value
+        )
+
+    def test_run_once_per_cluster(self) -> None:
+        job = self.create_job("cluster-job")
+        assert self.first_scheduler.run_job(job)
+        # The next execution is not due yet
+        assert not self.second_scheduler.run_job(job)
+        assert not self.first_scheduler.run_job(job)
+        assert self.executions == ["cluster-job"]
+
+        lease = self.get_lease("cluster-job")
+        assert lease.holder is None
+        assert lease.last_finished_at is not None
+        assert lease.last_duration is not None
+
+    def test_run_when_due(self) -> None:
+        job = self.create_job("due-job", interval=timedelta(0))
+        assert self.first_scheduler.run_job(job)
+        assert self.second_scheduler.run_job(job)
+        assert self.executions == ["due-job", "due-job"]
+
+    def test_run_in_every_instance(self) -> None:
+        job = self.create_job("local-job", run_once_per_cluster=False)
+        assert self.first_scheduler.run_job(job)
+        assert self.second_scheduler.run_job(job)
+        assert self.executions == ["local-job", "local-job"]
+
+    def test_overlap_protection(self) -> None:
+        job_started = threading.Event()
+        finish_job = threading.Event()
+
+        def block(component_manager: ComponentOperations) -> None:
+            job_started.set()
+            finish_job.wait(10)
+
+        job = ScheduledJob("blocking-job", block, timedelta(0))
+        job_thread = threading.Thread(target=self.first_scheduler.run_job, args=(job,))
+        job_thread.start()
+        assert job_started.wait(10)
+        assert self.get_lease("blocking-job").holder == "first"
+
+        initial_skipped_runs = _get_run_count("blocking-job", "skipped")
+        # The job is due, but still executed by the first instance
+        assert not self.first_scheduler.run_job(job)
+        assert not self.second_scheduler.run_job(job)
+        assert _get_run_count("blocking-job", "skipped") == initial_skipped_runs + 2
+
+        finish_job.set()
+        job_thread.join(10)
+        assert self.second_scheduler.run_job(job)
+
+    def test_expired_lease(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        # Lease of an instance that was terminated while executing the job
+        monkeypatch.setattr(settings, "SCHEDULED_JOB_TIMEOUT", timedelta(0))
+        monkeypatch.setattr(
+            JobScheduler, "_release_lease", lambda *args, **kwargs: None
+        )
+        job = self.create_job("expired-job", interval=timedelta(0))
+        assert self.first_scheduler.run_job(job)
+        assert self.get_lease("expired-job").holder == "first"
+        assert self.second_scheduler.run_job(job)
+
+    def test_failed_job(self) -> None:
+        def fail(component_manager: ComponentOperations) -> None:
+            raise RuntimeError("Job failed.")
+
+        initial_failed_runs = _get_run_count("failing-job", "failed")
+        job = ScheduledJob("failing-job", fail, timedelta(hours=1))
+        assert self.first_scheduler.run_job(job)
+        assert _get_run_count("failing-job", "failed") == initial_failed_runs + 1
+        assert self.get_lease("failing-job").holder is None
+
+    def test_registered_jobs(self) -> None:
+        # The managers register their jobs on import
+        jobs = {job.name: job for job in get_scheduled_jobs()}
+        assert jobs["stop_idle_services"].run_once_per_cluster
+        assert jobs["delete_expired_api_tokens"].run_once_per_cluster
+        assert jobs["reconcile_services"].run_once_per_cluster
+        assert jobs["dispatch_queued_jobs"].run_once_per_cluster
+        assert not jobs["check_deployment_platform_health"].run_once_per_cluster
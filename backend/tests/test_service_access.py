@@ -0,0 +1,201 @@
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Generator
+
+import pytest
+from starlette.datastructures import State
+
+from contaxy import config
+from contaxy.config import settings
+from contaxy.managers.components import ComponentManager
+from contaxy.managers.deployment.manager import DeploymentManager
+from contaxy.managers.deployment.service_access import (
+    AccessLogReader,
+    ServiceAccessRecorder,
+    get_service_access_recorder,
+)
+from contaxy.managers.deployment.utils import get_service_collection_id
+from contaxy.managers.json_db.inmemory_dict import InMemoryDictJsonDocumentManager
+from contaxy.operations import JsonDocumentOperations
+from contaxy.schema import Service
+from contaxy.schema.deployment import DeploymentType
+from contaxy.schema.json_db import JsonDocument
+from contaxy.utils.state_utils import GlobalState, RequestState
+
+ACCESS_TIME = datetime(2022, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.mark.unit
+def test_recorder_keeps_latest_access() -> None:
+    recorder = ServiceAccessRecorder()
+    recorder.record("project-a", "service-a", ACCESS_TIME, user="users/a")
+    recorder.record("project-a", "service-a", ACCESS_TIME - timedelta(minutes=1))
+    # Accesses without user keep the user of the previous access
+    recorder.record("project-a", "service-a", ACCESS_TIME + timedelta(minutes=1))
+    recorder.record("project-a", "service-b", ACCESS_TIME)
+
+    accesses = recorder.pop_all()
+    assert len(accesses) == 2
+    access = accesses[("project-a", "service-a")]
+    assert access.access_time == ACCESS_TIME + timedelta(minutes=1)
+    assert access.user == "users/a"
+    assert recorder.pop_all() == {}
+
+
+@pytest.mark.unit
+def test_access_log_reader(tmp_path: Path) -> None:
+    log_path = tmp_path / "service-access.log"
+    reader = AccessLogReader(str(log_path))
+    assert reader.read() == {}
+
+    timestamp = ACCESS_TIME.timestamp()
+    with open(log_path, "w") as log_file:
+        log_file.write(f"{timestamp} project-a service-a\n")
+        log_file.write(f"{timestamp + 60} project-a service-a\n")
+        log_file.write("invalid line\n")
+        # Line that is still written
+        log_file.write(f"{timestamp} project-a service-b")
+    assert reader.read() == {
+        ("project-a", "service-a"): ACCESS_TIME + timedelta(minutes=1)
+    }
+
+    with open(log_path, "a") as log_file:
+        log_file.write("\n")
+    # Lines are only read once, also by other readers of the same log
+    assert AccessLogReader(str(log_path)).read() == {
+        ("project-a", "service-b"): ACCESS_TIME
+    }
+    assert reader.read() == {}
+
+    # The log was rotated
+    os.rename(log_path, tmp_path / "service-access.log.1")
+    with open(log_path, "w") as log_file:
+        log_file.write(f"{timestamp} project-b service-a\n")
+    assert reader.read() == {("project-b", "service-a"): ACCESS_TIME}
+
+
+@pytest.mark.unit
+class TestFlushServiceAccesses:
+    @pytest.fixture(autouse=True)
+    def _init_managers(
+        self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+    ) -> Generator:
+        def get_json_db_manager(
+            component_manager: ComponentManager,
+        ) -> JsonDocumentOperations:
+            return InMemoryDictJsonDocumentManager(
+                component_manager.global_state, component_manager.request_state
+            )
+
+        monkeypatch.setattr(
+            ComponentManager, "get_json_db_manager", get_json_db_manager
+        )
+        self.log_path = tmp_path / "service-access.log"
+        monkeypatch.setattr(settings, "SERVICE_ACCESS_LOG_PATH", str(self.log_path))
+        # No deployment platform is required without the metadata cache
+        monkeypatch.setattr(settings, "DEPLOYMENT_METADATA_CACHE_ENABLED", False)
+        self.global_state = GlobalState(State())
+        self.global_state.settings = settings
+        self.component_manager = ComponentManager(
+            self.global_state, RequestState(State())
+        )
+        self.deployment_manager = DeploymentManager(
+            None, self.component_manager  # type: ignore
+        )
+        self.json_db_manager = self.component_manager.get_json_db_manager()
+        self.json_db_manager.create_json_document(
+            config.SYSTEM_INTERNAL_PROJECT,
+            get_service_collection_id("test-project"),
+            "test-service",
+            Service(
+                id="test-service",
+                display_name="test-service",
+                container_image="ubuntu:20.04",
+                deployment_type=DeploymentType.SERVICE,
+                last_access_user="users/previous-user",
+            ).json(),
+        )
+        yield
+        self.global_state.close()
+
+    def get_db_service(self) -> Service:
+        return Service.parse_raw(
+            self.json_db_manager.get_json_document(
+                config.SYSTEM_INTERNAL_PROJECT,
+                get_service_collection_id("test-project"),
+                "test-service",
+            ).json_value
+        )
+
+    def test_flush_recorded_access(self) -> None:
+        recorder = get_service_access_recorder(self.global_state)
+        recorder.record("test-project", "test-service", ACCESS_TIME, "users/test")
+        # Accesses of unknown services are dropped
+        recorder.record("test-project", "unknown-service", ACCESS_TIME)
+
+        assert self.deployment_manager.flush_service_accesses() == 1
+        service = self.get_db_service()
+        assert service.last_access_time == ACCESS_TIME
+        assert service.last_access_user == "users/test"
+        assert self.deployment_manager.flush_service_accesses() == 0
+
+    def test_flush_logged_access(self) -> None:
+        with open(self.log_path, "w") as log_file:
+            log_file.write(f"{ACCESS_TIME.timestamp()} test-project test-service\n")
+
+        assert self.deployment_manager.flush_service_accesses() == 1
+        service = self.get_db_service()
+        assert service.last_access_time == ACCESS_TIME
+        # The user is unknown for logged accesses
+        assert service.last_access_user == "users/previous-user"
+
+    def test_older_access_is_not_written(self) -> None:
+        newer_access_time = ACCESS_TIME + timedelta(hours=1)
+        self.json_db_manager.update_json_document(
+            config.SYSTEM_INTERNAL_PROJECT,
+            get_service_collection_id("test-project"),
+            "test-service",
+            json.dumps({"last_access_time": str(newer_access_time)}),
+        )
+        # Another app instance flushes an older access afterwards
+        get_service_access_recorder(self.global_state).record(
+            "test-project", "test-service", ACCESS_TIME, "users/test"
+        )
+
+        assert self.deployment_manager.flush_service_accesses() == 0
+        service = self.get_db_service()
+        assert service.last_access_time == newer_access_time
+        assert service.last_access_user == "users/previous-user"
+
+    def test_concurrent_newer_access(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        newer_access_time = ACCESS_TIME + timedelta(hours=1)
+        update_json_document = InMemoryDictJsonDocumentManager.update_json_document
+
+        def update_concurrently(
+            json_db_manager: InMemoryDictJsonDocumentManager, *args: Any, **kwargs: Any
+        ) -> JsonDocument:
+            # Another app instance writes a newer access between the read and the write
+            monkeypatch.setattr(
+                InMemoryDictJsonDocumentManager,
+                "update_json_document",
+                update_json_document,
+            )
+            json_db_manager.update_json_document(
+                config.SYSTEM_INTERNAL_PROJECT,
+                get_service_collection_id("test-project"),
+                "test-service",
+                json.dumps({"last_access_time": str(newer_access_time)}),
+            )
+            return json_db_manager.update_json_document(*args, **kwargs)
+
+        monkeypatch.setattr(
+            InMemoryDictJsonDocumentManager, "update_json_document", update_concurrently
+        )
+        get_service_access_recorder(self.global_state).record(
+            "test-project", "test-service", ACCESS_TIME
+        )
+
+        assert self.deployment_manager.flush_service_accesses() == 0
+        assert self.get_db_service().last_access_time == newer_access_time
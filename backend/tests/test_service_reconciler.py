@@ -0,0 +1,111 @@
+from typing import Dict, Generator, List
+
+import pytest
+from starlette.datastructures import State
+
+from contaxy import config
+from contaxy.config import settings
+from contaxy.managers.components import ComponentManager
+from contaxy.managers.deployment.manager import DeploymentManager
+from contaxy.managers.deployment.utils import get_service_collection_id
+from contaxy.managers.json_db.inmemory_dict import InMemoryDictJsonDocumentManager
+from contaxy.operations import JsonDocumentOperations
+from contaxy.schema import Service
+from contaxy.schema.deployment import DeploymentStatus, DeploymentType
+from contaxy.utils.state_utils import GlobalState, RequestState
+
+
+def create_service(service_id: str) -> Service:
+    return Service(
+        id=service_id,
+        display_name=service_id,
+        container_image="ubuntu:20.04",
+        deployment_type=DeploymentType.SERVICE,
+        status=DeploymentStatus.RUNNING,
+    )
+
+
+class StaticDeploymentPlatform:
+    """Deployment platform with services that were started without the contaxy API."""
+
+    def __init__(self) -> None:
+        self.services: Dict[str, List[Service]] = {}
+
+    def list_services(self, project_id: str, deployment_type: str) -> List[Service]:
+        if deployment_type != DeploymentType.SERVICE:
+            return []
+        return self.services.get(project_id, [])
+
+    def list_all_services(self, deployment_type: str) -> Dict[str, List[Service]]:
+        if deployment_type != DeploymentType.SERVICE:
+            return {}
+        return self.services
+
+
+@pytest.mark.unit
+class TestServiceReconciler:
+    @pytest.fixture(autouse=True)
+    def _init_managers(self, monkeypatch: pytest.MonkeyPatch) -> Generator:
+        def get_json_db_manager(
+            component_manager: ComponentManager,
+        ) -> JsonDocumentOperations:
+            return InMemoryDictJsonDocumentManager(
+                component_manager.global_state, component_manager.request_state
+            )
+
+        monkeypatch.setattr(
+            ComponentManager, "get_json_db_manager", get_json_db_manager
+        )
+        self.global_state = GlobalState(State())
+        self.global_state.settings = settings
+        self.component_manager = ComponentManager(
+            self.global_state, RequestState(State())
+        )
+        self.json_db_manager = self.component_manager.get_json_db_manager()
+        self.platform = StaticDeploymentPlatform()
+        self.deployment_manager = DeploymentManager(
+            self.platform, self.component_manager  # type: ignore
+        )
+        yield
+        self.global_state.close()
+
+    def list_db_service_ids(self, project_id: str) -> List[str]:
+        return sorted(
+            service_doc.key
+            for service_doc in self.json_db_manager.list_json_documents(
+                config.SYSTEM_INTERNAL_PROJECT, get_service_collection_id(project_id)
+            )
+        )
+
+    def test_list_services_without_writes(self) -> None:
+        self.platform.services["test-project"] = [create_service("unknown-service")]
+        services = self.deployment_manager.list_services("test-project")
+        assert [service.id for service in services] == ["unknown-service"]
+        assert self.list_db_service_ids("test-project") == []
+
+    def test_reconcile_services(self) -> None:
+        self.platform.services = {
+            "test-project": [
+                create_service("known-service"),
+                create_service("unknown-service"),
+            ],
+            "other-project": [create_service("other-service")],
+        }
+        self.json_db_manager.create_json_document(
+            config.SYSTEM_INTERNAL_PROJECT,
+            get_service_collection_id("test-project"),
+            "known-service",
+            create_service("known-service").json(),
+        )
+
+        assert self.deployment_manager.reconcile_services() == 2
+        assert self.list_db_service_ids("test-project") == [
+            "known-service",
+            "unknown-service",
+        ]
+        assert self.list_db_service_ids("other-project") == ["other-service"]
+        # All services are in the DB already
+        assert self.deployment_manager.reconcile_services() == 0
+
+        services = self.deployment_manager.list_services("test-project")
+        assert all(service.status == DeploymentStatus.RUNNING for service in services)
@@ -1,12 +1,15 @@
 from abc import ABC, abstractmethod
-from typing import Generator
+from typing import Any, Generator, List
 
 import pytest
+from starlette.datastructures import State
 
 from contaxy import config
+from contaxy.config import settings
 from contaxy.managers.json_db.inmemory_dict import InMemoryDictJsonDocumentManager
 from contaxy.managers.json_db.postgres import PostgresJsonDocumentManager
 from contaxy.managers.system import SystemManager
+from contaxy.schema import JsonDocument
 from contaxy.schema.exceptions import ClientValueError, ResourceNotFoundError
 from contaxy.schema.system import AllowedImageInfo
 from contaxy.utils.state_utils import GlobalState, RequestState
@@ -69,6 +72,16 @@ class SystemOperationsTests(ABC):
         self.system_manager.check_allowed_image("test-image", "0.1")
         self.system_manager.check_allowed_image("test-image", "0.2")
 
+    def test_tag_pattern_for_allowed_image_tag(self):
+        assert len(self.system_manager.list_allowed_images()) == 0
+        self.system_manager.add_allowed_image(
+            AllowedImageInfo(image_name="test-image", image_tags=["0.1", "0.2.*"])
+        )
+        self.system_manager.check_allowed_image("test-image", "0.1")
+        self.system_manager.check_allowed_image("test-image", "0.2.1")
+        with pytest.raises(ClientValueError):
+            self.system_manager.check_allowed_image("test-image", "0.3.0")
+
 
 @pytest.mark.skipif(
     not test_settings.POSTGRES_INTEGRATION_TESTS,
@@ -103,6 +116,7 @@ class TestSystemManagerWithInMemoryDB(SystemOperationsTests):
     ) -> Generator:
         json_db = InMemoryDictJsonDocumentManager(global_state, request_state)
         json_db.delete_json_collections(config.SYSTEM_INTERNAL_PROJECT)
+        self.json_db = json_db
         self._system_manager = SystemManager(
             ComponentManagerMock(global_state, request_state, json_db_manager=json_db)
         )
@@ -112,3 +126,44 @@ class TestSystemManagerWithInMemoryDB(SystemOperationsTests):
     @property
     def system_manager(self) -> SystemManager:
         return self._system_manager
+
+    def test_allowed_image_index(
+        self, request_state: RequestState, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        # System manager of another process that uses the same DB
+        other_global_state = GlobalState(State())
+        other_global_state.settings = settings
+        other_system_manager = SystemManager(
+            ComponentManagerMock(
+                other_global_state, request_state, json_db_manager=self.json_db
+            )
+        )
+        other_system_manager.check_allowed_image("test-image", "0.1")
+
+        self.system_manager.add_allowed_image(
+            AllowedImageInfo(image_name="test-image", image_tags=["0.1"])
+        )
+        list_calls = []
+        list_json_documents = self.json_db.list_json_documents
+
+        def count_list_calls(*args: Any, **kwargs: Any) -> List[JsonDocument]:
+            list_calls.append(args)
+            return list_json_documents(*args, **kwargs)
+
+        monkeypatch.setattr(self.json_db, "list_json_documents", count_list_calls)
+        # Changes of the same process are applied immediately
+        with pytest.raises(ClientValueError):
+            self.system_manager.check_allowed_image("other-image", "0.1")
+        self.system_manager.check_allowed_image("test-image", "0.1")
+        # The allowed images are only loaded once
+        assert len(list_calls) == 1
+
+        # Changes of other processes are applied after the expiry of the index
+        other_system_manager.check_allowed_image("other-image", "0.1")
+        monkeypatch.setattr(settings, "ALLOWED_IMAGES_CACHE_EXPIRY", 0)
+        with pytest.raises(ClientValueError):
+            other_system_manager.check_allowed_image("other-image", "0.1")
+        assert len(list_calls) == 2
+        # The allowed images are not loaded again if they were not changed
+        other_system_manager.check_allowed_image("test-image", "0.1")
+        assert len(list_calls) == 2
@@ -48,6 +48,13 @@ timeout = int(timeout_str)
 keepalive = int(keepalive_str)
 
 
+def child_exit(server, worker):  # type: ignore
+    # Remove the live metrics of the exited worker process
+    from contaxy.utils.prometheus_utils import mark_process_dead
+
+    mark_process_dead(worker.pid)
+
+
 # For debugging and testing
 log_data = {
     "loglevel": loglevel,